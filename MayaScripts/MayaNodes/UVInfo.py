@@ -1,6 +1,7 @@
 import sys
 import maya.OpenMaya as OpenMaya
 import maya.OpenMayaMPx as OpenMayaMPx
+from general import surfaceFunctions
 
 
 nodeTypeName = "UVinfo"
@@ -10,6 +11,13 @@ nodeTypeId = OpenMaya.MTypeId(0x00123)
 class UVinfoNode(OpenMayaMPx.MPxNode):
     def __init__(self):
         OpenMayaMPx.MPxNode.__init__(self)
+        # object space BVH of the input mesh, rebuilt when inMesh changes
+        self.__bvh = None
+
+    def setDependentsDirty(self, plug, affectedPlugs):
+        if plug == UVinfoNode.inMesh:
+            self.__bvh = None
+        return OpenMayaMPx.MPxNode.setDependentsDirty(self, plug, affectedPlugs)
 
     def compute(self, plug, dataBlock):
         meshObj = dataBlock.inputValue(UVinfoNode.inMesh).asMesh()
@@ -21,24 +29,10 @@ class UVinfoNode(OpenMayaMPx.MPxNode):
         if meshObj.isNull():
             return False
 
-        # calculate
-        mesh = OpenMaya.MFnMesh(meshObj)
-        mPoint = OpenMaya.MPoint(pointX, pointY, pointZ )
-
-        # find and use the default UV set
-        setList = list()
-        mesh.getUVSetNames(setList)
-        uvSet = setList[0]
-
-        # define the float2
-        pArray = [0, 0]
-        floatPtr = OpenMaya.MScriptUtil()
-        floatPtr.createFromList(pArray, 2)
-        uvPoint = floatPtr.asFloat2Ptr()
-
-        mesh.getUVAtPoint(mPoint, uvPoint, OpenMaya.MSpace.kObject , uvSet)
-        u = OpenMaya.MScriptUtil.getFloat2ArrayItem(uvPoint, 0, 0)
-        v = OpenMaya.MScriptUtil.getFloat2ArrayItem(uvPoint, 0, 1)
+        # calculate, only moving the point reuses the BVH of the mesh
+        if self.__bvh is None:
+            self.__bvh = surfaceFunctions.meshBVHFromData(meshObj, OpenMaya.MSpace.kObject)
+        u, v = self.__bvh.closestUVs([[pointX, pointY, pointZ]])[0]
 
         #set the value
         uPlug = OpenMaya.MPlug(self.thisMObject(), UVinfoNode.Ucoord)
@@ -0,0 +1,60 @@
+import sys
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+from general import dgTransaction
+
+commandName = "dgTransaction"
+
+
+class dgTransactionCmd(OpenMayaMPx.MPxCommand):
+    '''
+    Applies the transaction handed over by general.dgTransaction.Transaction.apply
+    so that all of its modifier passes are a single entry on the undo queue.
+    Errors are stored on the transaction, apply raises them on the python side.
+    '''
+    def __init__(self):
+        OpenMayaMPx.MPxCommand.__init__(self)
+        self.__transaction = None
+
+    def doIt(self, args):
+        self.__transaction = dgTransaction._pending
+        if not self.__transaction:
+            sys.stderr.write("%s: no pending transaction, use Transaction.apply()\n" %commandName)
+            return
+        try:
+            self.__transaction.doIt()
+        except Exception, e:
+            if not self.__transaction.error:
+                self.__transaction.error = e
+            self.__transaction = None
+
+    def undoIt(self):
+        if self.__transaction:
+            self.__transaction.undoIt()
+
+    def redoIt(self):
+        if self.__transaction:
+            self.__transaction.redoIt()
+
+    def isUndoable(self):
+        return self.__transaction is not None
+
+
+def cmdCreator():
+    return OpenMayaMPx.asMPxPtr(dgTransactionCmd())
+
+
+def initializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj)
+    try:
+        plugin.registerCommand(commandName, cmdCreator)
+    except:
+        sys.stderr.write( "Failed to register command: %s" % commandName)
+
+
+def uninitializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj)
+    try:
+        plugin.deregisterCommand(commandName)
+    except:
+        sys.stderr.write( "Failed to deregister command: %s" % commandName)
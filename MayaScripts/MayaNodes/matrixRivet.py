@@ -0,0 +1,147 @@
+import sys
+import numpy
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+from general import meshBinding
+
+
+nodeTypeName = "matrixRivet"
+nodeTypeId = OpenMaya.MTypeId(0x00124)
+
+
+class matrixRivetNode(OpenMayaMPx.MPxNode):
+    '''
+    Every rivet of a mesh in one node: binding[i] holds a triangle (three
+    vertex ids), the barycentric weights of rivet i on it and its reference
+    matrix relative to the triangle frame, outMatrix[i] is the reference
+    carried by the frame in the space of inMesh (connect worldMesh for world
+    matrices). See general.meshBinding for the frame axes and the bindings.
+    '''
+    def __init__(self):
+        OpenMayaMPx.MPxNode.__init__(self)
+        # meshBinding.Binding of the binding plugs over the bound vertices only,
+        # and those vertex ids, read again when the plugs change
+        self.__bindings = None
+        self.__vertices = None
+
+    def setDependentsDirty(self, plug, affectedPlugs):
+        if plug != matrixRivetNode.inMesh:
+            self.__bindings = None
+        return OpenMayaMPx.MPxNode.setDependentsDirty(self, plug, affectedPlugs)
+
+    def compute(self, plug, dataBlock):
+        if plug.attribute() != matrixRivetNode.outMatrix:
+            return OpenMaya.kUnknownParameter
+
+        meshObj = dataBlock.inputValue(matrixRivetNode.inMesh).asMesh()
+        if meshObj.isNull():
+            return False
+
+        if self.__bindings is None:
+            self.__bindings = self.__readBindings(dataBlock)
+        binding = self.__bindings
+
+        # only the points of bound triangles are read
+        mesh = OpenMaya.MFnMesh(meshObj)
+        point = OpenMaya.MPoint()
+        points = numpy.empty((len(self.__vertices), 3))
+        for i, vertex in enumerate(self.__vertices):
+            mesh.getPoint(vertex, point)
+            points[i] = (point.x, point.y, point.z)
+        matrices = binding.matrices(points)
+
+        outHandle = dataBlock.outputArrayValue(matrixRivetNode.outMatrix)
+        builder = OpenMaya.MArrayDataBuilder(dataBlock, matrixRivetNode.outMatrix, len(binding))
+        matrix = OpenMaya.MMatrix()
+        for i, index in enumerate(binding.names):
+            OpenMaya.MScriptUtil.createMatrixFromList(matrices[i].reshape(-1).tolist(), matrix)
+            builder.addElement(index).setMMatrix(matrix)
+        outHandle.set(builder)
+        outHandle.setAllClean()
+
+        dataBlock.setClean(plug)
+
+    def __readBindings(self, dataBlock):
+        arrayHandle = dataBlock.inputArrayValue(matrixRivetNode.binding)
+        indices, triangles, weights, references = [], [], [], []
+        for i in range(arrayHandle.elementCount()):
+            arrayHandle.jumpToArrayElement(i)
+            handle = arrayHandle.inputValue()
+            indices.append(arrayHandle.elementIndex())
+            triangles.append([handle.child(attr).asInt() for attr in matrixRivetNode.vertexAttrs])
+            weights.append([handle.child(attr).asDouble() for attr in matrixRivetNode.weightAttrs])
+            reference = handle.child(matrixRivetNode.bindingReference).asMatrix()
+            references.append([reference(row, column) for row in range(4) for column in range(4)])
+        # the triangles index into the bound vertices, the logical indices stand in for the names
+        vertices, triangles = numpy.unique(numpy.asarray(triangles, dtype=numpy.int64), return_inverse=True)
+        self.__vertices = vertices.tolist()
+        return meshBinding.Binding(triangles, weights, references=references, names=indices)
+
+
+def nodeCreator():
+    return OpenMayaMPx.asMPxPtr(matrixRivetNode())
+
+
+def nodeInitializer():
+    nAttr = OpenMaya.MFnNumericAttribute()
+    tAttr = OpenMaya.MFnTypedAttribute()
+    cAttr = OpenMaya.MFnCompoundAttribute()
+    mAttr = OpenMaya.MFnMatrixAttribute()
+
+    # define attributes
+    matrixRivetNode.inMesh = tAttr.create("inMesh", "im", OpenMaya.MFnData.kMesh)
+    tAttr.setStorable(False)
+
+    matrixRivetNode.vertexAttrs = []
+    matrixRivetNode.weightAttrs = []
+    for i in range(3):
+        matrixRivetNode.vertexAttrs.append(nAttr.create("bindingVertex%d" %i, "bvx%d" %i, OpenMaya.MFnNumericData.kInt, 0))
+        nAttr.setStorable(True)
+        matrixRivetNode.weightAttrs.append(nAttr.create("bindingWeight%d" %i, "bwt%d" %i, OpenMaya.MFnNumericData.kDouble, 0.0))
+        nAttr.setStorable(True)
+
+    matrixRivetNode.bindingVertices = nAttr.create("bindingVertices", "bvx", *matrixRivetNode.vertexAttrs)
+    matrixRivetNode.bindingWeights = nAttr.create("bindingWeights", "bwt", *matrixRivetNode.weightAttrs)
+
+    matrixRivetNode.bindingReference = mAttr.create("bindingReference", "brf")
+    mAttr.setStorable(True)
+
+    matrixRivetNode.binding = cAttr.create("binding", "bnd")
+    cAttr.addChild(matrixRivetNode.bindingVertices)
+    cAttr.addChild(matrixRivetNode.bindingWeights)
+    cAttr.addChild(matrixRivetNode.bindingReference)
+    cAttr.setArray(True)
+    cAttr.setUsesArrayDataBuilder(True)
+
+    matrixRivetNode.outMatrix = mAttr.create("outMatrix", "om")
+    mAttr.setArray(True)
+    mAttr.setUsesArrayDataBuilder(True)
+    mAttr.setStorable(False)
+    mAttr.setWritable(False)
+
+    #add attributes
+    matrixRivetNode.addAttribute(matrixRivetNode.inMesh)
+    matrixRivetNode.addAttribute(matrixRivetNode.binding)
+    matrixRivetNode.addAttribute(matrixRivetNode.outMatrix)
+
+    #attribute affects
+    matrixRivetNode.attributeAffects(matrixRivetNode.inMesh, matrixRivetNode.outMatrix)
+    matrixRivetNode.attributeAffects(matrixRivetNode.binding, matrixRivetNode.outMatrix)
+
+    return OpenMaya.MStatus.kSuccess
+
+
+def initializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj)
+    try:
+        plugin.registerNode(nodeTypeName, nodeTypeId, nodeCreator, nodeInitializer, OpenMayaMPx.MPxNode.kDependNode)
+    except:
+        sys.stderr.write( "Failed to register node: %s" % nodeTypeName)
+
+
+def uninitializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj)
+    try:
+        plugin.deregisterNode(nodeTypeId)
+    except:
+        sys.stderr.write( "Failed to deregister node: %s" % nodeTypeName)
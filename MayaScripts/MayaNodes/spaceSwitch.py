@@ -0,0 +1,169 @@
+import sys
+import numpy
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+from general import spaceBlend
+
+
+nodeTypeName = "spaceSwitch"
+nodeTypeId = OpenMaya.MTypeId(0x00125)
+
+
+class spaceSwitchNode(OpenMayaMPx.MPxNode):
+    '''
+    An N-way space switch in one node: driverMatrix[i] is the world matrix of
+    space i and offsetMatrix[i] the offset of the driven object in it, space
+    picks the space (the closest one, or blends the two around it with smooth)
+    and the outputs are the driven transform in the space of
+    parentInverseMatrix. See general.spaceBlend for the blending and pointOnly.
+    Only the picked space, and the next one when smooth, is read.
+    '''
+    def __init__(self):
+        OpenMayaMPx.MPxNode.__init__(self)
+
+    def compute(self, plug, dataBlock):
+        if plug.isChild():
+            plug = plug.parent()
+        if plug.attribute() not in spaceSwitchNode.outputs:
+            return OpenMaya.kUnknownParameter
+
+        space = dataBlock.inputValue(spaceSwitchNode.space).asDouble()
+        smooth = dataBlock.inputValue(spaceSwitchNode.smooth).asBool()
+        pointOnly = dataBlock.inputValue(spaceSwitchNode.pointOnly).asBool()
+
+        # a space without a driver is skipped, the element indices are read
+        # without evaluating the drivers, only the picked spaces are pulled
+        thisNode = self.thisMObject()
+        driverPlug = OpenMaya.MPlug(thisNode, spaceSwitchNode.driverMatrix)
+        offsetPlug = OpenMaya.MPlug(thisNode, spaceSwitchNode.offsetMatrix)
+        indices = sorted(_existingIndices(driverPlug))
+        offsetIndices = set(_existingIndices(offsetPlug))
+
+        def spaceMatrix(index):
+            driver = dataBlock.inputValue(driverPlug.elementByLogicalIndex(index)).asMatrix()
+            offset = OpenMaya.MMatrix()
+            if index in offsetIndices:
+                offset = dataBlock.inputValue(offsetPlug.elementByLogicalIndex(index)).asMatrix()
+            if not pointOnly:
+                return offset * driver
+            position = OpenMaya.MTransformationMatrix()
+            position.setTranslation(OpenMaya.MVector(driver(3, 0) + offset(3, 0), driver(3, 1) + offset(3, 1),
+                                                     driver(3, 2) + offset(3, 2)), OpenMaya.MSpace.kTransform)
+            return position.asMatrix()
+
+        matrix = OpenMaya.MMatrix()
+        if indices:
+            index, upper, weight = spaceBlend.pick(len(indices), space, smooth)
+            matrix = spaceMatrix(indices[index])
+            if upper is not None:
+                world = spaceBlend.blend(_asArray(matrix), _asArray(spaceMatrix(indices[upper])), weight)
+                OpenMaya.MScriptUtil.createMatrixFromList(world.reshape(-1).tolist(), matrix)
+        matrix = matrix * dataBlock.inputValue(spaceSwitchNode.parentInverseMatrix).asMatrix()
+
+        transform = OpenMaya.MTransformationMatrix(matrix)
+        translate = transform.getTranslation(OpenMaya.MSpace.kTransform)
+        rotate = transform.eulerRotation()
+        rotate.reorderIt(dataBlock.inputValue(spaceSwitchNode.rotateOrder).asShort())
+        util = OpenMaya.MScriptUtil()
+        util.createFromList([1.0, 1.0, 1.0], 3)
+        scalePtr = util.asDoublePtr()
+        transform.getScale(scalePtr, OpenMaya.MSpace.kTransform)
+        scale = [OpenMaya.MScriptUtil.getDoubleArrayItem(scalePtr, i) for i in range(3)]
+
+        dataBlock.outputValue(spaceSwitchNode.outMatrix).setMMatrix(matrix)
+        dataBlock.outputValue(spaceSwitchNode.outTranslate).set3Double(translate.x, translate.y, translate.z)
+        dataBlock.outputValue(spaceSwitchNode.outRotate).set3Double(rotate.x, rotate.y, rotate.z)
+        dataBlock.outputValue(spaceSwitchNode.outScale).set3Double(*scale)
+        for attr in spaceSwitchNode.outputs:
+            dataBlock.setClean(attr)
+
+
+def _existingIndices(plug):
+    indices = OpenMaya.MIntArray()
+    plug.getExistingArrayAttributeIndices(indices)
+    return [indices[i] for i in range(indices.length())]
+
+def _asArray(matrix):
+    return numpy.array([[matrix(row, column) for column in range(4)] for row in range(4)])
+
+
+def nodeCreator():
+    return OpenMayaMPx.asMPxPtr(spaceSwitchNode())
+
+
+def nodeInitializer():
+    nAttr = OpenMaya.MFnNumericAttribute()
+    uAttr = OpenMaya.MFnUnitAttribute()
+    eAttr = OpenMaya.MFnEnumAttribute()
+    mAttr = OpenMaya.MFnMatrixAttribute()
+
+    # define attributes
+    spaceSwitchNode.driverMatrix = mAttr.create("driverMatrix", "dm")
+    mAttr.setArray(True)
+    mAttr.setStorable(False)
+
+    spaceSwitchNode.offsetMatrix = mAttr.create("offsetMatrix", "ofm")
+    mAttr.setArray(True)
+    mAttr.setStorable(True)
+
+    spaceSwitchNode.parentInverseMatrix = mAttr.create("parentInverseMatrix", "pim")
+    mAttr.setStorable(False)
+
+    spaceSwitchNode.space = nAttr.create("space", "sp", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nAttr.setKeyable(True)
+    nAttr.setMin(0.0)
+
+    spaceSwitchNode.smooth = nAttr.create("smooth", "sm", OpenMaya.MFnNumericData.kBoolean, False)
+    spaceSwitchNode.pointOnly = nAttr.create("pointOnly", "po", OpenMaya.MFnNumericData.kBoolean, False)
+
+    spaceSwitchNode.rotateOrder = eAttr.create("rotateOrder", "ro", 0)
+    for i, order in enumerate(["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]):
+        eAttr.addField(order, i)
+
+    spaceSwitchNode.outMatrix = mAttr.create("outMatrix", "om")
+    mAttr.setStorable(False)
+    mAttr.setWritable(False)
+
+    for name, short, unit in [("outTranslate", "ot", OpenMaya.MFnUnitAttribute.kDistance),
+                              ("outRotate", "or", OpenMaya.MFnUnitAttribute.kAngle),
+                              ("outScale", "os", None)]:
+        attrs = []
+        for axis in "XYZ":
+            if unit is None:
+                attrs.append(nAttr.create(name + axis, short + axis.lower(), OpenMaya.MFnNumericData.kDouble, 1.0))
+            else:
+                attrs.append(uAttr.create(name + axis, short + axis.lower(), unit, 0.0))
+        setattr(spaceSwitchNode, name, nAttr.create(name, short, *attrs))
+        nAttr.setStorable(False)
+        nAttr.setWritable(False)
+    spaceSwitchNode.outputs = [spaceSwitchNode.outMatrix, spaceSwitchNode.outTranslate,
+                               spaceSwitchNode.outRotate, spaceSwitchNode.outScale]
+
+    #add attributes
+    inputs = [spaceSwitchNode.driverMatrix, spaceSwitchNode.offsetMatrix, spaceSwitchNode.parentInverseMatrix,
+              spaceSwitchNode.space, spaceSwitchNode.smooth, spaceSwitchNode.pointOnly, spaceSwitchNode.rotateOrder]
+    for attr in inputs + spaceSwitchNode.outputs:
+        spaceSwitchNode.addAttribute(attr)
+
+    #attribute affects
+    for attr in inputs:
+        for output in spaceSwitchNode.outputs:
+            spaceSwitchNode.attributeAffects(attr, output)
+
+    return OpenMaya.MStatus.kSuccess
+
+
+def initializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj)
+    try:
+        plugin.registerNode(nodeTypeName, nodeTypeId, nodeCreator, nodeInitializer, OpenMayaMPx.MPxNode.kDependNode)
+    except:
+        sys.stderr.write( "Failed to register node: %s" % nodeTypeName)
+
+
+def uninitializePlugin(obj):
+    plugin = OpenMayaMPx.MFnPlugin(obj)
+    try:
+        plugin.deregisterNode(nodeTypeId)
+    except:
+        sys.stderr.write( "Failed to deregister node: %s" % nodeTypeName)
@@ -10,10 +10,10 @@ All Modules inherit from modules.BaseModules which contains generic methods
 
 '''
 
-from ..utils import controllers
+from . import controllers
 from . import rigGuides
 from . import modules
-from ..utils import utils
+from . import utils
 from maya import cmds
 
 
@@ -210,56 +210,58 @@ class SimpleEyeRig(modules.BaseModule):
         create the individual lid rigs and the blink setup
         '''
         #create nodes for the lids / blink
-        upper_range = cmds.createNode("setRange", n="%s_upperLidRange" %self._side)
-        upper_range_pma = cmds.createNode("plusMinusAverage", n="%s_upperLidPMA" %self._side)
-        upper_remap = cmds.createNode("remapValue", n="%s_upperLidRemap" %self._side)
-        upper_remap_pma = cmds.createNode("plusMinusAverage", n="%s_upperLidRemapPMA" %self._side)
-        upper_clamp = cmds.createNode("clamp", n="%s_upperLidClamp" %self._side)
+        tx = self.transaction()
+        upper_range = tx.createNode("setRange", n="%s_upperLidRange" %self._side)
+        upper_range_pma = tx.createNode("plusMinusAverage", n="%s_upperLidPMA" %self._side)
+        upper_remap = tx.createNode("remapValue", n="%s_upperLidRemap" %self._side)
+        upper_remap_pma = tx.createNode("plusMinusAverage", n="%s_upperLidRemapPMA" %self._side)
+        upper_clamp = tx.createNode("clamp", n="%s_upperLidClamp" %self._side)
         
-        lower_range = cmds.createNode("setRange", n="%s_lowerLidRange" %self._side)
-        lower_range_pma = cmds.createNode("plusMinusAverage", n="%s_lowerLidPMA" %self._side)
-        lower_remap = cmds.createNode("remapValue", n="%s_lowerLidRemap" %self._side)
-        lower_remap_pma = cmds.createNode("plusMinusAverage", n="%s_lowerLidRemapPMA" %self._side)
-        lower_clamp = cmds.createNode("clamp", n="%s_lowerLidClamp" %self._side)
+        lower_range = tx.createNode("setRange", n="%s_lowerLidRange" %self._side)
+        lower_range_pma = tx.createNode("plusMinusAverage", n="%s_lowerLidPMA" %self._side)
+        lower_remap = tx.createNode("remapValue", n="%s_lowerLidRemap" %self._side)
+        lower_remap_pma = tx.createNode("plusMinusAverage", n="%s_lowerLidRemapPMA" %self._side)
+        lower_clamp = tx.createNode("clamp", n="%s_lowerLidClamp" %self._side)
         
         #set up the lid controls
-        cmds.connectAttr("%s.upperLidClosed" %self._attr_node, "%s.ny" %upper_range)
-        cmds.connectAttr("%s.upperLidOpen" %self._attr_node, "%s.mx" %upper_range)
-        cmds.connectAttr("%s.ty" %self._uLid_control.ctl, "%s.vx" %upper_range)
-        cmds.connectAttr("%s.ty" %self._uLid_control.ctl, "%s.vy" %upper_range)
-        cmds.setAttr("%s.ony" %upper_range, -1)
-        cmds.setAttr("%s.omx" %upper_range, 1)
-        cmds.connectAttr("%s.ox" %upper_range, "%s.i1[0]" %upper_range_pma)
-        cmds.connectAttr("%s.oy" %upper_range, "%s.i1[1]" %upper_range_pma)
-        cmds.connectAttr("%s.ty" %self._blink_control.ctl, "%s.i" %upper_remap)
-        cmds.connectAttr("%s.upperLidBlinkMax" %self._attr_node, "%s.omx" %upper_remap)
-        cmds.setAttr("%s.imn" %upper_remap, 0)
-        cmds.setAttr("%s.imx" %upper_remap, 1)
-        cmds.connectAttr("%s.o1" %upper_range_pma, "%s.i1[0]" %upper_remap_pma)
-        cmds.connectAttr("%s.ov" %upper_remap, "%s.i1[1]" %upper_remap_pma)
-        cmds.connectAttr("%s.o1" %upper_remap_pma, "%s.ipr" %upper_clamp)
-        cmds.connectAttr("%s.upperLidClosed" %self._attr_node, "%s.mnr" %upper_clamp)
-        cmds.connectAttr("%s.upperLidOpen" %self._attr_node, "%s.mxr" %upper_clamp)
-        cmds.connectAttr("%s.opr" %upper_clamp, "%s.rz" %self._upperLid_jnts[1])
+        tx.connectAttr("%s.upperLidClosed" %self._attr_node, "%s.ny" %upper_range)
+        tx.connectAttr("%s.upperLidOpen" %self._attr_node, "%s.mx" %upper_range)
+        tx.connectAttr("%s.ty" %self._uLid_control.ctl, "%s.vx" %upper_range)
+        tx.connectAttr("%s.ty" %self._uLid_control.ctl, "%s.vy" %upper_range)
+        tx.setAttr("%s.ony" %upper_range, -1)
+        tx.setAttr("%s.omx" %upper_range, 1)
+        tx.connectAttr("%s.ox" %upper_range, "%s.i1[0]" %upper_range_pma)
+        tx.connectAttr("%s.oy" %upper_range, "%s.i1[1]" %upper_range_pma)
+        tx.connectAttr("%s.ty" %self._blink_control.ctl, "%s.i" %upper_remap)
+        tx.connectAttr("%s.upperLidBlinkMax" %self._attr_node, "%s.omx" %upper_remap)
+        tx.setAttr("%s.imn" %upper_remap, 0)
+        tx.setAttr("%s.imx" %upper_remap, 1)
+        tx.connectAttr("%s.o1" %upper_range_pma, "%s.i1[0]" %upper_remap_pma)
+        tx.connectAttr("%s.ov" %upper_remap, "%s.i1[1]" %upper_remap_pma)
+        tx.connectAttr("%s.o1" %upper_remap_pma, "%s.ipr" %upper_clamp)
+        tx.connectAttr("%s.upperLidClosed" %self._attr_node, "%s.mnr" %upper_clamp)
+        tx.connectAttr("%s.upperLidOpen" %self._attr_node, "%s.mxr" %upper_clamp)
+        tx.connectAttr("%s.opr" %upper_clamp, "%s.rz" %self._upperLid_jnts[1])
         
-        cmds.connectAttr("%s.lowerLidClosed" %self._attr_node, "%s.mx" %lower_range)
-        cmds.connectAttr("%s.lowerLidOpen" %self._attr_node, "%s.ny" %lower_range)
-        cmds.connectAttr("%s.ty" %self._lLid_control.ctl, "%s.vx" %lower_range)
-        cmds.connectAttr("%s.ty" %self._lLid_control.ctl, "%s.vy" %lower_range)
-        cmds.setAttr("%s.ony" %lower_range, -1)
-        cmds.setAttr("%s.omx" %lower_range, 1)
-        cmds.connectAttr("%s.ox" %lower_range, "%s.i1[0]" %lower_range_pma)
-        cmds.connectAttr("%s.oy" %lower_range, "%s.i1[1]" %lower_range_pma)
-        cmds.connectAttr("%s.ty" %self._blink_control.ctl, "%s.i" %lower_remap)
-        cmds.connectAttr("%s.lowerLidBlinkMax" %self._attr_node, "%s.omx" %lower_remap)
-        cmds.setAttr("%s.imn" %lower_remap, 0)
-        cmds.setAttr("%s.imx" %lower_remap, 1)
-        cmds.connectAttr("%s.o1" %lower_range_pma, "%s.i1[0]" %lower_remap_pma)
-        cmds.connectAttr("%s.ov" %lower_remap, "%s.i1[1]" %lower_remap_pma)
-        cmds.connectAttr("%s.o1" %lower_remap_pma, "%s.ipr" %lower_clamp)
-        cmds.connectAttr("%s.lowerLidClosed" %self._attr_node, "%s.mxr" %lower_clamp)
-        cmds.connectAttr("%s.lowerLidOpen" %self._attr_node, "%s.mnr" %lower_clamp)
-        cmds.connectAttr("%s.opr" %lower_clamp, "%s.rz" %self._lowerLid_jnts[1])
+        tx.connectAttr("%s.lowerLidClosed" %self._attr_node, "%s.mx" %lower_range)
+        tx.connectAttr("%s.lowerLidOpen" %self._attr_node, "%s.ny" %lower_range)
+        tx.connectAttr("%s.ty" %self._lLid_control.ctl, "%s.vx" %lower_range)
+        tx.connectAttr("%s.ty" %self._lLid_control.ctl, "%s.vy" %lower_range)
+        tx.setAttr("%s.ony" %lower_range, -1)
+        tx.setAttr("%s.omx" %lower_range, 1)
+        tx.connectAttr("%s.ox" %lower_range, "%s.i1[0]" %lower_range_pma)
+        tx.connectAttr("%s.oy" %lower_range, "%s.i1[1]" %lower_range_pma)
+        tx.connectAttr("%s.ty" %self._blink_control.ctl, "%s.i" %lower_remap)
+        tx.connectAttr("%s.lowerLidBlinkMax" %self._attr_node, "%s.omx" %lower_remap)
+        tx.setAttr("%s.imn" %lower_remap, 0)
+        tx.setAttr("%s.imx" %lower_remap, 1)
+        tx.connectAttr("%s.o1" %lower_range_pma, "%s.i1[0]" %lower_remap_pma)
+        tx.connectAttr("%s.ov" %lower_remap, "%s.i1[1]" %lower_remap_pma)
+        tx.connectAttr("%s.o1" %lower_remap_pma, "%s.ipr" %lower_clamp)
+        tx.connectAttr("%s.lowerLidClosed" %self._attr_node, "%s.mxr" %lower_clamp)
+        tx.connectAttr("%s.lowerLidOpen" %self._attr_node, "%s.mnr" %lower_clamp)
+        tx.connectAttr("%s.opr" %lower_clamp, "%s.rz" %self._lowerLid_jnts[1])
+        tx.apply()
 
 
     def _clean(self):
@@ -111,49 +111,51 @@ class IkFkLeg(modules.BaseModule):
         toe_pos = cmds.xform(self._ik_jnts[4], q=True, ws=True, t=True)
         
         # in connect attr remove the unit conversion node
+        tx = self.transaction()
         peelHeelGrp = cmds.group(self._ik_handle_foot, n="peelHeelGrp_%s" %self._side)
         cmds.xform(peelHeelGrp, ws=True, rp=ball_pos, sp=ball_pos)
-        heelRemap = cmds.createNode('setRange', n="PeelHeelRange_%s_srg" %self._side)
-        cmds.connectAttr("%s.PeelHeel" %self._ik_ctl.name, "%s.vx" %heelRemap)
-        cmds.setAttr("%s.mx "%heelRemap, 50)
-        cmds.setAttr("%s.omx "%heelRemap, 10)
-        cmds.connectAttr("%s.ox"%heelRemap, "%s.rx" %peelHeelGrp)
+        heelRemap = tx.createNode('setRange', n="PeelHeelRange_%s_srg" %self._side)
+        tx.connectAttr("%s.PeelHeel" %self._ik_ctl.name, "%s.vx" %heelRemap)
+        tx.setAttr("%s.mx "%heelRemap, 50)
+        tx.setAttr("%s.omx "%heelRemap, 10)
+        tx.connectAttr("%s.ox"%heelRemap, "%s.rx" %peelHeelGrp)
         
         toeTapGrp = cmds.group([self._ik_handle_ball, self._ik_handle_toe], n="toeTapGrp_%s" %self._side)
         cmds.xform(toeTapGrp, ws=True, rp=ball_pos, sp=ball_pos)
-        toeRemap = cmds.createNode('setRange', n="ToeTapRange_%s_srg" %self._side)
-        cmds.connectAttr("%s.ToeTap" %self._ik_ctl.name, "%s.vx" %toeRemap)
-        cmds.setAttr("%s.mx "%toeRemap, 50)
-        cmds.setAttr("%s.nx "%toeRemap, -50)
-        cmds.setAttr("%s.omx "%toeRemap, 10)
-        cmds.setAttr("%s.onx "%toeRemap, -10)
-        cmds.connectAttr("%s.ox"%toeRemap, "%s.rx" %toeTapGrp)
+        toeRemap = tx.createNode('setRange', n="ToeTapRange_%s_srg" %self._side)
+        tx.connectAttr("%s.ToeTap" %self._ik_ctl.name, "%s.vx" %toeRemap)
+        tx.setAttr("%s.mx "%toeRemap, 50)
+        tx.setAttr("%s.nx "%toeRemap, -50)
+        tx.setAttr("%s.omx "%toeRemap, 10)
+        tx.setAttr("%s.onx "%toeRemap, -10)
+        tx.connectAttr("%s.ox"%toeRemap, "%s.rx" %toeTapGrp)
         
         
         toePivotGrp = cmds.group([peelHeelGrp, toeTapGrp], n="toePivotGrp_%s" %self._side)
         cmds.xform(toePivotGrp, ws=True, rp=toe_pos, sp=toe_pos)
-        toePivRemap = cmds.createNode('setRange', n="ToePivotRange_%s_srg" %self._side)
-        cmds.connectAttr("%s.StandTip" %self._ik_ctl.name, "%s.vx" %toePivRemap)
-        cmds.setAttr("%s.mx "%toePivRemap, 35)
-        cmds.setAttr("%s.omx "%toePivRemap, 10)
-        cmds.connectAttr("%s.ox"%toePivRemap, "%s.rx" %toePivotGrp)
-        cmds.connectAttr("%s.TwistToes" %self._ik_ctl.name, "%s.vy" %toePivRemap)
-        cmds.setAttr("%s.my "%toePivRemap, 40)
-        cmds.setAttr("%s.omy "%toePivRemap, 10)
-        cmds.setAttr("%s.ny "%toePivRemap, -40)
-        cmds.setAttr("%s.ony "%toePivRemap, -10)
-        cmds.connectAttr("%s.oy"%toePivRemap, "%s.ry" %toePivotGrp)
+        toePivRemap = tx.createNode('setRange', n="ToePivotRange_%s_srg" %self._side)
+        tx.connectAttr("%s.StandTip" %self._ik_ctl.name, "%s.vx" %toePivRemap)
+        tx.setAttr("%s.mx "%toePivRemap, 35)
+        tx.setAttr("%s.omx "%toePivRemap, 10)
+        tx.connectAttr("%s.ox"%toePivRemap, "%s.rx" %toePivotGrp)
+        tx.connectAttr("%s.TwistToes" %self._ik_ctl.name, "%s.vy" %toePivRemap)
+        tx.setAttr("%s.my "%toePivRemap, 40)
+        tx.setAttr("%s.omy "%toePivRemap, 10)
+        tx.setAttr("%s.ny "%toePivRemap, -40)
+        tx.setAttr("%s.ony "%toePivRemap, -10)
+        tx.connectAttr("%s.oy"%toePivRemap, "%s.ry" %toePivotGrp)
         
         
         heelPivotGrp = cmds.group(toePivotGrp, n='HeelPivotGrp_%s' %self._side)
         cmds.xform(heelPivotGrp, ws=True, rp=ankle_pos, sp=ankle_pos)
-        heelPivRemap = cmds.createNode('setRange', n="HeelPivotRange_%s_srg" %self._side)
-        cmds.connectAttr("%s.TwistHeel" %self._ik_ctl.name, "%s.vy" %heelPivRemap)
-        cmds.setAttr("%s.my "%heelPivRemap, 40)
-        cmds.setAttr("%s.ny "%heelPivRemap, -40)
-        cmds.setAttr("%s.omy "%heelPivRemap, 10)
-        cmds.setAttr("%s.ony "%heelPivRemap, -10)
-        cmds.connectAttr("%s.oy"%heelPivRemap, "%s.ry" %heelPivotGrp)
+        heelPivRemap = tx.createNode('setRange', n="HeelPivotRange_%s_srg" %self._side)
+        tx.connectAttr("%s.TwistHeel" %self._ik_ctl.name, "%s.vy" %heelPivRemap)
+        tx.setAttr("%s.my "%heelPivRemap, 40)
+        tx.setAttr("%s.ny "%heelPivRemap, -40)
+        tx.setAttr("%s.omy "%heelPivRemap, 10)
+        tx.setAttr("%s.ony "%heelPivRemap, -10)
+        tx.connectAttr("%s.oy"%heelPivRemap, "%s.ry" %heelPivotGrp)
+        tx.apply()
         
         cmds.parent(heelPivotGrp, self._ik_ctl.name)
         
@@ -7,6 +7,9 @@ A handy place to store any generic code used in multiple modules
 '''
 
 from . import rigGuides
+from . import utils
+from general import apiFunctions
+from general import dgTransaction
 from maya import cmds
 
 
@@ -19,6 +22,7 @@ class BaseModule(object):
         self._guide = guide
         self._skin_jnts = list()
         self._side = self._guide.side
+        self._names = None
         
         if self._side == "L":
             self._colour = "red"
@@ -43,11 +47,33 @@ class BaseModule(object):
                 tail = new_name[-2:]
                 replace = append + tail
                 new_name = new_name.replace(tail, replace)
+            new_name = self.unique_name(new_name)
             cmds.rename(jnt,new_name)
             return_list.append(new_name)
             
         return return_list
     
+    def unique_name(self, name):
+        '''
+        returns a unique name for a node about to be created by this module
+        one name registry is shared by the whole module build, so naming lots of
+        nodes doesn't re-probe the scene for every candidate
+        '''
+        return utils.find_unique_name(name, self._name_registry())
+    
+    def transaction(self):
+        '''
+        returns a dgTransaction.Transaction sharing the module name registry
+        record the createNode / connectAttr / setAttr calls on it and apply() them
+        in one modifier pass instead of one command each, one undo step for the lot
+        '''
+        return dgTransaction.Transaction(self._name_registry())
+    
+    def _name_registry(self):
+        if not self._names:
+            self._names = apiFunctions.NameRegistry()
+        return self._names
+    
     def connectPorts(self, input, output):
         '''
         used to connect rig modules to each other
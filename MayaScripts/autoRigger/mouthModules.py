@@ -463,40 +463,43 @@ class ZipLipsRig(modules.BaseModule):
         
         
     def _create_one_zip(self, joints, side="lower", crvShape = None):
+        tx = self.transaction()
         for i, joint in enumerate(joints):
             num = `i`.zfill(2)
-            crvInfo = cmds.createNode('pointOnCurveInfo', n="%s_%s_%s_crvInfo" %(self._side, side, num))
-            cmds.connectAttr("%s.worldSpace[0]" %crvShape, "%s.inputCurve" %crvInfo, f=True)
-            cmds.setAttr("%s.parameter" %crvInfo, i)
+            crvInfo = tx.createNode('pointOnCurveInfo', n="%s_%s_%s_crvInfo" %(self._side, side, num))
+            tx.connectAttr("%s.worldSpace[0]" %crvShape, "%s.inputCurve" %crvInfo, f=True)
+            tx.setAttr("%s.parameter" %crvInfo, i)
             
             # node will exist the second time this is run            
             crvInfo_mid = "%s_mid%s_crvInfo" %(self._side, num)
-            if not cmds.objExists(crvInfo_mid):
-                crvInfo_mid = cmds.createNode('pointOnCurveInfo', n="%s_mid%s_crvInfo" %(self._side, num))
+            if not tx.objExists(crvInfo_mid):
+                crvInfo_mid = tx.createNode('pointOnCurveInfo', n="%s_mid%s_crvInfo" %(self._side, num))
             
-                cmds.connectAttr("%s.worldSpace[0]" %self.mid_crv_shape, "%s.inputCurve" %crvInfo_mid, f=True)
-                cmds.setAttr("%s.parameter" %crvInfo_mid, i)
+                tx.connectAttr("%s.worldSpace[0]" %self.mid_crv_shape, "%s.inputCurve" %crvInfo_mid, f=True)
+                tx.setAttr("%s.parameter" %crvInfo_mid, i)
             
-            blend = cmds.createNode('blendColors', n="%s_%s_%s_blend" %(self._side, side, num))
-            cmds.connectAttr("%s.position" %crvInfo, "%s.color1" %blend, f=True)
-            cmds.connectAttr("%s.position" %crvInfo_mid, "%s.color2" %blend, f=True)
+            blend = tx.createNode('blendColors', n="%s_%s_%s_blend" %(self._side, side, num))
+            tx.connectAttr("%s.position" %crvInfo, "%s.color1" %blend, f=True)
+            tx.connectAttr("%s.position" %crvInfo_mid, "%s.color2" %blend, f=True)
             
-            cmds.connectAttr("%s.output" %blend, "%s.translate" %joint, f=True)
+            tx.connectAttr("%s.output" %blend, "%s.translate" %joint, f=True)
             
-            remap = cmds.createNode("remapValue", n="%s_%s_%s_rmp" %(self._side, side, num))
-            cmds.connectAttr("%s.zipLips" %self._crv_group, "%s.inputValue" %remap, f=True)
+            remap = tx.createNode("remapValue", n="%s_%s_%s_rmp" %(self._side, side, num))
+            tx.connectAttr("%s.zipLips" %self._crv_group, "%s.inputValue" %remap, f=True)
 
             # remaping value to zero for fist element            
             min = i - 0.3
             if i == 0:
                 min = 0
 
-            cmds.setAttr("%s.inputMax" %remap, i+1)
-            cmds.setAttr("%s.inputMin" %remap, min)
-            cmds.setAttr("%s.outputMax" %remap, 0)
-            cmds.setAttr("%s.outputMin" %remap, 1)
+            tx.setAttr("%s.inputMax" %remap, i+1)
+            tx.setAttr("%s.inputMin" %remap, min)
+            tx.setAttr("%s.outputMax" %remap, 0)
+            tx.setAttr("%s.outputMin" %remap, 1)
             
-            cmds.connectAttr("%s.outValue" %remap, "%s.blender" %blend)
+            tx.connectAttr("%s.outValue" %remap, "%s.blender" %blend)
+
+        tx.apply()
             
     def _create_controllers(self):
         '''
@@ -7,6 +7,8 @@ A collection of utility Functions for rigging
 from maya import cmds
 from maya import OpenMaya
 from maya import OpenMayaAnim as OMA
+from general import apiFunctions
+from general import surfaceFunctions
 
 def split_joint(joint, div=2, upAxis="tx"):
     '''
@@ -84,8 +86,13 @@ def lock_hide(nodes, t=True, r=True, s=True, v=True, other=False):
             for attr in other:
                 cmds.setAttr("%s.%s" %(node, attr), l=True, k=False, cb=False)
                 
-def find_unique_name(name):
-    pass
+def find_unique_name(name, registry=None):
+    '''
+    returns name, or the next free name by incrementing the number at the end of it
+    pass in a apiFunctions.NameRegistry when naming a lot of nodes, it saves probing the
+    scene for every candidate
+    '''
+    return apiFunctions.findUniqueName(name, registry)
 
 def create_rivet(surface, follow):
     '''
@@ -126,34 +133,13 @@ def find_closest_UV(shape, point=False, obj=False):
     shape is the name of the shape node
     can pass in an object instead of a point. 
     '''
-    sel = OpenMaya.MSelectionList()
-    OpenMaya.MGlobal.getSelectionListByName(shape, sel)
-    dPath = OpenMaya.MDagPath()
-    sel.getDagPath(0, dPath)
-    mesh = OpenMaya.MFnMesh(dPath)
-    
     if point:
         pos = point
     elif obj:
         pos = cmds.xform(obj, q=True, ws=True, t=True)
-    mPoint = OpenMaya.MPoint(pos[0], pos[1], pos[2])
-    
-    # find and use default set list
-    setList = list()
-    mesh.getUVSetNames(setList)
-    uvSet = setList[0]
-    
-    pArray = [0, 0]
-    floatPtr = OpenMaya.MScriptUtil()
-    floatPtr.createFromList(pArray, 2)
-    uvPoint = floatPtr.asFloat2Ptr()
-    
-    # query the UV
-    mesh.getUVAtPoint(mPoint, uvPoint, OpenMaya.MSpace.kWorld , uvSet)
-    U = OpenMaya.MScriptUtil.getFloat2ArrayItem(uvPoint, 0, 0)
-    V = OpenMaya.MScriptUtil.getFloat2ArrayItem(uvPoint, 0, 1)
-    
-    
+
+    # the mesh BVH is shared with the other uv lookups and cached until the mesh changes
+    U, V = surfaceFunctions.closestUVs(shape, [pos])[0]
     return U, V
     
     
@@ -172,11 +158,11 @@ def skinAs(source=None, target=None, sel=True):
     target_shp = cmds.listRelatives(target, s=True, ni=True)
     
     # find the skin cluster on the mesh
-    his = cmds.listHistory(source_shp, pdo=True)
     skin = False
-    for node in his:
-        if cmds.nodeType(node) == "skinCluster":
-            skin = node
+    if source_shp:
+        skin_node = apiFunctions.DependNode(source_shp[0]).findHistory(OpenMaya.MFn.kSkinClusterFilter)
+        if skin_node:
+            skin = skin_node.getName()
             
 #    skin = cmds.listConnections(source_shp, type="skinCluster" )
     if skin:
@@ -302,10 +288,9 @@ def invert_blendWeights(flood=False):
     
     # find the blendshape connected to this node
     blend = False
-    nodes = cmds.listHistory(sel[0], pdo=True)
-    for node in nodes:
-        if cmds.nodeType(node) == "blendShape":
-            blend = node
+    blend_node = apiFunctions.DependNode(sel[0]).findHistory(OpenMaya.MFn.kBlendShape)
+    if blend_node:
+        blend = blend_node.getName()
     
     if not blend:
         print "No blendshape node found connected to %s" %sel[0]
@@ -0,0 +1,84 @@
+'''
+Benchmark of the matrix constraint graph against offsetParentMatrix constraints
+
+Builds a dense rig, chains of animated fk controls each driving a joint chain
+with constraintFunctions.constraintToTarget, once with the multMatrix and
+decomposeMatrix graph (mode 'decompose') and once with direct offsetParentMatrix
+connections (mode 'offsetParentMatrix'), then times the build and the
+playback of the frame range, once with the DG evaluation and once with the
+parallel evaluation manager (see benchmarks.playback).
+
+Run from mayapy or the script editor:
+
+    from benchmarks import constraintBench
+    constraintBench.run()
+    constraintBench.run(counts=[2000], frames=50, mo=False)
+
+The table also lists the utility nodes every mode leaves in the scene, the
+nodes the evaluator has to schedule on top of the joints and controls.
+'''
+
+import sys, time
+from maya import cmds
+from general import constraintFunctions
+from general import apiFunctions
+from benchmarks import playback
+
+COUNTS = [200, 1000, 3000]
+FRAMES = 100
+CHAIN_LENGTH = 20
+
+MODES = ['decompose', 'offsetParentMatrix']
+_UTILITY_TYPES = ['multMatrix', 'decomposeMatrix', 'fourByFourMatrix']
+
+
+def _scene(count):
+    '''
+    New scene with count animated controls in fk chains and a joint under
+    each of them in matching joint chains, returns the controls and the joints
+    '''
+    cmds.file(new=True, force=True)
+    controls, joints = [], []
+    for i in range(count):
+        first = not (i % CHAIN_LENGTH)
+        control = cmds.createNode('transform', n='benchCtl%d'%i, p=None if first else controls[-1])
+        joint = cmds.createNode('joint', n='benchJnt%d'%i, p=None if first else joints[-1])
+        for node in [control, joint]:
+            cmds.setAttr('%s.t'%node, 0 if first else 2, 0, i // CHAIN_LENGTH * 3 if first else 0)
+        cmds.setAttr('%s.jo'%joint, 0, 0, 10)
+        cmds.setKeyframe(control, at='rz', t=1, v=0)
+        cmds.setKeyframe(control, at='rz', t=FRAMES, v=30)
+        controls.append(control)
+        joints.append(joint)
+    return controls, joints
+
+def run(counts=COUNTS, frames=FRAMES, mo=True, stream=None):
+    '''
+    Runs the benchmark, writes a table to stream (stdout) and returns the results as a
+    list of (count, mode, evaluation, utility nodes, build seconds, playback seconds)
+    '''
+    stream = stream or sys.stdout
+    results = []
+    evaluationMode = cmds.evaluationManager(q=True, mode=True)[0]
+    for count in counts:
+        for mode in MODES:
+            controls, joints = _scene(count)
+            registry = apiFunctions.NameRegistry()
+            start = time.time()
+            for control, joint in zip(controls, joints):
+                constraintFunctions.constraintToTarget(control, [joint], mo=mo, vbzLvl=0, nameRegistry=registry,
+                                                       bulk=True, mode=mode)
+            build = time.time() - start
+            nodes = len(cmds.ls(type=_UTILITY_TYPES))
+            for evaluation in playback.EVALUATIONS:
+                results.append((count, mode, evaluation, nodes, build,
+                                playback.timePlayback(joints, frames, evaluation)))
+    cmds.evaluationManager(mode=evaluationMode)
+
+    stream.write('\n%8s %-20s %-10s %8s %10s %12s %12s\n' %('joints', 'mode', 'evaluation', 'nodes', 'build',
+                                                           'playback', 'per frame'))
+    stream.write('-' * 86 + '\n')
+    for count, mode, evaluation, nodes, build, seconds in results:
+        stream.write('%8d %-20s %-10s %8d %9.3fs %11.3fs %10.2fms\n' %(count, mode, evaluation, nodes, build,
+                                                                      seconds, 1000.0 * seconds / frames))
+    return results
@@ -0,0 +1,108 @@
+'''
+Benchmark for the DependNodeArray membership index
+
+Compares the old linear scan membership test and de-duplication against the
+hash indexed DependNodeArray at 1k, 10k and 100k nodes.
+
+Run from mayapy or the script editor:
+
+    from benchmarks import dependNodeArrayBench
+    dependNodeArrayBench.run()
+
+The old algorithm is quadratic, sizes above legacyMax are not run but
+extrapolated from the largest measured size and flagged with a '~'.
+'''
+
+import sys, time, random
+from maya import cmds
+from general import apiFunctions
+
+SIZES = [1000, 10000, 100000]
+LOOKUPS = 1000
+
+
+#Old behaviour++
+def _legacyContains(array, node):
+    for i in range(0, len(array)):
+        if node.__eq__(array[i]):
+            return True
+    return False
+
+def _legacyRemoveDuplicates(array):
+    seen = []
+    result = []
+    for node in array:
+        if not _legacyContains(seen, node):
+            result.append(node)
+        seen.append(node)
+    return result
+#Old behaviour--
+
+
+def _timeIt(func, *args):
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+def _buildArray(size, rand):
+    '''
+    Returns the created node names and an array holding every node plus
+    one duplicate for every second node, shuffled
+    '''
+    names = [cmds.createNode('network', n='dnaBench%d' %i, skipSelect=True) for i in range(size)]
+    nodes = apiFunctions.DependNodeArray(names)
+    items = list(nodes) + list(nodes[::2])
+    rand.shuffle(items)
+    return names, items
+
+def run(sizes=SIZES, legacyMax=10000, seed=0):
+    '''
+    Runs the benchmark, writes a table to stdout and returns the results as
+    a list of dictionaries (one per size, times in seconds)
+    '''
+    rand = random.Random(seed)
+    results = []
+    lastLegacy = None
+
+    for size in sizes:
+        names, items = _buildArray(size, rand)
+        queries = [items[rand.randint(0, len(items)-1)] for i in range(LOOKUPS)]
+        result = {'size':size, 'estimated':False}
+
+        #    new behaviour
+        array = apiFunctions.DependNodeArray(items)
+        result['dedupe'] = _timeIt(array.removeDuplicates)
+        array = apiFunctions.DependNodeArray(items)
+        result['contains'] = _timeIt(lambda: [node in array for node in queries])
+
+        #    old behaviour
+        if size <= legacyMax:
+            result['legacyDedupe'] = _timeIt(_legacyRemoveDuplicates, items)
+            result['legacyContains'] = _timeIt(lambda: [_legacyContains(items, node) for node in queries])
+            lastLegacy = result
+        elif lastLegacy:
+            scale = float(size) / lastLegacy['size']
+            result['legacyDedupe'] = lastLegacy['legacyDedupe'] * scale * scale
+            result['legacyContains'] = lastLegacy['legacyContains'] * scale
+            result['estimated'] = True
+        else:
+            result['legacyDedupe'] = None
+            result['legacyContains'] = None
+
+        results.append(result)
+        cmds.delete(names)
+
+    _report(results)
+    return results
+
+def _report(results):
+    sys.stdout.write('\n%8s | %14s %14s | %14s %14s\n' %('nodes', 'dedupe old', 'dedupe new', '%d in old' %LOOKUPS, '%d in new' %LOOKUPS))
+    sys.stdout.write('-' * 76 + '\n')
+    for result in results:
+        flag = '~' if result['estimated'] else ' '
+        legacyDedupe = legacyContains = 'n/a'
+        if result['legacyDedupe'] is not None:
+            legacyDedupe = '%s%.4fs' %(flag, result['legacyDedupe'])
+            legacyContains = '%s%.4fs' %(flag, result['legacyContains'])
+        sys.stdout.write('%8d | %14s %13.4fs | %14s %13.4fs\n' %(result['size'], legacyDedupe, result['dedupe'],
+                                                             legacyContains, result['contains']))
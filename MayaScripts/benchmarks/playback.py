@@ -0,0 +1,36 @@
+'''
+Playback timing shared by the benchmarks
+
+In an interactive session the frames are played with cmds.play at free running
+speed, in mayapy (no playback) every frame is set with currentTime and the
+world matrices of all the nodes are evaluated with a single dgeval.
+'''
+
+import time
+from maya import cmds
+
+#    evaluationManager modes, 'off' is the DG
+EVALUATIONS = ['off', 'parallel']
+
+
+def timePlayback(nodes, frames, evaluation):
+    '''
+    Seconds to play frames 1 to frames under the evaluation manager mode evaluation
+    '''
+    cmds.evaluationManager(mode=evaluation)
+    cmds.playbackOptions(minTime=1, maxTime=frames, loop='once', playbackSpeed=0, maxPlaybackSpeed=0)
+    cmds.currentTime(1)
+    if cmds.about(batch=True):
+        plugs = ['%s.worldMatrix[0]'%node for node in nodes]
+        start = time.time()
+        for frame in range(1, frames+1):
+            cmds.currentTime(frame)
+            cmds.dgeval(plugs)
+        return time.time() - start
+
+    #    a first pass builds the evaluation graph (parallel), it is not timed
+    cmds.play(wait=True, forward=True)
+    cmds.currentTime(1)
+    start = time.time()
+    cmds.play(wait=True, forward=True)
+    return time.time() - start
@@ -0,0 +1,228 @@
+'''
+Rig build benchmark with per module budgets
+
+Builds every auto rig module on its own in a fresh headless scene and records
+the wall time, the cmds calls by command name and the nodes the build leaves
+in the scene by type. The guide is built before the clock starts, only the
+module build is measured.
+
+Run from a plain python 2.7, it does not need maya:
+
+    python -m benchmarks.rigBuildBench -o rigBuild.json
+    python -m benchmarks.rigBuildBench --budgets myBudgets.json IkFkLeg DualJawRig
+
+or from python:
+
+    from benchmarks import rigBuildBench
+    results = rigBuildBench.run()
+    rigBuildBench.check(results)
+
+A module with a budget fails when it goes over any of its limits or does not
+build at all. Modules without a budget are only reported. Budgets are a
+dictionary of module name to {'seconds', 'commands', 'nodes'} limits, a limit
+left out is not checked. The evaluation cost of a rig scales with its node
+count, so 'nodes' is the one to keep tight.
+'''
+
+import sys, time, json, traceback
+
+import headless
+headless.install()
+
+from autoRigger import rigGuides
+from autoRigger import spineModules
+from autoRigger import legModules
+from autoRigger import eyeModules
+from autoRigger import mouthModules
+from autoRigger import rigModule
+
+BUDGETS = {
+    'SimpleEyeRig': {'seconds':1.0, 'commands':450, 'nodes':70},
+    'SimpleJawRig': {'seconds':1.0, 'commands':320, 'nodes':40},
+    'DualJawRig':   {'seconds':1.0, 'commands':620, 'nodes':80},
+    'ZipLipsRig':   {'seconds':1.0, 'commands':250, 'nodes':90},
+    'CurveLipsRig': {'seconds':1.0, 'commands':410, 'nodes':80},
+}
+
+
+class BudgetError(Exception):
+    '''
+    Raised by check, failures holds (module, message) pairs
+    '''
+    def __init__(self, failures):
+        self.failures = failures
+        Exception.__init__(self, "\n".join("%s: %s" %failure for failure in failures))
+
+
+#Builders++
+def _stretchySpine():
+    guide = rigGuides.Spine5Guide()
+    guide.setup_chain()
+    guide.create_chain()
+    return spineModules.StretchySpine(guide).build
+
+def _ikFkLeg():
+    guide = rigGuides.LegGuide()
+    guide.setup_chain()
+    guide.create_chain()
+    return legModules.IkFkLeg(guide).build
+
+def _ikFkLegNoFlip():
+    guide = rigGuides.LegGuide()
+    guide.setup_chain()
+    guide.create_chain()
+    return legModules.IkFkLegNoFlip(guide).build
+
+def _simpleEyeRig():
+    guide = rigGuides.EyeGuide()
+    guide.create_chain()
+    return eyeModules.SimpleEyeRig(guide).create
+
+def _simpleJawRig():
+    guide = rigGuides.JawGuide()
+    guide.create_chain()
+    return mouthModules.SimpleJawRig(guide).create
+
+def _dualJawRig():
+    guide = rigGuides.DualJawGuide()
+    guide.setup_chain()
+    guide.create_chain()
+    return mouthModules.DualJawRig(guide).create
+
+def _zipLipsRig():
+    guide = rigGuides.LipGuide()
+    guide.create_chain()
+    return mouthModules.ZipLipsRig(guide).create
+
+def _curveLipsRig():
+    guide = rigGuides.CurveLipGuide()
+    guide.create_chain()
+    return mouthModules.CurveLipsRig(guide).create
+
+def _biPed():
+    character = rigModule.BiPed()
+    def build():
+        character.buildGuide()
+        character.buildRig()
+    return build
+#Builders--
+
+#    module name, function building its guide and returning the build to measure
+MODULES = [
+    ('StretchySpine', _stretchySpine),
+    ('IkFkLeg', _ikFkLeg),
+    ('IkFkLegNoFlip', _ikFkLegNoFlip),
+    ('SimpleEyeRig', _simpleEyeRig),
+    ('SimpleJawRig', _simpleJawRig),
+    ('DualJawRig', _dualJawRig),
+    ('ZipLipsRig', _zipLipsRig),
+    ('CurveLipsRig', _curveLipsRig),
+    ('BiPed', _biPed),
+]
+
+
+def _subtract(after, before):
+    counts = {}
+    for key, value in after.items():
+        value -= before.get(key, 0)
+        if value:
+            counts[key] = value
+    return counts
+
+def _buildModule(name, prepare):
+    '''
+    Builds one module in an empty scene, returns its result dictionary
+    '''
+    result = {'module':name, 'seconds':None, 'commands':0, 'nodes':0,
+              'commandCounts':{}, 'nodeCounts':{}, 'error':None}
+    headless.newScene()
+    try:
+        build = prepare()
+        before = headless.stats()['sceneNodes']
+        headless.resetStats()
+        start = time.time()
+        build()
+        result['seconds'] = time.time() - start
+    except Exception:
+        result['error'] = traceback.format_exc().strip().splitlines()[-1]
+        return result
+
+    stats = headless.stats()
+    result['commandCounts'] = stats['commands']
+    result['commands'] = sum(stats['commands'].values())
+    result['nodeCounts'] = _subtract(stats['sceneNodes'], before)
+    result['nodes'] = sum(result['nodeCounts'].values())
+    return result
+
+def run(modules=None, output=None):
+    '''
+    Builds the modules (all of them by default), writes a table to stdout and
+    the results as json to output when given. Returns the results as a list
+    of dictionaries, one per module
+    '''
+    builders = dict(MODULES)
+    for name in modules or []:
+        if name not in builders:
+            raise ValueError("Unknown module %s, expected one of %s" %(name, ", ".join(builders)))
+    results = [_buildModule(name, prepare) for name, prepare in MODULES if not modules or name in modules]
+    headless.newScene()
+
+    _report(results)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    return results
+
+def check(results, budgets=BUDGETS):
+    '''
+    Raises a BudgetError listing every budgeted module that failed to build
+    or went over one of its limits
+    '''
+    failures = []
+    for result in results:
+        budget = budgets.get(result['module'])
+        if budget is None:
+            continue
+        if result['error']:
+            failures.append((result['module'], "build failed, %s" %result['error']))
+            continue
+        for key in ('seconds', 'commands', 'nodes'):
+            if key in budget and result[key] > budget[key]:
+                failures.append((result['module'], "%s %s over the budget of %s" %(key, result[key], budget[key])))
+    if failures:
+        raise BudgetError(failures)
+
+def _report(results):
+    sys.stdout.write('\n%-14s | %9s %9s %7s | %s\n' %('module', 'seconds', 'commands', 'nodes', 'top commands'))
+    sys.stdout.write('-' * 90 + '\n')
+    for result in results:
+        if result['error']:
+            sys.stdout.write('%-14s | failed: %s\n' %(result['module'], result['error']))
+            continue
+        top = sorted(result['commandCounts'].items(), key=lambda item: -item[1])[:4]
+        sys.stdout.write('%-14s | %8.3fs %9d %7d | %s\n' %(result['module'], result['seconds'], result['commands'],
+                                                           result['nodes'], ", ".join("%s %d" %item for item in top)))
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Builds the auto rig modules headlessly against their budgets")
+    parser.add_argument('modules', nargs='*', help="modules to build, all of them by default")
+    parser.add_argument('-o', '--output', help="json file to write the results to")
+    parser.add_argument('-b', '--budgets', help="json file of budgets to use instead of the defaults")
+    args = parser.parse_args(argv)
+
+    budgets = BUDGETS
+    if args.budgets:
+        with open(args.budgets) as f:
+            budgets = json.load(f)
+    results = run(args.modules, args.output)
+    try:
+        check(results, budgets)
+    except BudgetError as e:
+        sys.stderr.write("\nOver budget:\n%s\n" %e)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
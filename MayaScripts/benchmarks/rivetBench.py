@@ -0,0 +1,116 @@
+'''
+Benchmark of follicle rivets against one matrixRivet node
+
+Builds the same rivets on a deformed sphere both ways, as a follicle per rivet
+like hookFunctions.follicleRivet and as a single matrixRivet node like
+hookFunctions.matrixRivets, then times the build and the playback of the
+frame range, once with the DG evaluation and once with the parallel evaluation
+manager (see benchmarks.playback).
+
+Run from mayapy or the script editor, the MayaNodes/matrixRivet.py plug-in has
+to be on the plug-in path:
+
+    from benchmarks import rivetBench
+    rivetBench.run()
+    rivetBench.run(counts=[1000], frames=50)
+
+The rivets carry no curve locator shapes or locks, so only the rivet graphs
+are compared. The matrixRivet ones get a locator shape, for the viewport to
+pull them like it pulls the follicle shapes.
+'''
+
+import sys, time, random
+from maya import cmds
+from general import surfaceFunctions
+from general import meshBinding
+from general import dgTransaction
+from general import apiFunctions
+from benchmarks import playback
+
+COUNTS = [100, 300, 1000]
+FRAMES = 100
+
+
+#Builders++
+def _buildFollicles(meshShp, uvs):
+    rivets = []
+    for i, (u, v) in enumerate(uvs):
+        follicleShp = cmds.createNode('follicle')
+        follicle = cmds.listRelatives(follicleShp, p=True)[0]
+        cmds.setAttr('%s.inheritsTransform'%follicle, 0)
+        cmds.connectAttr('%s.outRotate'%follicleShp, '%s.rotate'%follicle, f=True)
+        cmds.connectAttr('%s.outTranslate'%follicleShp, '%s.translate'%follicle, f=True)
+        cmds.setAttr('%s.pu'%follicleShp, u)
+        cmds.setAttr('%s.pv'%follicleShp, v)
+        cmds.connectAttr('%s.worldMatrix[0]'%meshShp, '%s.inputWorldMatrix'%follicleShp, f=True)
+        cmds.connectAttr('%s.worldMesh[0]'%meshShp, '%s.inputMesh'%follicleShp, f=True)
+        rivets.append(cmds.rename(follicle, 'follicleBench%d'%i))
+    return rivets
+
+def _buildMatrixRivets(meshShp, points):
+    points = surfaceFunctions.worldToObject(meshShp, points)
+    triangles, weights, faces = meshBinding.bind(surfaceFunctions.meshBVHFor(meshShp), points)
+    tx = dgTransaction.Transaction(apiFunctions.NameRegistry())
+    node = tx.createNode('matrixRivet', n='matrixRivetBench')
+    tx.connectAttr('%s.worldMesh[0]'%meshShp, '%s.inMesh'%node)
+    rivets = []
+    for i in range(len(points)):
+        tx.setAttr('%s.binding[%d].bindingVertices'%(node, i), *triangles[i].tolist())
+        tx.setAttr('%s.binding[%d].bindingWeights'%(node, i), *weights[i].tolist())
+        rivet = tx.createNode('transform', n='matrixRivetBench%d'%i)
+        tx.createNode('locator', n='%sShape'%rivet, p=rivet)
+        tx.setAttr('%s.inheritsTransform'%rivet, 0)
+        tx.connectAttr('%s.outMatrix[%d]'%(node, i), '%s.offsetParentMatrix'%rivet)
+        rivets.append(rivet)
+    tx.apply()
+    return rivets
+#Builders--
+
+
+def _scene(rand, count):
+    '''
+    New scene with an animated sine deformed sphere, returns its shape and
+    count random points on it
+    '''
+    cmds.file(new=True, force=True)
+    sphere = cmds.polySphere(sx=80, sy=60, r=10, ch=False)[0]
+    meshShp = cmds.listRelatives(sphere, s=True)[0]
+    sine, handle = cmds.nonLinear(sphere, type='sine')
+    cmds.setKeyframe(sine, at='offset', t=1, v=0)
+    cmds.setKeyframe(sine, at='offset', t=FRAMES, v=10)
+
+    vertices = rand.sample(range(cmds.polyEvaluate(sphere, vertex=True)), count)
+    points = [cmds.pointPosition('%s.vtx[%d]'%(sphere, i), w=True) for i in vertices]
+    return meshShp, points
+
+def run(counts=COUNTS, frames=FRAMES, seed=0, stream=None):
+    '''
+    Runs the benchmark, writes a table to stream (stdout) and returns the
+    results as a list of (count, mode, evaluation, build seconds, playback seconds)
+    '''
+    if not cmds.pluginInfo('matrixRivet', q=True, loaded=True):
+        cmds.loadPlugin('matrixRivet')
+    stream = stream or sys.stdout
+    rand = random.Random(seed)
+    results = []
+    evaluationMode = cmds.evaluationManager(q=True, mode=True)[0]
+    for count in counts:
+        for mode in ['follicle', 'matrixRivet']:
+            meshShp, points = _scene(rand, count)
+            start = time.time()
+            if mode == 'follicle':
+                rivets = _buildFollicles(meshShp, surfaceFunctions.closestUVs(meshShp, points).tolist())
+            else:
+                rivets = _buildMatrixRivets(meshShp, points)
+            build = time.time() - start
+            for evaluation in playback.EVALUATIONS:
+                results.append((count, mode, evaluation, build, playback.timePlayback(rivets, frames, evaluation)))
+    cmds.evaluationManager(mode=evaluationMode)
+
+    stream.write('\n%8s %-12s %-10s %10s %12s %12s\n' %('rivets', 'mode', 'evaluation', 'build', 'playback',
+                                                        'per frame'))
+    stream.write('-' * 69 + '\n')
+    for count, mode, evaluation, build, seconds in results:
+        stream.write('%8d %-12s %-10s %9.3fs %11.3fs %10.2fms\n' %(count, mode, evaluation, build, seconds,
+                                                                 1000.0 * seconds / frames))
+    return results
@@ -0,0 +1,97 @@
+'''
+Benchmark of the condition node parent switch against one spaceSwitch node
+
+Builds switched controls on animated spaces with constraintFunctions.parentSwitch,
+once with a parentConstraint and a condition node per space (mode 'constraint')
+and once with a single spaceSwitch node per control (mode 'spaceSwitch'), the
+switch attribute keyed to step through the spaces. Then times the build and
+the playback of the frame range, once with the DG evaluation and once with the
+parallel evaluation manager (see benchmarks.playback).
+
+Run from mayapy or the script editor, the MayaNodes/spaceSwitch.py plug-in has
+to be on the plug-in path:
+
+    from benchmarks import spaceSwitchBench
+    spaceSwitchBench.run()
+    spaceSwitchBench.run(counts=[500], spaces=8, frames=50)
+
+The table also lists the switch nodes every mode leaves in the scene.
+'''
+
+import sys, time
+from maya import cmds
+from general import constraintFunctions
+from benchmarks import playback
+
+COUNTS = [50, 200, 500]
+SPACES = 4
+FRAMES = 100
+
+MODES = ['constraint', 'spaceSwitch']
+_SWITCH_TYPES = ['condition', 'parentConstraint', 'spaceSwitch']
+
+
+def _scene(count, spaces):
+    '''
+    New scene with spaces animated space transforms and count controls, each
+    with a driven group, returns the spaces and the (control, driven) pairs
+    '''
+    cmds.file(new=True, force=True)
+    drivers = []
+    for i in range(spaces):
+        driver = cmds.createNode('transform', n='C_grp_benchSpace%d_0'%i)
+        cmds.setAttr('%s.t'%driver, i * 3, 0, 0)
+        cmds.setKeyframe(driver, at='ry', t=1, v=0)
+        cmds.setKeyframe(driver, at='ry', t=FRAMES, v=90 + i * 10)
+        drivers.append(driver)
+
+    switches = []
+    for i in range(count):
+        driven = cmds.createNode('transform', n='C_grp_benchSwitch%d_0'%i)
+        control = cmds.createNode('transform', n='C_ctl_benchSwitch%d_0'%i, p=driven)
+        cmds.setAttr('%s.t'%driven, i % 10, i // 10, 0)
+        switches.append((control, driven))
+    return drivers, switches
+
+def _keySwitches(switches, spaces, frames):
+    '''
+    Steps the switch attribute of every control through the spaces
+    '''
+    for i, (control, driven) in enumerate(switches):
+        for frame in range(1, frames+1, max(1, frames // (2 * spaces))):
+            cmds.setKeyframe(control, at='parentSwitch', t=frame, v=(i + frame) % spaces)
+        cmds.keyTangent(control, at='parentSwitch', ott='step')
+
+def run(counts=COUNTS, spaces=SPACES, frames=FRAMES, stream=None):
+    '''
+    Runs the benchmark, writes a table to stream (stdout) and returns the results as a
+    list of (count, mode, evaluation, switch nodes, build seconds, playback seconds)
+    '''
+    if not cmds.pluginInfo('spaceSwitch', q=True, loaded=True):
+        cmds.loadPlugin('spaceSwitch')
+    stream = stream or sys.stdout
+    results = []
+    evaluationMode = cmds.evaluationManager(q=True, mode=True)[0]
+    for count in counts:
+        for mode in MODES:
+            drivers, switches = _scene(count, spaces)
+            enumName = ['space%d'%i for i in range(spaces)]
+            start = time.time()
+            for control, driven in switches:
+                constraintFunctions.parentSwitch(control, driven, drivers=drivers, enumName=enumName, mode=mode)
+            build = time.time() - start
+            _keySwitches(switches, spaces, frames)
+            nodes = len(cmds.ls(type=_SWITCH_TYPES))
+            drivens = [driven for control, driven in switches]
+            for evaluation in playback.EVALUATIONS:
+                results.append((count, mode, evaluation, nodes, build,
+                                playback.timePlayback(drivens, frames, evaluation)))
+    cmds.evaluationManager(mode=evaluationMode)
+
+    stream.write('\n%8s %-12s %-10s %8s %10s %12s %12s\n' %('switches', 'mode', 'evaluation', 'nodes', 'build',
+                                                           'playback', 'per frame'))
+    stream.write('-' * 78 + '\n')
+    for count, mode, evaluation, nodes, build, seconds in results:
+        stream.write('%8d %-12s %-10s %8d %9.3fs %11.3fs %10.2fms\n' %(count, mode, evaluation, nodes, build,
+                                                                      seconds, 1000.0 * seconds / frames))
+    return results
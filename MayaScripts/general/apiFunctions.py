@@ -7,10 +7,34 @@ MFnDependencyNode and is a pointer to the object rather than the string
 
 import maya.cmds as cmds
 from maya import OpenMaya
-import types, fnmatch, sys, re, inspect
+import types, fnmatch, sys, re, inspect, itertools, weakref
 from maya import cmds, OpenMaya, OpenMayaAnim
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#    channels a bulk matrix setter writes
+_TRANSFORM_CHANNELS = ["translate", "rotate", "scale", "shear"]
+
 class DependNode(OpenMaya.MFnDependencyNode):
+    @classmethod
+    def get(cls, inObject):
+        '''
+        Returns the shared wrapper of a node, the same DependNode is handed out for
+        the same scene node for as long as something holds on to it, so they can be
+        compared with "is". Traversals use this rather than DependNode().
+        Never call setObject on a shared wrapper.
+        '''
+        if isinstance(inObject, DependNode):
+            return inObject
+        if isinstance(inObject, OpenMaya.MDagPath):
+            inObject = inObject.node()
+        if not isinstance(inObject, OpenMaya.MObject):
+            inObject = DependNode(inObject).asMObject()
+        return _internNode(inObject)
+
     @classmethod
     def create(cls, nodeType, nodeName=None):
         dNode = DependNode(cmds.createNode(nodeType))
@@ -22,6 +46,7 @@ class DependNode(OpenMaya.MFnDependencyNode):
     def __init__(self, inObject=None):
         OpenMaya.MFnDependencyNode.__init__(self)
         self.__obj = None
+        self.__cache = None
 
         if isinstance(inObject, OpenMaya.MObject):
             self.__obj=inObject
@@ -47,6 +72,8 @@ class DependNode(OpenMaya.MFnDependencyNode):
             OpenMaya.MFnDependencyNode.setObject(self, self.__obj)
 
     def __eq__(self, otherObj):
+        if otherObj is self:
+            return True
         if isinstance(otherObj, self.__class__):
             return self.object() == otherObj.asMObject()
         else:
@@ -57,6 +84,7 @@ class DependNode(OpenMaya.MFnDependencyNode):
         obj = dNode.asMObject()
         OpenMaya.MFnDependencyNode.setObject(self, obj)
         self.__obj = obj
+        self.__cache = None
 
     def isDagNode(self):
         if self.object().hasFn(OpenMaya.MFn.kDagNode):
@@ -66,13 +94,34 @@ class DependNode(OpenMaya.MFnDependencyNode):
     def __assertDagNode(self):
         assert self.isDagNode(), "Function only relevant to dagNodes!"
 
+    def __cached(self, key, build):
+        '''
+        Returns the value cached under key, calling build() to fill it when missing.
+        The cache is dropped once the cached dag path of this node is no longer
+        valid, which is when the node or one of its parents got deleted or reparented.
+        '''
+        if self.__cache is not None:
+            dagPath = self.__cache.get("MDagPath")
+            if (dagPath is not None) and ((not dagPath.isValid()) or (dagPath.node() != self.object())):
+                self.__cache = None
+        if self.__cache is None:
+            self.__cache = {}
+        value = self.__cache.get(key)
+        if value is None:
+            value = self.__cache[key] = build()
+        return value
+
+    def __dagPath(self):
+        return self.__cached("MDagPath", lambda: OpenMaya.MDagPath.getAPathTo(self.object()))
+
     def asMObject(self):
         return OpenMaya.MFnDependencyNode.object(self)
 
+    #The function sets returned by the asMFn methods are cached and shared,
+    #use them but do not call setObject on them
     def asMDagPath(self):
         self.__assertDagNode()
-        dPath = OpenMaya.MDagPath.getAPathTo(self.object())
-        return dPath
+        return OpenMaya.MDagPath(self.__dagPath())
 
     def asMItGeometry(self):
         self.__assertDagNode()
@@ -81,45 +130,36 @@ class DependNode(OpenMaya.MFnDependencyNode):
 
     def asMFnDagNode(self):
         self.__assertDagNode()
-        return OpenMaya.MFnDagNode(self.asMDagPath())
+        return self.__cached("MFnDagNode", lambda: OpenMaya.MFnDagNode(self.__dagPath()))
 
     def asMFnTransform(self):
         self.__assertDagNode()
-        return OpenMaya.MFnTransform(self.asMDagPath())
+        return self.__cached("MFnTransform", lambda: OpenMaya.MFnTransform(self.__dagPath()))
 
     def asMFnIkJoint(self):
         self.__assertDagNode()
         if self.getApiTypeStr() != 'kJoint':
             raise riggingToolsError.RiggingToolsError, 'This method can be used only for DagNodeWrappers that "contains" a dagNode of type kJoint, but the wrapped dagNode is of type %s' %self.getApiTypeStr()
-        path = OpenMaya.MDagPath()
-        self.asMFnDagNode().getPath(path)
-        tran = OpenMayaAnim.MFnIkJoint(path)
-        return tran
+        return self.__cached("MFnIkJoint", lambda: OpenMayaAnim.MFnIkJoint(self.__dagPath()))
 
     def asMFnNurbsCurve(self):
         assert (self.asMObject().hasFn(OpenMaya.MFn.kNurbsCurve)), "Object has no functions 'kNurbsCurve'"
-        crvFn = OpenMaya.MFnNurbsCurve()
-        crvFn.setObject(self.asMDagPath())
-        return crvFn
+        return self.__cached("MFnNurbsCurve", lambda: OpenMaya.MFnNurbsCurve(self.__dagPath()))
 
     def asMFnSkinCluster(self):
         assert (self.asMObject().hasFn(OpenMaya.MFn.kSkinClusterFilter)), "Object has no functions 'kSkinCluster'"
-        scFn = OpenMayaAnim.MFnSkinCluster()
-        scFn.setObject(self.asMObject())
-        return scFn
+        return self.__cached("MFnSkinCluster", lambda: OpenMayaAnim.MFnSkinCluster(self.asMObject()))
 
     def asMFnMesh(self):
         assert (self.asMObject().hasFn(OpenMaya.MFn.kMesh)), "Object has no function 'kMesh'"
-        meshFn = OpenMaya.MFnMesh()
-        meshFn.setObject(self.asMDagPath())
-        return meshFn
+        return self.__cached("MFnMesh", lambda: OpenMaya.MFnMesh(self.__dagPath()))
 
     def getName(self):
         return self.name()
 
     def getFullName(self):
         if self.isDagNode():
-            return OpenMaya.MFnDagNode(self.object()).fullPathName()
+            return self.__dagPath().fullPathName()
         return self.getName()
 
     def fullName(self):
@@ -127,7 +167,7 @@ class DependNode(OpenMaya.MFnDependencyNode):
 
     def getShortName(self):
         if self.isDagNode():
-            fullName = OpenMaya.MFnDagNode(self.object()).fullPathName()
+            fullName = self.getFullName()
             tokes = fullName.split("|")
             return tokes[len(tokes)-1]
         return self.getName()
@@ -137,7 +177,7 @@ class DependNode(OpenMaya.MFnDependencyNode):
 
     def getPartialName(self):
         if self.isDagNode():
-            return self.asMDagPath().partialPathName()
+            return self.__dagPath().partialPathName()
         return self.getName()
 
     def partialName(self):
@@ -162,52 +202,70 @@ class DependNode(OpenMaya.MFnDependencyNode):
         self.setAttr("overrideColor", colorIndex)
         self.setAttr("overrideEnabled", 1)
 
-    def getChildren(self, name="*", inTypes=None, recursive=False, ignoreNamespace=True, noIntermediate=False):
+    def iterChildren(self, name="*", inTypes=None, recursive=False, ignoreNamespace=True, noIntermediate=False, maxDepth=None):
+        '''
+        Generator over the children of this dag node, depth first, built on MItDag.
+        name is a glob string or a pre-compiled regular expression, matched against the
+        short name. inTypes holds apiTypeStr strings and/or MFn type ints, names and types
+        are tested on the MObject before any DependNode gets created.
+        maxDepth limits a recursive traversal (1 = direct children only).
+        Stop iterating to exit early.
+        '''
         self.__assertDagNode()
-        childrenFound = DependNodeArray()
-
-        def _getThem(nodeName, name, inTypes, recursive, ignoreNamespace):
-            children = None
-            children = cmds.listRelatives(nodeName, ni=noIntermediate, children=True, fullPath=True)
-
-            if noIntermediate and children:
-                myList = [node for node in children if not cmds.getAttr(node + '.intermediateObject')]
-                children = myList
-
-            if children:
-                for childName in children:
-                    shortName = childName.split("|")[-1]
-                    if ignoreNamespace:
-                        shortName = shortName.split(":")[-1]
-                    if fnmatch.fnmatch(shortName, name):
-                        wrapper = DependNode(childName)
-                        if inTypes:
-                            for type in inTypes:
-                                if issubclass(type.__class__, str):
-                                    if wrapper.getApiTypeStr()==type:
-                                        childrenFound.append(wrapper)
-                                elif issubclass(type.__class__, int):
-                                    if wrapper.hasFn(type):
-                                        childrenFound.append(wrapper)
-                        else:
-                            childrenFound.append(wrapper)
-                    if recursive:
-                        _getThem(childName, name, inTypes, recursive, ignoreNamespace)
-
-        _getThem(self.getFullName(), name, inTypes, recursive, ignoreNamespace)
-
-        return childrenFound
+        pattern = _compileNamePattern(name)
+        typeStrs, fnTypes = _splitTypeFilters(inTypes)
+        if not recursive:
+            maxDepth = 1
+
+        dagIt = OpenMaya.MItDag(OpenMaya.MItDag.kDepthFirst, OpenMaya.MFn.kInvalid)
+        dagIt.reset(self.asMDagPath(), OpenMaya.MItDag.kDepthFirst, OpenMaya.MFn.kInvalid)
+        rootDepth = dagIt.depth()
+        fnDag = OpenMaya.MFnDagNode()
+
+        #    first item is this node
+        dagIt.next()
+        while not dagIt.isDone():
+            obj = dagIt.currentItem()
+            fnDag.setObject(obj)
+
+            if noIntermediate and fnDag.isIntermediateObject():
+                dagIt.prune()
+                dagIt.next()
+                continue
+
+            if maxDepth and (dagIt.depth() - rootDepth) >= maxDepth:
+                dagIt.prune()
+
+            match = True
+            if pattern:
+                shortName = fnDag.name()
+                if ignoreNamespace:
+                    shortName = shortName.split(":")[-1]
+                match = pattern.match(shortName)
+            if match and (typeStrs or fnTypes):
+                match = _matchesTypes(obj, typeStrs, fnTypes)
+
+            if match:
+                yield DependNode.get(obj)
+            dagIt.next()
+
+    def getChildren(self, name="*", inTypes=None, recursive=False, ignoreNamespace=True, noIntermediate=False, maxDepth=None):
+        return DependNodeArray(list(self.iterChildren(name, inTypes, recursive, ignoreNamespace, noIntermediate, maxDepth)))
 
     def getChild(self, val, inTypes=None, recursive=False, ignoreNamespace=True):
         self.__assertDagNode()
         child = None
         if type(val) == int:
-            children = self.getChildren('*', inTypes, recursive, ignoreNamespace)
-            child = children[val]
+            if val < 0:
+                children = self.getChildren('*', inTypes, recursive, ignoreNamespace)
+                child = children[val]
+            else:
+                children = itertools.islice(self.iterChildren('*', inTypes, recursive, ignoreNamespace), val, None)
+                child = next(children, None)
+                if child is None:
+                    raise IndexError("DependNode.getChild: index %d out of range" %val)
         elif type(val) == str:
-           children = self.getChildren(val, inTypes, recursive, ignoreNamespace)
-           if len(children) > 0:
-               child = children[0]
+            child = next(self.iterChildren(val, inTypes, recursive, ignoreNamespace), None)
 
         return child
 
@@ -217,11 +275,11 @@ class DependNode(OpenMaya.MFnDependencyNode):
         Return the number of children of this DAG node.
         @return: Integer
         '''
-        return self.self.asMDagPath().childCount()
+        return self.__dagPath().childCount()
 
     def getParent(self):
         self.__assertDagNode()
-        return DependNode(self.asMFnDagNode().parent(0))
+        return DependNode.get(self.asMFnDagNode().parent(0))
 
     def setParent(self, parent, preserveState=False):
         self.__assertDagNode()
@@ -239,41 +297,63 @@ class DependNode(OpenMaya.MFnDependencyNode):
         self.__assertDagNode()
         parent = self
         while (cmds.listRelatives(parent.getFullName(), p=True)):
-            parent = DependNode(cmds.listRelatives(parent.getFullName(), f=True, p=True)[0])
+            parent = DependNode.get(cmds.listRelatives(parent.getFullName(), f=True, p=True)[0])
         return parent
 
-    def listHistory(self, MFnType=None, future=False, includeShapeHistory=False):
-        direction = OpenMaya.MItDependencyGraph.kUpstream
-        traversal = OpenMaya.MItDependencyGraph.kBreadthFirst
-        filter = OpenMaya.MFn.kInvalid
-        if future:
-            direction = OpenMaya.MItDependencyGraph.kDownstream
-        if MFnType:
-            filter = MFnType
+    def iterHistory(self, MFnType=None, future=False, includeShapeHistory=False, maxDepth=None, stopAt=None, useCache=False):
+        '''
+        Generator over the upstream graph of this node (downstream with future), breadth
+        first, every node is returned once per call and the root nodes come first.
+        MFnType filters what is returned, the traversal still walks through other nodes.
+        maxDepth limits the number of connections walked away from the root nodes.
+        stopAt is an MFn type, an apiTypeStr, a list of them or a predicate taking an
+        MObject, matching nodes are returned but not walked through.
+        useCache serves repeated queries from a cache that is flushed whenever a DG
+        connection changes, a cache miss walks the whole bounded graph before yielding.
+        '''
+        if useCache:
+            objs = _cachedHistory(self, MFnType, future, includeShapeHistory, maxDepth, stopAt)
+        else:
+            objs = self.__walkHistory(MFnType, future, includeShapeHistory, maxDepth, stopAt)
 
-        rootNodes = [self]
-        if (includeShapeHistory) and (self.isDagNode()):
-            shapes = self.getChildren("*", [OpenMaya.MFn.kShape], False)
-            for i in range(0, len(shapes)):
-                rootNodes.append(shapes[i])
+        for obj in objs:
+            yield DependNode.get(obj)
 
-        historyNodes = DependNodeArray()
-        for node in rootNodes:
-            try:
-                iter = OpenMaya.MItDependencyGraph(node.asMObject(),
-                                                   filter,
-                                                   direction,
-                                                   traversal)
-                try:
-                    while(not iter.isDone()):
-                        dn = DependNode(iter.currentItem())
-                        historyNodes.append(DependNode(iter.currentItem()))
-                        iter.next()
-                except:
-                    pass
-            except:
-                return historyNodes
-        return historyNodes
+    def __walkHistory(self, MFnType, future, includeShapeHistory, maxDepth, stopAt):
+        stop = _asNodePredicate(stopAt)
+        roots = [self.asMObject()]
+        if (includeShapeHistory) and (self.isDagNode()):
+            roots.extend([shape.asMObject() for shape in self.iterChildren("*", [OpenMaya.MFn.kShape])])
+
+        visited = {}
+        level = [obj for obj in roots if _visit(visited, obj)]
+
+        depth = 0
+        while level:
+            nextLevel = []
+            for obj in level:
+                if (not MFnType) or obj.hasFn(MFnType):
+                    yield obj
+                if (maxDepth is not None) and (depth >= maxDepth):
+                    continue
+                if depth and stop and stop(obj):
+                    continue
+                for other in _connectedNodes(obj, future):
+                    if _visit(visited, other):
+                        nextLevel.append(other)
+            level = nextLevel
+            depth += 1
+
+    def listHistory(self, MFnType=None, future=False, includeShapeHistory=False, maxDepth=None, stopAt=None, useCache=False):
+        return DependNodeArray(list(self.iterHistory(MFnType, future, includeShapeHistory, maxDepth, stopAt, useCache)))
+
+    def findHistory(self, MFnType, future=False, stopAt=OpenMaya.MFn.kDagNode, useCache=True):
+        '''
+        Returns the nearest node of MFnType in the history of this node, or None.
+        By default the search does not walk through dag nodes (like listHistory -pdo)
+        and is served from the history cache, ie. the skinCluster of a mesh shape.
+        '''
+        return next(self.iterHistory(MFnType, future, False, None, stopAt, useCache), None)
 
     def getWorldTranslation(self):
         self.__assertDagNode()
@@ -328,7 +408,7 @@ class DependNode(OpenMaya.MFnDependencyNode):
 
     def getWorldMatrix(self):
         self.__assertDagNode()
-        return self.asMDagPath().inclusiveMatrix()
+        return self.__dagPath().inclusiveMatrix()
 
     def setWorldMatrix(self, inMatrix, useJointOrient=False):
         self.__assertDagNode()
@@ -356,15 +436,15 @@ class DependNode(OpenMaya.MFnDependencyNode):
 
     def getWorldMatrixInverse(self):
         self.__assertDagNode()
-        return self.asMDagPath().inclusiveMatrixInverse()
+        return self.__dagPath().inclusiveMatrixInverse()
 
     def getParentMatrix(self):
         self.__assertDagNode()
-        return self.asMDagPath().exclusiveMatrix()
+        return self.__dagPath().exclusiveMatrix()
 
     def getParentInverseMatrix(self):
         self.__assertDagNode()
-        return self.asMDagPath().exclusiveMatrix().inverse()
+        return self.__dagPath().exclusiveMatrix().inverse()
 
     def getXVec(self):
         self.matrix = self.getWorldMatrix()
@@ -383,7 +463,7 @@ class DependNode(OpenMaya.MFnDependencyNode):
 
     def getParent(self):
         self.__assertDagNode()
-        return DependNode((OpenMaya.MFnDagNode(self.object())).parent(0) )
+        return DependNode.get(self.asMFnDagNode().parent(0))
 
     def getAttrAsMPlug(self, attribute):
         try:
@@ -420,11 +500,13 @@ class DependNode(OpenMaya.MFnDependencyNode):
         else:
             setValues = [True] * len(attributes)
 
+        fullName = self.getFullName()
         currentStates = []
         for i in range(0, len(attributes)):
-            lockedState = cmds.getAttr(self.getFullName() + "." + attributes[i], l=True)
+            lockedState = self.getAttrAsMPlug(attributes[i]).isLocked()
             currentStates.append(lockedState)
-            cmds.setAttr(self.getFullName() + "." + attributes[i], l=setValues[i])
+            if lockedState != bool(setValues[i]):
+                cmds.setAttr(fullName + "." + attributes[i], l=setValues[i])
 
         return currentStates
 
@@ -441,11 +523,13 @@ class DependNode(OpenMaya.MFnDependencyNode):
         else:
             setValues = [True] * len(attributes)
 
+        fullName = self.getFullName()
         currentStates = []
         for i in range(0, len(attributes)):
-            keyableState = cmds.getAttr(self.getFullName() + "." + attributes[i], k=True)
+            keyableState = self.getAttrAsMPlug(attributes[i]).isKeyable()
             currentStates.append(keyableState)
-            cmds.setAttr(self.getFullName() + "." + attributes[i], k=setValues[i])
+            if keyableState != bool(setValues[i]):
+                cmds.setAttr(fullName + "." + attributes[i], k=setValues[i])
 
         return currentStates
 
@@ -512,6 +596,46 @@ class DependNode(OpenMaya.MFnDependencyNode):
             nodeArray[0].setName(findUniqueName(n))
         return nodeArray
 
+class _NodeIndex(object):
+    '''
+    Hash index of the nodes held by a DependNodeArray.
+    Nodes are bucketed by their MObjectHandle hash code, a bucket only holds
+    more than one entry on a hash collision or when the array holds duplicates.
+    '''
+    def __init__(self, nodes=None):
+        self.__buckets = {}
+        if nodes:
+            for node in nodes:
+                self.add(node)
+
+    def add(self, node):
+        self.__buckets.setdefault(_nodeKey(node), []).append(node)
+
+    def discard(self, node):
+        key = _nodeKey(node)
+        bucket = self.__buckets.get(key)
+        if not bucket:
+            return
+        for i in range(0, len(bucket)):
+            if _sameNode(bucket[i], node):
+                bucket.pop(i)
+                break
+        if not bucket:
+            del self.__buckets[key]
+
+    def contains(self, node):
+        bucket = self.__buckets.get(_nodeKey(node))
+        if not bucket:
+            return False
+        for item in bucket:
+            if _sameNode(item, node):
+                return True
+        return False
+
+    def clear(self):
+        self.__buckets = {}
+
+
 class DependNodeArray(list):
     @classmethod
     def ls(cls, name="*", type=None):
@@ -524,10 +648,13 @@ class DependNodeArray(list):
 
     def __init__(self, inItem_array=None):
         list.__init__(self)
+        self.__index = _NodeIndex()
+        self.__indexDirty = False
+
         if not inItem_array:
-            self = []
+            return
 
-        elif (inItem_array.__class__==list) or\
+        if (inItem_array.__class__==list) or\
             (inItem_array.__class__==DependNodeArray):
             for node in inItem_array:
                 self.append(node)
@@ -540,16 +667,67 @@ class DependNodeArray(list):
         else:
             self.append(inItem_array)
 
-    def __contains__(self, node):
+    #Index++
+    #append, insert and extend keep the index up to date, any other mutation
+    #flags it dirty and it gets rebuilt on the next lookup
+    def __getIndex(self):
+        if self.__indexDirty:
+            self.__index = _NodeIndex(self)
+            self.__indexDirty = False
+        return self.__index
+
+    def __setitem__(self, index, node):
+        list.__setitem__(self, index, self.__checkType__(node))
+        self.__indexDirty = True
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self.__indexDirty = True
+
+    def __setslice__(self, i, j, nodes):
+        list.__setslice__(self, i, j, [self.__checkType__(node) for node in nodes])
+        self.__indexDirty = True
+
+    def __delslice__(self, i, j):
+        list.__delslice__(self, i, j)
+        self.__indexDirty = True
+
+    def __iadd__(self, node_nodeArray):
+        self.extend(node_nodeArray)
+        return self
+
+    def __imul__(self, count):
+        list.__imul__(self, count)
+        self.__indexDirty = True
+        return self
+
+    def pop(self, index=-1):
+        node = list.pop(self, index)
+        if not self.__indexDirty:
+            self.__index.discard(node)
+        return node
+
+    def remove(self, node):
+        node = self.__checkType__(node)
         for i in range(0, len(self)):
-            if node.__eq__(self[i]):
-                return True
-        return False
+            if _sameNode(self[i], node):
+                self.pop(i)
+                return
+        raise ValueError("DependNodeArray.remove(x): x not in array")
+    #Index--
+
+    def __contains__(self, node):
+        if not isinstance(node, (DependNode, DependNodeArray)):
+            try:
+                node = DependNode.get(node)
+            except:
+                return False
+        return self.__getIndex().contains(node)
 
     def __checkType__(self, node):
         if hasattr(node, "__class__") and \
         ((node.__class__==str) or (node.__class__==unicode)):
-            return DependNode(node)
+            return DependNode.get(node)
         elif hasattr(node, "__class__") and isinstance(node, DependNode):
             return node
         elif hasattr(node, "__class__") and issubclass(node.__class__, DependNode):
@@ -559,15 +737,20 @@ class DependNodeArray(list):
         elif hasattr(node, "__class__") and issubclass(node.__class__, DependNodeArray):
             return node
         else:
-            node = DependNode(node)
+            node = DependNode.get(node)
             return node
 
     def append(self, node):
-        list.append(self, self.__checkType__(node))
+        node = self.__checkType__(node)
+        list.append(self, node)
+        if not self.__indexDirty:
+            self.__index.add(node)
 
     def insert(self, index, node):
         node = self.__checkType__(node)
-        list.insert(index, node)
+        list.insert(self, index, node)
+        if not self.__indexDirty:
+            self.__index.add(node)
 
     def extend(self, node_nodeArray):
         if not node_nodeArray:
@@ -592,28 +775,73 @@ class DependNodeArray(list):
             extArr.append(self.__checkType__(node_nodeArray))
         list.extend(self, extArr)
 
+        if not self.__indexDirty:
+            for node in extArr:
+                self.__index.add(node)
+
     def removeDuplicates(self, id=None):
+        '''
+        Removes repeated nodes, keeping the first occurrence of each.
+        If id is given only the duplicates of that node are removed.
+        '''
         if not len(self) > 1:
             return
 
-        seen = DependNodeArray()
-        result = DependNodeArray()
-        for i in range(0, len(self)):
-            if not seen.__contains__(self[i]):
-                result.append(self[i])
-            elif id:
-                if not self[i].__eq__(DependNode(id)):
-                    result.append(self[i])
-            seen.append(self[i])
+        if id:
+            id = self.__checkType__(id)
+
+        seen = _NodeIndex()
+        result = []
+        for node in self:
+            if not seen.contains(node):
+                result.append(node)
+                seen.add(node)
+            elif id and not _sameNode(node, id):
+                result.append(node)
 
         self.clear()
         self.extend(result)
 
     def clear(self):
-        cnt = len(self)-1
-        for i in range(0, len(self)):
-            self.pop(cnt)
-            cnt -= 1
+        list.__delslice__(self, 0, len(self))
+        self.__index.clear()
+        self.__indexDirty = False
+
+    #Set operations++
+    #all of these keep the order of this array and return a new array without duplicates
+    def union(self, other):
+        result = DependNodeArray(self)
+        result.removeDuplicates()
+        for node in DependNodeArray(other):
+            if not result.__getIndex().contains(node):
+                result.append(node)
+        return result
+
+    def intersection(self, other):
+        otherIndex = _NodeIndex(DependNodeArray(other))
+        result = DependNodeArray()
+        for node in self:
+            if otherIndex.contains(node) and not result.__getIndex().contains(node):
+                result.append(node)
+        return result
+
+    def difference(self, other):
+        otherIndex = _NodeIndex(DependNodeArray(other))
+        result = DependNodeArray()
+        for node in self:
+            if not otherIndex.contains(node) and not result.__getIndex().contains(node):
+                result.append(node)
+        return result
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+    #Set operations--
 
     def asFullNameArray(self):
         arr = []
@@ -639,32 +867,395 @@ class DependNodeArray(list):
             arr.append(node.getWorldTranslation())
         return arr
 
+    #Bulk transforms++
+    #The getters return contiguous numpy arrays of shape (N,3) or (N,4,4) built in
+    #a single pass, the setters take the same shapes. Matrices are row major
+    #like MMatrix, so the translation sits in [i,3,0:3].
+    def __dagPaths(self):
+        _assertNumpy()
+        paths = []
+        for node in self:
+            assert node.isDagNode(), "Bulk transform functions only relevant to dagNodes! %s" %node.getName()
+            paths.append(OpenMaya.MDagPath.getAPathTo(node.asMObject()))
+        return paths
+
+    def __depthSortedPaths(self, values, attrs):
+        '''
+        Pairs the dag paths with their values, parents first, so a world space
+        value set on a parent is already there when its children are solved.
+        Raises when one of the attrs channels is locked, like the single node
+        setters the bulk setters do not write through locks.
+        '''
+        _assertNumpy()
+        values = numpy.asarray(values, dtype=numpy.float64)
+        if len(values) != len(self):
+            raise Exception, "DependNodeArray: %d values passed in for %d nodes" %(len(values), len(self))
+        paths = self.__dagPaths()
+        locked = []
+        for path in paths:
+            fnNode = OpenMaya.MFnDependencyNode(path.node())
+            for attr in attrs:
+                plug = fnNode.findPlug(attr)
+                if plug.isLocked() or any(plug.child(i).isLocked() for i in range(plug.numChildren())):
+                    locked.append("%s.%s" %(path.partialPathName(), attr))
+        if locked:
+            raise Exception, "DependNodeArray: locked channels %s" %", ".join(locked)
+        pairs = zip(paths, values)
+        pairs.sort(key=lambda pair: pair[0].length())
+        return pairs
+
+    def asWorldTranslationArray(self):
+        paths = self.__dagPaths()
+        arr = numpy.empty((len(self), 3), dtype=numpy.float64)
+        for i, path in enumerate(paths):
+            vec = OpenMaya.MFnTransform(path).getTranslation(OpenMaya.MSpace.kWorld)
+            arr[i] = (vec.x, vec.y, vec.z)
+        return arr
+
+    def asRotatePivotArray(self, space=OpenMaya.MSpace.kWorld):
+        paths = self.__dagPaths()
+        arr = numpy.empty((len(self), 3), dtype=numpy.float64)
+        for i, path in enumerate(paths):
+            pnt = OpenMaya.MFnTransform(path).rotatePivot(space)
+            arr[i] = (pnt.x, pnt.y, pnt.z)
+        return arr
+
+    def asWorldMatrixArray(self):
+        paths = self.__dagPaths()
+        arr = numpy.empty((len(self), 4, 4), dtype=numpy.float64)
+        for i, path in enumerate(paths):
+            _copyMMatrix(path.inclusiveMatrix(), arr[i])
+        return arr
+
+    def asLocalMatrixArray(self):
+        paths = self.__dagPaths()
+        arr = numpy.empty((len(self), 4, 4), dtype=numpy.float64)
+        for i, path in enumerate(paths):
+            _copyMMatrix(OpenMaya.MFnTransform(path).transformation().asMatrix(), arr[i])
+        return arr
+
+    def setWorldTranslations(self, array):
+        for path, value in self.__depthSortedPaths(array, ["translate"]):
+            OpenMaya.MFnTransform(path).setTranslation(OpenMaya.MVector(value[0], value[1], value[2]),
+                                                       OpenMaya.MSpace.kWorld)
+
+    def setRotatePivots(self, array, space=OpenMaya.MSpace.kWorld):
+        for path, value in self.__depthSortedPaths(array, ["rotatePivot"]):
+            OpenMaya.MFnTransform(path).setRotatePivot(OpenMaya.MPoint(value[0], value[1], value[2]),
+                                                       space, True)
+
+    def setWorldMatrices(self, array):
+        for path, value in self.__depthSortedPaths(array, _TRANSFORM_CHANNELS):
+            matrix = _asMMatrix(value) * path.exclusiveMatrixInverse()
+            OpenMaya.MFnTransform(path).set(OpenMaya.MTransformationMatrix(matrix))
+
+    def setLocalMatrices(self, array):
+        for path, value in self.__depthSortedPaths(array, _TRANSFORM_CHANNELS):
+            OpenMaya.MFnTransform(path).set(OpenMaya.MTransformationMatrix(_asMMatrix(value)))
+    #Bulk transforms--
+
     def delete(self):
         cmds.delete(self.asFullNameArray())
 
 #Utilities++
-def findUniqueName(nameToTest):
+def _nodeKey(node):
+    '''
+    Stable identity of a wrapped node, used as the DependNodeArray index key
+    '''
+    if isinstance(node, DependNode):
+        return OpenMaya.MObjectHandle(node.asMObject()).hashCode()
+    return id(node)
+
+def _sameNode(nodeA, nodeB):
+    if isinstance(nodeA, DependNode):
+        return nodeA.__eq__(nodeB)
+    return nodeA is nodeB
+
+def _compileNamePattern(name):
+    '''
+    Compiles a glob pattern once for the child traversal, None matches everything.
+    Pre-compiled regular expressions are passed through.
+    '''
+    if hasattr(name, "match"):
+        return name
+    if (not name) or (name == "*"):
+        return None
+    return re.compile(fnmatch.translate(name))
+
+def _splitTypeFilters(inTypes):
+    typeStrs = set()
+    fnTypes = []
+    for type in inTypes or []:
+        if issubclass(type.__class__, str):
+            typeStrs.add(type)
+        elif issubclass(type.__class__, int):
+            fnTypes.append(type)
+    return typeStrs, fnTypes
+
+def _matchesTypes(obj, typeStrs, fnTypes):
+    if typeStrs and (obj.apiTypeStr() in typeStrs):
+        return True
+    for fnType in fnTypes:
+        if obj.hasFn(fnType):
+            return True
+    return False
+
+def _asNodePredicate(stopAt):
+    '''
+    Turns an MFn type, apiTypeStr or list of them into a predicate taking an MObject
+    '''
+    if stopAt is None:
+        return None
+    if issubclass(stopAt.__class__, (str, int)):
+        stopAt = [stopAt]
+    if isinstance(stopAt, (list, tuple)):
+        typeStrs, fnTypes = _splitTypeFilters(stopAt)
+        return lambda obj: _matchesTypes(obj, typeStrs, fnTypes)
+    return stopAt
+
+def _visit(visited, obj):
+    '''
+    Records obj in visited (hash code -> MObjects), False if it was already there
+    '''
+    bucket = visited.setdefault(OpenMaya.MObjectHandle(obj).hashCode(), [])
+    for other in bucket:
+        if other == obj:
+            return False
+    bucket.append(obj)
+    return True
+
+def _connectedNodes(obj, future=False):
+    '''
+    Nodes connected to the inputs of obj, or to its outputs with future
+    '''
+    plugs = OpenMaya.MPlugArray()
+    try:
+        OpenMaya.MFnDependencyNode(obj).getConnections(plugs)
+    except RuntimeError:
+        return
+    others = OpenMaya.MPlugArray()
+    for i in range(plugs.length()):
+        plugs[i].connectedTo(others, not future, future)
+        for j in range(others.length()):
+            yield others[j].node()
+
+#    history results per query, flushed by DG connection changes and scene changes
+_historyCache = {}
+_historyCallbackIds = []
+
+def _cachedHistory(node, MFnType, future, includeShapeHistory, maxDepth, stopAt):
+    if isinstance(stopAt, list):
+        stopAt = tuple(stopAt)
+    obj = node.asMObject()
+    nodeHandle = OpenMaya.MObjectHandle(obj)
+    key = (nodeHandle.hashCode(), MFnType, future, includeShapeHistory, maxDepth, stopAt)
+
+    #    the hash code can collide or be reused after a delete, the entry keeps
+    #    the handle of its node and only serves that node
+    handles = None
+    entry = _historyCache.get(key)
+    if entry is not None:
+        entryHandle, handles = entry
+        if not (entryHandle.isValid() and entryHandle.object() == obj):
+            handles = None
+        else:
+            for handle in handles:
+                if not handle.isValid():
+                    handles = None
+                    break
+    if handles is None:
+        _addHistoryCallbacks()
+        walk = node._DependNode__walkHistory(MFnType, future, includeShapeHistory, maxDepth, stopAt)
+        handles = [OpenMaya.MObjectHandle(each) for each in walk]
+        _historyCache[key] = (nodeHandle, handles)
+    return [handle.object() for handle in handles]
+
+def _addHistoryCallbacks():
+    if _historyCallbackIds:
+        return
+    _historyCallbackIds.append(OpenMaya.MDGMessage.addConnectionCallback(_onConnectionChanged))
+    for message in [OpenMaya.MSceneMessage.kBeforeNew, OpenMaya.MSceneMessage.kBeforeOpen]:
+        _historyCallbackIds.append(OpenMaya.MSceneMessage.addCallback(message, _onSceneChanged))
+
+def _onConnectionChanged(srcPlug, dstPlug, made, clientData=None):
+    _historyCache.clear()
+
+def _onSceneChanged(clientData=None):
+    _historyCache.clear()
+
+def clearHistoryCache(removeCallbacks=False):
+    '''
+    Flushes the DependNode.iterHistory cache, removeCallbacks also unregisters
+    the callbacks keeping it up to date (they come back on the next cached query)
+    '''
+    _historyCache.clear()
+    if removeCallbacks:
+        for callbackId in _historyCallbackIds:
+            OpenMaya.MMessage.removeCallback(callbackId)
+        del _historyCallbackIds[:]
+
+#    shared DependNode wrappers by MObjectHandle hash code, entries go away with
+#    their last reference, when their node is deleted and before a new or opened scene
+_internedNodes = weakref.WeakValueDictionary()
+_internCallbackIds = []
+
+def _internNode(obj):
+    key = OpenMaya.MObjectHandle(obj).hashCode()
+    node = _internedNodes.get(key)
+    if (node is not None) and (node.asMObject() == obj):
+        return node
+
+    #    new node, or a hash collision: the newest wrapper wins the slot
+    _addInternCallbacks()
+    node = DependNode(obj)
+    _internedNodes[key] = node
+    return node
+
+def _addInternCallbacks():
+    if _internCallbackIds:
+        return
+    _internCallbackIds.append(OpenMaya.MDGMessage.addNodeRemovedCallback(_onNodeRemoved, "dependNode"))
+    for message in [OpenMaya.MSceneMessage.kBeforeNew, OpenMaya.MSceneMessage.kBeforeOpen]:
+        _internCallbackIds.append(OpenMaya.MSceneMessage.addCallback(message, _onSceneCleared))
+
+def _onNodeRemoved(obj, clientData=None):
+    key = OpenMaya.MObjectHandle(obj).hashCode()
+    node = _internedNodes.get(key)
+    if (node is not None) and (node.asMObject() == obj):
+        del _internedNodes[key]
+
+def _onSceneCleared(clientData=None):
+    _internedNodes.clear()
+
+def _assertNumpy():
+    assert numpy, "numpy is required for the bulk transform functions"
+
+def _copyMMatrix(mMatrix, out):
+    for row in range(4):
+        for column in range(4):
+            out[row, column] = mMatrix(row, column)
+
+def _asMMatrix(array):
+    '''
+    MMatrix of a (4,4) array, 16 values or nested rows, an MMatrix is passed through
+    '''
+    if isinstance(array, OpenMaya.MMatrix):
+        return array
+    values = []
+    for row in array:
+        values.extend([float(val) for val in row] if hasattr(row, '__len__') else [float(row)])
+    if len(values) != 16:
+        raise Exception, "%d values for a matrix" %len(values)
+    mMatrix = OpenMaya.MMatrix()
+    OpenMaya.MScriptUtil.createMatrixFromList(values, mMatrix)
+    return mMatrix
+
+def findUniqueName(nameToTest, registry=None):
+    '''
+    Returns nameToTest if it is free, else increments its numeric suffix until
+    a free name is found ("name" -> "name1", "name_3" -> "name_4").
+    Pass a NameRegistry when naming many nodes, it keeps the highest suffix in
+    use per base name rather than probing the scene for every candidate.
+    '''
+    if registry:
+        return registry.uniqueName(nameToTest)
+
+    while nameExists(nameToTest):
+        base, nums = splitNameSuffix(nameToTest)
+        nameToTest = base + str((nums or 0) + 1)
+    return nameToTest
+
+def nameExists(name):
     list = OpenMaya.MSelectionList()
     try:
-        OpenMaya.MGlobal.getSelectionListByName(nameToTest, list)
+        OpenMaya.MGlobal.getSelectionListByName(name, list)
     except:
-        return nameToTest
-
-    if list.length():
-        nums = re.search("([0-9]+)$", nameToTest)
-        if nums:
-            nums = int(nums.group(0))
-            nums += 1
-            split = re.split("([0-9]+)$", nameToTest)
-            nameToTest = (split[0] + `nums`)
-            return findUniqueName(nameToTest)
-        else:
-            nameToTest += "1"
-            return findUniqueName(nameToTest)
-    else:
-        return nameToTest
+        return False
+    return list.length() > 0
+
+def splitNameSuffix(name):
+    '''
+    Splits a name into its base and numeric suffix, "arm_12" -> ("arm_", 12)
+    The suffix is None when the name does not end with a number.
+    '''
+    nums = re.search("([0-9]+)$", name)
+    if not nums:
+        return name, None
+    return name[:nums.start()], int(nums.group(0))
 #Utilities--
 
+class NameRegistry(object):
+    '''
+    Name allocation for builds that create a lot of nodes.
+    Indexes the scene names once by base name and highest numeric suffix, after
+    that every unique name costs a dictionary lookup plus a single scene probe.
+    The probe keeps the registry correct when nodes get renamed behind its back,
+    names of deleted nodes are never handed out again unless released.
+
+    registry = NameRegistry()
+    registry.uniqueName("L_ctl_foot_0")         -> "L_ctl_foot_1" if _0 is taken
+    registry.reserveBlock("C_jnt_rivet_0", 300) -> 300 free names, reserved
+    '''
+    def __init__(self, scan=True):
+        self.__names = set()
+        self.__highest = {}
+        if scan:
+            self.refresh()
+
+    def refresh(self):
+        '''
+        Rebuild the index from the scene, drops any reservation not created yet
+        '''
+        self.__names = set()
+        self.__highest = {}
+        for name in cmds.ls() or []:
+            self.__add(name.split("|")[-1])
+
+    def __add(self, name):
+        self.__names.add(name)
+        base, nums = splitNameSuffix(name)
+        if nums is not None and nums > self.__highest.get(base, -1):
+            self.__highest[base] = nums
+
+    def isUsed(self, name):
+        return (name in self.__names) or nameExists(name)
+
+    def reserve(self, name):
+        '''
+        Marks name as taken, for nodes that will be created later with that name
+        '''
+        self.__add(name)
+
+    def release(self, name):
+        '''
+        Makes a deleted or never created name available again
+        '''
+        self.__names.discard(name)
+
+    def rename(self, oldName, newName):
+        self.release(oldName)
+        self.__add(newName)
+
+    def uniqueName(self, name, reserve=True):
+        '''
+        Returns name or the next free name sharing its base, reserving it
+        '''
+        base, nums = splitNameSuffix(name)
+        while (name in self.__names) or nameExists(name):
+            self.__add(name)
+            nums = max(nums or 0, self.__highest.get(base, 0)) + 1
+            name = base + str(nums)
+
+        if reserve:
+            self.__add(name)
+        return name
+
+    def reserveBlock(self, name, count):
+        '''
+        Returns count unique names sharing the base of name, all reserved
+        '''
+        return [self.uniqueName(name) for i in range(count)]
+
 
 
 
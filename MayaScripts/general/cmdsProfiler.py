@@ -0,0 +1,158 @@
+'''
+Opt-in profiler for maya.cmds and OpenMaya calls
+
+Swaps the functions of maya.cmds (and the methods of the OpenMaya function
+sets and iterators when api is set) for timing wrappers while it runs, and
+puts the originals back when it stops. Nothing is wrapped unless a Profiler
+is started.
+
+    from general import cmdsProfiler
+    with cmdsProfiler.Profiler() as prof:
+        eyeModules.SimpleEyeRig(guide).create()
+    prof.report(top=20)
+    prof.writeFlameGraph("eyeRig.folded")
+
+Every call is recorded against its call site, the first frame outside the
+profiler, with a count and the cumulative time. Only outermost calls are
+recorded, a command run from inside another wrapped call is part of its time.
+writeFlameGraph writes the folded stack format read by flamegraph.pl and
+speedscope, one line per distinct python stack with the time in microseconds.
+'''
+
+import sys, os, time, types
+from maya import cmds, OpenMaya
+
+#    OpenMaya classes wrapped when api is set
+API_PREFIXES = ("MFn", "MIt", "MDGModifier", "MDagModifier", "MPlug", "MSelectionList", "MDagPath")
+
+
+class _CallSite(object):
+    def __init__(self, command, filename, line, function):
+        self.command = command
+        self.filename = filename
+        self.line = line
+        self.function = function
+        self.count = 0
+        self.seconds = 0.0
+
+    def __str__(self):
+        return "%s:%d %s()" %(self.filename, self.line, self.function)
+
+
+class Profiler(object):
+    def __init__(self, api=False, modules=None):
+        '''
+        api = also wrap the OpenMaya function set, iterator, plug and modifier methods
+        modules = extra modules whose functions are wrapped like maya.cmds
+        '''
+        self.__api = api
+        self.__modules = [cmds] + list(modules or [])
+        self.__originals = []
+        self.__depth = 0
+        self.sites = {}
+        self.stacks = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    #Wrapping++
+    def start(self):
+        if self.__originals:
+            raise RuntimeError("the profiler is already running")
+        for module in self.__modules:
+            prefix = module.__name__.split(".")[-1]
+            for name, value in vars(module).items():
+                if not name.startswith("_") and isinstance(value, (types.FunctionType, types.BuiltinFunctionType)):
+                    self.__wrap(module, name, value, "%s.%s" %(prefix, name))
+        if self.__api:
+            for className, cls in vars(OpenMaya).items():
+                if isinstance(cls, type) and className.startswith(API_PREFIXES):
+                    for name, value in vars(cls).items():
+                        if not name.startswith("_") and isinstance(value, types.FunctionType):
+                            self.__wrap(cls, name, value, "OpenMaya.%s.%s" %(className, name))
+
+    def stop(self):
+        while self.__originals:
+            owner, name, value = self.__originals.pop()
+            setattr(owner, name, value)
+
+    def __wrap(self, owner, name, fn, label):
+        profiler = self
+        def wrapper(*args, **kwargs):
+            if profiler.__depth:
+                return fn(*args, **kwargs)
+            profiler.__depth += 1
+            start = time.time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.__record(label, time.time() - start, sys._getframe(1))
+                profiler.__depth -= 1
+        wrapper.__name__ = name
+        wrapper.__doc__ = fn.__doc__
+        self.__originals.append((owner, name, fn))
+        setattr(owner, name, wrapper)
+    #Wrapping--
+
+    #Recording++
+    def __record(self, label, seconds, frame):
+        code = frame.f_code
+        key = (label, code.co_filename, frame.f_lineno)
+        site = self.sites.get(key)
+        if site is None:
+            site = self.sites[key] = _CallSite(label, os.path.basename(code.co_filename), frame.f_lineno, code.co_name)
+        site.count += 1
+        site.seconds += seconds
+
+        names = [label]
+        while frame is not None:
+            names.append("%s:%s" %(os.path.splitext(os.path.basename(frame.f_code.co_filename))[0], frame.f_code.co_name))
+            frame = frame.f_back
+        stack = ";".join(reversed(names))
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + seconds
+
+    def reset(self):
+        self.sites = {}
+        self.stacks = {}
+    #Recording--
+
+    #Output++
+    def commands(self):
+        '''
+        Totals by command as a list of (command, count, seconds), slowest first
+        '''
+        totals = {}
+        for site in self.sites.itervalues():
+            count, seconds = totals.get(site.command, (0, 0.0))
+            totals[site.command] = (count + site.count, seconds + site.seconds)
+        return sorted([(command, count, seconds) for command, (count, seconds) in totals.items()],
+                      key=lambda item: -item[2])
+
+    def report(self, top=20, stream=None):
+        '''
+        Writes the top commands and the top call sites by cumulative time
+        '''
+        stream = stream or sys.stdout
+        total = sum(site.seconds for site in self.sites.itervalues()) or 1.0
+        stream.write('\n%-36s %8s %11s %7s\n' %('command', 'calls', 'seconds', '%'))
+        stream.write('-' * 66 + '\n')
+        for command, count, seconds in self.commands()[:top]:
+            stream.write('%-36s %8d %10.4fs %6.1f%%\n' %(command, count, seconds, 100.0 * seconds / total))
+
+        stream.write('\n%-36s %8s %11s   %s\n' %('command', 'calls', 'seconds', 'caller'))
+        stream.write('-' * 90 + '\n')
+        for site in sorted(self.sites.itervalues(), key=lambda site: -site.seconds)[:top]:
+            stream.write('%-36s %8d %10.4fs   %s\n' %(site.command, site.count, site.seconds, site))
+
+    def writeFlameGraph(self, path):
+        '''
+        Writes the recorded stacks in the folded format, times in microseconds
+        '''
+        with open(path, 'w') as f:
+            for stack, seconds in sorted(self.stacks.items()):
+                f.write('%s %d\n' %(stack, max(1, int(round(seconds * 1.0e6)))))
+    #Output--
@@ -1,7 +1,6 @@
 import sys
 from maya import cmds
 from maya import OpenMaya
-from maya import mel
 import math
 from Functions import attributeFunctions
 from Functions import checkFunctions
@@ -15,28 +14,17 @@ from Functions import apiFunctions
 from Functions.errorFunctions import GeppettoError
 from Interfaces import loggerInterfaces
 
-def applyRetarget(inputExternalNode, outputNode, externalNodeParent = None, outputNodeParent = None,translate=True, rotate=True):
-    def _setMatrixAttr(matrix, attr):
-        evalString = 'setAttr -type "matrix" "' + attr + '" '
-        evalString += str(matrix(0, 0)) + ' '
-        evalString += str(matrix(0, 1)) + ' '
-        evalString += str(matrix(0, 2)) + ' '
-        evalString += str(matrix(0, 3)) + ' '
-        evalString += str(matrix(1, 0)) + ' '
-        evalString += str(matrix(1, 1)) + ' '
-        evalString += str(matrix(1, 2)) + ' '
-        evalString += str(matrix(1, 3)) + ' '
-        evalString += str(matrix(2, 0)) + ' '
-        evalString += str(matrix(2, 1)) + ' '
-        evalString += str(matrix(2, 2)) + ' '
-        evalString += str(matrix(2, 3)) + ' '
-        evalString += str(matrix(3, 0)) + ' '
-        evalString += str(matrix(3, 1)) + ' '
-        evalString += str(matrix(3, 2)) + ' '
-        evalString += str(matrix(3, 3))
-
-        mel.eval(evalString)
+from general import apiFunctions as generalApi
+from general import dgTransaction
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_IDENTITY_MATRIX = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
 
+def applyRetarget(inputExternalNode, outputNode, externalNodeParent = None, outputNodeParent = None,translate=True, rotate=True):
     def _getWorldMatrix(nodeName):
         worldMatrix = OpenMaya.MMatrix()
         if nodeName:
@@ -65,9 +53,8 @@ def applyRetarget(inputExternalNode, outputNode, externalNodeParent = None, outp
     externalParentOffset = externalParentMatrix * parentMatrix.inverse()
     localOffset = childMatrix * parentMatrix.inverse()
 
-    _setMatrixAttr(externalOffset, node + ".externalOffset")
-    _setMatrixAttr(externalParentOffset, node + ".externalParentOffset")
-    _setMatrixAttr(localOffset, node + ".localOffset")
+    setMatrixAttrs([externalOffset, externalParentOffset, localOffset],
+                   [node + ".externalOffset", node + ".externalParentOffset", node + ".localOffset"])
 
     if externalNodeParent:
         cmds.connectAttr(externalNodeParent + ".worldMatrix", node + ".externalParent")
@@ -143,9 +130,13 @@ def weightedBlend(driver1, driver2, driven, weightTo1 = .5,switchObject = None,
     cmds.connectAttr(ramp+'.outValue', constraint[0]+'.'+driver1+'W0' )
     cmds.connectAttr(reverse+'.outputX', constraint[0]+'.'+driver2+'W1' )
 
-def pointSwitch(control, driven, drivers, attrName, attachPointIndex, defaultValue, enumName):
+def pointSwitch(control, driven, drivers, attrName, attachPointIndex, defaultValue, enumName, mode='constraint', smooth=False):
     '''
     Similar as a parent switch but only for translation/position (does not get affect by rotation in any way)
+
+    -mode (string): 'constraint' switches a point constraint with condition nodes, 'spaceSwitch' uses
+                    a single spaceSwitch node (see parentSwitch)
+    -smooth (bool): spaceSwitch mode, attrName is a float blending between adjacent spaces
     '''
     createNodeClass = nodeFunctions.CreateUtilityNode()
 
@@ -155,6 +146,15 @@ def pointSwitch(control, driven, drivers, attrName, attachPointIndex, defaultVal
     drivenParent=dagFunctions.addParent(driven)
     drivenConstraint=dagFunctions.addParent(drivenParent)
 
+    if mode == 'spaceSwitch':
+        node = _spaceSwitch(createNodeClass, side, description + 'PointSwitch', control, attrName, enumName,
+                            defaultValue, drivers, drivenParent, pointOnly=True, smooth=smooth)
+        cmds.connectAttr(node + '.outTranslate', drivenParent + '.t')
+        cmds.parentConstraint(drivers[attachPointIndex], drivenConstraint, mo=True)
+        createNodeClass.lockAndHide()
+        createNodeClass.setIsHistoricallyInteresting()
+        return drivenConstraint
+
     #    ADD ATTRIBUTE
     enum = ''
     for i in range(len(drivers)):
@@ -199,7 +199,17 @@ def pointSwitch(control, driven, drivers, attrName, attachPointIndex, defaultVal
 
     return drivenConstraint
 
-def parentSwitch(control, driven, drivers=[], type='parent', attrName='parentSwitch', enumName=[], addParentToDriven=False, defaultValue=0 , skip = False):
+def parentSwitch(control, driven, drivers=[], type='parent', attrName='parentSwitch', enumName=[], addParentToDriven=False, defaultValue=0 , skip = False,
+                 mode='constraint', smooth=False):
+    '''
+    Switches the space of driven between drivers from an enum attribute on control
+
+    -mode (string): 'constraint' blends a constraint with a condition node per driver, 'spaceSwitch'
+                    drives the channels of driven from a single spaceSwitch node (MayaNodes/spaceSwitch.py),
+                    no offset groups, constraint or conditions. Returns [node] instead of the constraint.
+    -smooth (bool): spaceSwitch mode, attrName is a float (0 to drivers-1) blending between adjacent
+                    spaces instead of an enum
+    '''
     loggerInterfaces.gLog('info', ('constraintFunctions.parentSwitch ' + control + ' ' + driven + ' ' + str(drivers) + ' ' + str(enumName)))
     constraint = ''
     #    Instantiate the Create Utility Node Class
@@ -209,6 +219,25 @@ def parentSwitch(control, driven, drivers=[], type='parent', attrName='parentSwi
     side = nameFunctions.getSide(driven)
     description = nameFunctions.getDescription(driven)
 
+    if mode == 'spaceSwitch':
+        if addParentToDriven:
+            driven = dagFunctions.addParent(driven)
+            if nameFunctions.getType(driven) == 'ctl':
+                driven = cmds.rename(driven, nameFunctions.changeType(driven, 'grp'))
+        if type not in ['parent', 'orient', 'parentSkipTranslate']:
+            raise GeppettoError("parentSwitch: unknown constraint type %s" %type)
+
+        node = _spaceSwitch(createNodeClass, side, '%sParentSwitch' %(description), control, attrName, enumName,
+                            defaultValue, drivers, driven, smooth=smooth)
+        if type == 'parent':
+            cmds.connectAttr(node + '.outTranslate', driven + '.t', f=True)
+        cmds.connectAttr(node + '.outRotate', driven + '.r', f=True)
+        attributeFunctions.lockAndHide(driven,['t','r', 's', 'v'])
+
+        createNodeClass.lockAndHide()
+        createNodeClass.setIsHistoricallyInteresting()
+        return [node]
+
     objDrivers=[]
     for driver in drivers:
         driverName = nameFunctions.addDescriptionToName(nameFunctions.changeType(driver, 'grp'), nameFunctions.flatten(driven) + 'parentSwitchOffset')
@@ -257,27 +286,63 @@ def parentSwitch(control, driven, drivers=[], type='parent', attrName='parentSwi
     #    Return the created constraint
     return constraint
 
+def _spaceSwitch(createNodeClass, side, description, control, attrName, enumName, defaultValue, drivers, driven,
+                 pointOnly=False, smooth=False):
+    '''
+    spaceSwitch node switching driven between drivers, with the offsets of the current
+    pose and control.attrName (enum, or float when smooth) on its space input.
+    The outputs are left to the caller.
+    '''
+    assert numpy, "numpy is required for the spaceSwitch mode"
+    if not drivers:
+        raise GeppettoError("No driver specified")
+    checkFunctions.loadPlugin("spaceSwitch")
+
+    #    offsets of the current pose, driven world in every driver space
+    worlds = generalApi.DependNodeArray(list(drivers) + [driven]).asWorldMatrixArray()
+    if pointOnly:
+        offsets = numpy.tile(numpy.identity(4), (len(drivers), 1, 1))
+        offsets[:, 3, :3] = worlds[-1, 3, :3] - worlds[:-1, 3, :3]
+    else:
+        offsets = numpy.einsum('ij,njk->nik', worlds[-1], numpy.linalg.inv(worlds[:-1]))
+
+    if smooth:
+        cmds.addAttr(control, k=True, ln=attrName, at='double', min=0, max=len(drivers)-1, dv=defaultValue)
+    else:
+        cmds.addAttr(control, k=True, ln=attrName, at='enum', en=':'.join(enumName[:len(drivers)]) + ':', dv=defaultValue)
+
+    node = createNodeClass.create('spaceSwitch', side, description, 0)
+    tx = dgTransaction.Transaction()
+    for i, driver in enumerate(drivers):
+        tx.connectAttr('%s.worldMatrix[0]' %driver, '%s.driverMatrix[%d]' %(node, i))
+        tx.setAttr('%s.offsetMatrix[%d]' %(node, i), offsets[i])
+    tx.connectAttr('%s.parentInverseMatrix[0]' %driven, '%s.parentInverseMatrix' %node)
+    tx.connectAttr('%s.rotateOrder' %driven, '%s.rotateOrder' %node)
+    tx.connectAttr('%s.%s' %(control, attrName), '%s.space' %node)
+    tx.setAttr('%s.pointOnly' %node, pointOnly)
+    tx.setAttr('%s.smooth' %node, smooth)
+    tx.apply()
+    return node
+
 
 def setMatrixAttr(matrix, attr):
-        evalString = 'setAttr -type "matrix" "' + attr + '" '
-        evalString += str(matrix(0, 0)) + ' '
-        evalString += str(matrix(0, 1)) + ' '
-        evalString += str(matrix(0, 2)) + ' '
-        evalString += str(matrix(0, 3)) + ' '
-        evalString += str(matrix(1, 0)) + ' '
-        evalString += str(matrix(1, 1)) + ' '
-        evalString += str(matrix(1, 2)) + ' '
-        evalString += str(matrix(1, 3)) + ' '
-        evalString += str(matrix(2, 0)) + ' '
-        evalString += str(matrix(2, 1)) + ' '
-        evalString += str(matrix(2, 2)) + ' '
-        evalString += str(matrix(2, 3)) + ' '
-        evalString += str(matrix(3, 0)) + ' '
-        evalString += str(matrix(3, 1)) + ' '
-        evalString += str(matrix(3, 2)) + ' '
-        evalString += str(matrix(3, 3))
-
-        mel.eval(evalString)
+    '''
+    Sets the matrix attribute attr to matrix, see setMatrixAttrs
+    '''
+    setMatrixAttrs([matrix], [attr])
+
+def setMatrixAttrs(matrices, attrs):
+    '''
+    Sets every matrix attribute of attrs to its matrix in one dgTransaction, the
+    values go to the plugs as matrix data at full double precision (no mel string).
+    matrices are MMatrix, 16 value lists or (4,4) arrays.
+    '''
+    if len(matrices) != len(attrs):
+        raise ValueError("setMatrixAttrs: %d matrices for %d attributes" %(len(matrices), len(attrs)))
+    tx = dgTransaction.Transaction()
+    for matrix, attr in zip(matrices, attrs):
+        tx.setAttr(attr, matrix)
+    tx.apply()
 
 #========================================================================================
 #FUNCTION:      parentSwitch2
@@ -310,6 +375,8 @@ def parentSwitch2(control, driven, drivers=[], type='parent', attrName='parentSw
     checkFunctions.objExists(driven)
 
     offsetNode = None
+    offsetMatrices = []
+    offsetAttrs = []
 
     #create the node
     nd = nodeFunctions.CreateUtilityNode()
@@ -352,11 +419,16 @@ def parentSwitch2(control, driven, drivers=[], type='parent', attrName='parentSw
 
             cmds.connectAttr(offsetNode + ".wm", nss + ".offsetMatrix[" + str(i) + "]")
         else:
-            setMatrixAttr(offsetMM, nss + ".offsetMatrix[" + str(i) + "]")
+            offsetMatrices.append(offsetMM)
+            offsetAttrs.append(nss + ".offsetMatrix[" + str(i) + "]")
 
         #connect the node
         cmds.connectAttr(drivers[i] + ".wm", nss + ".driverMatrix[" + str(i) + "]")
 
+    #all the offsets in one go
+    if offsetMatrices:
+        setMatrixAttrs(offsetMatrices, offsetAttrs)
+
     if not type == "parentSkipTranslate":
         cmds.connectAttr(nss + ".outTranslate", driven + ".t")
     if not type == "parentSkipRotate":
@@ -450,14 +522,24 @@ def create(sources, target, type='orient', mo=True, lockTarget=True):
 #===============================================================================
 #    Matrix constraint type    ---
 #===============================================================================
-def constraintToTarget(target, objList, t=True, r=True, s=True, sh=True, mo=False, store=False, vbzLvl=2):
+def constraintToTarget(target, objList, t=True, r=True, s=True, sh=True, mo=False, store=False, vbzLvl=2, nameRegistry=None,
+                       bulk=False, mode='decompose'):
     '''
     Constraint list items to target (point, orient, scale and shear constraint) with matrices (much faster than normal constraints)
 
     FLAGS:
     -mo (bool): maintain offset in constraint
-    -store (bool): store constraint info for 'automatic re-constraint' (see reconstraintAllToTarget() # To Do)
+    -store (bool): store constraint info for 'automatic re-constraint' (see reconstraintAllToTarget())
     -vbzLvl (int 0 to 4): defines the feedback verbose level
+    -nameRegistry (NameRegistry): general.apiFunctions name registry used to name the constraint nodes,
+                                  share one between calls when constraining a lot of objects
+    -bulk (bool): read every object in one api pass, compute all the offsets as one
+                  numpy batch and create the nodes and connections in a single transaction
+    -mode (string): 'decompose' drives the channels through multMatrix and decomposeMatrix nodes,
+                    'offsetParentMatrix' connects the target world matrix straight to the object
+                    offsetParentMatrix (inheritsTransform off) and bakes the offset in its channels,
+                    no node at all. Partial (t, r, s, sh) constraints, rotate axis, pivots, a connected
+                    joint orient or a sheared offset fall back to the decompose graph. Always bulk.
     '''
     #    sanity check
     if not cmds.objExists(target):
@@ -468,6 +550,9 @@ def constraintToTarget(target, objList, t=True, r=True, s=True, sh=True, mo=Fals
     if not type(objList) == list:
         objList =   [objList]
 
+    if bulk or mode == 'offsetParentMatrix':
+        return _constraintToTargetBulk(target, objList, t, r, s, sh, mo, store, vbzLvl, nameRegistry, mode)
+
     #    parse objList
     constraintNodeList  =   list()
     for obj in objList:
@@ -524,7 +609,10 @@ def constraintToTarget(target, objList, t=True, r=True, s=True, sh=True, mo=Fals
         baseName    =   obj.split('|')[-1].split(':')[-1]
         try:
             baseName    =   nameFunctions.addDescriptionToName(baseName, 'Cst')
-            baseName    =   nameFunctions.findUniqueName(baseName)
+            if nameRegistry:
+                baseName    =   nameRegistry.uniqueName(baseName)
+            else:
+                baseName    =   nameFunctions.findUniqueName(baseName)
         except:
             baseName    =   'C_grp_%sCst_0'%baseName
 
@@ -631,8 +719,12 @@ def constraintToTarget(target, objList, t=True, r=True, s=True, sh=True, mo=Fals
             cmds.setAttr('%s.%s' %(obj, attr), target, type='string', l=True)
 
         #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        #    store mo infos
+        #    store mo infos, an identity offset replaces the one of a previous constraint
         if not mo:
+            if cmds.attributeQuery('cstTgtSrcMo', n=obj, ex=True):
+                cmds.setAttr('%s.cstTgtSrcMo'%obj, l=False)
+                setMatrixAttr(_IDENTITY_MATRIX, '%s.cstTgtSrcMo'%obj)
+                cmds.setAttr('%s.cstTgtSrcMo'%obj, l=True)
             continue
 
         moAttr    =   'cstTgtSrcMo'
@@ -646,3 +738,413 @@ def constraintToTarget(target, objList, t=True, r=True, s=True, sh=True, mo=Fals
     return constraintNodeList
 
 
+def reconstraintAllToTarget(objList=None, vbzLvl=2, nameRegistry=None):
+    '''
+    Rebuilds every constraintToTarget(store=True) constraint from the infos stored on the
+    constrained objects, so the constraint nodes can be deleted (export, cache) and restored
+    after a rig update. Existing matrix constraints of the stored channels are replaced.
+
+    The scene (or objList) is read in one api pass and the entries are grouped by target,
+    channels, offset and mode, every group is one bulk constraintToTarget. A stored
+    cstTgtSrcMo offset is reused as is (not the current pose), an identity one is a
+    constraint without offset. cstTgtSrcOpm objects go
+    back to offsetParentMatrix constraints. Returns the constraint nodes.
+
+    FLAGS:
+    -objList (list): objects to re-constraint, every transform of the scene by default
+    -vbzLvl (int 0 to 4): defines the feedback verbose level
+    -nameRegistry (NameRegistry): general.apiFunctions name registry naming the constraint nodes
+    '''
+    assert numpy, "numpy is required for reconstraintAllToTarget"
+    nameRegistry    =   nameRegistry or generalApi.NameRegistry()
+    infoAttrs       =   [('cstTgtSrc', 'trsh'), ('cstTgtSrcTr', 't'), ('cstTgtSrcRo', 'r'), ('cstTgtSrcSc', 's'), ('cstTgtSrcSh', 'h')]
+
+    #    scan: (target, channels, mo, mode) -> objects and stored offsets
+    groups  =   dict()
+    for mObj in _storedConstraintNodes(objList, vbzLvl):
+        fnNode  =   OpenMaya.MFnDependencyNode(mObj)
+        obj     =   generalApi.DependNode(mObj).getPartialName()
+        targets =   dict()
+        for attr, channels in infoAttrs:
+            if fnNode.hasAttribute(attr):
+                target  =   fnNode.findPlug(attr).asString()
+                if target:
+                    targets[target] =   targets.get(target, '') + channels
+        if not targets:
+            continue
+
+        #    an identity cstTgtSrcMo is a constraint without offset (see constraintToTarget store),
+        #    the stored offset belongs to the last constraint, ambiguous with several targets
+        mo      =   False
+        offset  =   None
+        if fnNode.hasAttribute('cstTgtSrcMo'):
+            matrix  =   OpenMaya.MFnMatrixData(fnNode.findPlug('cstTgtSrcMo').asMObject()).matrix()
+            matrix  =   [[matrix(row, column) for column in range(4)] for row in range(4)]
+            mo      =   not numpy.allclose(matrix, numpy.identity(4), rtol=0.0, atol=1.0e-12)
+            if mo and len(targets) == 1:
+                offset  =   matrix
+            elif mo and vbzLvl>2:
+                sys.stdout.write('#   %s.reconstraintAllToTarget() -> %s has several targets, offsets from the current pose\n' % (__name__, obj))
+        direct  =   fnNode.hasAttribute('cstTgtSrcOpm') and fnNode.findPlug('cstTgtSrcOpm').asBool()
+
+        for target, channels in sorted(targets.items()):
+            key     =   (target, 't' in channels, 'r' in channels, 's' in channels, 'h' in channels,
+                         mo, offset is not None,
+                         'offsetParentMatrix' if direct else 'decompose')
+            objs, offsets   =   groups.setdefault(key, (list(), list()))
+            objs.append(obj)
+            offsets.append(offset)
+
+    #    one bulk constraint per group
+    constraintNodeList  =   list()
+    for key in sorted(groups):
+        target, t, r, s, sh, mo, stored, mode   =   key
+        objs, offsets   =   groups[key]
+        if not cmds.objExists(target):
+            if vbzLvl>0:
+                sys.stderr.write('! %s.reconstraintAllToTarget() -> target %s not found, skipping %s.\n' % (__name__, unicode(target), ', '.join(objs)))
+            continue
+        if vbzLvl>3:
+            sys.stdout.write('#   %s.reconstraintAllToTarget() -> %d objects to %s\n' % (__name__, len(objs), target))
+        constraintNodeList.extend(_constraintToTargetBulk(target, objs, t, r, s, sh, mo, True, vbzLvl, nameRegistry, mode,
+                                                          offsets if stored else None) or list())
+
+    return constraintNodeList
+
+
+def _storedConstraintNodes(objList=None, vbzLvl=2):
+    '''
+    MObjects of the transforms (objList, or all of the scene) holding constraintToTarget infos
+    '''
+    attrs   =   ['cstTgtSrc', 'cstTgtSrcTr', 'cstTgtSrcRo', 'cstTgtSrcSc', 'cstTgtSrcSh']
+    mObjs   =   list()
+    if objList is not None:
+        selList =   OpenMaya.MSelectionList()
+        for obj in objList:
+            try:
+                selList.add(obj)
+            except RuntimeError:
+                if vbzLvl>1:
+                    sys.stdout.write('#* %s.reconstraintAllToTarget() -> %s not found, skipping.\n' % (__name__, unicode(obj)))
+        for i in range(selList.length()):
+            mObj    =   OpenMaya.MObject()
+            selList.getDependNode(i, mObj)
+            mObjs.append(mObj)
+    else:
+        #    instanced transforms are visited once, through their first path
+        path    =   OpenMaya.MDagPath()
+        dagIt   =   OpenMaya.MItDag(OpenMaya.MItDag.kDepthFirst, OpenMaya.MFn.kTransform)
+        while not dagIt.isDone():
+            dagIt.getPath(path)
+            if not path.instanceNumber():
+                mObjs.append(dagIt.currentItem())
+            dagIt.next()
+
+    result  =   list()
+    for mObj in mObjs:
+        fnNode  =   OpenMaya.MFnDependencyNode(mObj)
+        if any(fnNode.hasAttribute(attr) for attr in attrs):
+            result.append(mObj)
+    return result
+
+
+def _constraintToTargetBulk(target, objList, t, r, s, sh, mo, store, vbzLvl, nameRegistry, mode, offsetInvMatrices=None):
+    '''
+    bulk mode of constraintToTarget, see there. offsetInvMatrices (N,4,4) are the
+    stored offsets of a re-constraint, the mo offsets come from the current pose without them
+    '''
+    assert numpy, "numpy is required for the bulk constraintToTarget"
+    nameRegistry    =   nameRegistry or generalApi.NameRegistry()
+    cstInfoAttrList =   _constraintInfoAttrs(t, r, s, sh)
+    attrList        =   [attr for attr, flag in [('t', t), ('r', r), ('s', s), ('shear', sh)] if flag]
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    #    query pass: existence, lock state, joints, current connections and offset parent state
+    nodes       =   generalApi.DependNodeArray()
+    fnNodes     =   list()
+    objs        =   list()
+    indices     =   list()
+    lockStates  =   list()
+    joints      =   list()
+    directs     =   list()
+    opmSources  =   list()
+    isSources   =   list()
+    isRecords   =   list()
+    inConnections   =   list()
+    for index, obj in enumerate(objList):
+        selList =   OpenMaya.MSelectionList()
+        try:
+            selList.add(obj)
+        except RuntimeError:
+            if vbzLvl>1:
+                sys.stdout.write('#* %s.constraintToTarget() -> %s not found, skipping.\n' % (__name__, unicode(obj)))
+            continue
+        mObj    =   OpenMaya.MObject()
+        selList.getDependNode(0, mObj)
+        fnNode  =   OpenMaya.MFnDependencyNode(mObj)
+
+        connections =   list()
+        for attr in attrList:
+            source  =   _firstSourceNode(fnNode.findPlug(attr))
+            if source and not (source in connections):
+                connections.append(source)
+        for connection in connections:
+            if cmds.nodeType(connection) != 'decomposeMatrix' and vbzLvl>1:
+                sys.stdout.write('#* %s.constraintToTarget() -> %s has non decomposeMatrixtype connection, skipping\n' % (__name__, obj))
+        if connections and vbzLvl>3:
+            sys.stdout.write('#   %s.constraintToTarget() -> %s is already connected, removing connection\n' % (__name__, obj))
+        inConnections.extend(connections)
+
+        isJoint =   mObj.hasFn(OpenMaya.MFn.kJoint)
+        nodes.append(generalApi.DependNode(mObj))
+        fnNodes.append(fnNode)
+        objs.append(obj)
+        indices.append(index)
+        lockStates.append(fnNode.findPlug('tx').isLocked())
+        joints.append(isJoint)
+        directs.append(mode == 'offsetParentMatrix' and (t and r and s and sh) and _isPlainTransform(fnNode, isJoint))
+        opmSources.append(_sourcePlugName(fnNode.findPlug('offsetParentMatrix')))
+        isSources.append(_sourcePlugName(fnNode.findPlug('inverseScale')) if isJoint else None)
+        #    inverseScale source a direct constraint disconnected, see cstTgtSrcIs below
+        isRecords.append(fnNode.findPlug('cstTgtSrcIs').asString() if fnNode.hasAttribute('cstTgtSrcIs') else '')
+
+    if not objs:
+        return list()
+
+    #    all the offsets in one batch, inverse of (target world * object world inverse),
+    #    a sheared offset can not be baked in the channels of a direct constraint
+    if mo and offsetInvMatrices is not None:
+        offsetInvMatrices   =   numpy.asarray(offsetInvMatrices, dtype=numpy.float64).reshape(-1, 4, 4)[indices]
+    elif mo:
+        tgtWorldMatrix      =   generalApi.DependNodeArray([target]).asWorldMatrixArray()[0]
+        offsetInvMatrices   =   numpy.einsum('nij,jk->nik', nodes.asWorldMatrixArray(), numpy.linalg.inv(tgtWorldMatrix))
+    if mo:
+        sheared             =   (numpy.abs(_shears(offsetInvMatrices)) > 1.0e-6).any(axis=1)
+        directs             =   [direct and not shear for direct, shear in zip(directs, sheared)]
+    if mode == 'offsetParentMatrix' and vbzLvl>2:
+        for obj, direct in zip(objs, directs):
+            if not direct:
+                sys.stdout.write('#   %s.constraintToTarget() -> %s can not be driven by its offsetParentMatrix, using matrix nodes\n' % (__name__, obj))
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    #    scene edits the transaction does not record: deletes, unlocks and new attributes
+    if inConnections:
+        inConnections   =   list(set(inConnections))
+        inConnections.extend(_matrixConstraintInputs(inConnections))
+        cmds.delete(inConnections)
+        for connection in inConnections:
+            nameRegistry.release(connection)
+    for obj, lockState in zip(objs, lockStates):
+        if lockState:
+            attributeFunctions.unlockTRSV(obj)
+    if store:
+        for obj, fnNode, direct in zip(objs, fnNodes, directs):
+            for attr in cstInfoAttrList + (['cstTgtSrcMo'] if mo else []) + (['cstTgtSrcOpm'] if direct else []):
+                if fnNode.hasAttribute(attr):
+                    continue
+                if attr == 'cstTgtSrcMo':
+                    cmds.addAttr(obj, ln=attr, at='matrix')
+                elif attr == 'cstTgtSrcOpm':
+                    cmds.addAttr(obj, ln=attr, at='bool')
+                else:
+                    cmds.addAttr(obj, ln=attr, dt='string')
+
+    for obj, fnNode, direct, isSource in zip(objs, fnNodes, directs, isSources):
+        if direct and isSource and not fnNode.hasAttribute('cstTgtSrcIs'):
+            cmds.addAttr(obj, ln='cstTgtSrcIs', dt='string')
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    #    matrix constraints, one transaction
+    tx  =   dgTransaction.Transaction(nameRegistry)
+    constraintNodeList  =   list()
+    for i, obj in enumerate(objs):
+        if directs[i]:
+            #    the target drives the parent space, the offset (or nothing) goes on the channels
+            tx.connectAttr('%s.worldMatrix[0]' %target, '%s.offsetParentMatrix'%obj, f=True)
+            tx.setAttr('%s.inheritsTransform'%obj, 0)
+            tx.setAttr('%s.t'%obj, 0, 0, 0)
+            tx.setAttr('%s.r'%obj, 0, 0, 0)
+            tx.setAttr('%s.s'%obj, 1, 1, 1)
+            tx.setAttr('%s.shear'%obj, 0, 0, 0)
+            if joints[i]:
+                tx.setAttr('%s.jo'%obj, 0, 0, 0)
+                #    nothing to compensate without an inherited parent scale, the
+                #    source is recorded in cstTgtSrcIs to reconnect it later
+                if isSources[i]:
+                    tx.disconnectAttr(isSources[i], '%s.inverseScale'%obj)
+                    tx.setAttr('%s.cstTgtSrcIs'%obj, l=False)
+                    tx.setAttr('%s.cstTgtSrcIs'%obj, isSources[i], l=True)
+                tx.setAttr('%s.inverseScale'%obj, 1, 1, 1)
+        else:
+            #    back from a direct constraint
+            if opmSources[i]:
+                tx.disconnectAttr(opmSources[i], '%s.offsetParentMatrix'%obj)
+                tx.setAttr('%s.offsetParentMatrix'%obj, _IDENTITY_MATRIX)
+                tx.setAttr('%s.inheritsTransform'%obj, 1)
+            if isRecords[i] and not isSources[i]:
+                if tx.objExists(isRecords[i].split('.')[0]):
+                    tx.connectAttr(isRecords[i], '%s.inverseScale'%obj)
+                elif vbzLvl>1:
+                    sys.stdout.write('#* %s.constraintToTarget() -> %s not found, %s.inverseScale left unconnected\n' % (__name__, isRecords[i], obj))
+                tx.setAttr('%s.cstTgtSrcIs'%obj, l=False)
+                tx.setAttr('%s.cstTgtSrcIs'%obj, '', l=True)
+            constraintNodeList.extend(_matrixConstraintNodes(tx, nameRegistry, target, obj, attrList, joints[i],
+                                                             offsetInvMatrices[i] if mo else None))
+
+        #    store constraint infos for automatic re-constraint
+        if store:
+            for attr in cstInfoAttrList:
+                tx.setAttr('%s.%s' %(obj, attr), l=False)
+                tx.setAttr('%s.%s' %(obj, attr), target, l=True)
+            if directs[i] or fnNodes[i].hasAttribute('cstTgtSrcOpm'):
+                tx.setAttr('%s.cstTgtSrcOpm' %obj, l=False)
+                tx.setAttr('%s.cstTgtSrcOpm' %obj, directs[i], l=True)
+            if mo:
+                tx.setAttr('%s.cstTgtSrcMo' %obj, l=False)
+                tx.setAttr('%s.cstTgtSrcMo' %obj, offsetInvMatrices[i], l=True)
+            elif fnNodes[i].hasAttribute('cstTgtSrcMo'):
+                #    no offset any more, an identity offset is the same constraint
+                tx.setAttr('%s.cstTgtSrcMo' %obj, l=False)
+                tx.setAttr('%s.cstTgtSrcMo' %obj, _IDENTITY_MATRIX, l=True)
+    tx.apply()
+
+    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+    #    offsets of the direct constraints and relock
+    if mo and any(directs):
+        indices =   [i for i, direct in enumerate(directs) if direct]
+        generalApi.DependNodeArray([nodes[i] for i in indices]).setLocalMatrices(offsetInvMatrices[indices])
+    for obj, lockState in zip(objs, lockStates):
+        if lockState:
+            attributeFunctions.lockAndHideTransforms(obj)
+
+    return constraintNodeList
+
+
+def _matrixConstraintNodes(tx, nameRegistry, target, obj, attrList, isJoint, offsetInvMatrix=None):
+    '''
+    Records the multMatrix, decomposeMatrix (and offset fourByFourMatrix) graph
+    constraining the attrList channels of obj to target on tx, returns the nodes
+    '''
+    #    define baseName
+    baseName    =   obj.split('|')[-1].split(':')[-1]
+    try:
+        baseName    =   nameRegistry.uniqueName(nameFunctions.addDescriptionToName(baseName, 'Cst'))
+    except:
+        baseName    =   'C_grp_%sCst_0'%baseName
+
+    #    maintain offset case: inverse offset on a fourByFourMatrix
+    indexOffset     =   0
+    offsetFbfMatrix =   None
+    if offsetInvMatrix is not None:
+        offsetFbfMatrix =   nameFunctions.addDescriptionToName(nameFunctions.changeType(baseName, 'fbfm'), 'Offset')
+        offsetFbfMatrix =   tx.createNode('fourByFourMatrix', n=offsetFbfMatrix)
+        for row in range(4):
+            for column in range(4):
+                tx.setAttr('%s.in%d%d'%(offsetFbfMatrix, row, column), float(offsetInvMatrix[row][column]), l=True)
+        indexOffset =   1
+
+    #    matrix constraint
+    multMx  =   tx.createNode('multMatrix', n=nameFunctions.changeType(baseName, 'mm'))
+    if offsetFbfMatrix:
+        tx.connectAttr('%s.output' %offsetFbfMatrix, '%s.matrixIn[0]'%multMx)
+    tx.connectAttr('%s.worldMatrix[0]' %target, '%s.matrixIn[%d]'%(multMx, indexOffset))
+    tx.connectAttr('%s.parentInverseMatrix[0]' %obj, '%s.matrixIn[%d]'%(multMx, indexOffset+1))
+
+    decompMatrix    =   tx.createNode('decomposeMatrix', n=nameFunctions.changeType(baseName, 'dmx'))
+    tx.connectAttr('%s.matrixSum' %multMx, '%s.inputMatrix' %decompMatrix)
+
+    #    reset joint orients
+    if isJoint:
+        tx.setAttr('%s.jo'%obj, 0, 0, 0)
+
+    #    connect
+    for attr, output in [('t', 'outputTranslate'), ('r', 'outputRotate'), ('s', 'outputScale'), ('shear', 'outputShear')]:
+        if attr in attrList:
+            tx.connectAttr('%s.%s'%(decompMatrix, output), '%s.%s'%(obj, attr))
+
+    if offsetFbfMatrix:
+        return [decompMatrix, multMx, offsetFbfMatrix]
+    return [decompMatrix, multMx]
+
+
+def _constraintInfoAttrs(t, r, s, sh):
+    '''
+    Names of the string attributes storing the target of a constraintToTarget
+    '''
+    if (t and r and s and sh):
+        return ['cstTgtSrc']
+    return [attr for attr, flag in [('cstTgtSrcTr', t), ('cstTgtSrcRo', r), ('cstTgtSrcSc', s), ('cstTgtSrcSh', sh)] if flag]
+
+def _isPlainTransform(fnNode, isJoint):
+    '''
+    True if the local matrix of the node is its translate, rotate and scale only:
+    no rotate axis, no pivots and a joint orient that can be reset
+    '''
+    attrs   =   ['rotateAxis'] if isJoint else ['rotateAxis', 'rotatePivot', 'rotatePivotTranslate', 'scalePivot', 'scalePivotTranslate']
+    for attr in attrs:
+        plug    =   fnNode.findPlug(attr)
+        if any(abs(plug.child(i).asDouble()) > 1.0e-9 for i in range(plug.numChildren())):
+            return False
+    if isJoint:
+        plug    =   fnNode.findPlug('jointOrient')
+        if plug.isConnected() or plug.isLocked():
+            return False
+    return True
+
+def _shears(matrices):
+    '''
+    (N,3) xy, xz and yz shears of (N,4,4) matrices, split as scale * shear * rotate like the decomposeMatrix node
+    '''
+    rows    =   numpy.asarray(matrices, dtype=numpy.float64)[:, :3, :3]
+    xAxis   =   rows[:, 0] / numpy.linalg.norm(rows[:, 0], axis=1)[:, numpy.newaxis]
+    xy      =   (rows[:, 1] * xAxis).sum(axis=1)
+    yAxis   =   rows[:, 1] - xAxis * xy[:, numpy.newaxis]
+    yScale  =   numpy.linalg.norm(yAxis, axis=1)
+    yAxis   =   yAxis / yScale[:, numpy.newaxis]
+    xz      =   (rows[:, 2] * xAxis).sum(axis=1)
+    yz      =   (rows[:, 2] * yAxis).sum(axis=1)
+    zScale  =   numpy.linalg.norm(rows[:, 2] - xAxis * xz[:, numpy.newaxis] - yAxis * yz[:, numpy.newaxis], axis=1)
+    return numpy.stack([xy / yScale, xz / zScale, yz / zScale], axis=1)
+
+def _sourcePlugName(plug):
+    '''
+    node.attribute name of the plug connected to plug, None when it is not connected
+    '''
+    sources =   OpenMaya.MPlugArray()
+    plug.connectedTo(sources, True, False)
+    if not sources.length():
+        return None
+    return '%s.%s' %(generalApi.DependNode(sources[0].node()).getPartialName(),
+                     sources[0].partialName(False, True, True, False, False, True))
+
+def _matrixConstraintInputs(decomposeMatrices):
+    '''
+    multMatrix and offset fourByFourMatrix nodes feeding only the decomposeMatrices of old
+    matrix constraints, deleted with them rather than left behind
+    '''
+    inputs  =   list()
+    for decompMatrix in decomposeMatrices:
+        if cmds.nodeType(decompMatrix) != 'decomposeMatrix':
+            continue
+        for multMx in cmds.listConnections('%s.inputMatrix' %decompMatrix, s=True, d=False, type='multMatrix') or list():
+            if len(set(cmds.listConnections('%s.matrixSum' %multMx, s=False, d=True) or list())) != 1:
+                continue
+            inputs.append(multMx)
+            for fbfMatrix in cmds.listConnections('%s.matrixIn' %multMx, s=True, d=False, type='fourByFourMatrix') or list():
+                if len(set(cmds.listConnections('%s.output' %fbfMatrix, s=False, d=True) or list())) == 1:
+                    inputs.append(fbfMatrix)
+    return list(set(inputs))
+
+def _firstSourceNode(plug):
+    '''
+    Name of the node connected to plug or, for a compound, to the first connected child
+    '''
+    plugs   =   [plug] + [plug.child(i) for i in range(plug.numChildren())] if plug.isCompound() else [plug]
+    sources =   OpenMaya.MPlugArray()
+    for each in plugs:
+        each.connectedTo(sources, True, False)
+        if sources.length():
+            return generalApi.DependNode(sources[0].node()).getPartialName()
+    return None
+
+
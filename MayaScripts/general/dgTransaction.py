@@ -0,0 +1,442 @@
+'''
+Batched DG/DAG edits for rig builds
+
+A Transaction records createNode, connectAttr, disconnectAttr, setAttr, rename
+and parent calls with the same arguments as maya.cmds and applies them in one
+modifier pass, rather than paying the command engine and undo queue for every
+single call.
+
+    tx = dgTransaction.Transaction()
+    remap = tx.createNode("setRange", n="PeelHeelRange_L_srg")
+    tx.connectAttr("L_ctl_foot_0.PeelHeel", "%s.vx" %remap)
+    tx.setAttr("%s.mx" %remap, 50)
+    tx.apply()
+
+createNode returns the name the node will have once applied (reserved through
+a NameRegistry), so the names can be used in later calls just like with cmds.
+Nothing touches the scene until apply(). A failing operation raises a
+TransactionError naming the call and the file/line that recorded it, and the
+scene is left as it was.
+
+apply() loads the MayaNodes.dgTransactionCmd plugin and runs through its
+command, so the whole transaction is a single entry on the Maya undo queue,
+in line with the cmds calls around it. When the plugin can not be found the
+modifiers run directly, with a warning: the edits are then not on the undo
+queue and only Transaction.undo() reverts them.
+'''
+
+import sys, os
+from maya import cmds, OpenMaya
+from general import apiFunctions
+
+#    transaction being applied by the dgTransaction command
+_pending = None
+_dagTypes = {}
+#    plugin of the undoable dgTransaction command
+_commandPlugin = "dgTransactionCmd"
+_commandWarned = False
+
+
+class TransactionError(Exception):
+    '''
+    Raised by Transaction.apply, errors holds (operation, message) pairs
+    '''
+    def __init__(self, errors):
+        self.errors = errors
+        lines = ["%s: %s" %(op, message) for op, message in errors]
+        Exception.__init__(self, "Transaction failed:\n\t" + "\n\t".join(lines))
+
+
+class _Operation(object):
+    def __init__(self, kind, args, flags, where):
+        self.kind = kind
+        self.args = args
+        self.flags = flags
+        self.where = where
+
+    def __str__(self):
+        args = [repr(arg) for arg in self.args]
+        args += ["%s=%r" %(key, val) for key, val in sorted(self.flags.items())]
+        return "%s(%s) [%s:%d]" %(self.kind, ", ".join(args), self.where[0], self.where[1])
+
+
+class Transaction(object):
+    def __init__(self, registry=None):
+        self.__registry = registry or apiFunctions.NameRegistry(scan=False)
+        self.__creates = []
+        self.__renames = []
+        self.__edits = []
+        self.__pendingNames = set()
+        self.__renamed = {}
+        self.__modifiers = []
+        self.__unlocks = []
+        self.__plugStates = []
+        self.__applied = False
+        self.error = None
+
+    def __len__(self):
+        return len(self.__creates) + len(self.__renames) + len(self.__edits)
+
+    def __record(self, ops, kind, args, flags):
+        caller = sys._getframe(2)
+        op = _Operation(kind, args, flags, (os.path.basename(caller.f_code.co_filename), caller.f_lineno))
+        ops.append(op)
+        return op
+
+    #Recording++
+    def createNode(self, nodeType, n=None, p=None):
+        '''
+        Records a createNode, returns the name the node gets on apply.
+        Shape types are created under a new transform which gets the name.
+        '''
+        name = self.__registry.uniqueName(n or (nodeType + "1"))
+        self.__record(self.__creates, "createNode", (nodeType,), {'n':name, 'p':p})
+        self.__pendingNames.add(name)
+        return name
+
+    def connectAttr(self, source, destination, f=False):
+        self.__record(self.__edits, "connectAttr", (source.strip(), destination.strip()), {'f':f})
+
+    def disconnectAttr(self, source, destination):
+        self.__record(self.__edits, "disconnectAttr", (source.strip(), destination.strip()), {})
+
+    def setAttr(self, attr, *values, **flags):
+        '''
+        Records a setAttr, values are in UI units like cmds.setAttr.
+        Numeric, boolean, enum, string and matrix attributes are supported,
+        several values set the children of a compound (ie. translate). A
+        matrix is an MMatrix, 16 values or a (4,4) array and keeps its full
+        double precision. l=True locks the attribute once set, k=False makes
+        it non keyable. l=False unlocks before any value of the transaction
+        is set, the other l/k flags apply after all of them.
+        '''
+        self.__record(self.__edits, "setAttr", (attr.strip(),) + values, flags)
+
+    def rename(self, node, newName):
+        '''
+        Records a rename, returns the name the node gets on apply
+        '''
+        newName = self.__registry.uniqueName(newName)
+        self.__record(self.__renames, "rename", (node, newName), {})
+        self.__renamed[node] = newName
+        self.__pendingNames.discard(node)
+        self.__pendingNames.add(newName)
+        return newName
+
+    def parent(self, child, parent, r=False):
+        '''
+        Records a parent, keeps the world transform of child unless r (relative)
+        '''
+        self.__record(self.__edits, "parent", (child, parent), {'r':r})
+
+    def objExists(self, name):
+        '''
+        cmds.objExists that also knows about the nodes this transaction creates or renames
+        '''
+        if name in self.__pendingNames:
+            return True
+        if name in self.__renamed:
+            return False
+        return cmds.objExists(name)
+    #Recording--
+
+    def apply(self):
+        '''
+        Applies every recorded operation, creates and renames first then the edits in
+        the order they were recorded. Raises TransactionError when anything fails.
+        '''
+        global _pending
+        if self.__applied:
+            raise TransactionError([(None, "transaction already applied")])
+
+        if _loadCommand():
+            _pending = self
+            try:
+                cmds.dgTransaction()
+            finally:
+                _pending = None
+            if self.error:
+                raise self.error
+        else:
+            self.doIt()
+
+    #Modifier passes, used by apply and the dgTransaction command++
+    def doIt(self):
+        self.error = None
+        self.__modifiers = []
+        self.__unlocks = []
+        self.__plugStates = []
+        errors = []
+        dagMod = OpenMaya.MDagModifier()
+        created = {}
+        for op in self.__creates:
+            try:
+                obj = _createNode(dagMod, op.args[0], self.__resolveParent(op.flags['p'], created))
+                dagMod.renameNode(obj, op.flags['n'])
+                created[op.flags['n']] = obj
+            except Exception, e:
+                errors.append((op, str(e)))
+        for op in self.__renames:
+            try:
+                dagMod.renameNode(self.__node(op.args[0], created), op.args[1])
+            except Exception, e:
+                errors.append((op, str(e)))
+        self.__fail(errors)
+
+        try:
+            dagMod.doIt()
+        except Exception, e:
+            dagMod.undoIt()
+            self.__fail([(op, str(e)) for op in self.__creates + self.__renames])
+        self.__modifiers = [dagMod]
+
+        editMod = OpenMaya.MDagModifier()
+        states = []
+        for op in self.__edits:
+            try:
+                self.__queue(editMod, op, states)
+            except Exception, e:
+                errors.append((op, str(e)))
+        self.__fail(errors)
+
+        #    unlocks go before the values, locks and keyable states after them
+        self.__unlocks = _setPlugStates([state for state in states if state[1:] == ('l', False)])
+        try:
+            editMod.doIt()
+        except Exception, e:
+            editMod.undoIt()
+            self.__fail(self.__findFailedEdits() or [(None, str(e))])
+
+        self.__modifiers.append(editMod)
+        self.__plugStates = _setPlugStates([state for state in states if state[1:] != ('l', False)])
+        self.__applied = True
+
+    def undoIt(self):
+        _revertPlugStates(self.__plugStates)
+        for mod in reversed(self.__modifiers):
+            mod.undoIt()
+        _revertPlugStates(self.__unlocks)
+
+    def redoIt(self):
+        _setPlugStates([(plug, flag, value) for plug, flag, previous, value in self.__unlocks])
+        for mod in self.__modifiers:
+            mod.doIt()
+        _setPlugStates([(plug, flag, value) for plug, flag, previous, value in self.__plugStates])
+
+    def undo(self):
+        '''
+        Reverts an applied transaction, for when it did not run through the undo queue
+        '''
+        self.undoIt()
+        self.__modifiers = []
+        self.__unlocks = []
+        self.__plugStates = []
+        self.__applied = False
+    #Modifier passes--
+
+    def __fail(self, errors):
+        if not errors:
+            return
+        self.undoIt()
+        self.__modifiers = []
+        self.__unlocks = []
+        self.__plugStates = []
+        self.error = TransactionError(errors)
+        raise self.error
+
+    def __findFailedEdits(self):
+        '''
+        Replays the edits one modifier each to find the ones the batched pass choked on
+        '''
+        errors = []
+        applied = []
+        for op in self.__edits:
+            mod = OpenMaya.MDagModifier()
+            try:
+                self.__queue(mod, op)
+                mod.doIt()
+                applied.append(mod)
+            except Exception, e:
+                errors.append((op, str(e)))
+        for mod in reversed(applied):
+            mod.undoIt()
+        return errors
+
+    def __resolveName(self, name):
+        while name in self.__renamed:
+            name = self.__renamed[name]
+        return name
+
+    def __node(self, name, created):
+        if name in created:
+            return created[name]
+        return apiFunctions.DependNode(name).asMObject()
+
+    def __resolveParent(self, parent, created):
+        if not parent:
+            return OpenMaya.MObject.kNullObj
+        return self.__node(parent, created)
+
+    def __plug(self, attr):
+        node, dot, attrName = attr.partition(".")
+        attr = self.__resolveName(node) + dot + attrName
+        selList = OpenMaya.MSelectionList()
+        try:
+            selList.add(attr)
+            plug = OpenMaya.MPlug()
+            selList.getPlug(0, plug)
+        except RuntimeError:
+            raise Exception, "attribute '%s' does not exist" %attr
+        return plug
+
+    def __queue(self, mod, op, states=None):
+        '''
+        Queues op on mod, the l/k flags of a setAttr are appended to states as
+        (plug, flag, value) since a modifier can not lock a plug
+        '''
+        if op.kind == "connectAttr":
+            source = self.__plug(op.args[0])
+            destination = self.__plug(op.args[1])
+            inputs = OpenMaya.MPlugArray()
+            destination.connectedTo(inputs, True, False)
+            if inputs.length():
+                if not op.flags['f']:
+                    raise Exception, "'%s' is already connected, use f=True" %op.args[1]
+                mod.disconnect(inputs[0], destination)
+            mod.connect(source, destination)
+
+        elif op.kind == "disconnectAttr":
+            source = self.__plug(op.args[0])
+            destination = self.__plug(op.args[1])
+            inputs = OpenMaya.MPlugArray()
+            destination.connectedTo(inputs, True, False)
+            if (not inputs.length()) or (inputs[0] != source):
+                raise Exception, "'%s' is not connected to '%s'" %(op.args[0], op.args[1])
+            mod.disconnect(source, destination)
+
+        elif op.kind == "setAttr":
+            plug = self.__plug(op.args[0])
+            values = op.args[1:]
+            if len(values) == 1:
+                _queueValue(mod, plug, values[0])
+            elif plug.isCompound() and (plug.numChildren() == len(values)):
+                for i in range(len(values)):
+                    _queueValue(mod, plug.child(i), values[i])
+            elif values:
+                raise Exception, "%d values passed in for '%s'" %(len(values), op.args[0])
+            for flag in ['l', 'k']:
+                if (flag in op.flags) and (states is not None):
+                    states.append((plug, flag, bool(op.flags[flag])))
+
+        elif op.kind == "parent":
+            child = self.__resolveName(op.args[0])
+            parent = self.__resolveName(op.args[1])
+            if op.flags['r']:
+                mod.reparentNode(apiFunctions.DependNode(child).asMObject(),
+                                 apiFunctions.DependNode(parent).asMObject())
+            else:
+                mod.commandToExecute('parent "%s" "%s"' %(child, parent))
+
+
+#Utilities++
+def _loadCommand():
+    '''
+    True when the dgTransaction command is available, loading its plugin if needed
+    '''
+    global _commandWarned
+    if not hasattr(cmds, "dgTransaction"):
+        try:
+            if not cmds.pluginInfo(_commandPlugin, q=True, loaded=True):
+                cmds.loadPlugin(_commandPlugin, quiet=True)
+        except RuntimeError:
+            pass
+    if hasattr(cmds, "dgTransaction"):
+        return True
+    if not _commandWarned:
+        _commandWarned = True
+        sys.stderr.write("dgTransaction: the %s plugin could not be loaded, transactions are not undoable\n" %_commandPlugin)
+    return False
+
+def _isDagType(nodeType):
+    if nodeType not in _dagTypes:
+        _dagTypes[nodeType] = "dagNode" in (cmds.nodeType(nodeType, isTypeName=True, inherited=True) or [])
+    return _dagTypes[nodeType]
+
+def _createNode(dagMod, nodeType, parent):
+    if _isDagType(nodeType):
+        return dagMod.createNode(nodeType, parent)
+    if not parent.isNull():
+        raise Exception, "'%s' is not a dag node type, it can not be parented" %nodeType
+    return OpenMaya.MDGModifier.createNode(dagMod, nodeType)
+
+def _queueValue(mod, plug, value):
+    '''
+    Queues a plug value on mod, converting UI units to internal ones
+    '''
+    attr = plug.attribute()
+    if attr.hasFn(OpenMaya.MFn.kUnitAttribute):
+        unitType = OpenMaya.MFnUnitAttribute(attr).unitType()
+        if unitType == OpenMaya.MFnUnitAttribute.kAngle:
+            mod.newPlugValueMAngle(plug, OpenMaya.MAngle(value, OpenMaya.MAngle.uiUnit()))
+        elif unitType == OpenMaya.MFnUnitAttribute.kDistance:
+            mod.newPlugValueMDistance(plug, OpenMaya.MDistance(value, OpenMaya.MDistance.uiUnit()))
+        elif unitType == OpenMaya.MFnUnitAttribute.kTime:
+            mod.newPlugValueMTime(plug, OpenMaya.MTime(value, OpenMaya.MTime.uiUnit()))
+        else:
+            mod.newPlugValueDouble(plug, value)
+
+    elif attr.hasFn(OpenMaya.MFn.kNumericAttribute):
+        numType = OpenMaya.MFnNumericAttribute(attr).unitType()
+        if numType == OpenMaya.MFnNumericData.kBoolean:
+            mod.newPlugValueBool(plug, bool(value))
+        elif numType in [OpenMaya.MFnNumericData.kFloat]:
+            mod.newPlugValueFloat(plug, value)
+        elif numType in [OpenMaya.MFnNumericData.kDouble]:
+            mod.newPlugValueDouble(plug, value)
+        else:
+            mod.newPlugValueInt(plug, int(value))
+
+    elif attr.hasFn(OpenMaya.MFn.kEnumAttribute):
+        mod.newPlugValueShort(plug, int(value))
+
+    elif isinstance(value, OpenMaya.MObject):
+        #    typed data (curve, mesh...) read from another plug
+        mod.newPlugValue(plug, value)
+
+    elif _isMatrixAttribute(attr):
+        mod.newPlugValue(plug, OpenMaya.MFnMatrixData().create(apiFunctions._asMMatrix(value)))
+
+    elif issubclass(value.__class__, basestring):
+        mod.newPlugValueString(plug, value)
+
+    else:
+        raise Exception, "can not set '%s' from a transaction" %plug.name()
+
+def _isMatrixAttribute(attr):
+    if attr.hasFn(OpenMaya.MFn.kMatrixAttribute):
+        return True
+    return attr.hasFn(OpenMaya.MFn.kTypedAttribute) and \
+        OpenMaya.MFnTypedAttribute(attr).attrType() == OpenMaya.MFnData.kMatrix
+
+def _setPlugStates(states):
+    '''
+    Sets the (plug, flag, value) lock/keyable states in order, returns them
+    as (plug, flag, previous, value) for _revertPlugStates
+    '''
+    applied = []
+    for plug, flag, value in states:
+        if flag == 'l':
+            applied.append((plug, flag, plug.isLocked(), value))
+            plug.setLocked(value)
+        else:
+            applied.append((plug, flag, plug.isKeyable(), value))
+            plug.setKeyable(value)
+    return applied
+
+def _revertPlugStates(applied):
+    for plug, flag, previous, value in reversed(applied):
+        if flag == 'l':
+            plug.setLocked(previous)
+        else:
+            plug.setKeyable(previous)
+#Utilities--
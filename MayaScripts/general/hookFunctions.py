@@ -15,6 +15,14 @@ from Functions import nameFunctions
 from Functions import apiFunctions
 dp = apiFunctions.Wrapper()
 
+from general import apiFunctions as generalApi
+from general import dgTransaction
+from general import meshBinding
+from general import surfaceFunctions
+
+#    vertices per transaction in the bulk meshToJointArray
+BULK_CHUNK_SIZE = 500
+
 @author('g.barlier')
 def follicleRivet(surface, baseName=None, U=0.5, V=0.5, attr=False, shape=True, p=None):
     '''
@@ -98,14 +106,127 @@ def follicleRivet(surface, baseName=None, U=0.5, V=0.5, attr=False, shape=True,
     return follicle
 
 
+def follicleRivets(surface, uvs, names=None, baseName='rivet', attr=False, shape=True, p=None):
+    '''
+    Bulk follicleRivet: create a follicle rivet on surface for every (u, v) of uvs
+    #    return rivets as a DependNodeArray
+
+    All the follicles, shapes, connections, values and rivet locks are created
+    in one transaction, the curve data, the U and V attribute connections and
+    the follicle locks in a second one. The rivet names come from a block
+    reserved up front. The curve locator is built once, every other locator
+    shape gets a copy of its curve data.
+
+    Options:
+    -uvs (list): [[u1, v1], [u2, v2], ...] placements
+    -names (list): rivet names, a block of unique baseName names by default
+    -baseName (string): base name string used when names are not given
+    -attr (bool): add U and V position option attributes to rivets
+    -shape (bool): add locator shaped curve to rivets
+    -p (node): rivets parent node
+    '''
+    #    sanity check
+    surface, surfaceShp = shapeFunctions.filterShpAndTransform(surface)
+    if not (surface and surfaceShp):
+        return generalApi.DependNodeArray()
+
+    if cmds.nodeType(surfaceShp) == 'nurbsSurface':
+        surfacePlug, inputPlug = 'local', 'inputSurface'
+    else:
+        surfacePlug, inputPlug = 'worldMesh[0]', 'inputMesh'
+
+    #    reserve the rivet names, each goes back to the transaction which reserves it again
+    registry = generalApi.NameRegistry()
+    if names:
+        names = [registry.uniqueName(name) for name in names]
+    else:
+        names = registry.reserveBlock(baseName+'1', len(uvs))
+
+    tx = dgTransaction.Transaction(registry)
+    parent = p if p and cmds.objExists(p) else None
+    rivets, follicleShps, locatorShps = [], [], []
+    for name, (u, v) in zip(names, uvs):
+        registry.release(name)
+        rivet = tx.createNode('transform', n=name, p=parent)
+        tx.setAttr('%s.inheritsTransform'%rivet, 0)
+
+        #    curve locator shape first, it is the first child then, the
+        #    first rivet gets the locator curve the others a copy of its data
+        if shape and rivets:
+            locatorShp = tx.createNode('nurbsCurve', n=rivet+'CrvLoc', p=rivet)
+            tx.setAttr('%s.overrideEnabled'%locatorShp, 1)
+            tx.setAttr('%s.overrideColor'%locatorShp, 4)
+            locatorShps.append(locatorShp)
+
+        follicleShp = tx.createNode('follicle', n=rivet+('FollicleShape' if shape else 'Shape'), p=rivet)
+        if shape:
+            tx.setAttr('%s.v'%follicleShp, 0)
+        tx.connectAttr('%s.outRotate'%follicleShp, '%s.rotate'%rivet, f=True)
+        tx.connectAttr('%s.outTranslate'%follicleShp, '%s.translate'%rivet, f=True)
+        tx.connectAttr('%s.worldMatrix[0]'%surfaceShp, '%s.inputWorldMatrix'%follicleShp, f=True)
+        tx.connectAttr('%s.%s'%(surfaceShp, surfacePlug), '%s.%s'%(follicleShp, inputPlug), f=True)
+        tx.setAttr('%s.pu'%follicleShp, u)
+        tx.setAttr('%s.pv'%follicleShp, v)
+        follicleShps.append(follicleShp)
+
+        #    lock and hide, the locked compounds lock their children
+        for attrName in ['t', 'r', 's']:
+            tx.setAttr('%s.%s'%(rivet, attrName), l=True)
+            for axis in 'xyz':
+                tx.setAttr('%s.%s%s'%(rivet, attrName, axis), k=False)
+        tx.setAttr('%s.v'%rivet, l=True, k=False)
+        rivets.append(rivet)
+    tx.apply()
+
+    #    custom attributes, not something a transaction records
+    if attr:
+        for rivet in rivets:
+            attributeFunctions.createSeparator(rivet)
+            for longName, shortName in [('parameterU', 'pu'), ('parameterV', 'pv')]:
+                cmds.addAttr(rivet, ln=longName, sn=shortName, at='double')
+
+    #    second transaction: curve data, rivet attributes and the follicle locks of follicleRivet
+    tx = dgTransaction.Transaction(registry)
+
+    #    one locator curve, its data set on the other shapes (no connection to it)
+    if shape and rivets:
+        source = handleFunctions.curveLocator(rivets[0]+'CrvLoc', p=rivets[0], s=True)
+        cmds.reorder(source, front=True)
+        controlFunctions.colorShape([source], 4)
+        curveData = generalApi.DependNode(source).findPlug('local').asMObject()
+        for locatorShp in locatorShps:
+            tx.setAttr('%s.cached'%locatorShp, curveData)
+
+    if attr:
+        for rivet, follicleShp, (u, v) in zip(rivets, follicleShps, uvs):
+            for shortName, value in [('pu', u), ('pv', v)]:
+                tx.setAttr('%s.%s'%(rivet, shortName), value, k=True)
+                tx.connectAttr('%s.%s'%(rivet, shortName), '%s.%s'%(follicleShp, shortName), f=True)
+
+    #    the locks go after the connections above
+    lockAttrs = []
+    if follicleShps:
+        lockAttrs = cmds.listAttr(follicleShps[0], k=True) or []
+    for follicleShp in follicleShps:
+        for attrName in lockAttrs:
+            tx.setAttr('%s.%s'%(follicleShp, attrName), l=True)
+    tx.apply()
+    cmds.select(cl=True)
+
+    return generalApi.DependNodeArray(rivets)
+
+
 @author('g.barlier')
-def makeRivetFromList(objList, surfaceShp, baseName=None, attr=False):
+def makeRivetFromList(objList, surfaceShp, baseName=None, attr=False, mode='follicle', binding=None):
     '''
     Create rivet with closest point on surface for objList
 
     Options:
     -baseName (string): base name string used as prefix for all nodes
     -attr (bool): add U and V position option attributes to rivet
+    -mode (string): 'follicle' for a follicle per rivet, 'matrix' for one
+                    matrixRivet node driving all of them (meshes only, no attr)
+    -binding (meshBinding.Binding or file path): saved binding of the matrix mode
 
     author: guillaume barlier
     '''
@@ -133,77 +254,116 @@ def makeRivetFromList(objList, surfaceShp, baseName=None, attr=False):
     if not baseName:
         baseName    =   'rivet'
 
-    #    duplicate/freeze surface (closest point on surface doesn't take into account surface transformations)
-    surfaceDup  =   cmds.duplicate(surface, n=surface+'_tmpRivetFreezedDup')[0]
-    attributeFunctions.lockAndHideTransforms(surfaceDup, unlock=True)
-    if cmds.listRelatives(surfaceDup, p=True):
-        cmds.parent(surfaceDup, w=True)
-    cmds.makeIdentity(surfaceDup, a=True)
-    surfaceDupShp   =   cmds.listRelatives(surfaceDup, s=True, ni=True)[0]
-
-    #    create tmp loc for objection position
-    tmpLocShp   =   cmds.createNode('locator')
-    tmpLoc      =   cmds.listRelatives(tmpLocShp, p=True)[0]
-
-    tmpLoc      =   cmds.rename(tmpLoc, 'tmpRivetClosestPointLoc')
-    tmpLocShp   =   cmds.listRelatives(tmpLoc, s=True)[0]#freaking non object cmds ... :/
-
-    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    #    position informations
-    normalizeUV     =   False
-    uRange          =   None
-    vRange          =   None
-
-    #    mesh case
-    if cmds.nodeType(surfaceShp) == 'mesh':
-        #    create/connect closest point on mesh info
-        cpInfo  =   cmds.createNode('closestPointOnMesh', n='tmpRivetMeasure_CPOM')
-        cmds.connectAttr('%s.outMesh'%surfaceDupShp, '%s.inMesh'%cpInfo)
-        cmds.connectAttr('%s.worldPosition'%tmpLocShp, '%s.inPosition'%cpInfo)
-
-    #    nurbsSurface case
-    if cmds.nodeType(surfaceShp) == 'nurbsSurface':
-        #    create/connect closest point on surface info
-        cpInfo    =   cmds.createNode('closestPointOnSurface', n='tmpRivetMeasure_CPOS')
-        cmds.connectAttr(surfaceShp+'.local', cpInfo+'.inputSurface', f=True)
-        cmds.connectAttr(tmpLocShp+'.worldPosition', cpInfo+'.inPosition', f=True)
+    #    define rivet names
+    rivetNames  =   []
+    for i in range(len(objList)):
+        rivetName   =   baseName
+        if len(objList)>1:
+            rivetName   +=  unicode(i+1).zfill(len(unicode(len(objList))))
+        rivetNames.append(rivetName)
 
-        normalizeUV =   True
-        uRange      =   cmds.getAttr(surfaceShp+'.minMaxRangeU')[0]
-        vRange      =   cmds.getAttr(surfaceShp+'.minMaxRangeV')[0]
+    #    one node for all rivets
+    if mode == 'matrix' and cmds.nodeType(surfaceShp) == 'mesh':
+        return matrixRivets(surfaceShp, objList, baseName=baseName, names=rivetNames, binding=binding)[1]
 
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     #    create rivet for selected objects
-    rivetList   =   []
-    for i in range(len(objList)):
-        obj = objList[i]
-
-        #    place tmpLoc
-        cmds.xform(tmpLoc, ws=True, t=cmds.xform(obj, q=True, ws=True, rp=True))
+    uvValues    =   getUVvalues(objList, surfaceShp)
+    rivetList   =   follicleRivets(surface, uvValues, names=rivetNames, attr=attr)
 
-        #    define rivet name
-        rivetName   =   baseName
-        if len(objList)>1:
-            rivetName   +=  unicode(i+1).zfill(len(unicode(len(objList))))
-        if not baseName:
-            rivetName   =   obj
+    return rivetList.asShortNameArray()
 
-        #    define UV coords
-        uCoord  =   cmds.getAttr(cpInfo+'.u')
-        vCoord  =   cmds.getAttr(cpInfo+'.v')
+def matrixRivets(surface, points=None, baseName='rivet', names=None, shape=True, p=None, binding=None):
+    '''
+    Create rivets on a mesh all driven by one matrixRivet node (MayaNodes/matrixRivet.py)
+    instead of a follicle each. Every rivet is bound to the triangle closest to
+    its point once, the node then only interpolates the triangle points and
+    drives the rivet offsetParentMatrix.
+    #    return matrixRivet node, rivet list
 
-        if normalizeUV:
-            #    follicles on nurbsSurfaces use normalized UV
-            uCoord  =   abs((uCoord-uRange[0])/(uRange[1]-uRange[0]))
-            vCoord  =   abs((vCoord-vRange[0])/(vRange[1]-vRange[0]))
+    Options:
+    -points: world positions (N,3) or transforms whose pivots are used
+    -baseName (string): base name string used as prefix for all nodes
+    -names (list): rivet names, baseName and an index by default
+    -shape (bool): add locator shaped curve to rivets
+    -p (node): rivets parent node
+    -binding (meshBinding.Binding or file path): use a saved binding instead
+              of binding points, its mesh must have the same topology
+    '''
+    #    sanity check
+    surface, surfaceShp = shapeFunctions.filterShpAndTransform(surface)
+    if not (surfaceShp and cmds.nodeType(surfaceShp) == 'mesh'):
+        sys.stderr.write('! %s.matrixRivets() -> %s is not a mesh, aborting\n' % (__name__, surface))
+        return None, []
+
+    #    bind every point to its closest triangle, or reuse a binding
+    topologyKey = surfaceFunctions.meshTopologyFor(surfaceShp).key()
+    if binding is None:
+        points = surfaceFunctions.worldToObject(surfaceShp, surfaceFunctions.worldPoints(points))
+        binding = meshBinding.capture(surfaceFunctions.meshBVHFor(surfaceShp), points, topology=topologyKey)
+    elif isinstance(binding, basestring):
+        binding = meshBinding.load(binding)
+    if not binding.matches(topologyKey):
+        raise Exception, "matrixRivets: the binding was made on a mesh with a different topology than %s" %surfaceShp
+
+    if names and len(names) != len(binding):
+        raise Exception, "matrixRivets: %d names for %d bindings" %(len(names), len(binding))
+    if not names:
+        names = [name or baseName + unicode(i+1).zfill(len(unicode(len(binding))))
+                 for i, name in enumerate(binding.names)]
 
-        #    create follicle rivet
-        rivetList.append(follicleRivet(surface, baseName=rivetName, U=uCoord, V=vCoord, attr=attr))
+    #    load plugin
+    checkFunctions.loadPlugin('matrixRivet')
+
+    #    one transaction for the node, the rivets and their connections
+    tx = dgTransaction.Transaction(generalApi.NameRegistry())
+    node = tx.createNode('matrixRivet', n=baseName+'MatrixRivet')
+    tx.connectAttr('%s.worldMesh[0]'%surfaceShp, '%s.inMesh'%node)
+    parent = p if p and cmds.objExists(p) else None
+    rivetList = []
+    for i in range(len(binding)):
+        tx.setAttr('%s.binding[%d].bindingVertices'%(node, i), *binding.triangles[i].tolist())
+        tx.setAttr('%s.binding[%d].bindingWeights'%(node, i), *binding.weights[i].tolist())
+
+        rivet = tx.createNode('transform', n=names[i], p=parent)
+        tx.setAttr('%s.inheritsTransform'%rivet, 0)
+        tx.connectAttr('%s.outMatrix[%d]'%(node, i), '%s.offsetParentMatrix'%rivet)
+        rivetList.append(rivet)
+    tx.apply()
+
+    #    reference matrices, identity ones are the default
+    for i in binding.referenced():
+        cmds.setAttr('%s.binding[%d].bindingReference'%(node, i), *binding.references[i].reshape(-1).tolist(), type='matrix')
+
+    #    add curve locator shapes, clean and lock
+    for rivet in rivetList:
+        if shape:
+            locatorShp  =    handleFunctions.curveLocator(rivet+'CrvLoc', p=rivet, s=True)
+            controlFunctions.colorShape([locatorShp], 4)
+        attributeFunctions.lockAndHideTransforms(rivet)
+    cmds.select(cl=True)
 
-    #    clean tmp stuff
-    cmds.delete([cpInfo, surfaceDup, tmpLoc])
+    return node, rivetList
 
-    return rivetList
+def readBinding(node):
+    '''
+    meshBinding.Binding stored on a matrixRivet node, named after the rivets it
+    drives, to save and reuse on a later version of the mesh
+    '''
+    triangles, weights, references, names = [], [], [], []
+    for index in cmds.getAttr('%s.binding'%node, multiIndices=True) or []:
+        attr = '%s.binding[%d]'%(node, index)
+        triangles.append(cmds.getAttr(attr+'.bindingVertices')[0])
+        weights.append(cmds.getAttr(attr+'.bindingWeights')[0])
+        references.append(cmds.getAttr(attr+'.bindingReference'))
+        rivets = cmds.listConnections('%s.outMatrix[%d]'%(node, index), s=False, d=True) or [None]
+        names.append(rivets[0])
+
+    topologyKey = None
+    meshes = cmds.listConnections('%s.inMesh'%node, s=True, d=False, shapes=True) or []
+    if meshes:
+        topologyKey = surfaceFunctions.meshTopologyFor(meshes[0]).key()
+    return meshBinding.Binding(triangles, weights, references=references, names=names, topology=topologyKey)
 
 @author('g.barlier')
 def getClosestUVValuesOnMesh(shape, coordinates, offset=False):
@@ -220,22 +380,9 @@ def getClosestUVValuesOnMesh(shape, coordinates, offset=False):
     #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     #    get uv values for closest point
 
-    #    mesh case
+    #    mesh case, the mesh BVH is cached until the mesh changes
     if shape.asMObject().hasFn(OpenMaya.MFn.kMesh):
-
-        #    make float2 api array...
-        pArray = [0,0]
-        x1 = OpenMaya.MScriptUtil()
-        x1.createFromList( pArray, 2 )
-        uvPoint = x1.asFloat2Ptr()
-
-        #    get values
-        shape.asMFnMesh().getUVAtPoint(pt, uvPoint)
-
-        #    get float values from float2 api array ...
-        u = OpenMaya.MScriptUtil.getFloat2ArrayItem( uvPoint, 0, 0 )
-        v = OpenMaya.MScriptUtil.getFloat2ArrayItem( uvPoint, 0, 1 )
-
+        u, v = surfaceFunctions.closestUVs(shape.fullName(), [[pt.x, pt.y, pt.z]])[0]
         return u, v
 
 #    #    nurbs case
@@ -261,57 +408,12 @@ def getOffsetedMPointOnMFnMesh(mfnMesh, mPoint, factor=0.001):
     '''
     return offested MPoint coordinate on face
     to prevent geoConstraint orient bug on edge of face
-    '''
-    #    get closest face
-    polyInt = OpenMaya.MScriptUtil().asIntPtr()
-    pt = OpenMaya.MPoint()
-    mfnMesh.getClosestPoint( mPoint, pt, OpenMaya.MSpace.kObject, polyInt)
-    if polyInt == -1:
-        print 'unexpected poly int'
-        return
-
-    faceIndex = OpenMaya.MScriptUtil.getIntArrayItem(polyInt, 0)
-
-    #    get face iterator
-    polyIt = OpenMaya.MItMeshPolygon(mfnMesh.object())
-    prevIndex = OpenMaya.MScriptUtil().asIntPtr()
-    polyIt.setIndex(faceIndex, prevIndex)
 
-    #    get face vertices
-    vtxArray = OpenMaya.MIntArray()
-    polyIt.getVertices(vtxArray)
-
-    #    get closest vtx to point
-    minDist = 10e32
-    closestIndex = -1
-    ptArray = list()
-    for i in range(vtxArray.length()):
-        vtxIndex = vtxArray[i]
-
-        vtxPt = OpenMaya.MPoint()
-        mfnMesh.getPoint(vtxIndex, vtxPt)
-        ptArray.append(vtxPt)
-
-        distance = vtxPt.distanceTo(mPoint)
-        if distance < minDist:
-            minDist = distance
-            closestIndex = i
-
-    #    define closest vtx edge vector
-    if closestIndex+1 >= vtxArray.length():
-        vec1 = ptArray[0]-ptArray[closestIndex]
-    else:
-        vec1 = ptArray[closestIndex+1]-ptArray[closestIndex]
-
-    vec2 = ptArray[closestIndex-1]-ptArray[closestIndex]
-
-    #    get offset vector
-    offsetVector = vec1*vec1.length()*factor + vec2*vec2.length()*factor
-
-    #    apply offset to input MPoint
-    resultPt = mPoint + offsetVector
-
-    return resultPt
+    the face lists and points come from the mesh topology cache, use
+    surfaceFunctions.offsetPoints to offset many points at once
+    '''
+    x, y, z = surfaceFunctions.offsetPoints(mfnMesh.fullPathName(), [(mPoint.x, mPoint.y, mPoint.z)], factor)[0]
+    return OpenMaya.MPoint(x, y, z)
 
 
 
@@ -321,7 +423,7 @@ def getOffsetedMPointOnMFnMesh(mfnMesh, mPoint, factor=0.001):
 # #Utility Functions  ---
 #===============================================================================
 @author('g.barlier')
-def getUVvalues(objList, surfaceShp):
+def getUVvalues(objList, surfaceShp, binding=None):
     '''
     returns a list of UV values in the form [[u1, v1], [u2, v2], ....etc]
 
@@ -330,6 +432,13 @@ def getUVvalues(objList, surfaceShp):
 
     this code was extracted from the makeRivetFromList function, to be able to be used with other nodes than follicle
     e.g. arrayGeoConstraint
+
+    objList can also be an array of world space positions (N,3). All the points are
+    solved in one pass over the surface data (see surfaceFunctions.closestUVs),
+    nurbsSurface uvs are normalized like follicles expect.
+
+    binding: a meshBinding file or Binding with uvs, solved offline by
+    general.offlineSolve for a mesh of the same topology, to use instead
     '''
 
     #    check surface
@@ -337,73 +446,36 @@ def getUVvalues(objList, surfaceShp):
     if not surfaceShp:
         return None
 
-    #    duplicate/freeze surface (closest point on surface doesn't take into account surface transformations)
-    surfaceDup  =   cmds.duplicate(surface, n=surface+'_tmpRivetFreezedDup')[0]
-    attributeFunctions.lockAndHideTransforms(surfaceDup, unlock=True)
-    if cmds.listRelatives(surfaceDup, p=True):
-        cmds.parent(surfaceDup, w=True)
-    cmds.makeIdentity(surfaceDup, a=True)
-    surfaceDupShp   =   cmds.listRelatives(surfaceDup, s=True, ni=True)[0]
-
-    #    create tmp loc for objection position
-    tmpLocShp   =   cmds.createNode('locator')
-    tmpLoc      =   cmds.listRelatives(tmpLocShp, p=True)[0]
-
-    tmpLoc      =   cmds.rename(tmpLoc, 'tmpRivetClosestPointLoc')
-    tmpLocShp   =   cmds.listRelatives(tmpLoc, s=True)[0]#freaking non object cmds ... :/
-
-    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    #    position informations
-    normalizeUV     =   False
-    uRange          =   None
-    vRange          =   None
-
-    #    mesh case
-    if cmds.nodeType(surfaceShp) == 'mesh':
-        #    create/connect closest point on mesh info
-        cpInfo  =   cmds.createNode('closestPointOnMesh', n='tmpRivetMeasure_CPOM')
-        cmds.connectAttr('%s.outMesh'%surfaceDupShp, '%s.inMesh'%cpInfo)
-        cmds.connectAttr('%s.worldPosition'%tmpLocShp, '%s.inPosition'%cpInfo)
-
-    #    nurbsSurface case
-    if cmds.nodeType(surfaceShp) == 'nurbsSurface':
-        #    create/connect closest point on surface info
-        cpInfo    =   cmds.createNode('closestPointOnSurface', n='tmpRivetMeasure_CPOS')
-        cmds.connectAttr(surfaceShp+'.local', cpInfo+'.inputSurface', f=True)
-        cmds.connectAttr(tmpLocShp+'.worldPosition', cpInfo+'.inPosition', f=True)
+    if binding is not None:
+        return _bindingUVs(binding, surfaceShp, len(objList) if objList is not None else None).tolist()
 
-        normalizeUV =   True
-        uRange      =   cmds.getAttr(surfaceShp+'.minMaxRangeU')[0]
-        vRange      =   cmds.getAttr(surfaceShp+'.minMaxRangeV')[0]
+    return surfaceFunctions.closestUVs(surfaceShp, objList).tolist()
 
-    #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    #    create rivet for selected objects
-    uvValues   =   []
-
-    for i in range(len(objList)):
-        obj = objList[i]
-
-        #    place tmpLoc
-        cmds.xform(tmpLoc, ws=True, t=cmds.xform(obj, q=True, ws=True, rp=True))
-
-        #    define UV coords
-        uCoord  =   cmds.getAttr(cpInfo+'.u')
-        vCoord  =   cmds.getAttr(cpInfo+'.v')
-
-        if normalizeUV:
-            #    follicles on nurbsSurfaces use normalized UV
-            uCoord  =   abs((uCoord-uRange[0])/(uRange[1]-uRange[0]))
-            vCoord  =   abs((vCoord-vRange[0])/(vRange[1]-vRange[0]))
-
-        uvValues.append([uCoord, vCoord])
-    #    clean tmp stuff
-    cmds.delete([cpInfo, surfaceDup, tmpLoc])
-
-    return uvValues
+def _bindingUVs(binding, surfaceShp, count=None):
+    '''
+    uvs of a binding (file path or meshBinding.Binding) checked against surfaceShp
+    '''
+    if isinstance(binding, basestring):
+        binding = meshBinding.load(binding)
+    if binding.uvs is None:
+        raise Exception, "the binding has no uvs, it was solved on a mesh without uvs"
+    if not binding.matches(surfaceFunctions.meshTopologyFor(surfaceShp).key()):
+        raise Exception, "the binding was made on a mesh with a different topology than %s" %surfaceShp
+    if count is not None and count != len(binding):
+        raise Exception, "the binding holds %d points, %d expected" %(len(binding), count)
+    return binding.uvs
 
 @author('g.barlier')
-def meshToJointArray(mesh, parent=None, compIndexList=None):
-    '''Create joint for every vertex on mesh'''
+def meshToJointArray(mesh, parent=None, compIndexList=None, bulk=False, chunkSize=BULK_CHUNK_SIZE):
+    '''
+    Create joint for every vertex on mesh
+
+    Options:
+    -bulk (bool): read all the points at once, solve all the uvs in one batch and
+                  create the joints and their nodes in modifier transactions of
+                  chunkSize vertices, the progress window updates and can be
+                  cancelled between chunks
+    '''
     #    sanity check
     if not dp.objExists(mesh):
         sys.stderr.write('! meshToJointArray() -> input %s not found, aborting\n'%unicode(mesh))
@@ -459,6 +531,10 @@ def meshToJointArray(mesh, parent=None, compIndexList=None):
     baseJntName = nameFunctions.changeType(mesh.name(), 'jnt').split(':')[-1]
     jointList = dp.DependNodeArray()
     arrayIndex = arrayGeoCst.getAttr('uValue', size=True)
+    if bulk:
+        return _meshToJointArrayBulk(shape, arrayGeoCst, parent, indexList, vtxCount, baseJntName, arrayIndex,
+                                     jointList, pWin if pWinState else None, chunkSize)
+
     for i in indexList:
         #    update feedback ui
         if pWinState:
@@ -521,10 +597,75 @@ def meshToJointArray(mesh, parent=None, compIndexList=None):
     return jointList
 
 
-def meshToJointArrayFollicle(mesh, parent=None, compIndexList=None):
+def _meshToJointArrayBulk(shape, arrayGeoCst, parent, indexList, vtxCount, baseJntName, arrayIndex, jointList,
+                          pWin, chunkSize):
+    '''
+    bulk mode of meshToJointArray, see there
+    '''
+    #    all points in one read, all uvs in one batch
+    shapeName = shape.fullName()
+    points = surfaceFunctions.meshTopologyFor(shapeName).points[list(indexList)]
+    points = surfaceFunctions.offsetPoints(shapeName, surfaceFunctions.objectToWorld(shapeName, points))
+    uvs = surfaceFunctions.closestUVs(shapeName, points)
+
+    invalid = ~((uvs > 0) & (uvs < 1)).all(axis=1)
+    for i in [index for index, bad in zip(indexList, invalid) if bad]:
+        sys.stdout.write('#* meshToJointArray() -> invalid u/v for component %d of %s, clamping\n'%(i, shape.name()))
+    uvs = uvs.clip(0.001, 1)
+
+    #    one transaction per chunk, the registry keeps the names unique across them
+    registry = generalApi.NameRegistry()
+    parentName = parent.name() if parent else None
+    padding = len(unicode(vtxCount))
+    for start in range(0, len(indexList), chunkSize):
+        if pWin:
+            if pWin.isCancelled():
+                sys.stdout.write('#* meshToJointArray() -> cancelled after %d of %d components\n'%(start, vtxCount))
+                break
+            pWin.setProgressStatus('processing components %d-%d (%d/%d)'%(indexList[start], indexList[min(start+chunkSize, len(indexList))-1],
+                                                                          start, vtxCount))
+
+        tx = dgTransaction.Transaction(registry)
+        names = []
+        for j in range(start, min(start+chunkSize, len(indexList))):
+            i = indexList[j]
+            agcIndex = arrayIndex + j
+            tx.setAttr('%s.uValue[%d]'%(arrayGeoCst, agcIndex), uvs[j][0], l=True)
+            tx.setAttr('%s.vValue[%d]'%(arrayGeoCst, agcIndex), uvs[j][1], l=True)
+
+            #   create and connect joint
+            jnt = nameFunctions.addDescriptionToName(baseJntName, unicode(i).zfill(padding))
+            jnt = tx.createNode('joint', n=jnt, p=parentName)
+            multMat = tx.createNode('multMatrix', n=nameFunctions.changeType(jnt, 'mm'))
+            decompMat = tx.createNode('decomposeMatrix', n=nameFunctions.changeType(jnt, 'dm'))
+            tx.connectAttr('%s.outMatrices[%d]'%(arrayGeoCst, agcIndex), '%s.matrixIn[0]'%multMat)
+            tx.connectAttr('%s.parentInverseMatrix'%jnt, '%s.matrixIn[1]'%multMat)
+            tx.connectAttr('%s.matrixSum'%multMat, '%s.inputMatrix'%decompMat)
+            tx.connectAttr('%s.outputTranslate'%decompMat, '%s.t'%jnt)
+            tx.connectAttr('%s.outputRotate'%decompMat, '%s.r'%jnt)
+            names.append(jnt)
+        tx.apply()
+
+        for jnt in names:
+            jointList.append(dp.DependNode(jnt))
+        if pWin:
+            pWin.advanceProgress(len(names))
+
+    if pWin:
+        pWin.endProgress()
+
+    return jointList
+
+
+def meshToJointArrayFollicle(mesh, parent=None, compIndexList=None, mode='follicle', binding=None):
     '''
     Create joint for every vertex on mesh
     Follicle solution since the geoCosntraint orientation is not reliable enough...
+
+    mode 'matrix' binds the vertices to their triangles and rivets the joints
+    with one matrixRivet node (see matrixRivets), binding reuses a saved one.
+    In follicle mode the uvs of binding (see general.offlineSolve) replace the
+    closest uv search.
     '''
     #    sanity check
     if not dp.objExists(mesh):
@@ -561,6 +702,12 @@ def meshToJointArrayFollicle(mesh, parent=None, compIndexList=None):
     #    parse vtx
     baseJntName = nameFunctions.changeType(mesh.name(), 'jnt').split(':')[-1]
     jointList = dp.DependNodeArray()
+    if mode == 'matrix':
+        return _meshToJointArrayMatrix(shape, parent, indexList, vtxCount, baseJntName, jointList, binding)
+    uvs = None
+    if binding is not None:
+        uvs = _bindingUVs(binding, shape.fullName(), len(indexList))
+
     arrayIndex=0
     for i in indexList:
         #    update feedback ui
@@ -568,11 +715,13 @@ def meshToJointArrayFollicle(mesh, parent=None, compIndexList=None):
 #            pWin.setProgressStatus( 'processing component %d (%d/%d)'%(i, arrayIndex, vtxCount))
 #            pWin.advanceProgress( 1 )
 
-        #    get cv coordinates
-        cvPos = dp.xform('%s.vtx[%d]'%(shape, i), q=True, t=True, ws=True)
-
         #    set geoCosntraint values
-        u,v = getClosestUVValuesOnMesh(shape, cvPos, offset=True)
+        if uvs is not None:
+            u,v = uvs[arrayIndex]
+        else:
+            #    get cv coordinates
+            cvPos = dp.xform('%s.vtx[%d]'%(shape, i), q=True, t=True, ws=True)
+            u,v = getClosestUVValuesOnMesh(shape, cvPos, offset=True)
 
         if not ( (0<u<1) and (0<v<1) ):
             sys.stdout.write('#* meshToJointArray() -> invalid u/v for component %d of %s, clamping\n'%(i, shape.name()))
@@ -597,6 +746,29 @@ def meshToJointArrayFollicle(mesh, parent=None, compIndexList=None):
 
     return jointList
 
+def _meshToJointArrayMatrix(shape, parent, indexList, vtxCount, baseJntName, jointList, binding):
+    '''
+    matrix mode of meshToJointArrayFollicle, see there
+    '''
+    jntNames = [nameFunctions.addDescriptionToName(baseJntName, unicode(i).zfill(len(unicode(vtxCount)))) for i in indexList]
+    rivetNames = [nameFunctions.addDescriptionToNameFix(jnt, 'Rivet') for jnt in jntNames]
+    shapeName = shape.fullName()
+    points = None
+    if binding is None:
+        points = surfaceFunctions.meshTopologyFor(shapeName).points[list(indexList)]
+        points = surfaceFunctions.objectToWorld(shapeName, points)
+    else:
+        if isinstance(binding, basestring):
+            binding = meshBinding.load(binding)
+        if len(binding) != len(jntNames):
+            raise Exception, "meshToJointArrayFollicle: the binding holds %d vertices, %d expected" %(len(binding), len(jntNames))
+    rivets = matrixRivets(shapeName, points, baseName=baseJntName, names=rivetNames,
+                          p=parent.name() if parent else None, binding=binding)[1]
+
+    for jnt, rivet in zip(jntNames, rivets):
+        jointList.append(dp.createNode('joint', n=jnt, p=rivet))
+    return jointList
+
 #===============================================================================
 #    old stuff    ---
 #===============================================================================
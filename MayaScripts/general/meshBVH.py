@@ -0,0 +1,298 @@
+'''
+Bounding volume hierarchy over the triangles of a mesh
+
+Pure python and numpy, no maya needed. Built once from the point, triangle and
+uv arrays of a mesh, it answers closest point queries for a whole array of
+points at once:
+
+    bvh = meshBVH.TriangleBVH(points, triangles, uvs, triangleUVs, triangleFaces)
+    closest, triangleIds, weights = bvh.closestPoints(queryPoints)
+    uvs = bvh.uvsAt(triangleIds, weights)
+
+    hits = bvh.closest(queryPoints)
+    hits.points, hits.faces, hits.triangles, hits.weights, hits.uvs
+
+points is (P,3), triangles (T,3) point indices, uvs (U,2) and triangleUVs (T,3)
+uv indices of every triangle corner, triangleFaces (T,) the polygon every
+triangle comes from. weights are the barycentric weights of the closest point
+on its triangle, in the order of the triangle corners.
+
+loadObj builds one from a wavefront obj file, so the queries can be run and
+tested without maya.
+
+The queries walk the tree for every query point together, each node is visited
+once with the query points that can still find something closer in it, so the
+python overhead grows with the nodes visited and not the number of points.
+'''
+
+import numpy
+
+LEAF_SIZE = 8
+
+
+class TriangleBVH(object):
+    def __init__(self, points, triangles, uvs=None, triangleUVs=None, triangleFaces=None, leafSize=LEAF_SIZE):
+        self.points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        self.triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+        self.uvs = None if uvs is None else numpy.asarray(uvs, dtype=numpy.float64).reshape(-1, 2)
+        self.triangleUVs = None
+        if triangleUVs is not None:
+            self.triangleUVs = numpy.asarray(triangleUVs, dtype=numpy.int64).reshape(-1, 3)
+        if triangleFaces is None:
+            triangleFaces = numpy.arange(len(self.triangles))
+        self.triangleFaces = numpy.asarray(triangleFaces, dtype=numpy.int64).reshape(-1)
+        if not len(self.triangles):
+            raise ValueError("TriangleBVH: the mesh has no triangles")
+
+        corners = self.points[self.triangles]
+        self.__a = corners[:, 0]
+        self.__b = corners[:, 1]
+        self.__c = corners[:, 2]
+        self.__build(corners, leafSize)
+
+    #Build++
+    def __build(self, corners, leafSize):
+        '''
+        Median split on the longest axis of the triangle centroids. Nodes are
+        kept in flat arrays, a leaf has a triangle range in self.__order, an
+        inner node the indices of its two children.
+        '''
+        centroids = corners.mean(axis=1)
+        lows, highs = corners.min(axis=1), corners.max(axis=1)
+        order = numpy.arange(len(corners))
+        boxMin, boxMax, children, ranges = [], [], [], []
+
+        stack = [(0, len(order), -1, 0)]
+        while stack:
+            start, end, parent, side = stack.pop()
+            node = len(boxMin)
+            if parent >= 0:
+                children[parent][side] = node
+            items = order[start:end]
+            boxMin.append(lows[items].min(axis=0))
+            boxMax.append(highs[items].max(axis=0))
+            children.append([-1, -1])
+            ranges.append((start, end))
+            if end - start <= leafSize:
+                continue
+
+            spread = centroids[items].max(axis=0) - centroids[items].min(axis=0)
+            axis = int(spread.argmax())
+            middle = (end - start) // 2
+            order[start:end] = items[numpy.argpartition(centroids[items, axis], middle)]
+            stack.append((start + middle, end, node, 1))
+            stack.append((start, start + middle, node, 0))
+
+        self.__order = order
+        self.__boxMin = numpy.array(boxMin)
+        self.__boxMax = numpy.array(boxMax)
+        self.__children = numpy.array(children, dtype=numpy.int64)
+        self.__ranges = numpy.array(ranges, dtype=numpy.int64)
+    #Build--
+
+    #Queries++
+    def closestPoints(self, queryPoints):
+        '''
+        Returns the closest points on the mesh (N,3), the index of the triangle
+        they are on (N,) and their barycentric weights on it (N,3)
+        '''
+        query = numpy.asarray(queryPoints, dtype=numpy.float64).reshape(-1, 3)
+        count = len(query)
+        bestDistance = numpy.full(count, numpy.inf)
+        bestTriangle = numpy.zeros(count, dtype=numpy.int64)
+        bestWeights = numpy.zeros((count, 3))
+
+        stack = [(0, numpy.arange(count))]
+        while stack:
+            node, active = stack.pop()
+            #    drop the points which already found something closer than this box
+            gap = numpy.maximum(self.__boxMin[node] - query[active], 0.0)
+            gap = numpy.maximum(gap, query[active] - self.__boxMax[node])
+            active = active[(gap * gap).sum(axis=1) < bestDistance[active]]
+            if not len(active):
+                continue
+
+            left, right = self.__children[node]
+            if left < 0:
+                start, end = self.__ranges[node]
+                self.__testLeaf(query, active, self.__order[start:end], bestDistance, bestTriangle, bestWeights)
+                continue
+
+            #    visit the nearer child first, it tightens bestDistance for the other one
+            if self.__centreDistance(left, query[active]) <= self.__centreDistance(right, query[active]):
+                stack.extend([(right, active), (left, active)])
+            else:
+                stack.extend([(left, active), (right, active)])
+
+        closest = (self.__a[bestTriangle] * bestWeights[:, 0:1] + self.__b[bestTriangle] * bestWeights[:, 1:2] +
+                   self.__c[bestTriangle] * bestWeights[:, 2:3])
+        return closest, bestTriangle, bestWeights
+
+    def closest(self, queryPoints):
+        '''
+        Closest points as a Hits, with the polygon ids and the uvs (None without uvs)
+        '''
+        points, triangleIds, weights = self.closestPoints(queryPoints)
+        uvs = None
+        if self.uvs is not None and self.triangleUVs is not None:
+            uvs = self.uvsAt(triangleIds, weights)
+        return Hits(points, self.triangleFaces[triangleIds], triangleIds, weights, uvs)
+
+    def uvsAt(self, triangleIds, weights):
+        '''
+        Interpolated uvs (N,2) of points given by triangle index and barycentric weights
+        '''
+        if self.uvs is None or self.triangleUVs is None:
+            raise ValueError("TriangleBVH: the mesh was built without uvs")
+        corners = self.uvs[self.triangleUVs[numpy.asarray(triangleIds)]]
+        return (corners * numpy.asarray(weights)[:, :, numpy.newaxis]).sum(axis=1)
+
+    def closestUVs(self, queryPoints):
+        closest, triangleIds, weights = self.closestPoints(queryPoints)
+        return self.uvsAt(triangleIds, weights)
+
+    def __centreDistance(self, node, points):
+        centre = (self.__boxMin[node] + self.__boxMax[node]) * 0.5
+        return ((points - centre) ** 2).sum(axis=1).mean()
+
+    def __testLeaf(self, query, active, triangles, bestDistance, bestTriangle, bestWeights):
+        points = query[active]
+        weights = closestWeights(points[:, numpy.newaxis], self.__a[triangles], self.__b[triangles], self.__c[triangles])
+        closest = (self.__a[triangles] * weights[..., 0:1] + self.__b[triangles] * weights[..., 1:2] +
+                   self.__c[triangles] * weights[..., 2:3])
+        distance = ((closest - points[:, numpy.newaxis]) ** 2).sum(axis=2)
+        nearest = distance.argmin(axis=1)
+        rows = numpy.arange(len(active))
+        found = distance[rows, nearest]
+        better = found < bestDistance[active]
+        update = active[better]
+        bestDistance[update] = found[better]
+        bestTriangle[update] = triangles[nearest[better]]
+        bestWeights[update] = weights[rows[better], nearest[better]]
+    #Queries--
+
+
+class Hits(object):
+    '''
+    Result of TriangleBVH.closest, one row per query point
+    '''
+    def __init__(self, points, faces, triangles, weights, uvs):
+        self.points = points
+        self.faces = faces
+        self.triangles = triangles
+        self.weights = weights
+        self.uvs = uvs
+
+    def __len__(self):
+        return len(self.points)
+
+
+def fromPolygons(points, counts, vertexIds, uvs=None, uvIds=None):
+    '''
+    TriangleBVH from polygon lists, fan triangulated. counts are the vertex
+    count of every polygon, vertexIds and uvIds their corners one polygon after
+    the other. A uv id of -1 is a corner without uv.
+    '''
+    return TriangleBVH(*triangleArrays(points, counts, vertexIds, uvs, uvIds))
+
+def triangleArrays(points, counts, vertexIds, uvs=None, uvIds=None):
+    '''
+    The TriangleBVH arguments (points, triangles, uvs, triangleUVs,
+    triangleFaces) of polygon lists, see fromPolygons
+    '''
+    counts = numpy.asarray(counts, dtype=numpy.int64)
+    starts = numpy.concatenate([[0], numpy.cumsum(counts)[:-1]]).astype(numpy.int64)
+    fans = counts - 2
+    faces = numpy.repeat(numpy.arange(len(counts)), fans)
+    first = numpy.repeat(starts, fans)
+    step = numpy.arange(fans.sum()) - numpy.repeat(numpy.cumsum(fans) - fans, fans)
+    corners = numpy.stack([first, first + step + 1, first + step + 2], axis=1)
+
+    vertexIds = numpy.asarray(vertexIds, dtype=numpy.int64)
+    triangleUVs = None
+    if uvs is not None and uvIds is not None:
+        #    corners without uv point at an extra (0,0) uv at the end
+        uvs = numpy.concatenate([numpy.asarray(uvs, dtype=numpy.float64).reshape(-1, 2), [[0.0, 0.0]]])
+        uvIds = numpy.asarray(uvIds, dtype=numpy.int64)
+        triangleUVs = numpy.where(uvIds[corners] < 0, len(uvs) - 1, uvIds[corners])
+    else:
+        uvs = None
+    return numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3), vertexIds[corners], uvs, triangleUVs, faces
+
+def loadObj(path):
+    '''
+    TriangleBVH of the v, vt and f records of a wavefront obj file, all groups together
+    '''
+    return fromPolygons(*readObj(path))
+
+def readObj(path):
+    '''
+    Polygon lists (points, counts, vertexIds, uvs, uvIds) of a wavefront obj
+    file, uvs and uvIds are None without vt records
+    '''
+    points, uvs, counts, vertexIds, uvIds = [], [], [], [], []
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0] == "v":
+                points.append([float(value) for value in fields[1:4]])
+            elif fields[0] == "vt":
+                uvs.append([float(value) for value in fields[1:3]])
+            elif fields[0] == "f":
+                corners = [corner.split("/") for corner in fields[1:]]
+                counts.append(len(corners))
+                for corner in corners:
+                    #    obj indices start at 1, negative ones count back from the last
+                    vertex = int(corner[0])
+                    vertexIds.append(vertex - 1 if vertex > 0 else len(points) + vertex)
+                    uv = int(corner[1]) if len(corner) > 1 and corner[1] else 0
+                    uvIds.append(uv - 1 if uv > 0 else (len(uvs) + uv if uv < 0 else -1))
+    return points, counts, vertexIds, uvs if uvs else None, uvIds if uvs else None
+
+def closestWeights(p, a, b, c):
+    '''
+    Barycentric weights of the closest point on the triangles a, b, c to p,
+    all arrays broadcast against each other with xyz on the last axis
+    (Ericson, Real-Time Collision Detection 5.1.5)
+    '''
+    ab, ac, ap = b - a, c - a, p - a
+    d1, d2 = (ab * ap).sum(-1), (ac * ap).sum(-1)
+    bp = p - b
+    d3, d4 = (ab * bp).sum(-1), (ac * bp).sum(-1)
+    cp = p - c
+    d5, d6 = (ab * cp).sum(-1), (ac * cp).sum(-1)
+
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+    shape = numpy.broadcast(d1, va).shape
+    u, v, w = numpy.zeros(shape), numpy.zeros(shape), numpy.zeros(shape)
+    done = numpy.zeros(shape, dtype=bool)
+
+    def assign(mask, weightU, weightV, weightW):
+        mask = mask & ~done
+        u[mask], v[mask], w[mask] = weightU[mask], weightV[mask], weightW[mask]
+        done[mask] = True
+
+    zero, one = numpy.zeros(shape), numpy.ones(shape)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        #    vertex regions
+        assign((d1 <= 0) & (d2 <= 0), one, zero, zero)
+        assign((d3 >= 0) & (d4 <= d3), zero, one, zero)
+        assign((d6 >= 0) & (d5 <= d6), zero, zero, one)
+        #    edge regions
+        t = numpy.broadcast_to(d1 / (d1 - d3), shape)
+        assign((vc <= 0) & (d1 >= 0) & (d3 <= 0), 1 - t, t, zero)
+        t = numpy.broadcast_to(d2 / (d2 - d6), shape)
+        assign((vb <= 0) & (d2 >= 0) & (d6 <= 0), 1 - t, zero, t)
+        t = numpy.broadcast_to((d4 - d3) / ((d4 - d3) + (d5 - d6)), shape)
+        assign((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0), zero, 1 - t, t)
+        #    face region, degenerate triangles fall back to their first corner
+        total = va + vb + vc
+        safe = numpy.where(total == 0, 1.0, total)
+        inside = numpy.broadcast_to(total != 0, shape)
+        assign(inside, va / safe, vb / safe, vc / safe)
+        assign(numpy.ones(shape, dtype=bool), one, zero, zero)
+    return numpy.stack([u, v, w], axis=-1)
@@ -0,0 +1,172 @@
+'''
+Barycentric bindings of points to the triangles of a mesh
+
+Pure python and numpy, no maya needed. A binding is the three point indices of
+a triangle and the barycentric weights of the bound point on it, so following
+the mesh is a weighted sum of three points, with no closest point or uv search
+after bind time:
+
+    triangles, weights, faces = meshBinding.bind(bvh, points)
+    matrices = meshBinding.frames(deformedPoints, triangles, weights)
+
+frames returns maya (row vector) matrices, the translation is the bound point,
+Y the triangle normal, X the first triangle edge and Z their cross product.
+
+A Binding keeps the bindings together with their reference matrices, the bind
+time matrices of the bound objects relative to their triangle frames, the
+names they were made for, their uvs when the mesh has some (for follicles) and
+the topology key of the mesh:
+
+    binding = meshBinding.capture(bvh, points, matrices, names, topology.key())
+    binding.matrices(deformedPoints)
+    binding.save("head.binding")
+    binding = meshBinding.load("head.binding")
+    binding.matches(otherTopology.key())
+
+The file is json, the arrays as nested lists, and is valid for any mesh with
+the same topology key: same point count, same faces and the same vertex order.
+'''
+
+import json
+import numpy
+
+FORMAT = "meshBinding"
+VERSION = 1
+
+
+class Binding(object):
+    def __init__(self, triangles, weights, faces=None, references=None, names=None, topology=None, uvs=None):
+        self.triangles = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+        self.weights = numpy.asarray(weights, dtype=numpy.float64).reshape(-1, 3)
+        count = len(self.triangles)
+        self.faces = numpy.full(count, -1, dtype=numpy.int64) if faces is None else \
+            numpy.asarray(faces, dtype=numpy.int64).reshape(-1)
+        self.references = numpy.tile(numpy.identity(4), (count, 1, 1)) if references is None else \
+            numpy.asarray(references, dtype=numpy.float64).reshape(-1, 4, 4)
+        self.names = list(names) if names is not None else [None] * count
+        self.topology = tuple(topology) if topology is not None else None
+        self.uvs = None if uvs is None else numpy.asarray(uvs, dtype=numpy.float64).reshape(-1, 2)
+        if self.uvs is not None and len(self.uvs) != count:
+            raise ValueError("Binding: %d uvs for %d bindings" %(len(self.uvs), count))
+        if not (len(self.weights) == len(self.faces) == len(self.references) == len(self.names) == count):
+            raise ValueError("Binding: triangles, weights, faces, references and names differ in length")
+
+    def __len__(self):
+        return len(self.triangles)
+
+    def positions(self, points):
+        '''
+        The bound points (N,3) on the mesh points (P,3)
+        '''
+        return positions(points, self.triangles, self.weights)
+
+    def matrices(self, points):
+        '''
+        (N,4,4) matrices of the bound objects on the mesh points (P,3), their
+        reference matrices carried by the triangle frames
+        '''
+        return numpy.einsum('nij,njk->nik', self.references, frames(points, self.triangles, self.weights))
+
+    def referenced(self):
+        '''
+        Indices of the bindings whose reference matrix is not the identity
+        '''
+        return numpy.nonzero((self.references != numpy.identity(4)).any(axis=2).any(axis=1))[0].tolist()
+
+    def matches(self, topology):
+        '''
+        True if the binding can be used on a mesh of topology key topology,
+        a binding without a key matches any mesh with enough points
+        '''
+        if self.topology is None:
+            return not len(self) or self.triangles.max() < topology[0]
+        return tuple(topology) == self.topology
+
+    #File++
+    def save(self, path):
+        data = {'format':FORMAT, 'version':VERSION,
+                'topology':list(self.topology) if self.topology else None,
+                'names':self.names,
+                'triangles':self.triangles.tolist(),
+                'weights':self.weights.tolist(),
+                'faces':self.faces.tolist(),
+                'references':self.references.reshape(-1, 16).tolist(),
+                'uvs':None if self.uvs is None else self.uvs.tolist()}
+        with open(path, 'w') as f:
+            json.dump(data, f)
+    #File--
+
+
+def load(path):
+    '''
+    Binding saved to path with Binding.save
+    '''
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('format') != FORMAT:
+        raise ValueError("%s is not a mesh binding file" %path)
+    if data.get('version', 0) > VERSION:
+        raise ValueError("%s is a version %s mesh binding, newer than this reader" %(path, data['version']))
+    return Binding(data['triangles'], data['weights'], data['faces'], data['references'],
+                   data['names'], data['topology'], data.get('uvs'))
+
+def capture(bvh, points, matrices=None, names=None, topology=None):
+    '''
+    Binding of points (N,3) to their closest triangles on a meshBVH.TriangleBVH.
+    matrices (N,4,4) are the bind matrices of the bound objects, the rivets get
+    the plain triangle frames without them.
+    '''
+    hits = bvh.closest(points)
+    triangles = bvh.triangles[hits.triangles]
+    references = None
+    if matrices is not None:
+        rest = _rigidInverse(frames(bvh.points, triangles, hits.weights))
+        references = numpy.einsum('nij,njk->nik', numpy.asarray(matrices, dtype=numpy.float64).reshape(-1, 4, 4), rest)
+    return Binding(triangles, hits.weights, hits.faces, references, names, topology, hits.uvs)
+
+def bind(bvh, points):
+    '''
+    Binds points (N,3) to their closest triangles on a meshBVH.TriangleBVH.
+    Returns the triangle point indices (N,3), the weights (N,3) and the polygon
+    ids (N,).
+    '''
+    hits = bvh.closest(points)
+    return bvh.triangles[hits.triangles], hits.weights, hits.faces
+
+def positions(points, triangles, weights):
+    '''
+    The bound points (N,3) on the mesh points (P,3)
+    '''
+    corners = numpy.asarray(points, dtype=numpy.float64)[numpy.asarray(triangles)]
+    return (corners * numpy.asarray(weights)[:, :, numpy.newaxis]).sum(axis=1)
+
+def frames(points, triangles, weights):
+    '''
+    (N,4,4) matrices of the bound points on the mesh points (P,3)
+    '''
+    corners = numpy.asarray(points, dtype=numpy.float64)[numpy.asarray(triangles)]
+    edge = corners[:, 1] - corners[:, 0]
+    normal = _normalized(numpy.cross(edge, corners[:, 2] - corners[:, 0]))
+    #    the edge, made orthogonal to the normal
+    xAxis = _normalized(edge - normal * (edge * normal).sum(axis=1)[:, numpy.newaxis])
+
+    matrices = numpy.zeros((len(corners), 4, 4))
+    matrices[:, 0, :3] = xAxis
+    matrices[:, 1, :3] = normal
+    matrices[:, 2, :3] = numpy.cross(xAxis, normal)
+    matrices[:, 3, :3] = (corners * numpy.asarray(weights)[:, :, numpy.newaxis]).sum(axis=1)
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+def _normalized(vectors):
+    lengths = numpy.sqrt((vectors ** 2).sum(axis=1))[:, numpy.newaxis]
+    #    degenerate triangles keep a zero axis rather than nans
+    return vectors / numpy.where(lengths > 0.0, lengths, 1.0)
+
+def _rigidInverse(matrices):
+    #    transposed rotation, the frames are orthonormal (or zero when degenerate)
+    inverse = numpy.zeros_like(matrices)
+    inverse[:, :3, :3] = matrices[:, :3, :3].transpose(0, 2, 1)
+    inverse[:, 3, :3] = -numpy.einsum('ni,nij->nj', matrices[:, 3, :3], inverse[:, :3, :3])
+    inverse[:, 3, 3] = 1.0
+    return inverse
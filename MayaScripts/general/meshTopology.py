@@ -0,0 +1,61 @@
+'''
+Polygon topology of a mesh as numpy arrays
+
+Pure python and numpy, no maya needed. Holds the points and the face-vertex
+lists of a mesh, padded into a (F, maxCount) table so per face work runs over
+all the faces or query points at once:
+
+    topology = meshTopology.MeshTopology(points, counts, vertexIds)
+    offsets = topology.offsetPoints(queryPoints, faceIds)
+
+counts are the vertex count of every face, vertexIds their vertices one face
+after the other, like MFnMesh.getVertices.
+'''
+
+import hashlib
+import numpy
+
+
+class MeshTopology(object):
+    def __init__(self, points, counts, vertexIds):
+        self.points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        self.counts = numpy.asarray(counts, dtype=numpy.int64)
+        vertexIds = numpy.asarray(vertexIds, dtype=numpy.int64)
+
+        #    face-vertex table, -1 past the end of a face
+        self.starts = numpy.concatenate([[0], numpy.cumsum(self.counts)[:-1]]).astype(numpy.int64)
+        columns = numpy.arange(self.counts.max() if len(self.counts) else 0)
+        self.valid = columns < self.counts[:, numpy.newaxis]
+        self.faceVertices = numpy.full(self.valid.shape, -1, dtype=numpy.int64)
+        self.faceVertices[self.valid] = vertexIds
+
+    def key(self):
+        '''
+        (point count, face count, hash of the face-vertex lists), equal for
+        meshes whose vertex ids mean the same thing
+        '''
+        return (len(self.points), len(self.counts),
+                hashlib.md5(self.faceVertices.astype(numpy.int32).tobytes()).hexdigest())
+
+    def offsetPoints(self, queryPoints, faceIds, factor=0.001):
+        '''
+        Moves every query point off the edges of its face: towards the inside
+        along the two face edges of the face vertex closest to it, each scaled
+        by its own length and factor. Returns (N,3).
+        '''
+        query = numpy.asarray(queryPoints, dtype=numpy.float64).reshape(-1, 3)
+        faceIds = numpy.asarray(faceIds, dtype=numpy.int64)
+        vertices = self.faceVertices[faceIds]
+        counts = self.counts[faceIds]
+        rows = numpy.arange(len(query))
+
+        distance = ((self.points[vertices] - query[:, numpy.newaxis]) ** 2).sum(axis=2)
+        distance[~self.valid[faceIds]] = numpy.inf
+        closest = distance.argmin(axis=1)
+
+        corner = self.points[vertices[rows, closest]]
+        nextEdge = self.points[vertices[rows, (closest + 1) % counts]] - corner
+        previousEdge = self.points[vertices[rows, (closest - 1) % counts]] - corner
+        nextLength = numpy.sqrt((nextEdge ** 2).sum(axis=1))[:, numpy.newaxis]
+        previousLength = numpy.sqrt((previousEdge ** 2).sum(axis=1))[:, numpy.newaxis]
+        return query + nextEdge * nextLength * factor + previousEdge * previousLength * factor
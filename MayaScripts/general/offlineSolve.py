@@ -0,0 +1,148 @@
+'''
+Offline closest uv solve for very large point sets, without maya
+
+Binds thousands of points to a mesh exported as a wavefront obj from plain
+python and numpy. The mesh arrays are written once to .npy files that every
+worker of a process pool memory maps, the points are split into chunks across
+the pool and every worker writes its results straight into memory mapped
+result arrays, so nothing big is pickled between the processes.
+
+    python -m general.offlineSolve C_head_GEO.obj lipPoints.txt -o lips.binding -j 8
+
+    from general import offlineSolve
+    binding = offlineSolve.solve("C_head_GEO.obj", points, names, processes=8)
+    binding.save("lips.binding")
+
+The result is a meshBinding file with the triangles, weights and uvs of the
+points and the topology key of the mesh. On the maya side it replaces the uv
+solve of hookFunctions.getUVvalues and meshToJointArrayFollicle (binding=...),
+for a mesh of the same topology. The points file is a .npy (N,3) array or a
+text file of "x y z" or "name x y z" lines.
+'''
+
+import os, sys, time, shutil, tempfile, argparse, multiprocessing
+import numpy
+
+from general import meshBVH
+from general import meshBinding
+from general import meshTopology
+
+CHUNK_SIZE = 2000
+
+#    TriangleBVH arguments, in order, as written for the workers
+_MESH_ARRAYS = ["points", "triangles", "uvs", "triangleUVs", "triangleFaces"]
+#    per point results: name, dtype, columns
+_RESULTS = [("triangles", numpy.int64, 3), ("weights", numpy.float64, 3), ("faces", numpy.int64, 1),
+            ("uvs", numpy.float64, 2)]
+
+#    state of a pool worker: its TriangleBVH, the query points and the result arrays
+_worker = {}
+
+
+def solve(meshPath, points, names=None, processes=None, chunkSize=CHUNK_SIZE, workDir=None):
+    '''
+    meshBinding.Binding of points (N,3) to the mesh of the obj file meshPath
+
+    processes = pool size, the cpu count by default, 1 solves in this process
+    workDir = where the memory mapped arrays go, the system temp dir by default
+    '''
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+    polygons = meshBVH.readObj(meshPath)
+    topology = meshTopology.MeshTopology(*polygons[:3]).key()
+    arrays = meshBVH.triangleArrays(*polygons)
+    hasUVs = arrays[2] is not None
+
+    directory = tempfile.mkdtemp(prefix="offlineSolve", dir=workDir)
+    try:
+        for name, array in zip(_MESH_ARRAYS, arrays):
+            if array is not None:
+                numpy.save(os.path.join(directory, name + ".npy"), array)
+        numpy.save(os.path.join(directory, "query.npy"), points)
+        for name, dtype, columns in _RESULTS:
+            numpy.lib.format.open_memmap(os.path.join(directory, "result_%s.npy" %name), mode="w+",
+                                         dtype=dtype, shape=(len(points), columns)).flush()
+
+        chunks = [(start, min(start + chunkSize, len(points))) for start in range(0, len(points), chunkSize)]
+        if processes == 1:
+            _initWorker(directory)
+            for chunk in chunks:
+                _solveChunk(chunk)
+            _worker.clear()
+        else:
+            pool = multiprocessing.Pool(processes, _initWorker, (directory,))
+            try:
+                pool.map(_solveChunk, chunks)
+            finally:
+                pool.close()
+                pool.join()
+
+        results = dict((name, numpy.array(numpy.load(os.path.join(directory, "result_%s.npy" %name))))
+                       for name, dtype, columns in _RESULTS)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return meshBinding.Binding(results["triangles"], results["weights"], results["faces"][:, 0], names=names,
+                               topology=topology, uvs=results["uvs"] if hasUVs else None)
+
+#Workers++
+def _initWorker(directory):
+    arrays = []
+    for name in _MESH_ARRAYS:
+        path = os.path.join(directory, name + ".npy")
+        arrays.append(numpy.load(path, mmap_mode="r") if os.path.exists(path) else None)
+    _worker["bvh"] = meshBVH.TriangleBVH(*arrays)
+    _worker["query"] = numpy.load(os.path.join(directory, "query.npy"), mmap_mode="r")
+    _worker["results"] = dict((name, numpy.load(os.path.join(directory, "result_%s.npy" %name), mmap_mode="r+"))
+                              for name, dtype, columns in _RESULTS)
+
+def _solveChunk(chunk):
+    start, end = chunk
+    bvh = _worker["bvh"]
+    results = _worker["results"]
+    hits = bvh.closest(_worker["query"][start:end])
+    results["triangles"][start:end] = bvh.triangles[hits.triangles]
+    results["weights"][start:end] = hits.weights
+    results["faces"][start:end, 0] = hits.faces
+    if hits.uvs is not None:
+        results["uvs"][start:end] = hits.uvs
+    for array in results.values():
+        array.flush()
+    return end - start
+#Workers--
+
+def readPoints(path):
+    '''
+    Points (N,3) and names (None when the file has none) of a points file
+    '''
+    if path.endswith(".npy"):
+        return numpy.load(path).reshape(-1, 3), None
+    points, names = [], []
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            if len(fields) == 4:
+                names.append(fields.pop(0))
+            points.append([float(value) for value in fields[:3]])
+    return numpy.array(points).reshape(-1, 3), names if len(names) == len(points) else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve the closest triangles and uvs of points on an obj mesh")
+    parser.add_argument('mesh', help="wavefront obj file of the mesh")
+    parser.add_argument('points', help=".npy array or text file of the points")
+    parser.add_argument('-o', '--output', required=True, help="mesh binding file to write")
+    parser.add_argument('-j', '--processes', type=int, default=None, help="pool size, the cpu count by default")
+    parser.add_argument('--chunk', type=int, default=CHUNK_SIZE, help="points per pool task")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    points, names = readPoints(args.points)
+    binding = solve(args.mesh, points, names, args.processes, args.chunk)
+    binding.save(args.output)
+    sys.stdout.write("%d points bound in %.2fs -> %s\n" %(len(binding), time.time() - start, args.output))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+'''
+Space switch maths of the spaceSwitch node
+
+Pure python and numpy, no maya needed. A space is a driver world matrix and
+the offset of the driven object in it, (4,4) maya (row vector) matrices, the
+driven world matrix in space i is offsets[i] * drivers[i]:
+
+    world = spaceBlend.evaluate(drivers, offsets, 2)
+    world = spaceBlend.evaluate(drivers, offsets, 1.25, smooth=True)
+
+space picks the closest space, with smooth it blends the two spaces around it,
+translate and scale linearly and rotate along the shortest arc. pointOnly
+spaces only carry a position, the driver position plus the offset translation
+in world space, like pointSwitch.
+'''
+
+import numpy
+
+_EPSILON = 1.0e-9
+
+
+def spaceMatrix(driver, offset, pointOnly=False):
+    '''
+    The driven world matrix in the space of driver
+    '''
+    driver = numpy.asarray(driver, dtype=numpy.float64).reshape(4, 4)
+    offset = numpy.asarray(offset, dtype=numpy.float64).reshape(4, 4)
+    if pointOnly:
+        matrix = numpy.identity(4)
+        matrix[3, :3] = driver[3, :3] + offset[3, :3]
+        return matrix
+    return numpy.dot(offset, driver)
+
+def pick(count, space, smooth=False):
+    '''
+    (index, next index or None, weight) of the spaces out of count that space
+    reads, clamped, the next one only when smooth and weight is not 0
+    '''
+    space = min(max(float(space), 0.0), count - 1.0)
+    if not smooth:
+        return int(round(space)), None, 0.0
+    lower = int(numpy.floor(space))
+    weight = space - lower
+    if weight < _EPSILON or lower + 1 >= count:
+        return lower, None, 0.0
+    return lower, lower + 1, weight
+
+def evaluate(drivers, offsets, space, smooth=False, pointOnly=False):
+    '''
+    The driven world matrix for space, an index in drivers (clamped), blended
+    between the spaces around it when smooth
+    '''
+    if not len(drivers):
+        return numpy.identity(4)
+    index, upper, weight = pick(len(drivers), space, smooth)
+    matrix = spaceMatrix(drivers[index], offsets[index], pointOnly)
+    if upper is None:
+        return matrix
+    return blend(matrix, spaceMatrix(drivers[upper], offsets[upper], pointOnly), weight)
+
+def blend(a, b, weight):
+    '''
+    a blended towards b by weight, shear is dropped
+    '''
+    translateA, rotateA, scaleA = _split(a)
+    translateB, rotateB, scaleB = _split(b)
+    rotation = _quaternionMatrix(_slerp(_quaternion(rotateA), _quaternion(rotateB), weight))
+    matrix = numpy.identity(4)
+    matrix[:3, :3] = rotation * (scaleA + (scaleB - scaleA) * weight)[:, numpy.newaxis]
+    matrix[3, :3] = translateA + (translateB - translateA) * weight
+    return matrix
+
+#Rotations++
+def _split(matrix):
+    '''
+    translate, orthonormal rotation (3,3) and scale of a matrix, a negative
+    determinant goes on the x scale
+    '''
+    matrix = numpy.asarray(matrix, dtype=numpy.float64).reshape(4, 4)
+    scale = numpy.sqrt((matrix[:3, :3] ** 2).sum(axis=1))
+    if numpy.linalg.det(matrix[:3, :3]) < 0:
+        scale[0] = -scale[0]
+    rotation = matrix[:3, :3] / numpy.where(numpy.abs(scale) > _EPSILON, scale, 1.0)[:, numpy.newaxis]
+    return matrix[3, :3].copy(), rotation, scale
+
+def _quaternion(rotation):
+    '''
+    (x, y, z, w) of an orthonormal rotation matrix
+    '''
+    m = rotation
+    trace = m[0, 0] + m[1, 1] + m[2, 2]
+    if trace > 0:
+        s = 0.5 / numpy.sqrt(trace + 1.0)
+        quaternion = [(m[2, 1] - m[1, 2]) * s, (m[0, 2] - m[2, 0]) * s, (m[1, 0] - m[0, 1]) * s, 0.25 / s]
+    elif m[0, 0] > m[1, 1] and m[0, 0] > m[2, 2]:
+        s = 2.0 * numpy.sqrt(1.0 + m[0, 0] - m[1, 1] - m[2, 2])
+        quaternion = [0.25 * s, (m[0, 1] + m[1, 0]) / s, (m[0, 2] + m[2, 0]) / s, (m[2, 1] - m[1, 2]) / s]
+    elif m[1, 1] > m[2, 2]:
+        s = 2.0 * numpy.sqrt(1.0 + m[1, 1] - m[0, 0] - m[2, 2])
+        quaternion = [(m[0, 1] + m[1, 0]) / s, 0.25 * s, (m[1, 2] + m[2, 1]) / s, (m[0, 2] - m[2, 0]) / s]
+    else:
+        s = 2.0 * numpy.sqrt(1.0 + m[2, 2] - m[0, 0] - m[1, 1])
+        quaternion = [(m[0, 2] + m[2, 0]) / s, (m[1, 2] + m[2, 1]) / s, 0.25 * s, (m[1, 0] - m[0, 1]) / s]
+    quaternion = numpy.array(quaternion)
+    return quaternion / numpy.linalg.norm(quaternion)
+
+def _quaternionMatrix(quaternion):
+    x, y, z, w = quaternion
+    return numpy.array([[1 - 2*(y*y + z*z), 2*(x*y - z*w), 2*(x*z + y*w)],
+                        [2*(x*y + z*w), 1 - 2*(x*x + z*z), 2*(y*z - x*w)],
+                        [2*(x*z - y*w), 2*(y*z + x*w), 1 - 2*(x*x + y*y)]])
+
+def _slerp(a, b, weight):
+    cosine = numpy.dot(a, b)
+    #    shortest arc
+    if cosine < 0:
+        b, cosine = -b, -cosine
+    if cosine > 1.0 - 1.0e-6:
+        quaternion = a + (b - a) * weight
+    else:
+        angle = numpy.arccos(cosine)
+        quaternion = (numpy.sin((1.0 - weight) * angle) * a + numpy.sin(weight * angle) * b) / numpy.sin(angle)
+    return quaternion / numpy.linalg.norm(quaternion)
+#Rotations--
@@ -0,0 +1,287 @@
+'''
+Closest point and uv queries on meshes and nurbs surfaces, in bulk
+
+Rather than moving a locator around under a closestPointOnMesh node, and
+paying a DG evaluation for every point, the mesh data is read once through the
+API and all the points are solved together against a meshBVH.TriangleBVH.
+
+    uvs = surfaceFunctions.closestUVs("C_head_GEOShape", ["L_lip_0_loc", "L_lip_1_loc"])
+    uvs = surfaceFunctions.closestUVs("C_head_GEO", numpy.array([[0, 10, 2], [1, 10, 2]]))
+
+Nurbs surface uvs are normalised to 0-1 like follicles expect, mesh uvs are
+returned as they are.
+
+The BVH and the topology of a mesh are cached in object space (meshBVHFor,
+meshTopologyFor) and shared by every caller until the mesh geometry is
+dirtied, its topology changes, it is deleted or the scene is cleared. World
+space queries go through the inverse world matrix of the mesh instead of a
+frozen copy of it, so moving the mesh does not rebuild anything:
+
+    local = surfaceFunctions.worldToObject("C_head_GEO", points)
+    surfaceFunctions.objectToWorld("C_head_GEO", meshTopologyFor("C_head_GEO").points)
+'''
+
+from maya import OpenMaya
+from general import apiFunctions
+from general import meshBVH
+from general import meshTopology
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def closestUVs(surface, points):
+    '''
+    Returns the uvs (N,2) of the closest points on surface
+
+    surface: mesh or nurbsSurface, transform or shape
+    points: world space positions (N,3), or a list of transforms whose world
+            rotate pivots are used
+    '''
+    _assertNumpy()
+    path = shapePath(surface)
+    points = worldPoints(points)
+
+    if path.hasFn(OpenMaya.MFn.kMesh):
+        return meshBVHFor(path).closestUVs(worldToObject(path, points))
+    elif path.hasFn(OpenMaya.MFn.kNurbsSurface):
+        return _closestNurbsUVs(path, points)
+    raise Exception, "closestUVs: %s is not a mesh or a nurbsSurface" %path.partialPathName()
+
+def worldPoints(points):
+    '''
+    (N,3) array from positions or from a list of transforms (their world rotate pivots)
+    '''
+    if len(points) and isinstance(points[0], basestring):
+        return apiFunctions.DependNodeArray(points).asRotatePivotArray(OpenMaya.MSpace.kWorld)
+    return numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+
+def shapePath(surface):
+    '''
+    Dag path to the first non intermediate mesh or nurbsSurface shape of surface
+    '''
+    sel = OpenMaya.MSelectionList()
+    sel.add(surface)
+    path = OpenMaya.MDagPath()
+    sel.getDagPath(0, path)
+    if path.hasFn(OpenMaya.MFn.kTransform) and not (path.hasFn(OpenMaya.MFn.kMesh) or path.hasFn(OpenMaya.MFn.kNurbsSurface)):
+        for i in range(path.childCount()):
+            child = path.child(i)
+            if (child.hasFn(OpenMaya.MFn.kMesh) or child.hasFn(OpenMaya.MFn.kNurbsSurface)) and \
+                    not OpenMaya.MFnDagNode(child).isIntermediateObject():
+                path.push(child)
+                return path
+        raise Exception, "%s has no mesh or nurbsSurface shape" %surface
+    return path
+
+def worldToObject(surface, points):
+    '''
+    World space points (N,3) in the object space of surface (name or dag path)
+    '''
+    return _transformPoints(_dagPath(surface).inclusiveMatrixInverse(), points)
+
+def objectToWorld(surface, points):
+    '''
+    Object space points (N,3) of surface (name or dag path) in world space
+    '''
+    return _transformPoints(_dagPath(surface).inclusiveMatrix(), points)
+
+def _dagPath(surface):
+    return surface if isinstance(surface, OpenMaya.MDagPath) else shapePath(surface)
+
+def _transformPoints(matrix, points):
+    matrix = numpy.array([[matrix(row, column) for column in range(4)] for row in range(4)])
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+    return points.dot(matrix[:3, :3]) + matrix[3, :3]
+
+#Mesh++
+def meshArrays(mesh, space=OpenMaya.MSpace.kWorld, uvSet=None):
+    '''
+    Returns points (P,3), triangles (T,3), uvs (U+1,2), triangleUVs (T,3) and
+    triangleFaces (T,) of mesh, a dag path or a mesh data MObject (use
+    kObject space for those). Corners without a uv point at the extra last
+    uv, (0,0).
+    '''
+    mesh = OpenMaya.MFnMesh(mesh)
+
+    mPoints = OpenMaya.MPointArray()
+    mesh.getPoints(mPoints, space)
+    points = numpy.array([(mPoints[i].x, mPoints[i].y, mPoints[i].z) for i in range(mPoints.length())])
+
+    triangleCounts, triangleVertices = OpenMaya.MIntArray(), OpenMaya.MIntArray()
+    mesh.getTriangles(triangleCounts, triangleVertices)
+    vertexCounts, vertexList = OpenMaya.MIntArray(), OpenMaya.MIntArray()
+    mesh.getVertices(vertexCounts, vertexList)
+    uvCounts, uvIds = OpenMaya.MIntArray(), OpenMaya.MIntArray()
+    uArray, vArray = OpenMaya.MFloatArray(), OpenMaya.MFloatArray()
+    if uvSet:
+        mesh.getAssignedUVs(uvCounts, uvIds, uvSet)
+        mesh.getUVs(uArray, vArray, uvSet)
+    else:
+        mesh.getAssignedUVs(uvCounts, uvIds)
+        mesh.getUVs(uArray, vArray)
+
+    triangleCounts, triangleVertices = _list(triangleCounts), _list(triangleVertices)
+    vertexCounts, vertexList = _list(vertexCounts), _list(vertexList)
+    uvCounts, uvIds = _list(uvCounts), _list(uvIds)
+    triangleUVs, triangleFaces = [], []
+    vertexStart = uvStart = triangleStart = 0
+    for face, count in enumerate(vertexCounts):
+        if uvCounts[face] == count:
+            faceUVs = dict(zip(vertexList[vertexStart:vertexStart+count], uvIds[uvStart:uvStart+count]))
+        else:
+            faceUVs = {}
+        corners = triangleCounts[face] * 3
+        triangleFaces.extend([face] * triangleCounts[face])
+        triangleUVs.extend([faceUVs.get(vertex, -1) for vertex in triangleVertices[triangleStart:triangleStart+corners]])
+        vertexStart += count
+        uvStart += uvCounts[face]
+        triangleStart += corners
+
+    uvs = numpy.zeros((uArray.length() + 1, 2))
+    uvs[:-1, 0] = _list(uArray)
+    uvs[:-1, 1] = _list(vArray)
+    return (points, numpy.array(triangleVertices, dtype=numpy.int64).reshape(-1, 3), uvs,
+            numpy.array(triangleUVs, dtype=numpy.int64).reshape(-1, 3), numpy.array(triangleFaces, dtype=numpy.int64))
+
+def meshBVHFromData(mesh, space=OpenMaya.MSpace.kWorld, uvSet=None):
+    '''
+    New TriangleBVH of mesh, a dag path or a mesh data MObject
+    '''
+    return meshBVH.TriangleBVH(*meshArrays(mesh, space, uvSet))
+
+def meshPolygons(mesh, space=OpenMaya.MSpace.kWorld):
+    '''
+    Returns points (P,3), polygon vertex counts (F,) and their vertex ids of mesh,
+    a dag path or a mesh data MObject
+    '''
+    mesh = OpenMaya.MFnMesh(mesh)
+    mPoints = OpenMaya.MPointArray()
+    mesh.getPoints(mPoints, space)
+    points = numpy.array([(mPoints[i].x, mPoints[i].y, mPoints[i].z) for i in range(mPoints.length())])
+    counts, vertexIds = OpenMaya.MIntArray(), OpenMaya.MIntArray()
+    mesh.getVertices(counts, vertexIds)
+    return points, _list(counts), _list(vertexIds)
+
+def meshBVHFor(mesh, uvSet=None):
+    '''
+    Object space TriangleBVH of mesh (name or dag path), cached
+    '''
+    return _cached(mesh, "bvh", uvSet, lambda path: meshBVHFromData(path, OpenMaya.MSpace.kObject, uvSet))
+
+def meshTopologyFor(mesh):
+    '''
+    Object space meshTopology.MeshTopology of mesh (name or dag path), cached
+    '''
+    return _cached(mesh, "topology", None,
+                   lambda path: meshTopology.MeshTopology(*meshPolygons(path, OpenMaya.MSpace.kObject)))
+
+def offsetPoints(mesh, points, factor=0.001):
+    '''
+    Moves world space points (N,3) off the edges of the closest face of mesh, to
+    keep constraints away from the unstable orientation on edges. Returns (N,3).
+    '''
+    path = _dagPath(mesh)
+    points = worldToObject(path, worldPoints(points))
+    faces = meshBVHFor(path).closest(points).faces
+    return objectToWorld(path, meshTopologyFor(path).offsetPoints(points, faces, factor))
+
+def dropMeshCache(mesh=None):
+    '''
+    Forgets what is cached for mesh (dag path name), everything when mesh is None
+    '''
+    for key in [key for key in _meshCache if mesh is None or key[1] == mesh]:
+        _dropEntry(key)
+#Mesh--
+
+#Cache++
+#    (kind, dag path, uv set): [signature, data, dirty callback id, mesh MObjectHandle]
+#    a dirtied entry gets a None signature, it is replaced on its next lookup
+_meshCache = {}
+_cacheCallbackIds = []
+
+#    plugs dirtied by moving the mesh, the object space data stays valid
+_TRANSFORM_PLUGS = set(["worldMatrix", "worldInverseMatrix", "parentMatrix", "parentInverseMatrix", "worldMesh"])
+
+def _cached(mesh, kind, uvSet, build):
+    _assertNumpy()
+    path = _dagPath(mesh)
+    key = (kind, path.fullPathName(), uvSet)
+    signature = _meshSignature(path)
+    entry = _meshCache.get(key)
+    if entry and entry[0] == signature:
+        return entry[1]
+
+    _addCacheCallbacks()
+    _dropEntry(key)
+    data = build(path)
+    callbackId = OpenMaya.MNodeMessage.addNodeDirtyPlugCallback(path.node(), _onMeshDirty, key)
+    _meshCache[key] = [signature, data, callbackId, OpenMaya.MObjectHandle(path.node())]
+    return data
+
+def _dropEntry(key):
+    entry = _meshCache.pop(key, None)
+    if entry:
+        OpenMaya.MMessage.removeCallback(entry[2])
+
+def _meshSignature(path):
+    '''
+    What a cached entry is valid for besides the point values: the topology
+    '''
+    mesh = OpenMaya.MFnMesh(path)
+    return (mesh.numVertices(), mesh.numPolygons(), mesh.numFaceVertices())
+
+def _addCacheCallbacks():
+    if _cacheCallbackIds:
+        return
+    _cacheCallbackIds.append(OpenMaya.MDGMessage.addNodeRemovedCallback(_onMeshRemoved, "mesh"))
+    for message in [OpenMaya.MSceneMessage.kBeforeNew, OpenMaya.MSceneMessage.kBeforeOpen]:
+        _cacheCallbackIds.append(OpenMaya.MSceneMessage.addCallback(message, _onSceneCleared))
+
+def _onMeshDirty(node, plug, key):
+    if OpenMaya.MFnAttribute(plug.attribute()).name() in _TRANSFORM_PLUGS:
+        return
+    entry = _meshCache.get(key)
+    if entry:
+        entry[0] = None
+
+def _onMeshRemoved(obj, clientData=None):
+    handle = OpenMaya.MObjectHandle(obj)
+    for key in [key for key, entry in _meshCache.items() if entry[3] == handle]:
+        _dropEntry(key)
+
+def _onSceneCleared(clientData=None):
+    dropMeshCache()
+#Cache--
+
+#Nurbs++
+def _closestNurbsUVs(path, points):
+    '''
+    Closest parameters through MFnNurbsSurface.closestPoint, normalised by the knot domain
+    '''
+    surface = OpenMaya.MFnNurbsSurface(path)
+    #    one MScriptUtil per pointer, they share their storage otherwise
+    utils = [OpenMaya.MScriptUtil() for i in range(4)]
+    domain = [util.asDoublePtr() for util in utils]
+    surface.getKnotDomain(*domain)
+    startU, endU, startV, endV = [OpenMaya.MScriptUtil.getDouble(ptr) for ptr in domain]
+
+    uPtr, vPtr = domain[0], domain[1]
+    uvs = numpy.empty((len(points), 2))
+    for i, point in enumerate(points):
+        surface.closestPoint(OpenMaya.MPoint(point[0], point[1], point[2]), uPtr, vPtr, False,
+                             OpenMaya.kMFnNurbsEpsilon, OpenMaya.MSpace.kWorld)
+        uvs[i] = (OpenMaya.MScriptUtil.getDouble(uPtr), OpenMaya.MScriptUtil.getDouble(vPtr))
+
+    uvs[:, 0] = abs((uvs[:, 0] - startU) / (endU - startU))
+    uvs[:, 1] = abs((uvs[:, 1] - startV) / (endV - startV))
+    return uvs
+#Nurbs--
+
+def _list(array):
+    return [array[i] for i in range(array.length())]
+
+def _assertNumpy():
+    assert numpy, "numpy is required for the surface functions"
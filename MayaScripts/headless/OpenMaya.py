@@ -0,0 +1,1767 @@
+'''
+maya.OpenMaya stand-in of the headless scene
+
+The subset of the 1.0 python API the project uses. Objects wrap scene nodes
+and attribute paths, out arguments are filled in place like the swig wrappers
+do. Angles cross the API in radians, the scene stores degrees.
+'''
+
+import math, fnmatch, itertools
+from . import scene as _scene
+from . import nodeTypes
+from . import transformMath as tm
+
+_FN_NAMES = [
+    "kInvalid", "kBase", "kNamedObject", "kDependencyNode", "kDagNode", "kWorld", "kTransform", "kJoint",
+    "kIkHandle", "kIkEffector", "kIkSolver", "kIkRPSolver", "kIkSCSolver", "kSplineSolver",
+    "kShape", "kCurve", "kNurbsCurve", "kNurbsSurface", "kMesh", "kLocator", "kFollicle", "kCamera",
+    "kGeometryFilt", "kSkinClusterFilter", "kBlendShape", "kDagPose", "kAffect",
+    "kConstraint", "kPointConstraint", "kOrientConstraint", "kParentConstraint", "kAimConstraint",
+    "kPoleVectorConstraint", "kSetRange", "kPlusMinusAverage", "kMultiplyDivide", "kReverse", "kClamp",
+    "kMultDoubleLinear", "kAddDoubleLinear", "kBlendColors", "kRemapValue", "kUnitConversion",
+    "kCurveInfo", "kPointOnCurveInfo", "kFourByFourMatrix", "kPluginDependNode",
+    "kAttribute", "kNumericAttribute", "kUnitAttribute", "kDoubleLinearAttribute", "kDoubleAngleAttribute",
+    "kTimeAttribute", "kEnumAttribute", "kTypedAttribute", "kMatrixAttribute", "kMessageAttribute",
+    "kCompoundAttribute", "kAttribute3Double", "kAttribute2Double",
+    "kMatrixData", "kNurbsCurveData", "kMeshData",
+]
+
+#    extra function sets an api type has besides its node type ancestry
+_EXTRA_FNS = {"kNurbsCurve":["kCurve"], "kDoubleLinearAttribute":["kUnitAttribute"],
+              "kDoubleAngleAttribute":["kUnitAttribute"], "kTimeAttribute":["kUnitAttribute"],
+              "kAttribute3Double":["kNumericAttribute", "kCompoundAttribute"],
+              "kAttribute2Double":["kNumericAttribute", "kCompoundAttribute"]}
+
+
+class MFn(object):
+    pass
+
+for _i, _name in enumerate(_FN_NAMES):
+    setattr(MFn, _name, _i)
+
+
+def _scn():
+    return _scene.current()
+
+
+#Values++
+class MVector(object):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if isinstance(x, (MVector, MPoint)):
+            x, y, z = x.x, x.y, x.z
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __repr__(self):
+        return "%s(%g, %g, %g)" %(self.__class__.__name__, self.x, self.y, self.z)
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.z)[i]
+
+    def _list(self):
+        return [self.x, self.y, self.z]
+
+    def __add__(self, other):
+        return self.__class__(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __neg__(self):
+        return self.__class__(-self.x, -self.y, -self.z)
+
+    def __mul__(self, other):
+        if isinstance(other, MMatrix):
+            return self.__class__(*tm.transformVector(self._list(), other._m))
+        if isinstance(other, MVector):
+            return tm.dot(self._list(), other._list())
+        return self.__class__(self.x * other, self.y * other, self.z * other)
+
+    __rmul__ = lambda self, other: self.__mul__(other)
+
+    def __div__(self, value):
+        return self.__class__(self.x / value, self.y / value, self.z / value)
+
+    def __xor__(self, other):
+        return MVector(*tm.cross(self._list(), other._list()))
+
+    def __eq__(self, other):
+        return isinstance(other, (MVector, MPoint)) and self.isEquivalent(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def isEquivalent(self, other, tolerance=1.0e-10):
+        return tm.distance(self._list(), other._list()) <= tolerance
+
+    def length(self):
+        return tm.length(self._list())
+
+    def normal(self):
+        return MVector(*tm.normalize(self._list()))
+
+    def normalize(self):
+        self.x, self.y, self.z = tm.normalize(self._list())
+        return self
+
+    def angle(self, other):
+        cosine = tm.dot(tm.normalize(self._list()), tm.normalize(other._list()))
+        return math.acos(max(-1.0, min(1.0, cosine)))
+
+
+class MFloatVector(MVector):
+    pass
+
+
+class MPoint(MVector):
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        MVector.__init__(self, x, y, z)
+        self.w = float(w)
+
+    def __mul__(self, other):
+        if isinstance(other, MMatrix):
+            return MPoint(*tm.transformPoint(self._list(), other._m))
+        return MPoint(self.x * other, self.y * other, self.z * other)
+
+    def __sub__(self, other):
+        return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def distanceTo(self, other):
+        return tm.distance(self._list(), other._list())
+
+
+class MFloatPoint(MPoint):
+    pass
+
+
+class MMatrix(object):
+    def __init__(self, other=None):
+        self._m = list(other._m) if isinstance(other, MMatrix) else list(other or tm.identity())
+
+    def __call__(self, row, column):
+        return self._m[row * 4 + column]
+
+    def __repr__(self):
+        return "MMatrix(%s)" %self._m
+
+    def __mul__(self, other):
+        return MMatrix(tm.multiply(self._m, other._m))
+
+    def __eq__(self, other):
+        return isinstance(other, MMatrix) and self.isEquivalent(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def isEquivalent(self, other, tolerance=1.0e-10):
+        return max(abs(a - b) for a, b in zip(self._m, other._m)) <= tolerance
+
+    def inverse(self):
+        return MMatrix(tm.inverse(self._m))
+
+    def transpose(self):
+        return MMatrix([self._m[column * 4 + row] for row in range(4) for column in range(4)])
+
+    def setToIdentity(self):
+        self._m = tm.identity()
+        return self
+
+MMatrix.identity = MMatrix()
+
+
+class MFloatMatrix(MMatrix):
+    pass
+
+
+class MEulerRotation(object):
+    kXYZ, kYZX, kZXY, kXZY, kYXZ, kZYX = range(6)
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, order=0):
+        if isinstance(x, MVector):
+            x, y, z = x.x, x.y, x.z
+        self.x, self.y, self.z, self.order = float(x), float(y), float(z), order
+
+    def __repr__(self):
+        return "MEulerRotation(%g, %g, %g, %d)" %(self.x, self.y, self.z, self.order)
+
+    def asDegrees(self):
+        return [math.degrees(self.x), math.degrees(self.y), math.degrees(self.z)]
+
+    def asMatrix(self):
+        return MMatrix(tm.eulerToMatrix(self.asDegrees(), self.order))
+
+    def asVector(self):
+        return MVector(self.x, self.y, self.z)
+
+    @classmethod
+    def _fromMatrix(cls, matrix, order=0):
+        return cls(*[math.radians(val) for val in tm.matrixToEuler(matrix, order)] + [order])
+
+
+class MQuaternion(object):
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        self.x, self.y, self.z, self.w = float(x), float(y), float(z), float(w)
+
+    def asMatrix(self):
+        return MMatrix(tm.quaternionToMatrix((self.x, self.y, self.z, self.w)))
+
+    def asEulerRotation(self):
+        return MEulerRotation._fromMatrix(self.asMatrix()._m)
+
+
+class MTransformationMatrix(object):
+    def __init__(self, matrix=None):
+        if isinstance(matrix, MTransformationMatrix):
+            matrix = matrix.asMatrix()
+        self.__matrix = list(matrix._m) if matrix else tm.identity()
+        self.__order = 0
+
+    def asMatrix(self):
+        return MMatrix(self.__matrix)
+
+    def asMatrixInverse(self):
+        return MMatrix(tm.inverse(self.__matrix))
+
+    def getTranslation(self, space=None):
+        return MVector(*tm.getTranslation(self.__matrix))
+
+    def setTranslation(self, vector, space=None):
+        self.__matrix = tm.setTranslation(self.__matrix, vector._list())
+
+    def eulerRotation(self):
+        return MEulerRotation._fromMatrix(self.__matrix, self.__order)
+
+    def rotation(self):
+        return MQuaternion(*tm.matrixToQuaternion(tm.rotationPart(self.__matrix)))
+
+    def rotationOrder(self):
+        return self.__order + 1
+
+    def _components(self, rotateOrder=0):
+        return tm.decompose(self.__matrix, rotateOrder)
+
+
+class MAngle(object):
+    kInvalid, kRadians, kDegrees, kAngMinutes, kAngSeconds = range(5)
+    __toRadians = {1:1.0, 2:math.pi / 180.0, 3:math.pi / 10800.0, 4:math.pi / 648000.0}
+
+    def __init__(self, value=0.0, unit=1):
+        self.__value, self.__unit = float(value), unit
+
+    @staticmethod
+    def uiUnit():
+        return MAngle.kDegrees
+
+    @staticmethod
+    def internalUnit():
+        return MAngle.kRadians
+
+    def value(self):
+        return self.__value
+
+    def unit(self):
+        return self.__unit
+
+    def asUnits(self, unit):
+        return self.__value * MAngle.__toRadians[self.__unit] / MAngle.__toRadians[unit]
+
+    def asRadians(self):
+        return self.asUnits(MAngle.kRadians)
+
+    def asDegrees(self):
+        return self.asUnits(MAngle.kDegrees)
+
+
+class MDistance(object):
+    kInvalid, kInches, kFeet, kYards, kMiles, kMillimeters, kCentimeters, kKilometers, kMeters = range(9)
+    __toCm = {1:2.54, 2:30.48, 3:91.44, 4:160934.4, 5:0.1, 6:1.0, 7:100000.0, 8:100.0}
+
+    def __init__(self, value=0.0, unit=6):
+        self.__value, self.__unit = float(value), unit
+
+    @staticmethod
+    def uiUnit():
+        return MDistance.kCentimeters
+
+    @staticmethod
+    def internalUnit():
+        return MDistance.kCentimeters
+
+    def value(self):
+        return self.__value
+
+    def unit(self):
+        return self.__unit
+
+    def asUnits(self, unit):
+        return self.__value * MDistance.__toCm[self.__unit] / MDistance.__toCm[unit]
+
+    def asCentimeters(self):
+        return self.asUnits(MDistance.kCentimeters)
+
+
+class MTime(object):
+    kInvalid, kHours, kMinutes, kSeconds, kMilliseconds, kGames, kFilm, kPALFrame, kNTSCFrame = range(9)
+    __perSecond = {1:1.0 / 3600, 2:1.0 / 60, 3:1.0, 4:1000.0, 5:15.0, 6:24.0, 7:25.0, 8:30.0}
+
+    def __init__(self, value=0.0, unit=6):
+        self.__value, self.__unit = float(value), unit
+
+    @staticmethod
+    def uiUnit():
+        return MTime.kFilm
+
+    def value(self):
+        return self.__value
+
+    def unit(self):
+        return self.__unit
+
+    def asUnits(self, unit):
+        return self.__value / MTime.__perSecond[self.__unit] * MTime.__perSecond[unit]
+
+
+class MSpace(object):
+    kInvalid, kTransform, kPreTransform, kPostTransform, kWorld = range(5)
+    kObject = kPreTransform
+#Values--
+
+
+#Arrays++
+class _Array(object):
+    _default = None
+
+    def __init__(self, items=None, value=None):
+        if isinstance(items, int):
+            items = [value if value is not None else self._default] * items
+        self._items = list(items or [])
+
+    def __getitem__(self, i):
+        return self._items[i]
+
+    def __setitem__(self, i, value):
+        self._items[i] = value
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def length(self):
+        return len(self._items)
+
+    def append(self, item):
+        self._items.append(item)
+
+    def set(self, item, i):
+        self._items[i] = item
+
+    def insert(self, item, i):
+        self._items.insert(i, item)
+
+    def remove(self, i):
+        del self._items[i]
+
+    def clear(self):
+        self._items = []
+
+    def setLength(self, length):
+        self._items = (self._items + [self._default] * length)[:length]
+
+
+class MObjectArray(_Array): pass
+class MDagPathArray(_Array): pass
+class MPlugArray(_Array): pass
+class MIntArray(_Array): _default = 0
+class MDoubleArray(_Array): _default = 0.0
+class MFloatArray(_Array): _default = 0.0
+class MStringArray(_Array): _default = ""
+class MPointArray(_Array): pass
+class MVectorArray(_Array): pass
+#Arrays--
+
+
+#Objects++
+def _attrApiType(attr):
+    attrType = attr.attrType
+    if attrType == "doubleLinear":
+        return "kDoubleLinearAttribute"
+    if attrType == "doubleAngle":
+        return "kDoubleAngleAttribute"
+    if attrType == "time":
+        return "kTimeAttribute"
+    if attrType == "enum":
+        return "kEnumAttribute"
+    if attrType in nodeTypes.NUMERIC:
+        return "kNumericAttribute"
+    if attrType == "matrix":
+        return "kMatrixAttribute"
+    if attrType == "message":
+        return "kMessageAttribute"
+    if attr.children:
+        if len(attr.children) in (2, 3) and all(child.attrType in nodeTypes.NUMERIC for child in attr.children):
+            return "kAttribute%dDouble" %len(attr.children)
+        return "kCompoundAttribute"
+    return "kTypedAttribute"
+
+
+class MObject(object):
+    '''
+    Wraps a scene node, an attribute definition or plug data
+    '''
+    def __init__(self, other=None):
+        self._node = None
+        self._attr = None
+        self._data = None
+        if isinstance(other, MObject):
+            self._assign(other)
+
+    def _assign(self, other):
+        self._node, self._attr, self._data = other._node, other._attr, other._data
+        return self
+
+    @classmethod
+    def _wrap(cls, node=None, attr=None, data=None):
+        obj = cls()
+        obj._node, obj._attr, obj._data = node, attr, data
+        return obj
+
+    def __repr__(self):
+        return "MObject(%s)" %self.apiTypeStr()
+
+    def __eq__(self, other):
+        if not isinstance(other, MObject):
+            return False
+        if self._attr is not None or other._attr is not None:
+            return self._attr is other._attr
+        if self._data is not None or other._data is not None:
+            return self._data is other._data
+        return self._node is other._node
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return id(self._attr or self._data or self._node)
+
+    def isNull(self):
+        return self._node is None and self._attr is None and self._data is None
+
+    def apiTypeStr(self):
+        if self._attr is not None:
+            return _attrApiType(self._attr)
+        if self._data is not None:
+            return self._data[0]
+        if self._node is not None:
+            return self._node.type.apiType
+        return "kInvalid"
+
+    def apiType(self):
+        return getattr(MFn, self.apiTypeStr(), MFn.kInvalid)
+
+    def hasFn(self, fn):
+        if self._attr is not None:
+            names = ["kBase", "kAttribute", self.apiTypeStr()] + _EXTRA_FNS.get(self.apiTypeStr(), [])
+        elif self._node is not None:
+            names = list(self._node.type.apiTypes)
+            for name in list(names):
+                names += _EXTRA_FNS.get(name, [])
+        else:
+            names = [self.apiTypeStr()]
+        return fn in [getattr(MFn, name, -1) for name in names]
+
+MObject.kNullObj = MObject()
+
+
+class MObjectHandle(object):
+    def __init__(self, obj=None):
+        self.__obj = MObject(obj) if obj is not None else MObject()
+
+    def hashCode(self):
+        node = self.__obj._node
+        return node.id if node is not None else 0
+
+    def object(self):
+        return MObject(self.__obj)
+
+    def isValid(self):
+        node = self.__obj._node
+        if node is None:
+            return False
+        return node.alive and (node is _scn().world or _scn().names.get(node.name) is node)
+
+    isAlive = isValid
+
+    def __eq__(self, other):
+        return isinstance(other, MObjectHandle) and self.__obj == other._MObjectHandle__obj
+#Objects--
+
+
+#Plugs++
+def _plugValueKind(attr):
+    if attr.attrType == "doubleAngle":
+        return "angle"
+    return attr.attrType
+
+
+class MPlug(object):
+    def __init__(self, other=None, attr=None):
+        self._node = None
+        self._path = None
+        if isinstance(other, MPlug):
+            self._node, self._path = other._node, other._path
+        elif isinstance(other, MObject) and isinstance(attr, MObject):
+            self._node = other._node
+            self._path = _pathToAttr(attr._attr)
+
+    @classmethod
+    def _wrap(cls, node, path):
+        plug = cls()
+        plug._node, plug._path = node, path
+        return plug
+
+    def _assign(self, other):
+        self._node, self._path = other._node, other._path
+        return self
+
+    def __repr__(self):
+        return "MPlug(%s)" %(self.name() if self._node else "null")
+
+    def __eq__(self, other):
+        return isinstance(other, MPlug) and self._node is other._node and self._path == other._path
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def _attr(self):
+        return self._node.attr(self._path[-1][0])
+
+    def isNull(self):
+        return self._node is None
+
+    def node(self):
+        return MObject._wrap(self._node)
+
+    def attribute(self):
+        return MObject._wrap(attr=self._attr())
+
+    def name(self):
+        return "%s.%s" %(self._node.name, _scene.pathString(self._path))
+
+    def partialName(self, includeNodeName=False, includeNonMandatoryIndices=False, includeInstancedIndices=False,
+                    useAlias=False, useFullAttributePath=False, useLongNames=False):
+        parts = []
+        for name, index in (self._path if useFullAttributePath else self._path[-1:]):
+            attr = self._node.attr(name)
+            name = attr.longName if useLongNames else attr.shortName
+            parts.append(name if index is None else "%s[%d]" %(name, index))
+        name = ".".join(parts)
+        return "%s.%s" %(self._node.name, name) if includeNodeName else name
+
+    def info(self):
+        return self.name()
+
+    #Structure++
+    def isCompound(self):
+        return bool(self._attr().children) and not self.isArray()
+
+    def numChildren(self):
+        return len(self._attr().children)
+
+    def child(self, index):
+        attr = self._attr()
+        if isinstance(index, MObject):
+            child = index._attr
+        else:
+            child = attr.children[index]
+        return MPlug._wrap(self._node, self._path + ((child.longName, 0 if child.multi else None),))
+
+    def isChild(self):
+        return self._attr().parent is not None
+
+    def parent(self):
+        return MPlug._wrap(self._node, self._path[:-1])
+
+    def isArray(self):
+        return self._attr().multi and self._path[-1][1] is None
+
+    def isElement(self):
+        return self._path[-1][1] is not None
+
+    def array(self):
+        return MPlug._wrap(self._node, self._path[:-1] + ((self._path[-1][0], None),))
+
+    def logicalIndex(self):
+        return self._path[-1][1]
+
+    def __indices(self):
+        return _scn().multiIndices(self._node, self._path[:-1] + ((self._path[-1][0], None),))
+
+    def numElements(self):
+        return len(self.__indices())
+
+    def evaluateNumElements(self):
+        return self.numElements()
+
+    def getExistingArrayAttributeIndices(self, indices):
+        indices.clear()
+        for index in self.__indices():
+            indices.append(index)
+        return indices.length()
+
+    def elementByLogicalIndex(self, index):
+        return MPlug._wrap(self._node, self._path[:-1] + ((self._path[-1][0], index),))
+
+    def elementByPhysicalIndex(self, index):
+        return self.elementByLogicalIndex(self.__indices()[index])
+
+    __getitem__ = elementByPhysicalIndex
+    #Structure--
+
+    #Flags++
+    def isLocked(self):
+        return any(self._path[:k] in self._node.locks for k in range(len(self._path), 0, -1))
+
+    def setLocked(self, locked):
+        _scn().setFlag(self._node, "locks", self._path, bool(locked))
+
+    def isKeyable(self):
+        return self._node.keyable.get(self._path, self._attr().keyable)
+
+    def setKeyable(self, keyable):
+        _scn().setFlag(self._node, "keyable", self._path, bool(keyable))
+
+    def isChannelBoxFlagSet(self):
+        return self._node.channelBox.get(self._path, False)
+
+    def setChannelBox(self, channelBox):
+        _scn().setFlag(self._node, "channelBox", self._path, bool(channelBox))
+
+    def isDynamic(self):
+        return self._attr().dynamic
+    #Flags--
+
+    #Connections++
+    def isDestination(self):
+        return self._path in self._node.inputs
+
+    def isSource(self):
+        return self._path in self._node.outputs
+
+    def isConnected(self):
+        return self.isDestination() or self.isSource()
+
+    def connectedTo(self, plugs, asDst, asSrc):
+        plugs.clear()
+        if asDst and self._path in self._node.inputs:
+            plugs.append(MPlug._wrap(*self._node.inputs[self._path]))
+        if asSrc:
+            for node, path in self._node.outputs.get(self._path, []):
+                plugs.append(MPlug._wrap(node, path))
+        return plugs
+
+    def source(self):
+        source = self._node.inputs.get(self._path)
+        return MPlug._wrap(*source) if source else MPlug()
+
+    def destinations(self, plugs):
+        return self.connectedTo(plugs, False, True)
+    #Connections--
+
+    #Values++
+    def _value(self):
+        return _scn().getPath(self._node, self._path)
+
+    def asDouble(self):
+        value = float(self._value() or 0.0)
+        return math.radians(value) if _plugValueKind(self._attr()) == "angle" else value
+
+    def asFloat(self):
+        return self.asDouble()
+
+    def asInt(self):
+        return int(self._value() or 0)
+
+    asShort = asLong = asChar = asInt
+
+    def asBool(self):
+        return bool(self._value())
+
+    def asString(self):
+        return self._value() or ""
+
+    def asMAngle(self):
+        return MAngle(self._value() or 0.0, MAngle.kDegrees)
+
+    def asMDistance(self):
+        return MDistance(self._value() or 0.0, MDistance.kCentimeters)
+
+    def asMTime(self):
+        return MTime(self._value() or 0.0, MTime.uiUnit())
+
+    def asMObject(self):
+        value = self._value()
+        if self._attr().attrType == "matrix":
+            return MObject._wrap(data=("kMatrixData", value or tm.identity()))
+        if self._attr().attrType == "nurbsCurve":
+            return MObject._wrap(data=("kNurbsCurveData", value))
+        return MObject._wrap(data=("kData", value))
+
+    def _set(self, value):
+        if self.isLocked():
+            raise RuntimeError("The attribute '%s' is locked" %self.name())
+        for path in _scene.leafPaths(self._node, self._path):
+            if path in self._node.inputs:
+                raise RuntimeError("The attribute '%s' is connected" %self.name())
+        _scn().setValue(self._node, self._path, value)
+
+    def setDouble(self, value):
+        if _plugValueKind(self._attr()) == "angle":
+            value = math.degrees(value)
+        self._set(float(value))
+
+    setFloat = setDouble
+
+    def setInt(self, value):
+        self._set(bool(value) if self._attr().attrType == "bool" else int(value))
+
+    setShort = setLong = setChar = setInt
+
+    def setBool(self, value):
+        self._set(bool(value))
+
+    def setString(self, value):
+        self._set(str(value))
+
+    def setMAngle(self, angle):
+        self._set(angle.asDegrees())
+
+    def setMDistance(self, distance):
+        self._set(distance.asCentimeters())
+
+    def setMTime(self, time):
+        self._set(time.asUnits(MTime.uiUnit()))
+
+    def setMObject(self, obj):
+        self._set(list(obj._data[1]) if obj._data[0] == "kMatrixData" else obj._data[1])
+    #Values--
+
+
+def _pathToAttr(attr):
+    chain = attr.ancestors() + [attr]
+    return tuple((each.longName, 0 if each.multi else None) for each in chain)
+#Plugs--
+
+
+#Selection++
+class MSelectionList(object):
+    def __init__(self, other=None):
+        self._items = list(other._items) if isinstance(other, MSelectionList) else []
+
+    def add(self, item, mergeWithExisting=True):
+        if isinstance(item, MObject):
+            self._items.append((item._node, None))
+            return
+        if isinstance(item, MDagPath):
+            self._items.append((item._node, None))
+            return
+        if isinstance(item, MPlug):
+            self._items.append((item._node, item._path))
+            return
+        matches = _match(item)
+        if not matches:
+            raise RuntimeError("(kInvalidParameter): Object does not exist")
+        self._items.extend(matches)
+
+    def length(self):
+        return len(self._items)
+
+    def clear(self):
+        self._items = []
+
+    def remove(self, index):
+        del self._items[index]
+
+    def isEmpty(self):
+        return not self._items
+
+    def getDependNode(self, index, obj):
+        obj._node, obj._attr, obj._data = self._items[index][0], None, None
+        return obj
+
+    def getDagPath(self, index, dagPath, component=None):
+        node = self._items[index][0]
+        if not node.isDag():
+            raise RuntimeError("(kInvalidParameter): Object is not a dag node")
+        dagPath._node = node
+        return dagPath
+
+    def getPlug(self, index, plug):
+        node, path = self._items[index]
+        if path is None:
+            raise RuntimeError("(kInvalidParameter): Item is not a plug")
+        plug._node, plug._path = node, path
+        return plug
+
+    def getSelectionStrings(self, strings):
+        for node, path in self._items:
+            strings.append(node.name if path is None else "%s.%s" %(node.name, _scene.pathString(path)))
+
+
+def _match(name):
+    '''
+    (node, path) pairs for a name, "node.attr" or a wildcard pattern
+    '''
+    current = _scn()
+    name = str(name).strip()
+    nodeName, dot, attrName = name.partition(".")
+    if any(char in nodeName for char in "*?["):
+        nodes = [node for node in current.nodes() if fnmatch.fnmatchcase(node.name, nodeName.split("|")[-1])]
+    else:
+        node = current.lookup(nodeName)
+        nodes = [node] if node else []
+    if not dot:
+        return [(node, None) for node in nodes]
+    matches = []
+    for node in nodes:
+        try:
+            matches.append((node, _scene.parsePath(node, attrName)))
+        except ValueError:
+            pass
+    return matches
+
+
+class MGlobal(object):
+    kReplaceList, kXORWithList, kRemoveFromList, kAddToList = range(4)
+
+    @staticmethod
+    def getSelectionListByName(name, selList):
+        selList.add(name)
+
+    @staticmethod
+    def getActiveSelectionList(selList):
+        selList.clear()
+        for node in _scn().selection:
+            selList.add(MObject._wrap(node))
+
+    @staticmethod
+    def setActiveSelectionList(selList, mode=0):
+        _scn().selection = [node for node, path in selList._items]
+
+    @staticmethod
+    def selectByName(name, mode=0):
+        _scn().selection = [node for node, path in _match(name)]
+
+    @staticmethod
+    def executeCommand(command, displayEnabled=False, undoEnabled=False):
+        from . import mel
+        return mel.eval(command)
+
+    @staticmethod
+    def displayInfo(message):
+        print message
+
+    @staticmethod
+    def displayWarning(message):
+        print "# Warning: %s #" %message
+
+    @staticmethod
+    def displayError(message):
+        print "# Error: %s #" %message
+
+    @staticmethod
+    def mayaState():
+        return 1
+#Selection--
+
+
+#Dag++
+class MDagPath(object):
+    def __init__(self, other=None):
+        self._node = other._node if isinstance(other, MDagPath) else None
+
+    @classmethod
+    def _wrap(cls, node):
+        path = cls()
+        path._node = node
+        return path
+
+    @staticmethod
+    def getAPathTo(obj, dagPath=None):
+        if (obj._node is None) or not obj._node.isDag():
+            raise RuntimeError("(kInvalidParameter): Object is not a dag node")
+        dagPath = dagPath if dagPath is not None else MDagPath()
+        dagPath._node = obj._node
+        return dagPath
+
+    @staticmethod
+    def getAllPathsTo(obj, paths):
+        paths.clear()
+        paths.append(MDagPath.getAPathTo(obj))
+        return paths
+
+    def __repr__(self):
+        return "MDagPath(%s)" %(self.fullPathName() if self._node else "")
+
+    def __eq__(self, other):
+        return isinstance(other, MDagPath) and self._node is other._node
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def isValid(self):
+        return self._node is not None and self._node.alive
+
+    def node(self):
+        return MObject._wrap(self._node)
+
+    def transform(self):
+        node = self._node
+        if not node.isA("transform") and node.parent is not None:
+            node = node.parent
+        return MObject._wrap(node)
+
+    def apiType(self):
+        return self.node().apiType()
+
+    def hasFn(self, fn):
+        return self.node().hasFn(fn)
+
+    def fullPathName(self):
+        if self._node is _scn().world:
+            return ""
+        return _scn().fullPath(self._node)
+
+    def partialPathName(self):
+        return self._node.name
+
+    def length(self):
+        return len(_scn().ancestors(self._node)) + (0 if self._node is _scn().world else 1)
+
+    def instanceNumber(self):
+        #    no instancing in the stand-in, every node has the one path
+        return 0
+
+    def childCount(self):
+        if self._node is _scn().world:
+            return len(_scn().topLevel())
+        return len(self._node.children)
+
+    def child(self, index):
+        if self._node is _scn().world:
+            return MObject._wrap(_scn().topLevel()[index])
+        return MObject._wrap(self._node.children[index])
+
+    def push(self, obj):
+        self._node = obj._node
+
+    def pop(self, count=1):
+        for i in range(count):
+            self._node = self._node.parent or _scn().world
+
+    def extendToShape(self):
+        shapes = [child for child in self._node.children if child.type.shape and not _scn().get(child, "io")]
+        if len(shapes) != 1:
+            raise RuntimeError("(kInvalidParameter): No unique shape below %s" %self._node.name)
+        self._node = shapes[0]
+
+    def numberOfShapesDirectlyBelow(self, count=None):
+        return len([child for child in self._node.children if child.type.shape])
+
+    def inclusiveMatrix(self):
+        return MMatrix(_scn().worldMatrix(self._node))
+
+    def inclusiveMatrixInverse(self):
+        return MMatrix(tm.inverse(_scn().worldMatrix(self._node)))
+
+    def exclusiveMatrix(self):
+        return MMatrix(_scn().parentMatrix(self._node))
+
+    def exclusiveMatrixInverse(self):
+        return MMatrix(tm.inverse(_scn().parentMatrix(self._node)))
+
+
+class MItDag(object):
+    kDepthFirst, kBreadthFirst, kInvalidType = range(3)
+
+    def __init__(self, traversal=0, filterType=0):
+        self.reset(MObject._wrap(_scn().world), traversal, filterType)
+
+    def reset(self, root=None, traversal=0, filterType=0):
+        if isinstance(root, MDagPath):
+            root = root._node
+        elif isinstance(root, MObject):
+            root = root._node
+        self.__filter = filterType
+        self.__stack = [(root or _scn().world, 0)]
+        self.__current = None
+        self.__pruned = False
+        self.__advance(first=True)
+
+    def __children(self, node):
+        if node is _scn().world:
+            return _scn().topLevel()
+        return node.children
+
+    def __advance(self, first=False):
+        while True:
+            if (self.__current is not None) and not self.__pruned:
+                node, depth = self.__current
+                self.__stack.extend((child, depth + 1) for child in reversed(self.__children(node)))
+            self.__pruned = False
+            if not self.__stack:
+                self.__current = None
+                return
+            self.__current = self.__stack.pop()
+            if (not self.__filter) or MObject._wrap(self.__current[0]).hasFn(self.__filter):
+                return
+
+    def next(self):
+        self.__advance()
+
+    def isDone(self):
+        return self.__current is None
+
+    def currentItem(self):
+        return MObject._wrap(self.__current[0])
+
+    def getPath(self, dagPath):
+        dagPath._node = self.__current[0]
+        return dagPath
+
+    def fullPathName(self):
+        return _scn().fullPath(self.__current[0])
+
+    def partialPathName(self):
+        return self.__current[0].name
+
+    def depth(self):
+        return self.__current[1]
+
+    def prune(self):
+        self.__pruned = True
+#Dag--
+
+
+#Function sets++
+class MFnBase(object):
+    def __init__(self, obj=None):
+        self.__node = None
+        if obj is not None:
+            MFnBase.setObject(self, obj)
+
+    def setObject(self, obj):
+        if isinstance(obj, MDagPath):
+            obj = obj.node()
+        if obj is None or obj._node is None:
+            raise RuntimeError("(kInvalidParameter): Object is incompatible with this method")
+        self.__node = obj._node
+
+    def object(self):
+        return MObject._wrap(self.__node)
+
+    def _node(self):
+        if self.__node is None:
+            raise RuntimeError("(kInvalidParameter): Object is incompatible with this method")
+        return self.__node
+
+    def type(self):
+        return self.object().apiType()
+
+    def hasObj(self, obj):
+        return True
+
+
+class MFnDependencyNode(MFnBase):
+    kLocalDynamicAttr, kNormalAttr = range(2)
+
+    def name(self):
+        return self._node().name
+
+    def setName(self, name):
+        return _scn().rename(self._node(), name)
+
+    def typeName(self):
+        return self._node().type.name
+
+    def isFromReferencedFile(self):
+        return False
+
+    def isLocked(self):
+        return False
+
+    def hasAttribute(self, name):
+        return self._node().attr(name) is not None
+
+    def attribute(self, name):
+        attr = self._node().attr(name)
+        if attr is None:
+            raise RuntimeError("(kInvalidParameter): No attribute named %s" %name)
+        return MObject._wrap(attr=attr)
+
+    def attributeCount(self):
+        return len([attr for each in self._node().allAttrs() for attr in [each] + list(each.descendants())])
+
+    def findPlug(self, attr, wantNetworkedPlug=False):
+        node = self._node()
+        try:
+            if isinstance(attr, MObject):
+                return MPlug._wrap(node, _pathToAttr(attr._attr))
+            return MPlug._wrap(node, _scene.parsePath(node, attr))
+        except ValueError:
+            raise RuntimeError("(kInvalidParameter): No element at given index")
+
+    def getConnections(self, plugs):
+        node = self._node()
+        plugs.clear()
+        for path in sorted(set(node.inputs.keys()) | set(node.outputs.keys())):
+            plugs.append(MPlug._wrap(node, path))
+        return plugs
+
+
+class MFnDagNode(MFnDependencyNode):
+    def __init__(self, obj=None):
+        MFnDependencyNode.__init__(self, obj)
+
+    def dagPath(self):
+        return MDagPath._wrap(self._node())
+
+    def getPath(self, dagPath):
+        dagPath._node = self._node()
+        return dagPath
+
+    def fullPathName(self):
+        return _scn().fullPath(self._node())
+
+    def partialPathName(self):
+        return self._node().name
+
+    def parentCount(self):
+        return 0 if self._node() is _scn().world else 1
+
+    def parent(self, index=0):
+        return MObject._wrap(self._node().parent or _scn().world)
+
+    def childCount(self):
+        return MDagPath._wrap(self._node()).childCount()
+
+    def child(self, index):
+        return MDagPath._wrap(self._node()).child(index)
+
+    def dagRoot(self):
+        node = self._node()
+        while node.parent is not None:
+            node = node.parent
+        return MObject._wrap(node)
+
+    def isIntermediateObject(self):
+        return bool(_scn().get(self._node(), "io"))
+
+    def setIntermediateObject(self, value):
+        MFnDependencyNode.findPlug(self, "io").setBool(value)
+
+    def transformationMatrix(self):
+        return MMatrix(_scn().localMatrix(self._node()))
+
+    def isChildOf(self, obj):
+        return self._node().parent is obj._node
+
+    def isParentOf(self, obj):
+        return obj._node.parent is self._node()
+
+
+class MFnTransform(MFnDagNode):
+    def __init__(self, obj=None):
+        MFnDagNode.__init__(self, obj)
+        if obj is not None and not self._node().isA("transform"):
+            raise RuntimeError("(kInvalidParameter): Object is incompatible with this method")
+
+    def __setTriple(self, attr, values):
+        node = self._node()
+        for child, value in zip(node.attr(attr).children, values):
+            path = _scene.parsePath(node, child.longName)
+            if not MPlug._wrap(node, path).isLocked():
+                _scn().setValue(node, path, float(value))
+
+    def __spaceMatrix(self):
+        '''
+        parent space of the translate channels: offsetParentMatrix * parent world matrix
+        '''
+        current = _scn()
+        node = self._node()
+        matrix = current.get(node, "opm")
+        if current.get(node, "it"):
+            matrix = tm.multiply(matrix, current.parentMatrix(node))
+        return matrix
+
+    def getTranslation(self, space=MSpace.kTransform):
+        node = self._node()
+        if space == MSpace.kWorld:
+            return MVector(*tm.getTranslation(_scn().worldMatrix(node)))
+        return MVector(*_scn().get(node, "t"))
+
+    def setTranslation(self, vector, space=MSpace.kTransform):
+        node = self._node()
+        translate = list(_scn().get(node, "t"))
+        if space == MSpace.kWorld:
+            delta = tm.subtract(vector._list(), tm.getTranslation(_scn().worldMatrix(node)))
+            delta = tm.transformVector(delta, tm.inverse(self.__spaceMatrix()))
+            translate = tm.add(translate, delta)
+        else:
+            translate = vector._list()
+        self.__setTriple("translate", translate)
+
+    def translateBy(self, vector, space=MSpace.kTransform):
+        self.setTranslation(self.getTranslation(space) + vector, space)
+
+    def rotatePivot(self, space=MSpace.kTransform):
+        node = self._node()
+        pivot = list(_scn().get(node, "rp")) if node.attr("rp") else [0.0, 0.0, 0.0]
+        if space == MSpace.kWorld:
+            pivot = tm.transformPoint(pivot, _scn().worldMatrix(node))
+        return MPoint(*pivot)
+
+    def setRotatePivot(self, point, space=MSpace.kTransform, balance=True):
+        node = self._node()
+        pivot = point._list()
+        if space == MSpace.kWorld:
+            pivot = tm.transformPoint(pivot, tm.inverse(_scn().worldMatrix(node)))
+        before = _scn().worldMatrix(node)
+        self.__setTriple("rotatePivot", pivot)
+        if balance:
+            _compensatePivot(node, "rpt", before)
+
+    def scalePivot(self, space=MSpace.kTransform):
+        node = self._node()
+        pivot = list(_scn().get(node, "sp"))
+        if space == MSpace.kWorld:
+            pivot = tm.transformPoint(pivot, _scn().worldMatrix(node))
+        return MPoint(*pivot)
+
+    def setScalePivot(self, point, space=MSpace.kTransform, balance=True):
+        node = self._node()
+        pivot = point._list()
+        if space == MSpace.kWorld:
+            pivot = tm.transformPoint(pivot, tm.inverse(_scn().worldMatrix(node)))
+        before = _scn().worldMatrix(node)
+        self.__setTriple("scalePivot", pivot)
+        if balance:
+            _compensatePivot(node, "spt", before)
+
+    def rotationOrder(self):
+        return _scn().get(self._node(), "ro") + 1
+
+    def getRotation(self, rotation, space=MSpace.kTransform):
+        node = self._node()
+        values = _scn().get(node, "r")
+        rotation.x, rotation.y, rotation.z = [math.radians(val) for val in values]
+        rotation.order = _scn().get(node, "ro")
+        return rotation
+
+    def setRotation(self, rotation, space=MSpace.kTransform):
+        if isinstance(rotation, MQuaternion):
+            rotation = MEulerRotation._fromMatrix(rotation.asMatrix()._m, _scn().get(self._node(), "ro"))
+        self.__setTriple("rotate", rotation.asDegrees())
+
+    def getScale(self, ptr):
+        ptr._values[:3] = list(_scn().get(self._node(), "s"))
+
+    def setScale(self, ptr):
+        self.__setTriple("scale", ptr._values[:3])
+
+    def transformation(self):
+        return MTransformationMatrix(MMatrix(_scn().localMatrix(self._node())))
+
+    def set(self, transformation):
+        '''
+        Sets translate, rotate and scale from a matrix, the joint orient of joints is kept
+        '''
+        node = self._node()
+        matrix = transformation.asMatrix()._m
+        if node.isA("joint"):
+            matrix = tm.multiply(matrix, tm.inverse(tm.setTranslation(tm.eulerToMatrix(_scn().get(node, "jo")), [0, 0, 0])))
+            matrix = tm.setTranslation(matrix, tm.getTranslation(transformation.asMatrix()._m))
+        translate, rotate, scale = tm.decompose(matrix, _scn().get(node, "ro"))
+        self.__setTriple("translate", translate)
+        self.__setTriple("rotate", rotate)
+        self.__setTriple("scale", scale)
+
+
+def _compensatePivot(node, attr, before):
+    '''
+    Moves the pivot translate so the world matrix of node stays what it was
+    '''
+    current = _scn()
+    after = current.worldMatrix(node)
+    delta = tm.subtract(tm.getTranslation(before), tm.getTranslation(after))
+    delta = tm.transformVector(delta, tm.inverse(after))
+    delta = tm.transformVector(delta, current.localMatrix(node))
+    values = tm.add(current.get(node, attr), delta)
+    for child, value in zip(node.attr(attr).children, values):
+        current.setValue(node, _scene.parsePath(node, child.longName), value)
+
+
+class MFnNurbsCurve(MFnDagNode):
+    kOpen, kClosed, kPeriodic = range(1, 4)
+
+    def __geometry(self, space=MSpace.kObject):
+        node = self._node()
+        if node.isA("transform"):
+            node = [child for child in node.children if child.isA("nurbsCurve")][0]
+        geometry = nodeTypes.curveGeometry(_scn(), node)
+        if geometry and space == MSpace.kWorld:
+            geometry = nodeTypes.transformGeometry(geometry, _scn().worldMatrix(node))
+        return geometry
+
+    def numCVs(self):
+        return len(self.__geometry()['cvs'])
+
+    def degree(self):
+        return self.__geometry()['degree']
+
+    def numSpans(self):
+        return self.numCVs() - self.degree()
+
+    def numKnots(self):
+        return len(self.__geometry()['knots'])
+
+    def form(self):
+        return self.__geometry()['form'] + 1
+
+    def getCVs(self, points, space=MSpace.kObject):
+        points.clear()
+        for cv in self.__geometry(space)['cvs']:
+            points.append(MPoint(*cv))
+        return points
+
+    def getCV(self, index, point, space=MSpace.kObject):
+        point.x, point.y, point.z = self.__geometry(space)['cvs'][index]
+        return point
+
+    def getKnots(self, knots):
+        knots.clear()
+        for knot in self.__geometry()['knots']:
+            knots.append(knot)
+        return knots
+
+    def getKnotDomain(self, startPtr, endPtr):
+        geometry = self.__geometry()
+        startPtr._values[0], endPtr._values[0] = tm.curveRange(geometry['knots'], geometry['degree'], len(geometry['cvs']))
+
+    def getPointAtParam(self, param, point, space=MSpace.kObject):
+        geometry = self.__geometry(space)
+        point.x, point.y, point.z = tm.curvePoint(geometry['cvs'], geometry['knots'], geometry['degree'], param)
+        return point
+
+    def length(self, tolerance=0.001):
+        geometry = self.__geometry(MSpace.kWorld)
+        return tm.curveLength(geometry['cvs'], geometry['knots'], geometry['degree'])
+
+
+class MFnAttribute(MFnBase):
+    def __init__(self, obj=None):
+        self.__attr = obj._attr if obj is not None else None
+
+    def setObject(self, obj):
+        self.__attr = obj._attr
+
+    def object(self):
+        return MObject._wrap(attr=self.__attr)
+
+    def _attr(self):
+        return self.__attr
+
+    def name(self):
+        return self.__attr.longName
+
+    def shortName(self):
+        return self.__attr.shortName
+
+    def isKeyable(self):
+        return self.__attr.keyable
+
+    def isArray(self):
+        return self.__attr.multi
+
+    def isDynamic(self):
+        return self.__attr.dynamic
+
+    def isWritable(self):
+        return not self.__attr.isOutput()
+
+    def parent(self):
+        return MObject._wrap(attr=self.__attr.parent) if self.__attr.parent else MObject()
+
+
+class MFnNumericData(MFnBase):
+    kInvalid, kBoolean, kByte, kChar, kShort, k2Short, k3Short, kLong, kInt, k2Long, k2Int, k3Long, k3Int, \
+    kInt64, kFloat, k2Float, k3Float, kDouble, k2Double, k3Double, k4Double, kAddr = range(22)
+
+
+class MFnNumericAttribute(MFnAttribute):
+    __units = {"bool":MFnNumericData.kBoolean, "byte":MFnNumericData.kByte, "short":MFnNumericData.kShort,
+               "long":MFnNumericData.kLong, "float":MFnNumericData.kFloat, "double":MFnNumericData.kDouble}
+
+    def unitType(self):
+        attr = self._attr()
+        if attr.children:
+            return MFnNumericData.k2Double if len(attr.children) == 2 else MFnNumericData.k3Double
+        return MFnNumericAttribute.__units.get(attr.attrType, MFnNumericData.kDouble)
+
+
+class MFnUnitAttribute(MFnAttribute):
+    kInvalid, kAngle, kDistance, kTime = range(4)
+
+    def unitType(self):
+        return {"doubleAngle":self.kAngle, "doubleLinear":self.kDistance, "time":self.kTime}.get(self._attr().attrType, 0)
+
+
+class MFnEnumAttribute(MFnAttribute):
+    def fieldName(self, index):
+        return (self._attr().enumNames or [])[index]
+
+class MFnTypedAttribute(MFnAttribute):
+    def attrType(self):
+        return _DATA_TYPES.get(self._attr().attrType, MFnData.kInvalid)
+
+class MFnMatrixAttribute(MFnAttribute): pass
+class MFnMessageAttribute(MFnAttribute): pass
+
+class MFnCompoundAttribute(MFnAttribute):
+    def numChildren(self):
+        return len(self._attr().children)
+
+    def child(self, index):
+        return MObject._wrap(attr=self._attr().children[index])
+
+
+class MFnData(object):
+    kInvalid, kNumeric, kPlugin, kPluginGeometry, kString, kMatrix, kStringArray, kDoubleArray, kIntArray, \
+        kPointArray, kVectorArray, kComponentList, kMesh, kLattice, kNurbsCurve, kNurbsSurface = range(16)
+
+_DATA_TYPES = {"string":MFnData.kString, "matrix":MFnData.kMatrix, "mesh":MFnData.kMesh,
+               "nurbsCurve":MFnData.kNurbsCurve}
+
+
+class MFnMatrixData(MFnBase):
+    def __init__(self, obj=None):
+        self.__data = obj
+
+    def setObject(self, obj):
+        self.__data = obj
+
+    def create(self, matrix):
+        self.__data = MObject._wrap(data=("kMatrixData", list(matrix._m)))
+        return self.__data
+
+    def matrix(self):
+        return MMatrix(self.__data._data[1])
+
+
+class MItGeometry(object):
+    def __init__(self, obj):
+        if isinstance(obj, MDagPath):
+            obj = obj.node()
+        self.__node = obj._node
+        self.__index = 0
+
+    def __points(self, space=MSpace.kObject):
+        node = self.__node
+        if node.isA("transform"):
+            node = [child for child in node.children if child.type.shape][0]
+        geometry = nodeTypes.curveGeometry(_scn(), node) if node.isA("nurbsCurve") else None
+        points = geometry['cvs'] if geometry else []
+        if space == MSpace.kWorld:
+            points = [tm.transformPoint(point, _scn().worldMatrix(node)) for point in points]
+        return points
+
+    def count(self):
+        return len(self.__points())
+
+    def isDone(self):
+        return self.__index >= self.count()
+
+    def next(self):
+        self.__index += 1
+
+    def reset(self):
+        self.__index = 0
+
+    def index(self):
+        return self.__index
+
+    def position(self, space=MSpace.kObject):
+        return MPoint(*self.__points(space)[self.__index])
+#Function sets--
+
+
+#Modifiers++
+class MDGModifier(object):
+    '''
+    Queues edits, doIt applies them with the scene journal open so undoIt can revert them
+    '''
+    def __init__(self):
+        self._operations = []
+        self._journals = []
+
+    def _queue(self, operation):
+        self._operations.append(operation)
+
+    def createNode(self, typeName):
+        nodeType = nodeTypes.TYPES.get(typeName)
+        if (nodeType is None) or nodeType.abstract:
+            raise RuntimeError("(kInvalidParameter): Unknown object type: %s" %typeName)
+        if nodeType.isA("dagNode") and not isinstance(self, MDagModifier):
+            raise RuntimeError("(kInvalidParameter): %s is a dag node type, use an MDagModifier" %typeName)
+        node = _scene.Node(nodeType, typeName + "1")
+        self._queue(lambda: _scn().insert(node) if not node.alive else None)
+        return MObject._wrap(node)
+
+    def deleteNode(self, obj):
+        def delete():
+            current = _scn()
+            for node in reversed([obj._node] + current.descendants(obj._node)):
+                current.remove(node)
+        self._queue(delete)
+
+    def renameNode(self, obj, name):
+        self._queue(lambda: _scn().rename(obj._node, name))
+
+    def connect(self, source, destination, *args):
+        if args:
+            source = MPlug(source, destination)
+            destination = MPlug(args[0], args[1])
+        source, destination = MPlug(source), MPlug(destination)
+        def connect():
+            if destination._path in destination._node.inputs:
+                raise RuntimeError("(kInvalidParameter): %s is already connected" %destination.name())
+            if destination.isLocked():
+                raise RuntimeError("(kInvalidParameter): %s is locked" %destination.name())
+            _scn().connect(source._node, source._path, destination._node, destination._path)
+        self._queue(connect)
+
+    def disconnect(self, source, destination, *args):
+        if args:
+            source = MPlug(source, destination)
+            destination = MPlug(args[0], args[1])
+        source, destination = MPlug(source), MPlug(destination)
+        self._queue(lambda: _scn().disconnect(source._node, source._path, destination._node, destination._path))
+
+    def commandToExecute(self, command):
+        from . import mel
+        self._queue(lambda: mel.eval(command))
+
+    def pythonCommandToExecute(self, command):
+        self._queue(lambda: exec_(command))
+
+    def __newValue(self, plug, setter, value):
+        plug = MPlug(plug)
+        self._queue(lambda: getattr(plug, setter)(value))
+
+    def newPlugValueDouble(self, plug, value): self.__newValue(plug, "setDouble", value)
+    def newPlugValueFloat(self, plug, value): self.__newValue(plug, "setFloat", value)
+    def newPlugValueInt(self, plug, value): self.__newValue(plug, "setInt", value)
+    def newPlugValueShort(self, plug, value): self.__newValue(plug, "setShort", value)
+    def newPlugValueBool(self, plug, value): self.__newValue(plug, "setBool", value)
+    def newPlugValueString(self, plug, value): self.__newValue(plug, "setString", value)
+    def newPlugValueMAngle(self, plug, value): self.__newValue(plug, "setMAngle", value)
+    def newPlugValueMDistance(self, plug, value): self.__newValue(plug, "setMDistance", value)
+    def newPlugValueMTime(self, plug, value): self.__newValue(plug, "setMTime", value)
+    def newPlugValue(self, plug, value): self.__newValue(plug, "setMObject", value)
+
+    def doIt(self):
+        operations, self._operations = self._operations, []
+        self._journals.append((operations, _scn().run(operations)))
+
+    def undoIt(self):
+        queued = []
+        while self._journals:
+            operations, journal = self._journals.pop()
+            _scn().undo(journal)
+            queued[:0] = operations
+        self._operations = queued + self._operations
+
+
+class MDagModifier(MDGModifier):
+    def createNode(self, typeName, parent=None):
+        nodeType = nodeTypes.TYPES.get(typeName)
+        if (nodeType is None) or nodeType.abstract:
+            raise RuntimeError("(kInvalidParameter): Unknown object type: %s" %typeName)
+        if not nodeType.isA("dagNode"):
+            return MDGModifier.createNode(self, typeName)
+        parentNode = parent._node if (parent is not None and not parent.isNull()) else None
+
+        node = _scene.Node(nodeType, typeName + "1")
+        result = node
+        if nodeType.shape:
+            if parentNode is None or not parentNode.isA("transform"):
+                transform = _scene.Node(nodeTypes.TYPES["transform"], "transform1")
+                self._queue(lambda: _scn().insert(transform, parentNode) if not transform.alive else None)
+                parentNode, result = transform, transform
+            node.name = typeName + "Shape1"
+        self._queue(lambda: _scn().insert(node, parentNode) if not node.alive else None)
+        return MObject._wrap(result)
+
+    def reparentNode(self, obj, parent=None):
+        parentNode = parent._node if (parent is not None and not parent.isNull()) else None
+        self._queue(lambda: _scn().reparent(obj._node, parentNode))
+
+
+def exec_(command):
+    exec command in {}
+#Modifiers--
+
+
+#Messages++
+_callbacks = {}
+_callbackIds = itertools.count(1)
+
+def _addCallback(kind, fn):
+    callbackId = next(_callbackIds)
+    _callbacks[callbackId] = _scn().addListener(kind, fn)
+    return callbackId
+
+
+class MMessage(object):
+    @staticmethod
+    def removeCallback(callbackId):
+        fn = _callbacks.pop(callbackId, None)
+        if fn is None:
+            raise RuntimeError("(kInvalidParameter): Unknown callback id")
+        _scn().removeListener(fn)
+
+    @staticmethod
+    def removeCallbacks(callbackIds):
+        for callbackId in callbackIds:
+            MMessage.removeCallback(callbackId)
+
+
+class MDGMessage(MMessage):
+    @staticmethod
+    def addConnectionCallback(fn, clientData=None):
+        def onConnection(source, destination, made):
+            fn(MPlug._wrap(*source), MPlug._wrap(*destination), made, clientData)
+        return _addCallback("connection", onConnection)
+
+    @staticmethod
+    def addNodeAddedCallback(fn, nodeType="dependNode", clientData=None):
+        def onAdded(node):
+            if node.isA(nodeType):
+                fn(MObject._wrap(node), clientData)
+        return _addCallback("nodeAdded", onAdded)
+
+    @staticmethod
+    def addNodeRemovedCallback(fn, nodeType="dependNode", clientData=None):
+        def onRemoved(node):
+            if node.isA(nodeType):
+                fn(MObject._wrap(node), clientData)
+        return _addCallback("nodeRemoved", onRemoved)
+
+
+class MSceneMessage(MMessage):
+    kBeforeNew, kAfterNew, kBeforeOpen, kAfterOpen = 2, 3, 6, 7
+
+    @staticmethod
+    def addCallback(message, fn, clientData=None):
+        kind = {MSceneMessage.kBeforeNew:"beforeNew", MSceneMessage.kBeforeOpen:"beforeOpen"}.get(message)
+        if kind is None:
+            raise RuntimeError("(kInvalidParameter): Unsupported scene message %s" %message)
+        return _addCallback(kind, lambda: fn(clientData))
+
+
+class MDagMessage(MMessage):
+    kParentAdded, kParentRemoved, kChildAdded, kChildRemoved, kChildReordered, kInstanceAdded, kInstanceRemoved = range(1, 8)
+
+    @staticmethod
+    def addAllDagChangesCallback(fn, clientData=None):
+        def onDagChange(child, parent):
+            fn(MDagMessage.kParentAdded, MDagPath._wrap(child), MDagPath._wrap(parent), clientData)
+        return _addCallback("dagChange", onDagChange)
+
+
+class MNodeMessage(MMessage):
+    @staticmethod
+    def addNameChangedCallback(obj, fn, clientData=None):
+        def onNameChanged(node, previous):
+            if obj.isNull() or obj._node is node:
+                fn(MObject._wrap(node), previous, clientData)
+        return _addCallback("nameChanged", onNameChanged)
+#Messages--
+
+
+#Script util++
+class _Ptr(object):
+    def __init__(self, values):
+        self._values = values
+
+
+class MScriptUtil(object):
+    def __init__(self, value=None):
+        self.__values = [0.0] * 16
+        if value is not None:
+            self.__values[0] = value
+
+    def createFromList(self, values, count):
+        self.__values = list(values[:count]) + [0.0] * max(0, 16 - count)
+
+    def createFromDouble(self, *values):
+        self.__values = list(values) + [0.0] * 16
+
+    def createFromInt(self, *values):
+        self.__values = [int(value) for value in values] + [0] * 16
+
+    def __ptr(self):
+        return _Ptr(self.__values)
+
+    asDoublePtr = asFloatPtr = asIntPtr = asUintPtr = asShortPtr = asBoolPtr = __ptr
+    asDouble2Ptr = asDouble3Ptr = asDouble4Ptr = asFloat2Ptr = asFloat3Ptr = asFloat4Ptr = asInt2Ptr = asInt3Ptr = __ptr
+
+    @staticmethod
+    def getDouble(ptr):
+        return ptr._values[0]
+
+    getFloat = getDouble
+
+    @staticmethod
+    def getInt(ptr):
+        return int(ptr._values[0])
+
+    getUint = getShort = getInt
+
+    @staticmethod
+    def getBool(ptr):
+        return bool(ptr._values[0])
+
+    @staticmethod
+    def getDoubleArrayItem(ptr, index):
+        return ptr._values[index]
+
+    getFloatArrayItem = getDoubleArrayItem
+
+    @staticmethod
+    def getIntArrayItem(ptr, index):
+        return int(ptr._values[index])
+
+    @staticmethod
+    def getFloat2ArrayItem(ptr, row, column):
+        return ptr._values[row * 2 + column]
+
+    getDouble2ArrayItem = getFloat2ArrayItem
+
+    @staticmethod
+    def setDouble(ptr, value):
+        ptr._values[0] = value
+
+    setFloat = setInt = setDouble
+
+    @staticmethod
+    def setDoubleArray(ptr, index, value):
+        ptr._values[index] = value
+
+    setFloatArray = setDoubleArray
+
+    @staticmethod
+    def createMatrixFromList(values, matrix):
+        matrix._m = [float(value) for value in values[:16]]
+        return matrix
+#Script util--
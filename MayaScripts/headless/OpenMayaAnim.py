@@ -0,0 +1,52 @@
+'''
+maya.OpenMayaAnim stand-in of the headless scene
+'''
+
+import math
+from . import scene as _scene
+from .OpenMaya import MFnTransform, MFnDependencyNode, MDagPath, _scn
+
+
+class MFnIkJoint(MFnTransform):
+    def __init__(self, obj=None):
+        MFnTransform.__init__(self, obj)
+        if obj is not None and not self._node().isA("joint"):
+            raise RuntimeError("(kInvalidParameter): Object is incompatible with this method")
+
+    def getOrientation(self, rotation):
+        values = [math.radians(value) for value in _scn().get(self._node(), "jo")]
+        rotation.x, rotation.y, rotation.z = values
+        return rotation
+
+    def setOrientation(self, rotation):
+        node = self._node()
+        for child, value in zip(node.attr("jointOrient").children, (rotation.x, rotation.y, rotation.z)):
+            _scn().setValue(node, _scene.parsePath(node, child.longName), math.degrees(value))
+
+
+class MFnSkinCluster(MFnDependencyNode):
+    def __init__(self, obj=None):
+        MFnDependencyNode.__init__(self, obj)
+        if obj is not None and not self._node().isA("skinCluster"):
+            raise RuntimeError("(kInvalidParameter): Object is incompatible with this method")
+
+    def __influences(self):
+        node = self._node()
+        for index in _scn().multiIndices(node, (("matrix", None),)):
+            source = node.inputs.get((("matrix", index),))
+            if source:
+                yield index, source[0]
+
+    def influenceObjects(self, paths):
+        paths.clear()
+        for index, influence in self.__influences():
+            paths.append(MDagPath._wrap(influence))
+        return len(paths)
+
+    def indexForInfluenceObject(self, path):
+        influence = path.node()._node
+        for index, node in self.__influences():
+            if node is influence:
+                return index
+        raise RuntimeError("(kInvalidParameter): %s is not an influence" %influence.name)
+
@@ -0,0 +1,62 @@
+'''
+maya.OpenMayaMPx stand-in of the headless scene
+
+Only commands can be registered, a registered command is installed on the
+cmds module and runs the doIt of a fresh instance on every call.
+'''
+
+import sys
+from . import cmds
+
+_loadedPlugins = {}
+
+class MPxCommand(object):
+    def __init__(self):
+        pass
+
+    def doIt(self, args):
+        pass
+
+    def undoIt(self):
+        pass
+
+    def redoIt(self):
+        self.doIt(None)
+
+    def isUndoable(self):
+        return False
+
+class MPxNode(object):
+    kDependNode = 0
+    kLocatorNode = 1
+
+    def __init__(self):
+        pass
+
+def asMPxPtr(instance):
+    return instance
+
+class MFnPlugin(object):
+    def __init__(self, obj=None, vendor="", version="", apiVersion="Any"):
+        pass
+
+    def registerCommand(self, name, creator, syntaxCreator=None):
+        if hasattr(cmds, name):
+            raise RuntimeError("(kFailure): command %s is already registered" %name)
+        def command(*args, **flags):
+            instance = creator()
+            instance.doIt(args)
+            return None
+        command.__name__ = name
+        setattr(cmds, name, cmds._command("")(command))
+
+    def deregisterCommand(self, name):
+        if not hasattr(cmds, name):
+            raise RuntimeError("(kFailure): command %s is not registered" %name)
+        delattr(cmds, name)
+
+    def registerNode(self, *args):
+        raise RuntimeError("(kFailure): the headless scene does not support plug-in nodes")
+
+    def deregisterNode(self, *args):
+        raise RuntimeError("(kFailure): the headless scene does not support plug-in nodes")
@@ -0,0 +1,76 @@
+'''
+Headless in-memory stand-in for the parts of Maya the project uses
+
+Lets autoRigger, general and MocapUtils run on a plain python 2.7 without a
+Maya licence, for benchmarks and regression tests:
+
+    import headless
+    headless.install()
+
+    from autoRigger import rigModule
+    rigModule.BiPed(...)
+    print headless.stats()
+
+install() registers the package as the maya module, so everything importing
+maya.cmds, maya.OpenMaya, maya.OpenMayaAnim, maya.OpenMayaMPx or maya.mel
+gets the stand-in. It refuses to replace a real maya that is already imported.
+
+The scene keeps counters of node creations by type, connections,
+disconnections and top level command calls, see stats() and resetStats().
+'''
+
+import sys
+from . import scene
+
+MODULES = ["cmds", "OpenMaya", "OpenMayaAnim", "OpenMayaMPx", "mel"]
+
+
+def install():
+    '''
+    Registers the stand-in as the maya package, returns the package
+    '''
+    package = sys.modules[__name__]
+    existing = sys.modules.get("maya")
+    if existing is not None and existing is not package:
+        raise RuntimeError("maya is already imported from %s" %getattr(existing, "__file__", existing))
+    sys.modules["maya"] = package
+    for name in MODULES:
+        module = __import__("%s.%s" %(__name__, name), fromlist=[name])
+        sys.modules["maya.%s" %name] = module
+    return package
+
+def uninstall():
+    '''
+    Removes the maya modules registered by install()
+    '''
+    package = sys.modules[__name__]
+    if sys.modules.get("maya") is not package:
+        return
+    del sys.modules["maya"]
+    for name in MODULES:
+        sys.modules.pop("maya.%s" %name, None)
+
+def newScene():
+    '''
+    Empties the current scene, counters start again from zero
+    '''
+    return scene.newScene()
+
+def stats():
+    '''
+    Counters of the current scene as a dictionary:
+        nodes:          nodes created by type
+        connections:    number of connectAttr
+        disconnections: number of disconnectAttr
+        commands:       top level cmds calls by command name
+        sceneNodes:     nodes currently in the scene by type
+    '''
+    current = scene.current()
+    result = dict(current.counters)
+    result['nodes'] = dict(current.counters['nodes'])
+    result['commands'] = dict(current.counters['commands'])
+    result['sceneNodes'] = current.nodeCounts()
+    return result
+
+def resetStats():
+    scene.current().resetCounters()
@@ -0,0 +1,1530 @@
+'''
+maya.cmds stand-in of the headless scene
+
+Only the commands and flags the project uses are implemented, an unknown flag
+raises a TypeError so a missing feature shows up instead of being ignored.
+Flags are normalised to their long names before a command runs. Every call
+made from outside the package is counted on the current scene.
+'''
+
+import sys, math, fnmatch, copy, functools
+from . import scene as _scene
+from . import nodeTypes
+from . import transformMath as tm
+
+_depth = [0]
+
+
+def _scn():
+    return _scene.current()
+
+
+def _command(spec=""):
+    '''
+    Registers a command, spec lists its flags as "short=long" or bare long names
+    '''
+    names = {}
+    for flag in spec.split():
+        short, eq, long = flag.partition("=")
+        long = long or short
+        names[short] = long
+        names[long] = long
+    names["q"] = names["query"] = "query"
+    names["e"] = names["edit"] = "edit"
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def command(*args, **flags):
+            normalized = {}
+            for key, value in flags.items():
+                if key not in names:
+                    raise TypeError("Invalid flag '%s'" %key)
+                normalized[names[key]] = value
+            if not _depth[0]:
+                _scn().countCommand(fn.__name__)
+            _depth[0] += 1
+            try:
+                return fn(*args, **normalized)
+            finally:
+                _depth[0] -= 1
+        return command
+    return decorate
+
+
+#Helpers++
+def _flatten(args):
+    items = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            items.extend(_flatten(arg))
+        elif arg is not None:
+            items.append(arg)
+    return items
+
+def _node(name):
+    node = _scn().lookup(name)
+    if node is None:
+        raise ValueError("No object matches name: %s" %name)
+    return node
+
+def _nodes(args, useSelection=True):
+    names = _flatten(args)
+    if not names and useSelection:
+        return list(_scn().selection)
+    return [_node(name) for name in names]
+
+def _plug(attr):
+    node, dot, attrName = str(attr).strip().partition(".")
+    if not dot:
+        raise ValueError("No object matches name: %s" %attr)
+    node = _node(node)
+    return node, _scene.parsePath(node, attrName)
+
+def _name(node, full=False):
+    return _scn().fullPath(node) if full else node.name
+
+def _orNone(items):
+    return items or None
+
+def _isLocked(node, path):
+    return any(path[:k] in node.locks for k in range(len(path), 0, -1))
+
+def _isConnected(node, path):
+    return any(path[:k] in node.inputs for k in range(len(path), 0, -1))
+
+def _vector(values):
+    return [float(value) for value in _flatten([values])][:3]
+
+def _setTriple(node, attr, values):
+    '''
+    Sets the children of a compound, skipping locked and connected ones like xform does
+    '''
+    current = _scn()
+    for child, value in zip(node.attr(attr).children, values):
+        path = _scene.parsePath(node, child.longName)
+        if not (_isLocked(node, path) or _isConnected(node, path)):
+            current.setValue(node, path, float(value))
+
+def _spaceMatrix(node):
+    '''
+    Parent space of the local matrix: offsetParentMatrix * parent world matrix
+    '''
+    current = _scn()
+    matrix = current.get(node, "opm") if node.isA("transform") else tm.identity()
+    if (not node.isA("transform")) or current.get(node, "it"):
+        matrix = tm.multiply(matrix, current.parentMatrix(node))
+    return matrix
+
+def _setLocal(node, matrix):
+    '''
+    Sets the channels of node so its local matrix becomes matrix. Joints keep
+    their rotate and scale and take the rotation in their joint orient.
+    '''
+    current = _scn()
+    rotateOrder = current.get(node, "ro")
+    translate, rotate, scale = tm.decompose(matrix, rotateOrder)
+    rotateAxis = tm.eulerToMatrix(current.get(node, "ra"))
+    if node.isA("joint"):
+        keep = tm.multiply(rotateAxis, tm.eulerToMatrix(current.get(node, "r"), rotateOrder))
+        orient = tm.multiply(tm.inverse(keep), tm.eulerToMatrix(rotate, rotateOrder))
+        _setTriple(node, "jointOrient", tm.matrixToEuler(orient, 0))
+        _setTriple(node, "translate", translate)
+        return
+
+    rotation = tm.multiply(tm.inverse(rotateAxis), tm.eulerToMatrix(rotate, rotateOrder))
+    _setTriple(node, "rotate", tm.matrixToEuler(rotation, rotateOrder))
+    _setTriple(node, "scale", scale)
+    _setTriple(node, "translate", [0.0, 0.0, 0.0])
+    offset = tm.getTranslation(current.localMatrix(node))
+    _setTriple(node, "translate", tm.subtract(tm.getTranslation(matrix), offset))
+
+def _setWorld(node, matrix):
+    _setLocal(node, tm.multiply(matrix, tm.inverse(_spaceMatrix(node))))
+
+def _shapes(node, intermediate=False):
+    return [child for child in node.children if child.type.shape and (intermediate or not _scn().get(child, "io"))]
+
+def _geometryShape(node):
+    if node.type.shape:
+        return node
+    shapes = _shapes(node)
+    if not shapes:
+        raise RuntimeError("%s has no shape" %node.name)
+    return shapes[0]
+
+def _select(nodes):
+    _scn().selection = list(nodes)
+
+def _connect(source, destination, force=True):
+    sourceNode, sourcePath = source
+    node, path = destination
+    current = _scn()
+    existing = node.inputs.get(path)
+    if existing == (sourceNode, sourcePath):
+        return
+    if existing:
+        if not force:
+            raise RuntimeError("'%s.%s' is already connected to '%s.%s'."
+                               %(existing[0].name, _scene.pathString(existing[1]), node.name, _scene.pathString(path)))
+        current.disconnect(existing[0], existing[1], node, path)
+    current.connect(sourceNode, sourcePath, node, path)
+
+def _attrConnect(source, sourceAttr, destination, destinationAttr):
+    _connect((source, _scene.parsePath(source, sourceAttr)), (destination, _scene.parsePath(destination, destinationAttr)))
+
+def _curveData(node):
+    return nodeTypes.curveGeometry(_scn(), node)
+#Helpers--
+
+
+#Nodes++
+@_command("n=name p=parent ss=skipSelect s=shared")
+def createNode(nodeType, **flags):
+    current = _scn()
+    typeDef = nodeTypes.TYPES.get(nodeType)
+    if (typeDef is None) or typeDef.abstract:
+        raise RuntimeError("Unknown object type: %s" %nodeType)
+    parent = _node(flags["parent"]) if flags.get("parent") else None
+    name = flags.get("name")
+
+    if typeDef.shape and (parent is None or not parent.isA("transform")):
+        parent = current.createNode("transform", "transform1" if name else nodeType + "1", parent)
+        node = current.createNode(nodeType, name or nodeType + "Shape1", parent)
+    else:
+        node = current.createNode(nodeType, name or nodeType + "1", parent)
+    if not flags.get("skipSelect"):
+        _select([node])
+    return node.name
+
+@_command("cn=constraints c=channels ch=constructionHistory hi=hierarchy")
+def delete(*objects, **flags):
+    current = _scn()
+    for node in _nodes(objects):
+        if not node.alive:
+            continue
+        for each in reversed([node] + current.descendants(node)):
+            current.remove(each)
+
+@_command("is=ignoreShape uuid")
+def rename(*args, **flags):
+    current = _scn()
+    if len(args) == 1:
+        node, newName = current.selection[0], args[0]
+    else:
+        node, newName = _node(args[0]), args[1]
+    newName = str(newName).split("|")[-1]
+    oldName = node.name
+    newName = current.rename(node, newName)
+    if not flags.get("ignoreShape"):
+        for shape in _shapes(node, True):
+            if shape.name.startswith(oldName + "Shape"):
+                current.rename(shape, newName + shape.name[len(oldName):])
+    return newName
+
+@_command("")
+def objExists(name):
+    name = str(name)
+    if "." in name:
+        try:
+            _plug(name)
+            return True
+        except ValueError:
+            return False
+    return _scn().lookup(name) is not None
+
+@_command("i=inherited api=apiType isTypeName d=derived")
+def nodeType(name, **flags):
+    if flags.get("isTypeName"):
+        typeDef = nodeTypes.TYPES.get(name)
+        if typeDef is None:
+            return None
+        return typeDef.inherited() if flags.get("inherited") else typeDef.name
+    node = _node(name)
+    if flags.get("apiType"):
+        return node.type.apiType
+    if flags.get("inherited"):
+        return node.type.inherited()
+    return node.type.name
+
+@_command("typ=type sl=selection l=long dag tr=transforms s=shapes r=recursive o=objectsOnly et=exactType fl=flatten st=showType ni=noIntermediate")
+def ls(*patterns, **flags):
+    current = _scn()
+    if flags.get("selection"):
+        nodes = list(current.selection)
+    else:
+        nodes = current.nodes()
+    patterns = _flatten(patterns)
+    if patterns:
+        found = []
+        for pattern in patterns:
+            pattern = str(pattern)
+            if any(char in pattern for char in "*?["):
+                short = pattern.split("|")[-1]
+                found.extend(node for node in nodes if fnmatch.fnmatchcase(node.name, short))
+            else:
+                node = current.lookup(pattern.split(".")[0])
+                if node is not None and node in nodes:
+                    found.append(node)
+        nodes = found
+    types = _flatten([flags.get("type")])
+    if types:
+        nodes = [node for node in nodes if any(node.isA(typeName) for typeName in types)]
+    if flags.get("exactType"):
+        nodes = [node for node in nodes if node.type.name == flags["exactType"]]
+    if flags.get("dag"):
+        nodes = [node for node in nodes if node.isDag()]
+    if flags.get("transforms"):
+        nodes = [node for node in nodes if node.isA("transform")]
+    if flags.get("shapes"):
+        nodes = [node for node in nodes if node.type.shape]
+    if flags.get("noIntermediate"):
+        nodes = [node for node in nodes if not (node.isDag() and current.get(node, "io"))]
+    return [_name(node, flags.get("long")) for node in nodes]
+
+@_command("cl=clear add d=deselect r=replace tgl=toggle hi=hierarchy ne=noExpand all")
+def select(*objects, **flags):
+    current = _scn()
+    if flags.get("clear"):
+        current.selection = []
+        return
+    if flags.get("all"):
+        nodes = current.nodes()
+    else:
+        nodes = _nodes(objects, False)
+    if flags.get("hierarchy"):
+        nodes = [each for node in nodes for each in [node] + current.descendants(node)]
+    if flags.get("deselect"):
+        current.selection = [node for node in current.selection if node not in nodes]
+    elif flags.get("add"):
+        current.selection += [node for node in nodes if node not in current.selection]
+    elif flags.get("toggle"):
+        for node in nodes:
+            if node in current.selection:
+                current.selection.remove(node)
+            else:
+                current.selection.append(node)
+    else:
+        current.selection = nodes
+#Nodes--
+
+
+#Attributes++
+def _coerce(attr, value):
+    attrType = attr.attrType
+    if attrType == "bool":
+        return bool(value)
+    if attrType == "enum" and isinstance(value, basestring):
+        return (attr.enumNames or []).index(value)
+    if attrType in ("long", "short", "byte", "enum"):
+        value = int(value)
+    elif attrType in nodeTypes.NUMERIC:
+        value = float(value)
+    elif attrType == "string":
+        return None if value is None else str(value)
+    elif attrType == "matrix":
+        return [float(val) for val in _flatten([value])]
+    else:
+        return value
+    if attr.minValue is not None:
+        value = max(value, attr.minValue)
+    if attr.maxValue is not None:
+        value = min(value, attr.maxValue)
+    return value
+
+@_command("l=lock k=keyable cb=channelBox typ=type type clamp s=size av=alteredValue ca=caching")
+def setAttr(attr, *values, **flags):
+    current = _scn()
+    node, path = _plug(attr)
+    #    like maya the value is set before the attribute gets locked
+    locking = bool(flags.get("lock"))
+    for flag, store in [("lock", "locks"), ("keyable", "keyable"), ("channelBox", "channelBox")]:
+        if flag in flags and not (flag == "lock" and locking):
+            for each in [path] + (_scene.leafPaths(node, path)[0:] if store != "locks" else []):
+                current.setFlag(node, store, each, bool(flags[flag]))
+    if values:
+        _setValues(current, node, path, values, flags)
+    if locking:
+        current.setFlag(node, "locks", path, True)
+
+def _setValues(current, node, path, values, flags):
+
+    attr = node.attr(path[-1][0])
+    if attr.attrType in ("matrix", "nurbsCurve", "mesh") or flags.get("type") in ("matrix", "string"):
+        leaves, values = [path], [values[0] if len(values) == 1 else list(values)]
+    else:
+        leaves, values = _scene.leafPaths(node, path), _flatten(values)
+    if len(leaves) != len(values):
+        raise RuntimeError("Error while parsing arguments, %d values for '%s'" %(len(values), attr.longName))
+    for leaf, value in zip(leaves, values):
+        if _isLocked(node, leaf) or _isConnected(node, leaf):
+            raise RuntimeError("setAttr: The attribute '%s.%s' is locked or connected and cannot be modified."
+                               %(node.name, _scene.pathString(leaf)))
+        current.setValue(node, leaf, _coerce(node.attr(leaf[-1][0]), value))
+
+def _typeString(attr):
+    if attr.children:
+        kinds = set(child.attrType for child in attr.children)
+        if len(attr.children) in (2, 3) and kinds <= nodeTypes.NUMERIC:
+            return "%s%d" %("float" if kinds == set(["float"]) else "double", len(attr.children))
+        return "TdataCompound"
+    return attr.attrType
+
+@_command("l=lock k=keyable cb=channelBox typ=type type s=size se=settable asString mi=multiIndices sl=silent t=time x=expandEnvironmentVariables")
+def getAttr(attr, **flags):
+    current = _scn()
+    node, path = _plug(attr)
+    attrDef = node.attr(path[-1][0])
+    if flags.get("lock"):
+        return _isLocked(node, path)
+    if flags.get("keyable"):
+        return node.keyable.get(path, attrDef.keyable)
+    if flags.get("channelBox"):
+        return node.channelBox.get(path, False)
+    if flags.get("settable"):
+        return not (_isLocked(node, path) or _isConnected(node, path) or attrDef.isOutput())
+    if flags.get("type"):
+        return _typeString(attrDef)
+    if flags.get("multiIndices") or flags.get("size"):
+        indices = current.multiIndices(node, path[:-1] + ((path[-1][0], None),))
+        return len(indices) if flags.get("size") else _orNone(indices)
+
+    value = current.getPath(node, path)
+    if attrDef.children:
+        return [tuple(value)]
+    if attrDef.attrType == "matrix":
+        return list(value)
+    if flags.get("asString") and attrDef.enumNames:
+        return attrDef.enumNames[value]
+    if attrDef.attrType in ("nurbsCurve", "mesh"):
+        return copy.deepcopy(value)
+    return value
+
+@_command("f=force l=lock na=nextAvailable")
+def connectAttr(source, destination, **flags):
+    sourceNode, sourcePath = _plug(source)
+    node, path = _plug(destination)
+    if flags.get("nextAvailable"):
+        indices = _scn().multiIndices(node, path[:-1] + ((path[-1][0], None),))
+        path = path[:-1] + ((path[-1][0], (max(indices) + 1) if indices else 0),)
+    if _isLocked(node, path):
+        raise RuntimeError("The destination attribute '%s' is locked." %destination)
+    root = node.attr(path[0][0])
+    if root.isOutput() and root.longName in node.type.compute:
+        raise RuntimeError("The destination attribute '%s' cannot be connected to, it is an output." %destination)
+    _connect((sourceNode, sourcePath), (node, path), flags.get("force"))
+
+@_command("na=nextAvailable")
+def disconnectAttr(source, destination, **flags):
+    sourceNode, sourcePath = _plug(source)
+    node, path = _plug(destination)
+    _scn().disconnect(sourceNode, sourcePath, node, path)
+
+def _enumNames(enumName):
+    names = []
+    for item in enumName.split(":"):
+        name, eq, index = item.partition("=")
+        if eq:
+            names.extend([None] * (int(index) - len(names)))
+        names.append(name)
+    return names
+
+_ADD_TYPES = {"double3":"compound", "float3":"compound", "double2":"compound", "float2":"compound",
+              "compound":"compound", "long":"long", "short":"short", "byte":"byte", "bool":"bool", "enum":"enum",
+              "double":"double", "float":"float", "doubleLinear":"doubleLinear", "doubleAngle":"doubleAngle",
+              "time":"time", "message":"message", "matrix":"matrix", "fltMatrix":"matrix"}
+
+@_command("ln=longName sn=shortName at=attributeType dt=dataType k=keyable dv=defaultValue min=minValue max=maxValue "
+          "hnv=hasMinValue hxv=hasMaxValue en=enumName nn=niceName p=parent nc=numberOfChildren m=multi h=hidden "
+          "ex=exists smn=softMinValue smx=softMaxValue hsn=hasSoftMinValue hsx=hasSoftMaxValue uac=usedAsColor "
+          "r=readable w=writable s=storable im=indexMatters ci=cachedInternally")
+def addAttr(*objects, **flags):
+    current = _scn()
+    nodes = _nodes(objects)
+    if flags.get("query") or flags.get("edit"):
+        node, name = _attrTarget(objects, flags)
+        attr = node.attr(name)
+        if flags.get("exists"):
+            return attr is not None
+        if attr is None:
+            raise RuntimeError("addAttr: No attribute named '%s'" %name)
+        if flags.get("edit"):
+            for flag, key in [("keyable", "keyable"), ("minValue", "minValue"), ("maxValue", "maxValue"),
+                              ("defaultValue", "default")]:
+                if flag in flags:
+                    setattr(attr, key, flags[flag])
+            if "enumName" in flags:
+                attr.enumNames = _enumNames(flags["enumName"])
+            return
+        for flag, key in [("minValue", "minValue"), ("maxValue", "maxValue"), ("defaultValue", "default"),
+                          ("keyable", "keyable"), ("attributeType", "attrType"), ("shortName", "shortName"),
+                          ("longName", "longName")]:
+            if flags.get(flag):
+                return getattr(attr, key)
+        return attr.longName
+
+    longName = flags.get("longName") or flags.get("shortName")
+    shortName = flags.get("shortName") or longName
+    if not longName:
+        raise RuntimeError("addAttr: a long name is required")
+    attrType = flags.get("dataType") or flags.get("attributeType") or "double"
+    attrType = _ADD_TYPES.get(attrType, attrType)
+    for node in nodes:
+        if node.attr(longName) or node.attr(shortName):
+            raise RuntimeError("Found a attribute named '%s' on %s." %(longName, node.name))
+        default = flags.get("defaultValue")
+        if default is None:
+            default = {"bool":False, "long":0, "short":0, "byte":0, "enum":0}.get(attrType, 0.0)
+            if attrType in ("string", "message", "matrix", "compound", "nurbsCurve", "mesh"):
+                default = None
+        attr = nodeTypes.Attr(longName, shortName, attrType, default, multi=bool(flags.get("multi")),
+                              keyable=bool(flags.get("keyable")), minValue=flags.get("minValue"),
+                              maxValue=flags.get("maxValue"), hidden=bool(flags.get("hidden")),
+                              enumNames=_enumNames(flags["enumName"]) if flags.get("enumName") else None)
+        if attrType == "enum" and not attr.enumNames:
+            attr.enumNames = ["green", "purple", "yellow", "blue"]
+        parent = node.attr(flags["parent"]) if flags.get("parent") else None
+        current.addAttr(node, attr, parent)
+
+def _attrTarget(objects, flags):
+    '''
+    (node, attribute name) from either "node.attr" or a node plus the ln/sn flag
+    '''
+    items = _flatten(objects)
+    if items and "." in str(items[0]):
+        node, dot, name = str(items[0]).partition(".")
+        return _node(node), name
+    nodes = _nodes(objects)
+    return nodes[0], flags.get("longName") or flags.get("shortName")
+
+@_command("n=node ex=exists mne=minExists mxe=maxExists min=minimum max=maximum k=keyable lc=listChildren "
+          "lp=listParent at=attributeType m=multi le=listEnum ln=longName sn=shortName nn=niceName "
+          "re=rangeExists r=range ch=channelBox h=hidden ld=listDefault w=writable typ=type uac=usedAsColor")
+def attributeQuery(name, **flags):
+    node = _node(flags["node"])
+    attr = node.attr(name)
+    if flags.get("exists"):
+        return attr is not None
+    if attr is None:
+        raise RuntimeError("attributeQuery: No attribute '%s' on %s" %(name, node.name))
+    if flags.get("minExists"):
+        return attr.minValue is not None
+    if flags.get("maxExists"):
+        return attr.maxValue is not None
+    if flags.get("minimum"):
+        return [attr.minValue]
+    if flags.get("maximum"):
+        return [attr.maxValue]
+    if flags.get("range"):
+        return [attr.minValue, attr.maxValue]
+    if flags.get("keyable"):
+        return attr.keyable
+    if flags.get("listChildren"):
+        return _orNone([child.longName for child in attr.children])
+    if flags.get("listParent"):
+        return [attr.parent.longName] if attr.parent else None
+    if flags.get("attributeType"):
+        return _typeString(attr)
+    if flags.get("multi"):
+        return attr.multi
+    if flags.get("listEnum"):
+        return [":".join(name for name in attr.enumNames if name)] if attr.enumNames else None
+    if flags.get("longName"):
+        return attr.longName
+    if flags.get("shortName"):
+        return attr.shortName
+    if flags.get("listDefault"):
+        default = attr.defaultValue()
+        return list(default) if isinstance(default, tuple) else [default]
+    if flags.get("hidden"):
+        return attr.hidden
+    if flags.get("writable"):
+        return not attr.isOutput()
+    return None
+
+@_command("k=keyable ud=userDefined cb=channelBox l=locked u=unlocked m=multi s=scalar st=string v=visible "
+          "c=connectable r=read w=write sa=shortNames lf=leaf")
+def listAttr(*objects, **flags):
+    node = _nodes(objects)[0]
+    attrs = []
+    for top in node.allAttrs():
+        if flags.get("userDefined") and not top.dynamic:
+            continue
+        for attr in [top] + list(top.descendants()):
+            if attr.multi or (attr.parent and attr.parent.multi) or attr.hidden:
+                if flags.get("keyable") or flags.get("channelBox") or flags.get("scalar"):
+                    continue
+            path = tuple((each.longName, 0 if each.multi else None) for each in attr.ancestors() + [attr])
+            keyable = node.keyable.get(path, attr.keyable)
+            if flags.get("keyable") and (not keyable or attr.children):
+                continue
+            if flags.get("channelBox") and (keyable or not node.channelBox.get(path, False)):
+                continue
+            if flags.get("locked") and not _isLocked(node, path):
+                continue
+            if flags.get("unlocked") and _isLocked(node, path):
+                continue
+            if flags.get("string") and not fnmatch.fnmatchcase(attr.longName, flags["string"]):
+                continue
+            attrs.append(attr.shortName if flags.get("shortNames") else attr.longName)
+    return _orNone(attrs)
+#Attributes--
+
+
+#Transforms++
+def _pivotWorld(node, attr):
+    return tm.transformPoint(_scn().get(node, attr), _scn().worldMatrix(node))
+
+def _setPivot(node, attr, point, worldSpace):
+    '''
+    Moves a pivot without moving the node, compensating with the pivot translate
+    '''
+    current = _scn()
+    world = current.worldMatrix(node)
+    if worldSpace:
+        point = tm.transformPoint(point, tm.inverse(world))
+    _setTriple(node, attr, point)
+    after = current.worldMatrix(node)
+    delta = tm.subtract(tm.getTranslation(world), tm.getTranslation(after))
+    delta = tm.transformVector(delta, tm.inverse(_spaceMatrix(node)))
+    translateAttr = {"rotatePivot":"rotatePivotTranslate", "scalePivot":"scalePivotTranslate"}[attr]
+    _setTriple(node, translateAttr, tm.add(current.get(node, translateAttr), delta))
+
+def _worldBounds(node):
+    points = []
+    current = _scn()
+    for each in [node] + current.descendants(node):
+        if each.isA("nurbsCurve") and not current.get(each, "io"):
+            geometry = _curveData(each)
+            if geometry:
+                points.extend(tm.transformPoint(cv, current.worldMatrix(each)) for cv in geometry['cvs'])
+        elif each.isA("locator"):
+            points.append(tm.transformPoint(current.get(each, "lp"), current.worldMatrix(each)))
+    if not points:
+        position = tm.getTranslation(current.worldMatrix(node))
+        return position, position
+    return [min(point[i] for point in points) for i in range(3)], [max(point[i] for point in points) for i in range(3)]
+
+@_command("q=query ws=worldSpace os=objectSpace t=translation ro=rotation s=scale rp=rotatePivot sp=scalePivot "
+          "m=matrix roo=rotateOrder piv=pivots cp=centerPivots r=relative a=absolute p=preserve bb=boundingBox "
+          "ztp=zeroTransformPivots wd=worldSpaceDistance sh=shear ra=rotateAxis eu=euler")
+def xform(*objects, **flags):
+    current = _scn()
+    nodes = _nodes(objects)
+    worldSpace = flags.get("worldSpace")
+    if flags.get("query"):
+        node = nodes[0]
+        if flags.get("translation"):
+            if worldSpace:
+                return list(tm.transformPoint(current.get(node, "t"), _spaceMatrix(node)))
+            return list(current.get(node, "t"))
+        if flags.get("rotation"):
+            if worldSpace:
+                rotation = tm.rotationPart(current.worldMatrix(node))
+                return list(tm.matrixToEuler(rotation, current.get(node, "ro")))
+            return list(current.get(node, "r"))
+        if flags.get("scale"):
+            if worldSpace:
+                return list(tm.decompose(current.worldMatrix(node))[2])
+            return list(current.get(node, "s"))
+        if flags.get("rotatePivot"):
+            return list(_pivotWorld(node, "rp") if worldSpace else current.get(node, "rp"))
+        if flags.get("scalePivot"):
+            return list(_pivotWorld(node, "sp") if worldSpace else current.get(node, "sp"))
+        if flags.get("pivots"):
+            if worldSpace:
+                return list(_pivotWorld(node, "rp")) + list(_pivotWorld(node, "sp"))
+            return list(current.get(node, "rp")) + list(current.get(node, "sp"))
+        if flags.get("matrix"):
+            return list(current.worldMatrix(node) if worldSpace else current.localMatrix(node))
+        if flags.get("rotateOrder"):
+            return nodeTypes.TYPES["transform"].byName["ro"].enumNames[current.get(node, "ro")]
+        if flags.get("boundingBox"):
+            low, high = _worldBounds(node)
+            return low + high
+        if flags.get("rotateAxis"):
+            return list(current.get(node, "ra"))
+        raise RuntimeError("xform: query flag not supported")
+
+    for node in nodes:
+        if flags.get("centerPivots"):
+            low, high = _worldBounds(node)
+            center = [(low[i] + high[i]) * 0.5 for i in range(3)]
+            _setPivot(node, "rotatePivot", center, True)
+            _setPivot(node, "scalePivot", center, True)
+        if flags.get("rotateOrder"):
+            orders = nodeTypes.TYPES["transform"].byName["ro"].enumNames
+            current.setValue(node, _scene.parsePath(node, "ro"), orders.index(flags["rotateOrder"]))
+        if flags.get("matrix") is not None:
+            matrix = [float(val) for val in flags["matrix"]]
+            if worldSpace:
+                _setWorld(node, matrix)
+            else:
+                _setLocal(node, matrix)
+        if flags.get("scale") is not None:
+            scale = _vector(flags["scale"])
+            if flags.get("relative"):
+                scale = [a * b for a, b in zip(current.get(node, "s"), scale)]
+            _setTriple(node, "scale", scale)
+        if flags.get("rotation") is not None:
+            rotation = _vector(flags["rotation"])
+            rotateOrder = current.get(node, "ro")
+            if flags.get("relative"):
+                rotation = tm.add(current.get(node, "r"), rotation)
+            if worldSpace:
+                world = tm.eulerToMatrix(rotation, rotateOrder)
+                local = tm.multiply(world, tm.inverse(tm.rotationPart(_spaceMatrix(node))))
+                if node.isA("joint"):
+                    local = tm.multiply(local, tm.inverse(tm.eulerToMatrix(current.get(node, "jo"))))
+                local = tm.multiply(tm.inverse(tm.eulerToMatrix(current.get(node, "ra"))), local)
+                rotation = tm.matrixToEuler(local, rotateOrder)
+            _setTriple(node, "rotate", rotation)
+        if flags.get("translation") is not None:
+            translate = _vector(flags["translation"])
+            if worldSpace and not flags.get("relative"):
+                translate = tm.transformPoint(translate, tm.inverse(_spaceMatrix(node)))
+            elif flags.get("relative"):
+                if worldSpace:
+                    translate = tm.transformVector(translate, tm.inverse(_spaceMatrix(node)))
+                translate = tm.add(current.get(node, "t"), translate)
+            _setTriple(node, "translate", translate)
+        if flags.get("rotatePivot") is not None:
+            _setPivot(node, "rotatePivot", _vector(flags["rotatePivot"]), worldSpace)
+        if flags.get("scalePivot") is not None:
+            _setPivot(node, "scalePivot", _vector(flags["scalePivot"]), worldSpace)
+        if flags.get("pivots") is not None:
+            _setPivot(node, "rotatePivot", _vector(flags["pivots"]), worldSpace)
+            _setPivot(node, "scalePivot", _vector(flags["pivots"]), worldSpace)
+
+def _bakeShapes(node, matrix):
+    current = _scn()
+    for shape in _shapes(node, True):
+        if shape.isA("nurbsCurve") and shape.data.get("curve") and not shape.inputs.get((("create", None),)):
+            geometry = nodeTypes.transformGeometry(shape.data["curve"], matrix)
+            current.setData(shape, "curve", geometry)
+        elif shape.isA("locator"):
+            _setTriple(shape, "localPosition", tm.transformPoint(current.get(shape, "lp"), matrix))
+
+def _freeze(node, parentBake, translate, rotate, scale):
+    '''
+    Resets the requested channels of node keeping everything below it in place,
+    parentBake is what the parent freeze left to push into the local matrix of node
+    '''
+    current = _scn()
+    old = current.localMatrix(node)
+    local = tm.multiply(old, parentBake)
+    position, rotation, scaling = tm.decompose(local, current.get(node, "ro"))
+    if node.isA("joint"):
+        #    joints keep their translate and take the rotation into the joint orient
+        orient = tm.matrixToEuler(tm.rotationPart(local), 0) if rotate else current.get(node, "jo")
+        _setTriple(node, "translate", position)
+        if rotate:
+            _setTriple(node, "rotate", [0.0, 0.0, 0.0])
+            _setTriple(node, "jointOrient", orient)
+        if scale:
+            _setTriple(node, "scale", [1.0, 1.0, 1.0])
+    else:
+        pivots = [tm.transformPoint(current.get(node, attr), parentBake) for attr in ("rp", "sp")]
+        if translate:
+            _setTriple(node, "translate", [0.0, 0.0, 0.0])
+        if rotate:
+            _setTriple(node, "rotate", [0.0, 0.0, 0.0])
+        if scale:
+            _setTriple(node, "scale", [1.0, 1.0, 1.0])
+        if translate and rotate and scale:
+            _setTriple(node, "rotatePivotTranslate", [0.0, 0.0, 0.0])
+            _setTriple(node, "scalePivotTranslate", [0.0, 0.0, 0.0])
+            _setTriple(node, "rotatePivot", tm.transformPoint(current.get(node, "rp"), local))
+            _setTriple(node, "scalePivot", tm.transformPoint(current.get(node, "sp"), local))
+        elif not (translate or rotate or scale):
+            _setTriple(node, "rotatePivot", pivots[0])
+            _setTriple(node, "scalePivot", pivots[1])
+    bake = tm.multiply(local, tm.inverse(current.localMatrix(node)))
+    _bakeShapes(node, bake)
+    for child in node.children:
+        if child.isA("transform"):
+            _freeze(child, bake, translate, rotate, scale)
+
+@_command("a=apply t=translate r=rotate s=scale n=normal pn=preserveNormals jo=jointOrient")
+def makeIdentity(*objects, **flags):
+    current = _scn()
+    translate, rotate, scale = flags.get("translate"), flags.get("rotate"), flags.get("scale")
+    if not (translate or rotate or scale):
+        translate = rotate = scale = True
+    for node in _nodes(objects):
+        if flags.get("apply"):
+            _freeze(node, tm.identity(), translate, rotate, scale)
+        else:
+            if translate:
+                _setTriple(node, "translate", [0.0, 0.0, 0.0])
+            if rotate:
+                _setTriple(node, "rotate", [0.0, 0.0, 0.0])
+                if flags.get("jointOrient") and node.isA("joint"):
+                    _setTriple(node, "jointOrient", [0.0, 0.0, 0.0])
+            if scale:
+                _setTriple(node, "scale", [1.0, 1.0, 1.0])
+
+_LIMITS = {}
+for _kind, _long, _short in [("translation", "Trans", "t"), ("rotation", "Rot", "r"), ("scale", "Scale", "s")]:
+    for _axis in "XYZ":
+        _LIMITS["%s%s" %(_short, _axis.lower())] = (_long, _axis)
+
+@_command(" ".join(["%s=%s" %(key, key) for key in _LIMITS] + ["e%s=e%s" %(key, key) for key in _LIMITS] + ["rm=remove"]))
+def transformLimits(*objects, **flags):
+    current = _scn()
+    for node in _nodes(objects):
+        if flags.get("query"):
+            for key, (kind, axis) in _LIMITS.items():
+                if flags.get(key):
+                    return [current.get(node, "min%s%sLimit" %(kind, axis)), current.get(node, "max%s%sLimit" %(kind, axis))]
+                if flags.get("e" + key):
+                    return [current.get(node, "min%s%sLimitEnable" %(kind, axis)), current.get(node, "max%s%sLimitEnable" %(kind, axis))]
+            return None
+        for key, (kind, axis) in _LIMITS.items():
+            if flags.get(key) is not None:
+                low, high = flags[key]
+                current.setValue(node, _scene.parsePath(node, "min%s%sLimit" %(kind, axis)), float(low))
+                current.setValue(node, _scene.parsePath(node, "max%s%sLimit" %(kind, axis)), float(high))
+            if flags.get("e" + key) is not None:
+                low, high = flags["e" + key]
+                current.setValue(node, _scene.parsePath(node, "min%s%sLimitEnable" %(kind, axis)), bool(low))
+                current.setValue(node, _scene.parsePath(node, "max%s%sLimitEnable" %(kind, axis)), bool(high))
+#Transforms--
+
+
+#Hierarchy++
+def _connectInverseScale(parent, child):
+    if parent is not None and parent.isA("joint") and child.isA("joint"):
+        _attrConnect(parent, "scale", child, "inverseScale")
+
+def _disconnectInverseScale(child):
+    if child.isA("joint"):
+        path = _scene.parsePath(child, "inverseScale")
+        source = child.inputs.get(path)
+        if source and source[0].isA("joint"):
+            _scn().disconnect(source[0], source[1], child, path)
+
+def _reparent(node, parent, relative=False):
+    current = _scn()
+    if parent is not None and (parent is node or node in current.ancestors(parent)):
+        raise RuntimeError("parent: Cannot parent '%s' under its own descendant '%s'" %(node.name, parent.name))
+    world = current.worldMatrix(node)
+    _disconnectInverseScale(node)
+    current.reparent(node, parent)
+    if not relative and node.isA("transform"):
+        _setWorld(node, world)
+    _connectInverseScale(parent, node)
+
+@_command("w=world r=relative a=absolute add=addObject s=shape rm=removeObject nc=noConnections nis=noInvScale")
+def parent(*args, **flags):
+    current = _scn()
+    items = _flatten(args)
+    if flags.get("world"):
+        children, target = items, None
+    else:
+        if len(items) < 2:
+            raise RuntimeError("parent: Not enough objects or values.")
+        children, target = items[:-1], _node(items[-1])
+    result = []
+    for child in [_node(name) for name in children]:
+        if child.parent is target:
+            sys.stdout.write("# Warning: %s is already a child of %s. #\n" %(child.name, target.name if target else "the world"))
+            result.append(child.name)
+            continue
+        relative = flags.get("relative") or (flags.get("addObject") and flags.get("shape")) or child.type.shape
+        if child.type.shape and target is None:
+            raise RuntimeError("parent: shapes can not be parented to the world")
+        _reparent(child, target, relative)
+        result.append(child.name)
+    return result
+
+@_command("n=name em=empty w=world p=parent r=relative a=absolute uag=useAsGroup")
+def group(*objects, **flags):
+    current = _scn()
+    parentNode = _node(flags["parent"]) if flags.get("parent") else None
+    name = flags.get("name") or "group1"
+    if flags.get("empty"):
+        node = current.createNode("transform", name, parentNode)
+        _select([node])
+        return node.name
+
+    nodes = []
+    for node in _nodes(objects):
+        if node not in nodes:
+            nodes.append(node)
+    if not nodes:
+        raise RuntimeError("group: Not enough objects or values.")
+    if parentNode is None and not flags.get("world"):
+        parents = set(node.parent for node in nodes)
+        parentNode = nodes[0].parent if len(parents) == 1 else None
+    node = current.createNode("transform", name, parentNode)
+    for child in nodes:
+        _reparent(child, node, flags.get("relative"))
+    _select([node])
+    return node.name
+
+def _copyNode(node, name, parent):
+    current = _scn()
+    copyNode = _scene.Node(node.type, name)
+    copyNode.values = dict(node.values)
+    copyNode.locks = set(node.locks)
+    copyNode.keyable = dict(node.keyable)
+    copyNode.channelBox = dict(node.channelBox)
+    copyNode.indices = dict((key, set(value)) for key, value in node.indices.items())
+    copyNode.data = copy.deepcopy(node.data)
+    current.insert(copyNode, parent, (parent.children.index(node) + 1) if (parent is not None and node in parent.children) else None)
+    for attr in node.dynamic:
+        current.addAttr(copyNode, copy.deepcopy(attr))
+    return copyNode
+
+def _copyTree(node, name, parent, parentOnly, copies):
+    current = _scn()
+    copyNode = _copyNode(node, name, parent)
+    copies.append(copyNode)
+    if node.isA("nurbsCurve") and node.inputs.get((("create", None),)):
+        current.setData(copyNode, "curve", copy.deepcopy(_curveData(node)))
+    _connectInverseScale(parent, copyNode)
+    if not parentOnly:
+        for child in list(node.children):
+            if child.type.shape or child.isA("transform"):
+                _copyTree(child, child.name, copyNode, False, copies)
+    return copyNode
+
+@_command("rr=returnRootsOnly rc=renameChildren po=parentOnly n=name un=upstreamNodes ic=inputConnections ilf=instanceLeaf st=smartTransform")
+def duplicate(*objects, **flags):
+    current = _scn()
+    nodes = _nodes(objects)
+    roots = [node for node in nodes if not any(parent in nodes for parent in current.ancestors(node))]
+    roots = [node for i, node in enumerate(roots) if node not in roots[:i]]
+
+    rootCopies = []
+    descendants = []
+    for node in roots:
+        copies = []
+        name = flags.get("name") or node.name
+        rootCopies.append(_copyTree(node, name, node.parent, flags.get("parentOnly"), copies))
+        descendants.extend(copies[1:])
+    _select(rootCopies)
+    if flags.get("returnRootsOnly"):
+        return [node.name for node in rootCopies]
+    return [node.name for node in rootCopies + descendants]
+
+@_command("c=children p=parent s=shapes ad=allDescendents ap=allParents typ=type type f=fullPath path ni=noIntermediate")
+def listRelatives(*objects, **flags):
+    current = _scn()
+    found = []
+    for node in _nodes(objects):
+        if flags.get("parent"):
+            related = [node.parent] if node.parent else []
+        elif flags.get("allParents"):
+            related = current.ancestors(node)
+        elif flags.get("allDescendents"):
+            related = list(reversed(current.descendants(node)))
+        else:
+            related = list(node.children)
+        if flags.get("shapes"):
+            related = [each for each in related if each.type.shape]
+        if flags.get("noIntermediate"):
+            related = [each for each in related if not (each.type.shape and current.get(each, "io"))]
+        types = _flatten([flags.get("type")])
+        if types:
+            related = [each for each in related if any(each.isA(typeName) for typeName in types)]
+        found.extend(each for each in related if each not in found)
+    return _orNone([_name(node, flags.get("fullPath") or flags.get("path")) for node in found])
+
+@_command("s=source d=destination p=plugs c=connections t=type sh=shapes scn=skipConversionNodes et=exactType")
+def listConnections(*objects, **flags):
+    source = flags.get("source", True)
+    destination = flags.get("destination", True)
+    if not flags.get("source", False) and not flags.get("destination", False):
+        if "source" not in flags and "destination" not in flags:
+            source = destination = True
+    results = []
+    for item in _flatten(objects):
+        if "." in str(item):
+            node, path = _plug(item)
+            paths = set([path])
+            underPath = lambda other: other[:len(path)] == path
+        else:
+            node = _node(item)
+            underPath = lambda other: True
+        pairs = []
+        if source:
+            pairs.extend((path, node.inputs[path]) for path in sorted(node.inputs) if underPath(path))
+        if destination:
+            for path in sorted(node.outputs):
+                if underPath(path):
+                    pairs.extend((path, other) for other in node.outputs[path])
+        for path, (other, otherPath) in pairs:
+            if flags.get("type") and not other.isA(flags["type"]):
+                continue
+            name = other.name
+            if other.type.shape and not flags.get("shapes") and not flags.get("plugs") and other.parent:
+                name = other.parent.name
+            if flags.get("plugs"):
+                name = "%s.%s" %(other.name, _scene.pathString(otherPath))
+            if flags.get("connections"):
+                results.append("%s.%s" %(node.name, _scene.pathString(path)))
+            results.append(name)
+    return _orNone(results)
+#Hierarchy--
+
+
+#Joints++
+_AXES = {"x":[1.0, 0.0, 0.0], "y":[0.0, 1.0, 0.0], "z":[0.0, 0.0, 1.0]}
+
+def _secondaryAxis(secondaryAxisOrient):
+    axis = list(_AXES[secondaryAxisOrient[0]])
+    if secondaryAxisOrient.endswith("down"):
+        axis = tm.scaleVector(axis, -1.0)
+    return axis
+
+def _orientJoint(node, orientJoint, secondaryAxisOrient):
+    '''
+    Aims node at its first child joint and moves its rotation into the joint orient,
+    children keep their world transforms
+    '''
+    current = _scn()
+    childWorlds = [(child, current.worldMatrix(child)) for child in node.children if child.isA("transform")]
+    position = tm.getTranslation(current.worldMatrix(node))
+    parentRotation = tm.rotationPart(_spaceMatrix(node))
+    joints = [child for child in node.children if child.isA("joint")]
+
+    if orientJoint == "none" or not joints:
+        world = parentRotation
+    else:
+        aim = tm.subtract(tm.getTranslation(current.worldMatrix(joints[0])), position)
+        up = _secondaryAxis(secondaryAxisOrient or "yup")
+        if tm.length(tm.cross(tm.normalize(aim), up)) < 1.0e-6:
+            up = _secondaryAxis("zup")
+        world = tm.aimMatrix(aim, up, orientJoint[0], orientJoint[1])
+    orient = tm.multiply(tm.rotationPart(world), tm.inverse(parentRotation))
+    _setTriple(node, "rotate", [0.0, 0.0, 0.0])
+    _setTriple(node, "rotateAxis", [0.0, 0.0, 0.0])
+    _setTriple(node, "jointOrient", tm.matrixToEuler(orient, 0))
+    for child, world in childWorlds:
+        _setWorld(child, world)
+
+@_command("n=name p=position r=relative a=absolute oj=orientJoint sao=secondaryAxisOrient zso=zeroScaleOrient "
+          "ch=children rad=radius o=orientation roo=rotationOrder sc=scaleCompensate ax=angleX ay=angleY az=angleZ "
+          "co=component spa=setPreferredAngles")
+def joint(*objects, **flags):
+    current = _scn()
+    if flags.get("edit"):
+        nodes = _nodes(objects)
+        if flags.get("children"):
+            nodes = [each for node in nodes for each in [node] + current.descendants(node) if each.isA("joint")]
+        for node in nodes:
+            if flags.get("orientJoint"):
+                _orientJoint(node, flags["orientJoint"], flags.get("secondaryAxisOrient"))
+            if flags.get("position") is not None:
+                position = _vector(flags["position"])
+                if not flags.get("relative"):
+                    position = tm.transformPoint(position, tm.inverse(_spaceMatrix(node)))
+                _setTriple(node, "translate", position)
+            if flags.get("radius") is not None:
+                current.setValue(node, _scene.parsePath(node, "radi"), float(flags["radius"]))
+            if flags.get("orientation") is not None:
+                _setTriple(node, "jointOrient", _vector(flags["orientation"]))
+        return
+
+    if flags.get("query"):
+        node = _nodes(objects)[0]
+        if flags.get("position"):
+            if flags.get("relative"):
+                return list(current.get(node, "t"))
+            return list(tm.getTranslation(current.worldMatrix(node)))
+        if flags.get("orientation"):
+            return list(current.get(node, "jo"))
+        if flags.get("radius"):
+            return [current.get(node, "radi")]
+        raise RuntimeError("joint: query flag not supported")
+
+    parentNode = None
+    if current.selection and current.selection[0].isA("joint"):
+        parentNode = current.selection[0]
+    node = current.createNode("joint", flags.get("name") or "joint1", parentNode)
+    if flags.get("position") is not None:
+        position = _vector(flags["position"])
+        if not flags.get("relative"):
+            position = tm.transformPoint(position, tm.inverse(_spaceMatrix(node)))
+        _setTriple(node, "translate", position)
+    if flags.get("orientation") is not None:
+        _setTriple(node, "jointOrient", _vector(flags["orientation"]))
+    if flags.get("radius") is not None:
+        current.setValue(node, _scene.parsePath(node, "radi"), float(flags["radius"]))
+    if flags.get("rotationOrder"):
+        orders = nodeTypes.TYPES["transform"].byName["ro"].enumNames
+        current.setValue(node, _scene.parsePath(node, "ro"), orders.index(flags["rotationOrder"]))
+    _connectInverseScale(parentNode, node)
+    _select([node])
+    return node.name
+
+_MIRRORS = {"mirrorYZ":[-1.0, 1.0, 1.0], "mirrorXY":[1.0, 1.0, -1.0], "mirrorXZ":[1.0, -1.0, 1.0]}
+
+@_command("myz=mirrorYZ mxy=mirrorXY mxz=mirrorXZ mb=mirrorBehavior sr=searchReplace")
+def mirrorJoint(*objects, **flags):
+    current = _scn()
+    plane = [1.0, 1.0, 1.0]
+    for key, value in _MIRRORS.items():
+        if flags.get(key):
+            plane = value
+    reflect = tm.scale(*plane)
+    root = _nodes(objects)[0]
+    originals = [root] + [each for each in current.descendants(root) if each.isA("joint")]
+    worlds = [current.worldMatrix(each) for each in originals]
+
+    copies = []
+    _copyTree(root, root.name, root.parent, False, copies)
+    copies = [each for each in copies if each.isA("joint")]
+    search, replace = (flags.get("searchReplace") or (None, None))[:2]
+    for original, copyNode, world in zip(originals, copies, worlds):
+        if search:
+            current.rename(copyNode, original.name.replace(search, replace))
+        axes = [tm.transformVector(tm.axis(world, i), reflect) for i in range(3)]
+        if flags.get("mirrorBehavior"):
+            axes = [tm.scaleVector(axis, -1.0) for axis in axes]
+        else:
+            axes[2] = tm.cross(axes[0], axes[1])
+        mirrored = axes[0] + [0.0] + axes[1] + [0.0] + axes[2] + [0.0] + tm.transformPoint(tm.getTranslation(world), reflect) + [1.0]
+        _setTriple(copyNode, "rotate", [0.0, 0.0, 0.0])
+        _setWorld(copyNode, mirrored)
+    return [each.name for each in copies]
+#Joints--
+
+
+#Curves++
+def _createCurve(name, geometry, shapeName="curveShape1", parent=None):
+    current = _scn()
+    transform = current.createNode("transform", name or "curve1", parent)
+    shape = current.createNode("nurbsCurve", shapeName, transform)
+    current.setData(shape, "curve", geometry)
+    return transform, shape
+
+@_command("d=degree p=point k=knot per=periodic n=name a=append r=replace ep=editPoint bez=bezier os=objectSpace ws=worldSpace pw=pointWeight")
+def curve(*objects, **flags):
+    current = _scn()
+    degree = int(flags.get("degree", 3))
+    points = [_vector(point) for point in flags.get("point") or flags.get("editPoint") or []]
+    if len(points) <= degree:
+        raise RuntimeError("curve: %d points are not enough for a degree %d curve" %(len(points), degree))
+    periodic = bool(flags.get("periodic"))
+    knots = [float(knot) for knot in flags["knot"]] if flags.get("knot") else tm.defaultKnots(len(points), degree, periodic)
+    if len(knots) != len(points) + degree - 1:
+        raise RuntimeError("curve: %d knots given for %d points of degree %d, expected %d"
+                           %(len(knots), len(points), degree, len(points) + degree - 1))
+    geometry = {'cvs':points, 'knots':knots, 'degree':degree, 'form':2 if periodic else 0}
+    transform, shape = _createCurve(flags.get("name"), geometry)
+    _select([transform])
+    return transform.name
+
+@_command("ch=constructionHistory")
+def arclen(curveName, **flags):
+    current = _scn()
+    shape = _geometryShape(_node(curveName))
+    if flags.get("constructionHistory"):
+        info = current.createNode("curveInfo", "curveInfo1")
+        _attrConnect(shape, "worldSpace[0]", info, "inputCurve")
+        return info.name
+    geometry = current.get(shape, "worldSpace[0]")
+    return tm.curveLength(geometry['cvs'], geometry['knots'], geometry['degree'])
+
+@_command("rpo=replaceOriginal rt=rebuildType end=endKnots kr=keepRange kcp=keepControlPoints kep=keepEndPoints "
+          "kt=keepTangents s=spans d=degree tol=tolerance ch=constructionHistory")
+def rebuildCurve(curveName, **flags):
+    '''
+    Uniform rebuild, samples the curve at the new control point count
+    '''
+    current = _scn()
+    node = _node(curveName)
+    shape = _geometryShape(node)
+    geometry = _curveData(shape)
+    if flags.get("keepControlPoints"):
+        return [node.name]
+    degree = int(flags.get("degree", geometry['degree']))
+    spans = int(flags.get("spans", 4)) or (len(geometry['cvs']) - geometry['degree'])
+    count = spans + degree
+    start, end = tm.curveRange(geometry['knots'], geometry['degree'], len(geometry['cvs']))
+    cvs = [tm.curvePoint(geometry['cvs'], geometry['knots'], geometry['degree'], start + (end - start) * i / float(count - 1))
+           for i in range(count)]
+    knots = tm.defaultKnots(count, degree, False)
+    if flags.get("keepRange") == 1:
+        knots = [start + (end - start) * knot / float(spans) for knot in knots]
+    current.setData(shape, "curve", {'cvs':cvs, 'knots':knots, 'degree':degree, 'form':0})
+    return [node.name]
+
+@_command("n=name p=position a=absolute r=relative")
+def spaceLocator(**flags):
+    current = _scn()
+    transform = current.createNode("transform", flags.get("name") or "locator1")
+    shape = current.createNode("locator", transform.name + "Shape", transform)
+    if flags.get("position") is not None:
+        _setTriple(shape, "localPosition", _vector(flags["position"]))
+    _select([transform])
+    return [transform.name]
+#Curves--
+
+
+#Deformers++
+def _bindWeights(points, positions, maxInfluences):
+    '''
+    Normalised inverse distance weights of every point, limited to maxInfluences
+    '''
+    weights = []
+    for point in points:
+        distances = sorted((tm.distance(point, position), i) for i, position in enumerate(positions))
+        if distances[0][0] < 1.0e-6:
+            weights.append({distances[0][1]:1.0})
+            continue
+        distances = distances[:maxInfluences]
+        raw = dict((i, 1.0 / (distance ** 2)) for distance, i in distances)
+        total = sum(raw.values())
+        weights.append(dict((i, value / total) for i, value in raw.items()))
+    return weights
+
+@_command("tsb=toSelectedBones bm=bindMethod sm=skinMethod nw=normalizeWeights mi=maximumInfluences n=name "
+          "inf=influence dr=dropoffRate omi=obeyMaxInfluences wd=weightDistribution rui=removeUnusedInfluence "
+          "ih=ignoreHierarchy g=geometry")
+def skinCluster(*objects, **flags):
+    current = _scn()
+    if flags.get("query"):
+        node = _nodes(objects)[0]
+        if flags.get("influence"):
+            indices = current.multiIndices(node, (("matrix", None),))
+            sources = [node.inputs.get((("matrix", i),)) for i in indices]
+            return _orNone([source[0].name for source in sources if source])
+        if flags.get("geometry"):
+            return _orNone([shape.name for path, shapes in node.outputs.items() for shape, other in shapes])
+        raise RuntimeError("skinCluster: query flag not supported")
+
+    nodes = _nodes(objects)
+    joints = [node for node in nodes if node.isA("joint")]
+    if not flags.get("toSelectedBones"):
+        for node in list(joints):
+            joints.extend(each for each in current.descendants(node) if each.isA("joint") and each not in joints)
+    geometry = [node for node in nodes if not node.isA("joint")]
+    if not joints or not geometry:
+        raise RuntimeError("skinCluster: Must select at least one influence and one piece of geometry")
+    shape = _geometryShape(geometry[-1])
+    transform = shape.parent
+
+    orig = _copyNode(shape, shape.name + "Orig", transform)
+    current.setData(orig, "curve", copy.deepcopy(_curveData(shape)))
+    current.setValue(orig, (("intermediateObject", None),), True)
+
+    skin = current.createNode("skinCluster", flags.get("name") or "skinCluster1")
+    pose = current.createNode("dagPose", "bindPose1")
+    current.setValue(pose, (("bindPose", None),), True)
+    _attrConnect(pose, "message", skin, "bindPose")
+    _attrConnect(orig, "worldSpace[0]", skin, "input[0].inputGeometry")
+    _attrConnect(skin, "outputGeometry[0]", shape, "create")
+    current.setValue(skin, (("geomMatrix", None),), list(current.worldMatrix(shape)))
+    if flags.get("maximumInfluences"):
+        current.setValue(skin, (("maxInfluences", None),), int(flags["maximumInfluences"]))
+
+    for i, node in enumerate(joints):
+        _attrConnect(node, "worldMatrix[0]", skin, "matrix[%d]" %i)
+        current.setValue(skin, (("bindPreMatrix", i),), tm.inverse(current.worldMatrix(node)))
+        _attrConnect(node, "message", pose, "members[%d]" %i)
+        current.setValue(pose, (("worldMatrix", i),), list(current.worldMatrix(node)))
+
+    points = current.get(orig, "worldSpace[0]")['cvs']
+    positions = [tm.getTranslation(current.worldMatrix(node)) for node in joints]
+    for c, weights in enumerate(_bindWeights(points, positions, current.get(skin, "mi"))):
+        for i, weight in weights.items():
+            current.setValue(skin, (("weightList", c), ("weights", i)), weight)
+    return [skin.name]
+#Deformers--
+
+
+#Ik++
+def _solver(solverType):
+    current = _scn()
+    solver = current.names.get(solverType)
+    if solver is None or not solver.isA(solverType):
+        solver = current.createNode(solverType, solverType)
+    return solver
+
+def _chainPositions(startJoint, endJoint):
+    current = _scn()
+    chain = [endJoint]
+    while chain[-1] is not startJoint:
+        if chain[-1].parent is None:
+            raise RuntimeError("ikHandle: %s is not below %s" %(endJoint.name, startJoint.name))
+        chain.append(chain[-1].parent)
+    return [tm.getTranslation(current.worldMatrix(node)) for node in reversed(chain)]
+
+def _resample(points, count):
+    '''
+    count points evenly spaced along the polyline through points
+    '''
+    lengths = [0.0]
+    for a, b in zip(points, points[1:]):
+        lengths.append(lengths[-1] + tm.distance(a, b))
+    total = lengths[-1] or 1.0
+    samples = []
+    for i in range(count):
+        target = total * i / float(count - 1)
+        segment = max(0, min(len(points) - 2, sum(1 for length in lengths[1:-1] if length < target)))
+        span = (lengths[segment + 1] - lengths[segment]) or 1.0
+        blend = (target - lengths[segment]) / span
+        samples.append(tm.add(points[segment], tm.scaleVector(tm.subtract(points[segment + 1], points[segment]), blend)))
+    return samples
+
+@_command("n=name sj=startJoint ee=endEffector sol=solver ccv=createCurve c=curve pcv=parentCurve scv=simplifyCurve "
+          "ns=numSpans roc=rootOnCurve s=sticky p=priority w=weight pw=poWeight crh=createRootAxis ap=autoPriority "
+          "tws=twistType shf=snapHandleFlagToggle fs=forceSolver jl=jointList rtm=rootTwistMode")
+def ikHandle(*objects, **flags):
+    current = _scn()
+    if flags.get("query"):
+        handle = _nodes(objects)[0]
+        if flags.get("jointList"):
+            startJoint = handle.inputs[(("startJoint", None),)][0]
+            effector = handle.inputs[(("endEffector", None),)][0]
+            chain = []
+            node = effector.parent
+            while node is not None and node is not startJoint:
+                chain.insert(0, node.name)
+                node = node.parent
+            return [startJoint.name] + chain
+        raise RuntimeError("ikHandle: query flag not supported")
+
+    startJoint = _node(flags["startJoint"])
+    endJoint = _node(flags["endEffector"])
+    solverType = flags.get("solver") or "ikRPsolver"
+    positions = _chainPositions(startJoint, endJoint)
+
+    effector = current.createNode("ikEffector", "effector1", endJoint.parent)
+    _attrConnect(endJoint, "translate", effector, "translate")
+    current.setValue(effector, (("hideDisplay", None),), True)
+
+    handle = current.createNode("ikHandle", flags.get("name") or "ikHandle1")
+    _setTriple(handle, "translate", positions[-1])
+    _attrConnect(startJoint, "message", handle, "startJoint")
+    _attrConnect(effector, "handlePath[0]", handle, "endEffector")
+    _attrConnect(_solver(solverType), "message", handle, "ikSolver")
+    if flags.get("sticky") == "sticky":
+        current.setValue(handle, (("stickiness", None),), 1)
+    for flag, attr in [("priority", "priority"), ("weight", "weight"), ("poWeight", "poWeight")]:
+        if flags.get(flag) is not None and handle.attr(attr):
+            current.setValue(handle, _scene.parsePath(handle, attr), flags[flag])
+
+    result = [handle.name, effector.name]
+    if solverType == "ikSplineSolver":
+        if flags.get("curve"):
+            curveNode = _node(flags["curve"])
+        else:
+            spans = int(flags.get("numSpans", 1))
+            cvs = _resample(positions, spans + 3)
+            geometry = {'cvs':cvs, 'knots':tm.defaultKnots(len(cvs), 3, False), 'degree':3, 'form':0}
+            curveNode = _createCurve("curve1", geometry)[0]
+            result.append(curveNode.name)
+        _attrConnect(_geometryShape(curveNode), "worldSpace[0]", handle, "inCurve")
+    _select([handle])
+    return result
+#Ik--
+
+
+#Constraints++
+_CONSTRAINT_OUTPUTS = {"pointConstraint":["ct"], "orientConstraint":["cr"], "parentConstraint":["ct", "cr"],
+                       "aimConstraint":["cr"], "poleVectorConstraint":["ct"]}
+_DRIVEN = {"ct":"translate", "cr":"rotate"}
+
+def _targetIndex(constraint, target):
+    for index in _scn().multiIndices(constraint, (("target", None),)):
+        source = constraint.inputs.get((("target", index), ("targetParentMatrix", None)))
+        if source and source[0] is target:
+            return index
+    return None
+
+def _constrain(kind, objects, flags):
+    current = _scn()
+    nodes = _nodes(objects)
+    if flags.get("query"):
+        constraint = nodes[0]
+        if not constraint.isA(kind):
+            constraint = ([child for child in constraint.children if child.isA(kind)] or [None])[0]
+        if constraint is None:
+            return None
+        indices = current.multiIndices(constraint, (("target", None),))
+        if flags.get("targetList"):
+            sources = [constraint.inputs.get((("target", i), ("targetParentMatrix", None))) for i in indices]
+            return _orNone([source[0].name for source in sources if source])
+        if flags.get("weightAliasList"):
+            return _orNone([attr.longName for attr in constraint.dynamic])
+        raise RuntimeError("%s: query flag not supported" %kind)
+
+    if len(nodes) < 2:
+        raise RuntimeError("%s: at least one target and a constrained object are needed" %kind)
+    targets, driven = nodes[:-1], nodes[-1]
+    constraint = ([child for child in driven.children if child.type.name == kind] or [None])[0]
+    created = constraint is None
+    if created:
+        constraint = current.createNode(kind, flags.get("name") or "%s_%s1" %(driven.name, kind), driven)
+        for attr, drivenAttr in [("cpim", "parentInverseMatrix[0]"), ("cro", "rotateOrder"), ("crp", "rotatePivot"),
+                                 ("crt", "rotatePivotTranslate"), ("cjo", "jointOrient")]:
+            if driven.attr(drivenAttr.split("[")[0]):
+                _attrConnect(driven, drivenAttr, constraint, attr)
+        if kind == "aimConstraint":
+            _attrConnect(driven, "translate", constraint, "ct")
+        if kind == "poleVectorConstraint":
+            startJoint = driven.inputs[(("startJoint", None),)][0]
+            _attrConnect(startJoint, "translate", constraint, "crp")
+            _attrConnect(startJoint, "parentMatrix[0]", constraint, "ps")
+        for flag, attr in [("aimVector", "a"), ("upVector", "u"), ("worldUpVector", "wu")]:
+            if flags.get(flag) is not None:
+                _setTriple(constraint, constraint.attr(attr).longName, _vector(flags[flag]))
+        if flags.get("worldUpType"):
+            names = constraint.attr("wut").enumNames
+            current.setValue(constraint, (("worldUpType", None),), names.index(flags["worldUpType"]))
+        if flags.get("worldUpObject"):
+            _attrConnect(_node(flags["worldUpObject"]), "worldMatrix[0]", constraint, "wum")
+
+    for target in targets:
+        index = _targetIndex(constraint, target)
+        if index is None:
+            indices = current.multiIndices(constraint, (("target", None),))
+            index = (max(indices) + 1) if indices else 0
+            prefix = "target[%d]." %index
+            for attr, targetAttr in [("targetTranslate", "translate"), ("targetRotate", "rotate"),
+                                     ("targetRotateOrder", "rotateOrder"), ("targetRotatePivot", "rotatePivot"),
+                                     ("targetRotateTranslate", "rotatePivotTranslate"), ("targetScale", "scale"),
+                                     ("targetJointOrient", "jointOrient"), ("targetParentMatrix", "parentMatrix[0]")]:
+                if target.attr(targetAttr.split("[")[0]):
+                    _attrConnect(target, targetAttr, constraint, prefix + attr)
+            weightName = "%sW%d" %(target.name, index)
+            current.addAttr(constraint, nodeTypes.Attr(weightName, weightName, "double", 1.0, keyable=True, minValue=0.0))
+            _attrConnect(constraint, weightName, constraint, prefix + "targetWeight")
+        if flags.get("weight") is not None:
+            weightSource = constraint.inputs[(("target", index), ("targetWeight", None))]
+            current.setValue(constraint, weightSource[1], float(flags["weight"]))
+
+    if flags.get("maintainOffset"):
+        _maintainOffset(kind, constraint, driven)
+    elif flags.get("offset") is not None:
+        _setTriple(constraint, "offset", _vector(flags["offset"]))
+
+    if created:
+        skips = dict((attr, _skipped(flags.get(flag))) for attr, flag in [("ct", "skipTranslate"), ("cr", "skipRotate")])
+        skips["ct"] |= _skipped(flags.get("skip")) if kind != "orientConstraint" else set()
+        skips["cr"] |= _skipped(flags.get("skip")) if kind in ("orientConstraint", "aimConstraint") else set()
+        for attr in _CONSTRAINT_OUTPUTS[kind]:
+            drivenAttr = "poleVector" if kind == "poleVectorConstraint" else _DRIVEN[attr]
+            outAttr = constraint.attr(attr)
+            for axis, child in zip("xyz", outAttr.children):
+                if axis in skips[attr]:
+                    continue
+                _attrConnect(constraint, child.longName, driven, driven.attr(drivenAttr).children["xyz".index(axis)].longName)
+    return [constraint.name]
+
+def _skipped(skip):
+    axes = set()
+    for axis in _flatten([skip]):
+        if axis != "none":
+            axes.add(axis)
+    return axes
+
+def _maintainOffset(kind, constraint, driven):
+    current = _scn()
+    if kind in ("pointConstraint", "poleVectorConstraint"):
+        _setTriple(constraint, "offset", [0.0, 0.0, 0.0])
+        attr = "poleVector" if kind == "poleVectorConstraint" else "translate"
+        computed = current.get(constraint, "ct")
+        _setTriple(constraint, "offset", tm.subtract(current.get(driven, attr), computed))
+    elif kind in ("orientConstraint", "aimConstraint"):
+        _setTriple(constraint, "offset", [0.0, 0.0, 0.0])
+        rotateOrder = current.get(driven, "ro")
+        computed = tm.eulerToMatrix(current.get(constraint, "cr"), rotateOrder)
+        wanted = tm.eulerToMatrix(current.get(driven, "r"), rotateOrder)
+        _setTriple(constraint, "offset", tm.matrixToEuler(tm.multiply(wanted, tm.inverse(computed)), 0))
+    elif kind == "parentConstraint":
+        drivenWorld = current.worldMatrix(driven)
+        for weight, position, rotation, index in nodeTypes._targetPieces(current, constraint):
+            target = tm.setTranslation(rotation, position)
+            offset = tm.multiply(tm.rotationPart(drivenWorld), tm.inverse(target))
+            offset = tm.setTranslation(offset, tm.transformPoint(tm.getTranslation(drivenWorld), tm.inverse(target)))
+            translate, rotate, scale = tm.decompose(offset, 0)
+            for child, values in [("targetOffsetTranslate", translate), ("targetOffsetRotate", rotate)]:
+                attr = constraint.attr(child)
+                for leaf, value in zip(attr.children, values):
+                    current.setValue(constraint, (("target", index), (child, None), (leaf.longName, None)), float(value))
+
+def _constraintCommand(kind):
+    spec = "mo=maintainOffset o=offset w=weight n=name tl=targetList wal=weightAliasList sk=skip st=skipTranslate " \
+           "sr=skipRotate aim=aimVector u=upVector wu=worldUpVector wut=worldUpType wuo=worldUpObject rm=remove " \
+           "l=layer"
+    def command(*objects, **flags):
+        return _constrain(kind, objects, flags)
+    command.__name__ = kind
+    return _command(spec)(command)
+
+pointConstraint = _constraintCommand("pointConstraint")
+orientConstraint = _constraintCommand("orientConstraint")
+parentConstraint = _constraintCommand("parentConstraint")
+aimConstraint = _constraintCommand("aimConstraint")
+poleVectorConstraint = _constraintCommand("poleVectorConstraint")
+#Constraints--
+
+
+#Scene++
+@_command("new f=force o=open s=save typ=type rn=rename")
+def file(*args, **flags):
+    if flags.get("new"):
+        _scene.newScene()
+        return "untitled"
+    if flags.get("open"):
+        _scene.newScene("beforeOpen")
+        return args[0] if args else None
+    if flags.get("query"):
+        return "untitled"
+    return None
+
+@_command("swf=stateWithoutFlush st=state ock=openChunk cck=closeChunk cn=chunkName fl=flushQueue")
+def undoInfo(*args, **flags):
+    return True
+
+@_command("qt=quiet")
+def loadPlugin(name, **flags):
+    from . import OpenMaya, OpenMayaMPx
+    moduleName = name.split("/")[-1].split("\\")[-1]
+    if moduleName.endswith(".py"):
+        moduleName = moduleName[:-3]
+    module = None
+    for fullName in ("MayaNodes." + moduleName, moduleName):
+        try:
+            __import__(fullName)
+            module = sys.modules[fullName]
+            break
+        except ImportError:
+            continue
+    if module is None:
+        raise RuntimeError("loadPlugin: Plug-in, \"%s\", was not found on MAYA_PLUG_IN_PATH." %name)
+    OpenMayaMPx._loadedPlugins[moduleName] = module
+    module.initializePlugin(OpenMaya.MObject())
+    return [moduleName]
+
+@_command("f=force")
+def unloadPlugin(name, **flags):
+    from . import OpenMaya, OpenMayaMPx
+    moduleName = name.split("/")[-1].split("\\")[-1].replace(".py", "")
+    module = OpenMayaMPx._loadedPlugins.pop(moduleName, None)
+    if module:
+        module.uninitializePlugin(OpenMaya.MObject())
+    return [moduleName]
+
+@_command("l=loaded")
+def pluginInfo(name, **flags):
+    from . import OpenMayaMPx
+    return name.replace(".py", "") in OpenMayaMPx._loadedPlugins
+
+@_command("")
+def warning(message):
+    sys.stdout.write("# Warning: %s #\n" %message)
+
+@_command("")
+def error(message):
+    raise RuntimeError(message)
+
+@_command("cv=currentView f=force")
+def refresh(**flags):
+    pass
+#Scene--
@@ -0,0 +1,52 @@
+'''
+maya.mel stand-in of the headless scene
+
+Only evaluates plain command statements, every word after the command name is
+a flag or an argument and the statement runs through the matching cmds
+command. That covers the setAttr strings built by constraintFunctions.
+'''
+
+import shlex
+from . import cmds
+
+
+_BOOLEANS = {"true":True, "on":True, "yes":True, "false":False, "off":False, "no":False}
+
+def _value(word):
+    if word in _BOOLEANS:
+        return _BOOLEANS[word]
+    for cast in (int, float):
+        try:
+            return cast(word)
+        except ValueError:
+            pass
+    return word
+
+def _statements(script):
+    for statement in script.split(";"):
+        words = shlex.split(statement)
+        if words:
+            yield words
+
+def eval(script):
+    result = None
+    for words in _statements(script):
+        command = getattr(cmds, words[0], None)
+        if command is None:
+            raise RuntimeError("Cannot find procedure \"%s\"." %words[0])
+        args, flags = [], {}
+        i = 1
+        while i < len(words):
+            word = words[i]
+            if word.startswith("-") and not isinstance(_value(word), (int, float)):
+                if i + 1 < len(words) and not words[i+1].startswith("-"):
+                    flags[word[1:]] = _value(words[i+1])
+                    i += 2
+                else:
+                    flags[word[1:]] = True
+                    i += 1
+                continue
+            args.append(_value(word))
+            i += 1
+        result = command(*args, **flags)
+    return result
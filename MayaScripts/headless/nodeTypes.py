@@ -0,0 +1,846 @@
+'''
+Node types of the headless scene: attribute schemas and compute functions
+
+Only the node types and attributes the project uses are defined. Output
+attributes are pulled through a compute function taking (scene, node, index)
+and returning the value of the whole top level attribute (the element at
+index for a multi), the scene picks the children out of it.
+'''
+
+from . import transformMath as tm
+
+TYPES = {}
+
+#    value kinds
+NUMERIC = set(["double", "float", "bool", "long", "short", "byte", "enum", "doubleLinear", "doubleAngle", "time"])
+GEOMETRY = set(["nurbsCurve", "mesh"])
+
+
+class Attr(object):
+    '''
+    An attribute definition, shared by every node of a type
+    '''
+    def __init__(self, longName, shortName, attrType="double", default=None, children=(), multi=False,
+                 keyable=False, output=False, minValue=None, maxValue=None, enumNames=None, hidden=False):
+        self.longName = longName
+        self.shortName = shortName or longName
+        self.attrType = attrType
+        self.default = default
+        self.children = list(children)
+        self.multi = multi
+        self.keyable = keyable
+        self.output = output
+        self.minValue = minValue
+        self.maxValue = maxValue
+        self.enumNames = enumNames
+        self.hidden = hidden
+        self.dynamic = False
+        self.parent = None
+        for child in self.children:
+            child.parent = self
+
+    def __repr__(self):
+        return "Attr(%s)" %self.longName
+
+    def isCompound(self):
+        return bool(self.children)
+
+    def childByName(self, name):
+        for child in self.children:
+            if name in (child.longName, child.shortName):
+                return child
+        return None
+
+    def ancestors(self):
+        chain = []
+        parent = self.parent
+        while parent:
+            chain.insert(0, parent)
+            parent = parent.parent
+        return chain
+
+    def root(self):
+        attr = self
+        while attr.parent:
+            attr = attr.parent
+        return attr
+
+    def descendants(self):
+        for child in self.children:
+            yield child
+            for sub in child.descendants():
+                yield sub
+
+    def defaultValue(self):
+        if self.children:
+            return tuple(child.defaultValue() for child in self.children)
+        if self.attrType == "matrix":
+            return tm.identity()
+        return self.default
+
+    def isOutput(self):
+        return self.root().output
+
+
+class NodeType(object):
+    def __init__(self, name, parent=None, attrs=(), compute=None, apiType=None, shape=False, abstract=False):
+        self.name = name
+        self.parent = TYPES[parent] if parent else None
+        self.abstract = abstract
+        self.shape = shape or bool(self.parent and self.parent.shape)
+        self.apiType = apiType or (self.parent and self.parent.apiType) or "kDependencyNode"
+
+        self.attrs = list(self.parent.attrs) if self.parent else []
+        self.attrs.extend(attrs)
+        self.compute = dict(self.parent.compute) if self.parent else {}
+        self.compute.update(compute or {})
+        self.apiTypes = set(self.parent.apiTypes) if self.parent else set(["kBase"])
+        self.apiTypes.add(self.apiType)
+
+        self.byName = {}
+        for attr in self.attrs:
+            for each in [attr] + list(attr.descendants()):
+                self.byName.setdefault(each.longName, each)
+                self.byName.setdefault(each.shortName, each)
+        #    attribute string -> path, filled by the scene
+        self.paths = {}
+
+    def inherited(self):
+        chain = []
+        nodeType = self
+        while nodeType:
+            chain.insert(0, nodeType.name)
+            nodeType = nodeType.parent
+        return chain
+
+    def isA(self, name):
+        nodeType = self
+        while nodeType:
+            if nodeType.name == name:
+                return True
+            nodeType = nodeType.parent
+        return False
+
+
+def define(name, parent=None, attrs=(), compute=None, apiType=None, shape=False, abstract=False):
+    TYPES[name] = NodeType(name, parent, attrs, compute, apiType, shape, abstract)
+    return TYPES[name]
+
+def get(name):
+    return TYPES.get(name)
+
+
+#Attribute builders++
+def _attr(longName, shortName, attrType="double", default=0.0, **kwargs):
+    return Attr(longName, shortName, attrType, default, **kwargs)
+
+def _bool(longName, shortName, default=False, **kwargs):
+    return Attr(longName, shortName, "bool", default, **kwargs)
+
+def _enum(longName, shortName, default=0, names=None, **kwargs):
+    return Attr(longName, shortName, "enum", default, enumNames=names, **kwargs)
+
+def _matrix(longName, shortName, **kwargs):
+    return Attr(longName, shortName, "matrix", None, **kwargs)
+
+def _message(longName, shortName, **kwargs):
+    return Attr(longName, shortName, "message", None, **kwargs)
+
+def _compound(longName, shortName, children, **kwargs):
+    return Attr(longName, shortName, "compound", None, children, **kwargs)
+
+def _triple(longName, shortName, attrType="double", default=(0.0, 0.0, 0.0), suffixes="XYZ", names=None,
+            keyable=False, multi=False, output=False):
+    '''
+    double3 style compound, children are named longName + suffix and shortName + suffix.lower()
+    unless names gives the (long, short) pairs
+    '''
+    names = names or [(longName + suffix, shortName + suffix.lower()) for suffix in suffixes]
+    children = [Attr(names[i][0], names[i][1], attrType, default[i], keyable=keyable) for i in range(len(names))]
+    return Attr(longName, shortName, "compound", None, children, multi=multi, keyable=keyable, output=output)
+
+def _limits(kind, short, default):
+    '''
+    min/max limit and limit enable compounds of a transform, ie. minTransLimit (mtl) -> minTransXLimit (mtxl)
+    '''
+    attrs = []
+    for prefix, shortPrefix in [("min", "m"), ("max", "x")]:
+        values = [("%s%s%sLimit" %(prefix, kind, axis), "%s%s%sl" %(shortPrefix, short, axis.lower())) for axis in "XYZ"]
+        enables = [("%s%s%sLimitEnable" %(prefix, kind, axis), "%s%s%se" %(shortPrefix, short, axis.lower())) for axis in "XYZ"]
+        attrs.append(_triple("%s%sLimit" %(prefix, kind), "%s%sl" %(shortPrefix, short), names=values,
+                             default=(default[prefix],) * 3))
+        attrs.append(_triple("%s%sLimitEnable" %(prefix, kind), "%s%sle" %(shortPrefix, short), "bool",
+                             default=(False,) * 3, names=enables))
+    return attrs
+#Attribute builders--
+
+
+#Compute++
+def localMatrix(scene, node):
+    '''
+    The local matrix of a dag node, built from its transform attributes
+    '''
+    nodeType = node.type
+    if not nodeType.isA("transform"):
+        return tm.identity()
+    get = scene.get
+    if nodeType.isA("joint"):
+        inverseScale = (1.0, 1.0, 1.0)
+        if get(node, "ssc"):
+            inverseScale = get(node, "is")
+        return tm.composeTransform(t=get(node, "t"), r=get(node, "r"), s=get(node, "s"), rotateOrder=get(node, "ro"),
+                                   ra=get(node, "ra"), jo=get(node, "jo"), inverseScale=inverseScale)
+    return tm.composeTransform(t=get(node, "t"), r=get(node, "r"), s=get(node, "s"), rotateOrder=get(node, "ro"),
+                               sh=get(node, "sh"), ra=get(node, "ra"), rp=get(node, "rp"), rpt=get(node, "rpt"),
+                               sp=get(node, "sp"), spt=get(node, "spt"))
+
+def transformGeometry(geometry, matrix):
+    if not geometry:
+        return geometry
+    out = dict(geometry)
+    out['cvs'] = [tm.transformPoint(cv, matrix) for cv in geometry['cvs']]
+    return out
+
+def curveGeometry(scene, node):
+    '''
+    Local geometry of a curve shape, from its create input when connected,
+    else from its cached data
+    '''
+    return scene.get(node, "create") or scene.get(node, "cached") or node.data.get("curve")
+
+def _computeMatrix(scene, node, index):
+    return scene.localMatrix(node)
+
+def _computeInverseMatrix(scene, node, index):
+    return tm.inverse(scene.localMatrix(node))
+
+def _computeWorldMatrix(scene, node, index):
+    return scene.worldMatrix(node)
+
+def _computeWorldInverseMatrix(scene, node, index):
+    return tm.inverse(scene.worldMatrix(node))
+
+def _computeParentMatrix(scene, node, index):
+    return scene.parentMatrix(node)
+
+def _computeParentInverseMatrix(scene, node, index):
+    return tm.inverse(scene.parentMatrix(node))
+
+def _computeWorldPosition(scene, node, index):
+    return tuple(tm.transformPoint(scene.get(node, "lp"), scene.worldMatrix(node)))
+
+def _computeCurveLocal(scene, node, index):
+    return curveGeometry(scene, node)
+
+def _computeCurveWorld(scene, node, index):
+    return transformGeometry(curveGeometry(scene, node), scene.worldMatrix(node))
+
+def _curveAttr(key, default):
+    def compute(scene, node, index):
+        geometry = curveGeometry(scene, node)
+        if not geometry:
+            return default
+        if key == "spans":
+            return len(geometry['cvs']) - geometry['degree']
+        if key in ("minValue", "maxValue"):
+            start, end = tm.curveRange(geometry['knots'], geometry['degree'], len(geometry['cvs']))
+            return start if key == "minValue" else end
+        return geometry[key]
+    return compute
+
+def _computeArcLength(scene, node, index):
+    geometry = scene.get(node, "ic")
+    if not geometry:
+        return 0.0
+    return tm.curveLength(geometry['cvs'], geometry['knots'], geometry['degree'])
+
+def _curveParameter(scene, node, geometry):
+    param = scene.get(node, "pr")
+    if scene.get(node, "top"):
+        start, end = tm.curveRange(geometry['knots'], geometry['degree'], len(geometry['cvs']))
+        param = start + (end - start) * param
+    return param
+
+def _computeCurvePosition(scene, node, index):
+    geometry = scene.get(node, "ic")
+    if not geometry:
+        return (0.0, 0.0, 0.0)
+    return tuple(tm.curvePoint(geometry['cvs'], geometry['knots'], geometry['degree'], _curveParameter(scene, node, geometry)))
+
+def _computeSetRange(scene, node, index):
+    out = []
+    values, minimum, maximum = scene.get(node, "v"), scene.get(node, "n"), scene.get(node, "m")
+    oldMin, oldMax = scene.get(node, "on"), scene.get(node, "om")
+    for i in range(3):
+        if oldMax[i] == oldMin[i]:
+            out.append(minimum[i])
+            continue
+        blend = (values[i] - oldMin[i]) / float(oldMax[i] - oldMin[i])
+        blend = max(0.0, min(1.0, blend))
+        out.append(minimum[i] + (maximum[i] - minimum[i]) * blend)
+    return tuple(out)
+
+def _combine(operation, inputs):
+    '''
+    plusMinusAverage maths over equally sized tuples
+    '''
+    if not inputs:
+        return None
+    if operation == 0:
+        return inputs[0]
+    out = list(inputs[0])
+    for values in inputs[1:]:
+        for i in range(len(out)):
+            if operation == 2:
+                out[i] -= values[i]
+            else:
+                out[i] += values[i]
+    if operation == 3:
+        out = [val / float(len(inputs)) for val in out]
+    return tuple(out)
+
+def _plusMinusAverage(attrName, size):
+    def compute(scene, node, index):
+        inputs = []
+        for i in scene.multiIndices(node, ((attrName, None),)):
+            value = scene.getPath(node, ((attrName, i),))
+            inputs.append(value if size > 1 else (value,))
+        out = _combine(scene.get(node, "op"), inputs) or (0.0,) * size
+        return out if size > 1 else out[0]
+    return compute
+
+def _computeMultiplyDivide(scene, node, index):
+    operation = scene.get(node, "op")
+    a, b = scene.get(node, "i1"), scene.get(node, "i2")
+    out = []
+    for i in range(3):
+        if operation == 1:
+            out.append(a[i] * b[i])
+        elif operation == 2:
+            out.append(a[i] / b[i] if b[i] else 0.0)
+        elif operation == 3:
+            try:
+                out.append(float(a[i] ** b[i]))
+            except (ValueError, ZeroDivisionError, OverflowError):
+                out.append(0.0)
+        else:
+            out.append(a[i])
+    return tuple(out)
+
+def _computeReverse(scene, node, index):
+    return tuple(1.0 - val for val in scene.get(node, "i"))
+
+def _computeClamp(scene, node, index):
+    out = []
+    minimum, maximum, values = scene.get(node, "mn"), scene.get(node, "mx"), scene.get(node, "ip")
+    for i in range(3):
+        if minimum[i] > maximum[i]:
+            out.append(values[i])
+        else:
+            out.append(max(minimum[i], min(maximum[i], values[i])))
+    return tuple(out)
+
+def _computeMultDoubleLinear(scene, node, index):
+    return scene.get(node, "i1") * scene.get(node, "i2")
+
+def _computeAddDoubleLinear(scene, node, index):
+    return scene.get(node, "i1") + scene.get(node, "i2")
+
+def _computeBlendColors(scene, node, index):
+    blend = scene.get(node, "b")
+    a, b = scene.get(node, "c1"), scene.get(node, "c2")
+    return tuple(a[i] * blend + b[i] * (1.0 - blend) for i in range(3))
+
+def _computeRemapValue(scene, node, index):
+    '''
+    linear ramp, the default remapValue curve
+    '''
+    inMin, inMax = scene.get(node, "imn"), scene.get(node, "imx")
+    outMin, outMax = scene.get(node, "omn"), scene.get(node, "omx")
+    blend = 0.0
+    if inMax != inMin:
+        blend = (scene.get(node, "i") - inMin) / float(inMax - inMin)
+    blend = max(0.0, min(1.0, blend))
+    return outMin + (outMax - outMin) * blend
+
+def _computeUnitConversion(scene, node, index):
+    return (scene.get(node, "i") or 0.0) * scene.get(node, "cf")
+
+def _computeMatrixSum(scene, node, index):
+    matrices = [scene.getPath(node, (("matrixIn", i),)) for i in scene.multiIndices(node, (("matrixIn", None),))]
+    return tm.multiplyAll([matrix for matrix in matrices if matrix])
+
+def _decomposed(part):
+    def compute(scene, node, index):
+        matrix = scene.get(node, "imat") or tm.identity()
+        return tuple(tm.decomposeShear(matrix, scene.get(node, "ro"))[part])
+    return compute
+
+def _computeFourByFour(scene, node, index):
+    return [float(scene.get(node, "in%d%d" %(row, column))) for row in range(4) for column in range(4)]
+
+def _computeSkinOutput(scene, node, index):
+    '''
+    Linear blend skinning of input[index].inputGeometry
+    '''
+    geometry = scene.getPath(node, (("input", index), ("inputGeometry", None)))
+    if not geometry or not scene.get(node, "en"):
+        return geometry
+    skinMatrices = {}
+    for i in scene.multiIndices(node, (("matrix", None),)):
+        skinMatrices[i] = tm.multiply(scene.getPath(node, (("bindPreMatrix", i),)), scene.getPath(node, (("matrix", i),)))
+    toLocal = tm.inverse(scene.get(node, "gm"))
+
+    cvs = []
+    for c, cv in enumerate(geometry['cvs']):
+        point = [0.0, 0.0, 0.0]
+        total = 0.0
+        for i in scene.multiIndices(node, (("weightList", c), ("weights", None))):
+            weight = scene.getPath(node, (("weightList", c), ("weights", i)))
+            if weight and i in skinMatrices:
+                point = tm.add(point, tm.scaleVector(tm.transformPoint(cv, skinMatrices[i]), weight))
+                total += weight
+        if total < 1.0e-9:
+            point = list(cv)
+        cvs.append(tm.transformPoint(point, toLocal))
+    out = dict(geometry)
+    out['cvs'] = cvs
+    return out
+#Compute--
+
+
+#Constraints++
+def _targetPieces(scene, node):
+    '''
+    (weight, world position, world rotation, target index) for every weighted target
+    '''
+    pieces = []
+    for index in scene.multiIndices(node, (("target", None),)):
+        value = lambda child: scene.getPath(node, (("target", index), (child, None)))
+        weight = value("targetWeight")
+        if not weight:
+            continue
+        parentMatrix = value("targetParentMatrix")
+        pivot = tm.add(tm.add(value("targetTranslate"), value("targetRotatePivot")), value("targetRotateTranslate"))
+        rotation = tm.multiplyAll([tm.eulerToMatrix(value("targetRotate"), value("targetRotateOrder")),
+                                   tm.eulerToMatrix(value("targetJointOrient")), tm.rotationPart(parentMatrix)])
+        pieces.append((weight, tm.transformPoint(pivot, parentMatrix), rotation, index))
+    return pieces
+
+def _blendPositions(pieces):
+    total = sum(piece[0] for piece in pieces)
+    point = [0.0, 0.0, 0.0]
+    for piece in pieces:
+        point = tm.add(point, tm.scaleVector(piece[1], piece[0] / total))
+    return point
+
+def _drivenTranslate(scene, node, localMatrix):
+    '''
+    translate giving the driven node localMatrix, with the rotate pivot taken into account
+    '''
+    pivot = scene.get(node, "crp")
+    rotated = tm.transformVector(pivot, localMatrix)
+    translate = tm.getTranslation(localMatrix)
+    return [translate[i] + rotated[i] - pivot[i] - scene.get(node, "crt")[i] for i in range(3)]
+
+def _drivenRotate(scene, node, worldRotation, offset=(0.0, 0.0, 0.0)):
+    '''
+    rotate values giving the driven node worldRotation
+    '''
+    local = tm.multiply(worldRotation, tm.rotationPart(scene.get(node, "cpim")))
+    local = tm.multiplyAll([tm.eulerToMatrix(offset), local, tm.inverse(tm.eulerToMatrix(scene.get(node, "cjo")))])
+    return tuple(tm.matrixToEuler(local, scene.get(node, "cro")))
+
+def _computePointTranslate(scene, node, index):
+    pieces = _targetPieces(scene, node)
+    if not pieces:
+        return scene.stored(node, "ct")
+    local = tm.transformPoint(_blendPositions(pieces), scene.get(node, "cpim"))
+    pivot = tm.add(scene.get(node, "crp"), scene.get(node, "crt"))
+    return tuple(local[i] - pivot[i] + scene.get(node, "o")[i] for i in range(3))
+
+def _computeOrientRotate(scene, node, index):
+    pieces = _targetPieces(scene, node)
+    if not pieces:
+        return scene.stored(node, "cr")
+    world = tm.blendRotations([piece[2] for piece in pieces], [piece[0] for piece in pieces])
+    return _drivenRotate(scene, node, world, scene.get(node, "o"))
+
+def _parentTargets(scene, node):
+    pieces = []
+    for weight, position, rotation, index in _targetPieces(scene, node):
+        target = tm.setTranslation(rotation, position)
+        offset = tm.composeTransform(t=scene.getPath(node, (("target", index), ("targetOffsetTranslate", None))),
+                                     r=scene.getPath(node, (("target", index), ("targetOffsetRotate", None))))
+        pieces.append((weight, tm.multiply(offset, target)))
+    return pieces
+
+def _parentWorldMatrix(scene, node):
+    pieces = _parentTargets(scene, node)
+    if not pieces:
+        return None
+    total = sum(piece[0] for piece in pieces)
+    rotation = tm.blendRotations([piece[1] for piece in pieces], [piece[0] for piece in pieces])
+    position = [0.0, 0.0, 0.0]
+    for weight, matrix in pieces:
+        position = tm.add(position, tm.scaleVector(tm.getTranslation(matrix), weight / total))
+    return tm.setTranslation(rotation, position)
+
+def _computeParentTranslate(scene, node, index):
+    world = _parentWorldMatrix(scene, node)
+    if world is None:
+        return scene.stored(node, "ct")
+    return tuple(_drivenTranslate(scene, node, tm.multiply(world, scene.get(node, "cpim"))))
+
+def _computeParentRotate(scene, node, index):
+    world = _parentWorldMatrix(scene, node)
+    if world is None:
+        return scene.stored(node, "cr")
+    return _drivenRotate(scene, node, world)
+
+def _aimUp(scene, node, position):
+    upType = scene.get(node, "wut")
+    upMatrix = scene.get(node, "wum")
+    if upType == 1:
+        return tm.subtract(tm.getTranslation(upMatrix), position)
+    if upType == 2:
+        return tm.transformVector(scene.get(node, "wu"), upMatrix)
+    if upType == 3:
+        return list(scene.get(node, "wu"))
+    return [0.0, 1.0, 0.0]
+
+def _computeAimRotate(scene, node, index):
+    pieces = _targetPieces(scene, node)
+    if not pieces:
+        return scene.stored(node, "cr")
+    pivot = tm.add(tm.add(scene.get(node, "ct"), scene.get(node, "crp")), scene.get(node, "crt"))
+    position = tm.transformPoint(pivot, tm.inverse(scene.get(node, "cpim")))
+    world = tm.aimRotation(scene.get(node, "a"), scene.get(node, "u"),
+                           tm.subtract(_blendPositions(pieces), position), _aimUp(scene, node, position))
+    return _drivenRotate(scene, node, world, scene.get(node, "o"))
+
+def _computePoleVector(scene, node, index):
+    pieces = _targetPieces(scene, node)
+    if not pieces:
+        return scene.stored(node, "ct")
+    pivot = tm.transformPoint(scene.get(node, "crp"), scene.get(node, "ps"))
+    vector = tm.subtract(_blendPositions(pieces), pivot)
+    return tuple(tm.transformVector(vector, scene.get(node, "cpim")))
+#Constraints--
+
+
+#Types++
+define("dependNode", attrs=[
+    _message("message", "msg"),
+    _bool("caching", "cch"),
+    _enum("nodeState", "nds", names=["normal", "hasNoEffect", "blocking", "waiting-normal", "waiting-hasNoEffect", "waiting-blocking"]),
+    _attr("isHistoricallyInteresting", "ihi", "byte", 2),
+], abstract=True)
+
+define("dagNode", "dependNode", apiType="kDagNode", abstract=True, attrs=[
+    _bool("visibility", "v", True, keyable=True),
+    _bool("intermediateObject", "io"),
+    _bool("template", "tmp"),
+    _bool("overrideEnabled", "ove"),
+    _enum("overrideDisplayType", "ovdt", names=["Normal", "Template", "Reference"]),
+    _attr("overrideColor", "ovc", "byte", 0),
+    _bool("overrideVisibility", "ovv", True),
+    _matrix("matrix", "m", output=True),
+    _matrix("inverseMatrix", "im", output=True),
+    _matrix("worldMatrix", "wm", multi=True, output=True),
+    _matrix("worldInverseMatrix", "wim", multi=True, output=True),
+    _matrix("parentMatrix", "pm", multi=True, output=True),
+    _matrix("parentInverseMatrix", "pim", multi=True, output=True),
+    _message("instObjGroups", "iog", multi=True),
+], compute={
+    "matrix":_computeMatrix, "inverseMatrix":_computeInverseMatrix,
+    "worldMatrix":_computeWorldMatrix, "worldInverseMatrix":_computeWorldInverseMatrix,
+    "parentMatrix":_computeParentMatrix, "parentInverseMatrix":_computeParentInverseMatrix,
+})
+
+define("world", "dagNode", apiType="kWorld", abstract=True)
+
+define("transform", "dagNode", apiType="kTransform", attrs=[
+    _triple("translate", "t", "doubleLinear", keyable=True),
+    _triple("rotate", "r", "doubleAngle", keyable=True),
+    _triple("scale", "s", default=(1.0, 1.0, 1.0), keyable=True),
+    _triple("shear", "sh", names=[("shearXY", "shxy"), ("shearXZ", "shxz"), ("shearYZ", "shyz")]),
+    _enum("rotateOrder", "ro", names=["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]),
+    _triple("rotateAxis", "ra", "doubleAngle"),
+    _triple("rotatePivot", "rp", "doubleLinear"),
+    _triple("rotatePivotTranslate", "rpt", "doubleLinear"),
+    _triple("scalePivot", "sp", "doubleLinear"),
+    _triple("scalePivotTranslate", "spt", "doubleLinear"),
+    _bool("inheritsTransform", "it", True),
+    _matrix("offsetParentMatrix", "opm"),
+    _bool("displayHandle", "dh"),
+    _bool("displayLocalAxis", "dla"),
+] + _limits("Trans", "t", {"min":-1.0, "max":1.0}) + _limits("Rot", "r", {"min":-45.0, "max":45.0})
+  + _limits("Scale", "s", {"min":-1.0, "max":1.0}))
+
+define("joint", "transform", apiType="kJoint", attrs=[
+    _triple("jointOrient", "jo", "doubleAngle"),
+    _bool("segmentScaleCompensate", "ssc", True),
+    _triple("inverseScale", "is", default=(1.0, 1.0, 1.0)),
+    _attr("radius", "radi", "double", 1.0),
+    _enum("drawStyle", "ds", names=["Bone", "Multi-child as Box", "None", "Joint"]),
+    _enum("side", "sd", names=["Center", "Left", "Right", "None"]),
+    _enum("type", "typ", names=["None", "Root", "Hip", "Knee", "Foot", "Toe", "Spine", "Neck", "Head", "Collar",
+                                "Shoulder", "Elbow", "Hand", "Finger", "Thumb", "PropA", "PropB", "PropC", "Other"]),
+    _attr("otherType", "otp", "string", None),
+    _bool("drawLabel", "dl"),
+    _triple("preferredAngle", "pa", "doubleAngle"),
+    _triple("stiffness", "st"),
+    _message("bindPose", "bps"),
+])
+
+define("ikHandle", "transform", apiType="kIkHandle", attrs=[
+    _message("startJoint", "hsj"),
+    _message("endEffector", "hee"),
+    _message("ikSolver", "hsv"),
+    _triple("poleVector", "pv", default=(0.0, 0.0, 1.0)),
+    _attr("twist", "twi", "doubleAngle"),
+    _attr("roll", "rol", "doubleAngle"),
+    _attr("offset", "off"),
+    _attr("ikBlend", "ikb", "double", 1.0),
+    _attr("poWeight", "pow", "double", 1.0),
+    _enum("stickiness", "stick", names=["off", "sticky", "superSticky"]),
+    _bool("snapEnable", "snap", True),
+    _attr("inCurve", "ic", "nurbsCurve", None),
+    _bool("dTwistControlEnable", "dtce"),
+    _enum("dWorldUpType", "dwut"),
+    _enum("dWorldUpAxis", "dwua"),
+    _enum("dForwardAxis", "dfa"),
+    _triple("dWorldUpVector", "dwu", default=(0.0, 1.0, 0.0)),
+    _triple("dWorldUpVectorEnd", "dwve", default=(0.0, 1.0, 0.0)),
+    _matrix("dWorldUpMatrix", "dwum"),
+    _matrix("dWorldUpMatrixEnd", "dwue"),
+])
+
+define("ikEffector", "transform", apiType="kIkEffector", attrs=[
+    _message("handlePath", "hp", multi=True),
+    _bool("hideDisplay", "hd"),
+])
+
+define("ikSolver", "dependNode", apiType="kIkSolver", abstract=True)
+define("ikRPsolver", "ikSolver", apiType="kIkRPSolver")
+define("ikSCsolver", "ikSolver", apiType="kIkSCSolver")
+define("ikSplineSolver", "ikSolver", apiType="kSplineSolver")
+
+define("shape", "dagNode", apiType="kShape", shape=True, abstract=True)
+
+define("nurbsCurve", "shape", apiType="kNurbsCurve", attrs=[
+    _attr("create", "cr", "nurbsCurve", None),
+    _attr("cached", "cc", "nurbsCurve", None),
+    _attr("local", "l", "nurbsCurve", None, output=True),
+    _attr("worldSpace", "ws", "nurbsCurve", None, multi=True, output=True),
+    _attr("degree", "d", "long", 3, output=True),
+    _attr("spans", "sps", "long", 0, output=True),
+    _enum("form", "f", names=["Open", "Closed", "Periodic"], output=True),
+    _attr("minValue", "min", "double", 0.0, output=True),
+    _attr("maxValue", "max", "double", 1.0, output=True),
+], compute={
+    "local":_computeCurveLocal, "worldSpace":_computeCurveWorld,
+    "degree":_curveAttr("degree", 3), "spans":_curveAttr("spans", 0), "form":_curveAttr("form", 0),
+    "minValue":_curveAttr("minValue", 0.0), "maxValue":_curveAttr("maxValue", 1.0),
+})
+
+define("locator", "shape", apiType="kLocator", attrs=[
+    _triple("localPosition", "lp", "doubleLinear"),
+    _triple("localScale", "los", default=(1.0, 1.0, 1.0), names=[("localScaleX", "lsx"), ("localScaleY", "lsy"), ("localScaleZ", "lsz")]),
+    _triple("worldPosition", "wp", "doubleLinear", multi=True, output=True),
+], compute={"worldPosition":_computeWorldPosition})
+
+define("follicle", "shape", apiType="kFollicle", attrs=[
+    _attr("parameterU", "pu", keyable=True),
+    _attr("parameterV", "pv", keyable=True),
+    _attr("inputMesh", "inm", "mesh", None),
+    _attr("inputSurface", "is", "nurbsCurve", None),
+    _matrix("inputWorldMatrix", "iwm"),
+    _triple("outTranslate", "ot", "doubleLinear", output=True),
+    _triple("outRotate", "or", "doubleAngle", output=True),
+])
+
+define("geometryFilter", "dependNode", apiType="kGeometryFilt", abstract=True, attrs=[
+    _compound("input", "ip", [_attr("inputGeometry", "ig", "nurbsCurve", None), _attr("groupId", "gi", "long", 0)], multi=True),
+    _attr("outputGeometry", "og", "nurbsCurve", None, multi=True, output=True),
+    _attr("originalGeometry", "orggeom", "nurbsCurve", None, multi=True),
+    _attr("envelope", "en", "float", 1.0, keyable=True),
+])
+
+define("skinCluster", "geometryFilter", apiType="kSkinClusterFilter", attrs=[
+    _compound("weightList", "wl", [_attr("weights", "w", multi=True)], multi=True),
+    _matrix("matrix", "ma", multi=True),
+    _matrix("bindPreMatrix", "pm", multi=True),
+    _matrix("geomMatrix", "gm"),
+    _attr("maxInfluences", "mi", "long", 5),
+    _bool("maintainMaxInfluences", "mmi"),
+    _enum("skinningMethod", "sm"),
+    _enum("normalizeWeights", "nw", 1),
+    _attr("dropoff", "dpf", "double", 4.0, multi=True),
+    _bool("lockWeights", "lw", multi=True),
+    _message("paintTrans", "ptt"),
+    _message("bindPose", "bp"),
+], compute={"outputGeometry":_computeSkinOutput})
+
+define("dagPose", "dependNode", apiType="kDagPose", attrs=[
+    _message("members", "m", multi=True),
+    _matrix("worldMatrix", "wm", multi=True),
+    _bool("bindPose", "bp"),
+])
+
+_targetChildren = lambda: [
+    _triple("targetTranslate", "tt", "doubleLinear"),
+    _triple("targetRotate", "tr", "doubleAngle"),
+    _enum("targetRotateOrder", "tro"),
+    _triple("targetJointOrient", "tjo", "doubleAngle"),
+    _matrix("targetParentMatrix", "tpm"),
+    _attr("targetWeight", "tw", "double", 1.0),
+    _triple("targetRotatePivot", "trp", "doubleLinear"),
+    _triple("targetRotateTranslate", "trt", "doubleLinear"),
+    _triple("targetScale", "ts", default=(1.0, 1.0, 1.0)),
+    _triple("targetOffsetTranslate", "tot", "doubleLinear"),
+    _triple("targetOffsetRotate", "tor", "doubleAngle"),
+]
+
+define("constraint", "transform", apiType="kConstraint", abstract=True, attrs=[
+    _compound("target", "tg", _targetChildren(), multi=True),
+    _matrix("constraintParentInverseMatrix", "cpim"),
+    _enum("constraintRotateOrder", "cro"),
+    _triple("constraintJointOrient", "cjo", "doubleAngle"),
+    _triple("constraintRotatePivot", "crp", "doubleLinear"),
+    _triple("constraintRotateTranslate", "crt", "doubleLinear"),
+    _triple("constraintTranslate", "ct", "doubleLinear", output=True),
+    _triple("constraintRotate", "cr", "doubleAngle", output=True),
+    _triple("offset", "o"),
+    _enum("interpType", "int", 1, names=["No Flip", "Average", "Shortest", "Longest", "Cache"]),
+    _triple("aimVector", "a", default=(1.0, 0.0, 0.0)),
+    _triple("upVector", "u", default=(0.0, 1.0, 0.0)),
+    _triple("worldUpVector", "wu", default=(0.0, 1.0, 0.0)),
+    _matrix("worldUpMatrix", "wum"),
+    _enum("worldUpType", "wut", names=["scene", "object", "objectrotation", "vector", "none"]),
+    _matrix("pivotSpace", "ps"),
+    _bool("enableRestPosition", "erp", True),
+    _bool("lockOutput", "lo"),
+])
+
+define("pointConstraint", "constraint", apiType="kPointConstraint", compute={
+    "constraintTranslate":_computePointTranslate})
+define("orientConstraint", "constraint", apiType="kOrientConstraint", compute={
+    "constraintRotate":_computeOrientRotate})
+define("parentConstraint", "constraint", apiType="kParentConstraint", compute={
+    "constraintTranslate":_computeParentTranslate, "constraintRotate":_computeParentRotate})
+define("aimConstraint", "constraint", apiType="kAimConstraint", compute={
+    "constraintRotate":_computeAimRotate})
+define("poleVectorConstraint", "pointConstraint", apiType="kPoleVectorConstraint", compute={
+    "constraintTranslate":_computePoleVector})
+
+define("network", "dependNode", apiType="kAffect", attrs=[
+    _message("affectedBy", "ab", multi=True),
+])
+
+define("setRange", "dependNode", apiType="kSetRange", attrs=[
+    _triple("value", "v"),
+    _triple("min", "n"),
+    _triple("max", "m"),
+    _triple("oldMin", "on"),
+    _triple("oldMax", "om"),
+    _triple("outValue", "o", output=True),
+], compute={"outValue":_computeSetRange})
+
+define("plusMinusAverage", "dependNode", apiType="kPlusMinusAverage", attrs=[
+    _enum("operation", "op", 1, names=["No operation", "Sum", "Subtract", "Average"]),
+    _attr("input1D", "i1", multi=True),
+    _triple("input2D", "i2", suffixes="xy", default=(0.0, 0.0), multi=True),
+    _triple("input3D", "i3", suffixes="xyz", multi=True),
+    _attr("output1D", "o1", output=True),
+    _triple("output2D", "o2", suffixes="xy", default=(0.0, 0.0), output=True),
+    _triple("output3D", "o3", suffixes="xyz", output=True),
+], compute={"output1D":_plusMinusAverage("input1D", 1), "output2D":_plusMinusAverage("input2D", 2),
+            "output3D":_plusMinusAverage("input3D", 3)})
+
+define("multiplyDivide", "dependNode", apiType="kMultiplyDivide", attrs=[
+    _enum("operation", "op", 1, names=["No operation", "Multiply", "Divide", "Power"]),
+    _triple("input1", "i1"),
+    _triple("input2", "i2", default=(1.0, 1.0, 1.0)),
+    _triple("output", "o", output=True),
+], compute={"output":_computeMultiplyDivide})
+
+define("reverse", "dependNode", apiType="kReverse", attrs=[
+    _triple("input", "i"),
+    _triple("output", "o", output=True),
+], compute={"output":_computeReverse})
+
+define("clamp", "dependNode", apiType="kClamp", attrs=[
+    _triple("min", "mn", suffixes="RGB"),
+    _triple("max", "mx", suffixes="RGB"),
+    _triple("input", "ip", suffixes="RGB"),
+    _triple("output", "op", suffixes="RGB", output=True),
+], compute={"output":_computeClamp})
+
+define("multDoubleLinear", "dependNode", apiType="kMultDoubleLinear", attrs=[
+    _attr("input1", "i1", default=1.0),
+    _attr("input2", "i2", default=1.0),
+    _attr("output", "o", output=True),
+], compute={"output":_computeMultDoubleLinear})
+
+define("addDoubleLinear", "dependNode", apiType="kAddDoubleLinear", attrs=[
+    _attr("input1", "i1"),
+    _attr("input2", "i2"),
+    _attr("output", "o", output=True),
+], compute={"output":_computeAddDoubleLinear})
+
+define("blendColors", "dependNode", apiType="kBlendColors", attrs=[
+    _attr("blender", "b", "float", 0.5, keyable=True),
+    _triple("color1", "c1", "float", default=(1.0, 0.0, 0.0), suffixes="RGB"),
+    _triple("color2", "c2", "float", default=(0.0, 0.0, 1.0), suffixes="RGB"),
+    _triple("output", "op", "float", suffixes="RGB", output=True),
+], compute={"output":_computeBlendColors})
+
+define("remapValue", "dependNode", apiType="kRemapValue", attrs=[
+    _attr("inputValue", "i", "float"),
+    _attr("inputMin", "imn", "float", 0.0),
+    _attr("inputMax", "imx", "float", 1.0),
+    _attr("outputMin", "omn", "float", 0.0),
+    _attr("outputMax", "omx", "float", 1.0),
+    _attr("outValue", "ov", "float", output=True),
+], compute={"outValue":_computeRemapValue})
+
+define("unitConversion", "dependNode", apiType="kUnitConversion", attrs=[
+    _attr("input", "i", "double", None),
+    _attr("output", "o", output=True),
+    _attr("conversionFactor", "cf", "double", 1.0),
+], compute={"output":_computeUnitConversion})
+
+define("curveInfo", "dependNode", apiType="kCurveInfo", attrs=[
+    _attr("inputCurve", "ic", "nurbsCurve", None),
+    _attr("arcLength", "al", "double", output=True),
+], compute={"arcLength":_computeArcLength})
+
+define("pointOnCurveInfo", "dependNode", apiType="kPointOnCurveInfo", attrs=[
+    _attr("inputCurve", "ic", "nurbsCurve", None),
+    _attr("parameter", "pr"),
+    _bool("turnOnPercentage", "top"),
+    _triple("position", "p", "doubleLinear", output=True),
+], compute={"position":_computeCurvePosition})
+
+define("multMatrix", "dependNode", apiType="kPluginDependNode", attrs=[
+    _matrix("matrixIn", "i", multi=True),
+    _matrix("matrixSum", "o", output=True),
+], compute={"matrixSum":_computeMatrixSum})
+
+define("decomposeMatrix", "dependNode", apiType="kPluginDependNode", attrs=[
+    _matrix("inputMatrix", "imat"),
+    _enum("inputRotateOrder", "ro", names=["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]),
+    _triple("outputTranslate", "ot", "doubleLinear", output=True),
+    _triple("outputRotate", "or", "doubleAngle", output=True),
+    _triple("outputScale", "os", default=(1.0, 1.0, 1.0), output=True),
+    _triple("outputShear", "osh", output=True),
+], compute={"outputTranslate":_decomposed(0), "outputRotate":_decomposed(1), "outputScale":_decomposed(2),
+            "outputShear":_decomposed(3)})
+
+define("fourByFourMatrix", "dependNode", apiType="kFourByFourMatrix", attrs=[
+    _attr("in%d%d" %(row, column), "i%d%d" %(row, column), default=1.0 if row == column else 0.0)
+    for row in range(4) for column in range(4)
+] + [_matrix("output", "o", output=True)], compute={"output":_computeFourByFour})
+#Types--
@@ -0,0 +1,575 @@
+'''
+In-memory dependency graph of the headless stand-in
+
+A Scene holds the nodes, their attribute values and connections and the dag
+hierarchy. Values are kept in UI units (degrees, centimetres). Output
+attributes are pulled through the compute functions of nodeTypes and cached
+until the next edit.
+
+Every edit goes through one of the primitives below, which records its inverse
+when a journal is open. That is how the OpenMaya modifiers undo.
+'''
+
+import re, itertools
+from . import nodeTypes
+from . import transformMath as tm
+
+_MISSING = object()
+_ids = itertools.count(1)
+_PART = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)(?:\[(\d+)\])?$")
+_INVALID = re.compile(r"[^A-Za-z0-9_]")
+_SUFFIX = re.compile(r"([0-9]+)$")
+
+LISTENER_KINDS = ["connection", "nodeAdded", "nodeRemoved", "dagChange", "nameChanged", "beforeNew", "beforeOpen"]
+
+
+class Node(object):
+    '''
+    A scene node. values, inputs and locks are keyed by attribute path, a tuple
+    of (longName, index) pairs from the top level attribute down to a leaf,
+    index is None for anything that is not a multi element.
+    '''
+    def __init__(self, nodeType, name):
+        self.id = next(_ids)
+        self.type = nodeType
+        self.name = name
+        self.alive = False
+        self.values = {}
+        self.locks = set()
+        self.keyable = {}
+        self.channelBox = {}
+        self.attrs = {}
+        self.dynamic = []
+        self.indices = {}
+        self.parent = None
+        self.children = []
+        self.data = {}
+        self.inputs = {}
+        self.outputs = {}
+
+    def __repr__(self):
+        return "Node(%s, %s)" %(self.type.name, self.name)
+
+    def attr(self, name):
+        return self.type.byName.get(name) or self.attrs.get(name)
+
+    def allAttrs(self):
+        return self.type.attrs + self.dynamic
+
+    def isDag(self):
+        return self.type.isA("dagNode")
+
+    def isA(self, typeName):
+        return self.type.isA(typeName)
+
+
+#Paths++
+def parsePath(node, attrString):
+    '''
+    "target[0].targetTranslate", "tx" or "worldMatrix" -> attribute path.
+    Missing parents are filled in (tx -> translate.translateX) and a multi
+    without an index means its first element. Raises ValueError.
+    '''
+    attrString = attrString.strip()
+    cached = node.type.paths.get(attrString)
+    if cached is not None:
+        return cached
+
+    path = []
+    dynamic = False
+    for part in attrString.split("."):
+        match = _PART.match(part.strip())
+        attr = match and node.attr(match.group(1))
+        if not attr:
+            raise ValueError("No object matches name: %s.%s" %(node.name, attrString))
+        dynamic = dynamic or attr.dynamic
+        ancestors = attr.ancestors()
+        known = [node.attr(name) for name, index in path]
+        if known != ancestors[:len(known)]:
+            raise ValueError("No object matches name: %s.%s" %(node.name, attrString))
+        for ancestor in ancestors[len(path):]:
+            path.append((ancestor.longName, 0 if ancestor.multi else None))
+        index = match.group(2)
+        if index is not None:
+            index = int(index)
+        elif attr.multi:
+            index = 0
+        path.append((attr.longName, index))
+
+    path = tuple(path)
+    if not dynamic:
+        node.type.paths[attrString] = path
+    return path
+
+def pathString(path):
+    parts = []
+    for name, index in path:
+        parts.append(name if index is None else "%s[%d]" %(name, index))
+    return ".".join(parts)
+
+def component(value, attr, rest):
+    '''
+    Picks the child value at rest (a path below attr) out of the compound value of attr
+    '''
+    for name, index in rest:
+        child = attr.childByName(name)
+        if value is not None:
+            value = value[attr.children.index(child)]
+        attr = child
+    return value
+
+def leafPaths(node, path):
+    '''
+    path if it is a leaf, else the paths of its leaves in order
+    '''
+    attr = node.attr(path[-1][0])
+    if not attr.children:
+        return [path]
+    paths = []
+    for child in attr.children:
+        paths.extend(leafPaths(node, path + ((child.longName, 0 if child.multi else None),)))
+    return paths
+#Paths--
+
+
+class Scene(object):
+    def __init__(self, listeners=None):
+        self.names = {}
+        self.world = Node(nodeTypes.TYPES["world"], "")
+        self.world.alive = True
+        self.selection = []
+        self.listeners = listeners if listeners is not None else dict((kind, []) for kind in LISTENER_KINDS)
+        self.journal = None
+        self.cache = {}
+        self.__evaluating = set()
+        self.resetCounters()
+
+    #Counters++
+    def resetCounters(self):
+        self.counters = {'nodes':{}, 'connections':0, 'disconnections':0, 'commands':{}}
+
+    def countCommand(self, name):
+        commands = self.counters['commands']
+        commands[name] = commands.get(name, 0) + 1
+
+    def nodeCounts(self):
+        '''
+        Number of nodes in the scene by type
+        '''
+        counts = {}
+        for node in self.names.itervalues():
+            counts[node.type.name] = counts.get(node.type.name, 0) + 1
+        return counts
+    #Counters--
+
+    #Listeners++
+    def addListener(self, kind, fn):
+        self.listeners[kind].append(fn)
+        return fn
+
+    def removeListener(self, fn):
+        for listeners in self.listeners.itervalues():
+            if fn in listeners:
+                listeners.remove(fn)
+                return True
+        return False
+
+    def notify(self, kind, *args):
+        for fn in list(self.listeners[kind]):
+            fn(*args)
+    #Listeners--
+
+    #Lookup++
+    def nodes(self, typeName=None):
+        '''
+        Nodes in creation order
+        '''
+        nodes = sorted(self.names.itervalues(), key=lambda node: node.id)
+        if typeName:
+            nodes = [node for node in nodes if node.isA(typeName)]
+        return nodes
+
+    def lookup(self, name):
+        '''
+        Node from a short name or a (partial) dag path, None when there is no match
+        '''
+        if isinstance(name, Node):
+            return name if name.alive else None
+        name = str(name).strip()
+        parts = [part for part in name.split("|") if part]
+        if not parts:
+            return None
+        node = self.names.get(parts[-1])
+        if node is None:
+            return None
+        parent = node.parent
+        for part in reversed(parts[:-1]):
+            if (parent is None) or (parent.name != part):
+                return None
+            parent = parent.parent
+        if name.startswith("|") and parent is not None:
+            return None
+        return node
+
+    def fullPath(self, node):
+        if not node.isDag():
+            return node.name
+        names = []
+        while node is not None:
+            names.insert(0, node.name)
+            node = node.parent
+        return "|" + "|".join(names)
+
+    def uniqueName(self, name, node=None):
+        '''
+        name if it is free (or already belongs to node), else the next free numeric suffix
+        '''
+        name = _INVALID.sub("_", str(name)) or "_"
+        if name[0].isdigit():
+            name = "_" + name
+        while (name in self.names) and (self.names[name] is not node):
+            nums = _SUFFIX.search(name)
+            if nums:
+                name = name[:nums.start()] + str(int(nums.group(0)) + 1)
+            else:
+                name += "1"
+        return name
+
+    def ancestors(self, node):
+        parents = []
+        node = node.parent
+        while node is not None:
+            parents.append(node)
+            node = node.parent
+        return parents
+
+    def descendants(self, node):
+        '''
+        Depth first, children before their own children
+        '''
+        found = []
+        for child in node.children:
+            found.append(child)
+            found.extend(self.descendants(child))
+        return found
+
+    def topLevel(self):
+        return [node for node in self.nodes() if node.isDag() and node.parent is None]
+    #Lookup--
+
+    #Evaluation++
+    def path(self, node, attrString):
+        return parsePath(node, attrString)
+
+    def get(self, node, attrString):
+        return self.getPath(node, parsePath(node, attrString))
+
+    def getPath(self, node, path):
+        key = (node.id, path)
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self.__evaluating:
+            return self.storedPath(node, path)
+        self.__evaluating.add(key)
+        try:
+            value = self.__evaluate(node, path)
+        finally:
+            self.__evaluating.discard(key)
+        self.cache[key] = value
+        return value
+
+    def __evaluate(self, node, path):
+        source = node.inputs.get(path)
+        if source:
+            return self.getPath(source[0], source[1])
+        for k in range(len(path) - 1, 0, -1):
+            source = node.inputs.get(path[:k])
+            if source:
+                return component(self.getPath(source[0], source[1]), node.attr(path[k - 1][0]), path[k:])
+
+        root = node.attr(path[0][0])
+        compute = None if root.dynamic else node.type.compute.get(root.longName)
+        if compute:
+            return component(compute(self, node, path[0][1] or 0), root, path[1:])
+        attr = node.attr(path[-1][0])
+        if attr.children:
+            return tuple(self.getPath(node, path + ((child.longName, 0 if child.multi else None),))
+                         for child in attr.children)
+        return node.values.get(path, attr.defaultValue())
+
+    def stored(self, node, attrString):
+        return self.storedPath(node, parsePath(node, attrString))
+
+    def storedPath(self, node, path):
+        '''
+        Value set on the attribute, ignoring connections and computes
+        '''
+        attr = node.attr(path[-1][0])
+        if attr.children:
+            return tuple(self.storedPath(node, path + ((child.longName, 0 if child.multi else None),))
+                         for child in attr.children)
+        return node.values.get(path, attr.defaultValue())
+
+    def multiIndices(self, node, arrayPath):
+        '''
+        Existing (set or connected) element indices of the multi at arrayPath,
+        the last entry of arrayPath has None as its index
+        '''
+        return sorted(node.indices.get(arrayPath, ()))
+
+    def localMatrix(self, node):
+        key = (node.id, "#local")
+        value = self.cache.get(key)
+        if value is None:
+            value = self.cache[key] = nodeTypes.localMatrix(self, node)
+        return value
+
+    def parentMatrix(self, node):
+        if node.parent is None:
+            return tm.identity()
+        return self.worldMatrix(node.parent)
+
+    def worldMatrix(self, node):
+        if node is self.world:
+            return tm.identity()
+        key = (node.id, "#world")
+        value = self.cache.get(key)
+        if value is None:
+            matrix = self.localMatrix(node)
+            if node.isA("transform"):
+                matrix = tm.multiply(matrix, self.get(node, "opm"))
+                if self.get(node, "it"):
+                    matrix = tm.multiply(matrix, self.parentMatrix(node))
+            else:
+                matrix = tm.multiply(matrix, self.parentMatrix(node))
+            value = self.cache[key] = matrix
+        return value
+    #Evaluation--
+
+    #Journal++
+    def _record(self, undo):
+        self.cache.clear()
+        if self.journal is not None:
+            self.journal.append(undo)
+
+    def run(self, operations):
+        '''
+        Calls every operation with a journal open and returns it, when one
+        fails the ones that ran are reverted before the error is raised
+        '''
+        outer = self.journal
+        journal = self.journal = []
+        try:
+            for operation in operations:
+                operation()
+        except:
+            self.journal = outer
+            self.undo(journal)
+            raise
+        self.journal = outer
+        if outer is not None:
+            outer.append(lambda: self.undo(journal))
+        return journal
+
+    def undo(self, journal):
+        outer = self.journal
+        self.journal = None
+        try:
+            for undo in reversed(journal):
+                undo()
+        finally:
+            self.journal = outer
+            self.cache.clear()
+    #Journal--
+
+    #Primitives++
+    def createNode(self, typeName, name=None, parent=None):
+        nodeType = nodeTypes.TYPES.get(typeName)
+        if (nodeType is None) or nodeType.abstract:
+            raise RuntimeError("Unknown object type: %s" %typeName)
+        return self.insert(Node(nodeType, name or typeName + "1"), parent)
+
+    def insert(self, node, parent=None, index=None):
+        '''
+        Adds a detached node to the scene
+        '''
+        node.name = self.uniqueName(node.name)
+        node.alive = True
+        self.names[node.name] = node
+        if parent is not None and parent is not self.world:
+            node.parent = parent
+            parent.children.insert(len(parent.children) if index is None else index, node)
+        nodes = self.counters['nodes']
+        nodes[node.type.name] = nodes.get(node.type.name, 0) + 1
+        self._record(lambda: self.remove(node))
+        self.notify("nodeAdded", node)
+        return node
+
+    def remove(self, node):
+        '''
+        Takes a node out of the scene with its connections, its children are left parentless
+        '''
+        for path, source in node.inputs.items():
+            self.disconnect(source[0], source[1], node, path)
+        for path, destinations in node.outputs.items():
+            for destination in list(destinations):
+                self.disconnect(node, path, destination[0], destination[1])
+        for child in list(node.children):
+            self.reparent(child, None)
+        parent, index = node.parent, None
+        if parent is not None:
+            index = parent.children.index(node)
+            parent.children.remove(node)
+            node.parent = None
+        if node in self.selection:
+            self.selection.remove(node)
+        del self.names[node.name]
+        node.alive = False
+        self._record(lambda: self.insert(node, parent, index))
+        self.notify("nodeRemoved", node)
+
+    def setValue(self, node, path, value):
+        old = node.values.get(path, _MISSING)
+        node.values[path] = value
+        self.__touch(node, path)
+        if old is _MISSING:
+            self._record(lambda: node.values.pop(path, None))
+        else:
+            self._record(lambda: node.values.__setitem__(path, old))
+
+    def setFlag(self, node, flag, path, value):
+        '''
+        flag is "locks", "keyable" or "channelBox"
+        '''
+        if flag == "locks":
+            locked = path in node.locks
+            if value:
+                node.locks.add(path)
+            else:
+                node.locks.discard(path)
+            self._record(lambda: self.setFlag(node, flag, path, locked))
+            return
+        store = getattr(node, flag)
+        old = store.get(path, _MISSING)
+        store[path] = value
+        if old is _MISSING:
+            self._record(lambda: store.pop(path, None))
+        else:
+            self._record(lambda: store.__setitem__(path, old))
+
+    def connect(self, source, sourcePath, destination, destinationPath):
+        destination.inputs[destinationPath] = (source, sourcePath)
+        source.outputs.setdefault(sourcePath, []).append((destination, destinationPath))
+        self.__touch(source, sourcePath)
+        self.__touch(destination, destinationPath)
+        self.counters['connections'] += 1
+        self._record(lambda: self.disconnect(source, sourcePath, destination, destinationPath))
+        self.notify("connection", (source, sourcePath), (destination, destinationPath), True)
+
+    def disconnect(self, source, sourcePath, destination, destinationPath):
+        if destination.inputs.get(destinationPath) != (source, sourcePath):
+            raise RuntimeError("There is no connection from '%s.%s' to '%s.%s' to disconnect."
+                               %(source.name, pathString(sourcePath), destination.name, pathString(destinationPath)))
+        del destination.inputs[destinationPath]
+        outputs = source.outputs[sourcePath]
+        outputs.remove((destination, destinationPath))
+        if not outputs:
+            del source.outputs[sourcePath]
+        self.counters['disconnections'] += 1
+        self._record(lambda: self.connect(source, sourcePath, destination, destinationPath))
+        self.notify("connection", (source, sourcePath), (destination, destinationPath), False)
+
+    def reparent(self, node, parent, index=None):
+        if parent is self.world:
+            parent = None
+        oldParent, oldIndex = node.parent, None
+        if oldParent is not None:
+            oldIndex = oldParent.children.index(node)
+            oldParent.children.remove(node)
+        node.parent = parent
+        if parent is not None:
+            parent.children.insert(len(parent.children) if index is None else index, node)
+        self._record(lambda: self.reparent(node, oldParent, oldIndex))
+        self.notify("dagChange", node, parent or self.world)
+
+    def rename(self, node, name):
+        previous = node.name
+        name = self.uniqueName(name, node)
+        if name == previous:
+            return name
+        del self.names[previous]
+        node.name = name
+        self.names[name] = node
+        self._record(lambda: self.rename(node, previous))
+        self.notify("nameChanged", node, previous)
+        return name
+
+    def addAttr(self, node, attr, parent=None):
+        '''
+        Adds a dynamic attribute, as a child of the dynamic compound parent when given
+        '''
+        for each in [attr] + list(attr.descendants()):
+            each.dynamic = True
+            node.attrs[each.longName] = each
+            node.attrs.setdefault(each.shortName, each)
+        if parent is not None:
+            attr.parent = parent
+            parent.children.append(attr)
+            self._record(lambda: parent.children.remove(attr))
+            return
+        node.dynamic.append(attr)
+        self._record(lambda: self.deleteAttr(node, attr))
+
+    def deleteAttr(self, node, attr):
+        names = set(each.longName for each in [attr] + list(attr.descendants()))
+        for path, source in node.inputs.items():
+            if path[0][0] in names:
+                self.disconnect(source[0], source[1], node, path)
+        for path, destinations in node.outputs.items():
+            if path[0][0] in names:
+                for destination in list(destinations):
+                    self.disconnect(node, path, destination[0], destination[1])
+        removed = dict((path, node.values.pop(path)) for path in list(node.values) if path[0][0] in names)
+        if removed:
+            self._record(lambda: node.values.update(removed))
+        for each in [attr] + list(attr.descendants()):
+            for name in (each.longName, each.shortName):
+                if node.attrs.get(name) is each:
+                    del node.attrs[name]
+        node.dynamic.remove(attr)
+        self._record(lambda: self.addAttr(node, attr))
+
+    def setData(self, node, key, value):
+        old = node.data.get(key, _MISSING)
+        node.data[key] = value
+        if old is _MISSING:
+            self._record(lambda: node.data.pop(key, None))
+        else:
+            self._record(lambda: node.data.__setitem__(key, old))
+
+    def __touch(self, node, path):
+        '''
+        Registers the multi elements along path as existing
+        '''
+        for k in range(len(path)):
+            if path[k][1] is not None:
+                node.indices.setdefault(path[:k] + ((path[k][0], None),), set()).add(path[k][1])
+    #Primitives--
+
+
+#Current scene++
+_current = [Scene()]
+
+def current():
+    return _current[0]
+
+def newScene(kind="beforeNew"):
+    '''
+    Replaces the current scene with an empty one, listeners carry over
+    '''
+    old = _current[0]
+    old.notify(kind)
+    _current[0] = Scene(old.listeners)
+    return _current[0]
+#Current scene--
@@ -0,0 +1,392 @@
+'''
+Matrix, euler and nurbs curve maths for the headless scene
+
+Matrices are flat lists of 16 floats, row major with the translation in the
+last row, and points are row vectors (p * M) like MMatrix.
+Angles are in degrees, rotate orders are Maya's rotateOrder enum (0 = xyz).
+'''
+
+import math
+
+ROTATE_ORDERS = ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+_AXES = {"x":0, "y":1, "z":2}
+_EPSILON = 1.0e-10
+
+
+def identity():
+    return [1.0, 0.0, 0.0, 0.0,
+            0.0, 1.0, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0,
+            0.0, 0.0, 0.0, 1.0]
+
+def isIdentity(m, tolerance=1.0e-9):
+    ident = identity()
+    for i in range(16):
+        if abs(m[i] - ident[i]) > tolerance:
+            return False
+    return True
+
+def multiply(a, b):
+    out = [0.0] * 16
+    for row in range(4):
+        r = row * 4
+        a0, a1, a2, a3 = a[r], a[r+1], a[r+2], a[r+3]
+        for column in range(4):
+            out[r+column] = a0*b[column] + a1*b[4+column] + a2*b[8+column] + a3*b[12+column]
+    return out
+
+def multiplyAll(matrices):
+    out = identity()
+    for m in matrices:
+        out = multiply(out, m)
+    return out
+
+def inverse(m):
+    '''
+    Gauss-Jordan inverse, a singular matrix returns the identity
+    '''
+    rows = [list(m[i*4:i*4+4]) + [1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+    for column in range(4):
+        pivot = max(range(column, 4), key=lambda r: abs(rows[r][column]))
+        if abs(rows[pivot][column]) < _EPSILON:
+            return identity()
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        scale = 1.0 / rows[column][column]
+        rows[column] = [val * scale for val in rows[column]]
+        for r in range(4):
+            if r != column and rows[r][column]:
+                factor = rows[r][column]
+                rows[r] = [val - factor * other for val, other in zip(rows[r], rows[column])]
+    return [rows[i][4+j] for i in range(4) for j in range(4)]
+
+def translation(x, y, z):
+    m = identity()
+    m[12:15] = [float(x), float(y), float(z)]
+    return m
+
+def scale(x, y, z):
+    m = identity()
+    m[0], m[5], m[10] = float(x), float(y), float(z)
+    return m
+
+def shear(xy, xz, yz):
+    m = identity()
+    m[4], m[8], m[9] = float(xy), float(xz), float(yz)
+    return m
+
+def getTranslation(m):
+    return [m[12], m[13], m[14]]
+
+def setTranslation(m, t):
+    m = list(m)
+    m[12:15] = [float(t[0]), float(t[1]), float(t[2])]
+    return m
+
+def transformPoint(p, m):
+    x, y, z = p[0], p[1], p[2]
+    return [x*m[0] + y*m[4] + z*m[8] + m[12],
+            x*m[1] + y*m[5] + z*m[9] + m[13],
+            x*m[2] + y*m[6] + z*m[10] + m[14]]
+
+def transformVector(v, m):
+    x, y, z = v[0], v[1], v[2]
+    return [x*m[0] + y*m[4] + z*m[8],
+            x*m[1] + y*m[5] + z*m[9],
+            x*m[2] + y*m[6] + z*m[10]]
+
+def axis(m, index):
+    return [m[index*4], m[index*4+1], m[index*4+2]]
+
+#Vectors++
+def add(a, b):
+    return [a[0]+b[0], a[1]+b[1], a[2]+b[2]]
+
+def subtract(a, b):
+    return [a[0]-b[0], a[1]-b[1], a[2]-b[2]]
+
+def scaleVector(v, factor):
+    return [v[0]*factor, v[1]*factor, v[2]*factor]
+
+def dot(a, b):
+    return a[0]*b[0] + a[1]*b[1] + a[2]*b[2]
+
+def cross(a, b):
+    return [a[1]*b[2] - a[2]*b[1], a[2]*b[0] - a[0]*b[2], a[0]*b[1] - a[1]*b[0]]
+
+def length(v):
+    return math.sqrt(dot(v, v))
+
+def normalize(v):
+    size = length(v)
+    if size < _EPSILON:
+        return [0.0, 0.0, 0.0]
+    return [v[0]/size, v[1]/size, v[2]/size]
+
+def distance(a, b):
+    return length(subtract(a, b))
+#Vectors--
+
+#Rotations++
+def axisRotation(axisIndex, degrees):
+    '''
+    Rotation about one axis, for row vectors
+    '''
+    angle = math.radians(degrees)
+    c, s = math.cos(angle), math.sin(angle)
+    m = identity()
+    if axisIndex == 0:
+        m[5], m[6], m[9], m[10] = c, s, -s, c
+    elif axisIndex == 1:
+        m[0], m[2], m[8], m[10] = c, -s, s, c
+    else:
+        m[0], m[1], m[4], m[5] = c, s, -s, c
+    return m
+
+def eulerToMatrix(rotation, rotateOrder=0):
+    '''
+    rotation is [rx, ry, rz], the first axis of the rotate order is applied first
+    '''
+    out = identity()
+    for letter in ROTATE_ORDERS[rotateOrder]:
+        index = _AXES[letter]
+        out = multiply(out, axisRotation(index, rotation[index]))
+    return out
+
+def rotationPart(m):
+    '''
+    Orthonormal rotation of m, scale (and a negative determinant) removed
+    '''
+    rows = [normalize(axis(m, i)) for i in range(3)]
+    if dot(cross(rows[0], rows[1]), rows[2]) < 0:
+        rows[0] = scaleVector(rows[0], -1.0)
+    out = identity()
+    for i in range(3):
+        out[i*4:i*4+3] = rows[i]
+    return out
+
+def matrixToEuler(m, rotateOrder=0):
+    '''
+    Euler angles in degrees of the rotation in m, for the given rotate order
+    '''
+    r = rotationPart(m)
+    #    column vector form, N = R_k * R_j * R_i for the order i, j, k
+    n = [[r[column*4+row] for column in range(3)] for row in range(3)]
+    order = ROTATE_ORDERS[rotateOrder]
+    i, j, k = _AXES[order[0]], _AXES[order[1]], _AXES[order[2]]
+    sign = 1.0 if (j - i) % 3 == 1 else -1.0
+
+    angles = [0.0, 0.0, 0.0]
+    sinJ = -sign * n[k][i]
+    sinJ = max(-1.0, min(1.0, sinJ))
+    angles[j] = math.asin(sinJ)
+    if abs(sinJ) < 1.0 - 1.0e-9:
+        angles[i] = math.atan2(sign * n[k][j], n[k][k])
+        angles[k] = math.atan2(sign * n[j][i], n[i][i])
+    else:
+        #    gimbal lock, put the whole remaining rotation on the first axis
+        angles[k] = 0.0
+        angles[i] = math.atan2(-sign * n[j][k], n[j][j])
+    return [math.degrees(angle) for angle in angles]
+
+def matrixToQuaternion(m):
+    '''
+    Quaternion [x, y, z, w] of the rotation in m
+    '''
+    r = rotationPart(m)
+    trace = r[0] + r[5] + r[10]
+    if trace > 0:
+        s = 0.5 / math.sqrt(trace + 1.0)
+        return [(r[6] - r[9]) * s, (r[8] - r[2]) * s, (r[1] - r[4]) * s, 0.25 / s]
+    if r[0] > r[5] and r[0] > r[10]:
+        s = 2.0 * math.sqrt(1.0 + r[0] - r[5] - r[10])
+        return [0.25 * s, (r[4] + r[1]) / s, (r[8] + r[2]) / s, (r[6] - r[9]) / s]
+    if r[5] > r[10]:
+        s = 2.0 * math.sqrt(1.0 + r[5] - r[0] - r[10])
+        return [(r[4] + r[1]) / s, 0.25 * s, (r[9] + r[6]) / s, (r[8] - r[2]) / s]
+    s = 2.0 * math.sqrt(1.0 + r[10] - r[0] - r[5])
+    return [(r[8] + r[2]) / s, (r[9] + r[6]) / s, 0.25 * s, (r[1] - r[4]) / s]
+
+def quaternionToMatrix(q):
+    x, y, z, w = q
+    out = identity()
+    out[0:3] = [1 - 2*(y*y + z*z), 2*(x*y + z*w), 2*(x*z - y*w)]
+    out[4:7] = [2*(x*y - z*w), 1 - 2*(x*x + z*z), 2*(y*z + x*w)]
+    out[8:11] = [2*(x*z + y*w), 2*(y*z - x*w), 1 - 2*(x*x + y*y)]
+    return out
+
+def blendRotations(matrices, weights):
+    '''
+    Weighted average of the rotations of matrices, as a rotation matrix
+    '''
+    total = [0.0, 0.0, 0.0, 0.0]
+    first = None
+    for m, weight in zip(matrices, weights):
+        q = matrixToQuaternion(m)
+        if first is None:
+            first = q
+        elif sum(a*b for a, b in zip(first, q)) < 0:
+            q = [-val for val in q]
+        total = [a + b * weight for a, b in zip(total, q)]
+    size = math.sqrt(sum(val * val for val in total))
+    if size < _EPSILON:
+        return identity()
+    return quaternionToMatrix([val / size for val in total])
+
+def _frame(aim, up):
+    '''
+    Orthonormal rows aim, up, aim x up, None when aim is zero length.
+    An up parallel to aim falls back to the world axis the least aligned with aim.
+    '''
+    aim = normalize(aim)
+    if length(aim) < _EPSILON:
+        return None
+    up = normalize(up)
+    if length(up) < _EPSILON or abs(dot(aim, up)) > 1.0 - 1.0e-6:
+        worldAxes = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+        up = min(worldAxes, key=lambda vec: abs(dot(aim, vec)))
+    up = normalize(subtract(up, scaleVector(aim, dot(up, aim))))
+    return [aim, up, cross(aim, up)]
+
+def aimMatrix(aimVector, upVector, aimAxis="x", upAxis="y"):
+    '''
+    Rotation matrix pointing aimAxis along aimVector with upAxis towards upVector
+    '''
+    frame = _frame(aimVector, upVector)
+    if not frame:
+        return identity()
+    aimIndex, upIndex = _AXES[aimAxis], _AXES[upAxis]
+    third = 3 - aimIndex - upIndex
+    rows = [None, None, None]
+    rows[aimIndex] = frame[0]
+    rows[upIndex] = frame[1]
+    rows[third] = cross(rows[(third+1) % 3], rows[(third+2) % 3])
+    out = identity()
+    for index in range(3):
+        out[index*4:index*4+3] = rows[index]
+    return out
+
+def aimRotation(aimVector, upVector, worldAim, worldUp):
+    '''
+    Rotation taking the local aimVector onto worldAim with upVector towards worldUp,
+    for any aim and up vectors (aimConstraint)
+    '''
+    local = _frame(aimVector, upVector)
+    world = _frame(worldAim, worldUp)
+    if not (local and world):
+        return identity()
+    out = [0.0] * 16
+    out[15] = 1.0
+    #    transpose(local) * world
+    for row in range(3):
+        for column in range(3):
+            out[row*4+column] = sum(local[k][row] * world[k][column] for k in range(3))
+    return out
+#Rotations--
+
+def decompose(m, rotateOrder=0):
+    '''
+    Splits m into translate, rotate (degrees) and scale, shear is dropped
+    '''
+    scales = [length(axis(m, i)) for i in range(3)]
+    if dot(cross(axis(m, 0), axis(m, 1)), axis(m, 2)) < 0:
+        scales[0] = -scales[0]
+    return getTranslation(m), matrixToEuler(m, rotateOrder), scales
+
+def decomposeShear(m, rotateOrder=0):
+    '''
+    Splits m into translate, rotate (degrees), scale and shear, m = S * SH * R * T
+    like the decomposeMatrix node
+    '''
+    rows = [axis(m, i) for i in range(3)]
+    #    a negative determinant goes on the x scale
+    flip = -1.0 if dot(cross(rows[0], rows[1]), rows[2]) < 0 else 1.0
+    x = scaleVector(normalize(rows[0]), flip)
+    xy = dot(rows[1], x)
+    y = subtract(rows[1], scaleVector(x, xy))
+    sy = length(y)
+    y = normalize(y)
+    xz, yz = dot(rows[2], x), dot(rows[2], y)
+    z = subtract(subtract(rows[2], scaleVector(x, xz)), scaleVector(y, yz))
+    sz = length(z)
+    z = normalize(z)
+
+    scales = [flip * length(rows[0]), sy, sz]
+    shears = [xy / sy if sy > _EPSILON else 0.0, xz / sz if sz > _EPSILON else 0.0, yz / sz if sz > _EPSILON else 0.0]
+    rotation = identity()
+    for i, row in enumerate([x, y, z]):
+        rotation[i*4:i*4+3] = row
+    return getTranslation(m), matrixToEuler(rotation, rotateOrder), scales, shears
+
+def composeTransform(t=(0,0,0), r=(0,0,0), s=(1,1,1), rotateOrder=0, sh=(0,0,0), ra=(0,0,0),
+                     rp=(0,0,0), rpt=(0,0,0), sp=(0,0,0), spt=(0,0,0), jo=None, inverseScale=(1,1,1)):
+    '''
+    The local matrix of a transform, or of a joint when jo (jointOrient) is given:
+        transform: -sp * S * SH * sp * spt * -rp * RA * R * rp * rpt * T
+        joint:     S * RA * R * JO * IS * T, IS being the inverse of inverseScale
+    '''
+    if jo is not None:
+        inverse = [1.0 / val if abs(val) > _EPSILON else 1.0 for val in inverseScale]
+        return multiplyAll([scale(*s), eulerToMatrix(ra), eulerToMatrix(r, rotateOrder),
+                            eulerToMatrix(jo), scale(*inverse), translation(*t)])
+    return multiplyAll([translation(-sp[0], -sp[1], -sp[2]), scale(*s), shear(*sh), translation(*sp),
+                        translation(*spt), translation(-rp[0], -rp[1], -rp[2]), eulerToMatrix(ra),
+                        eulerToMatrix(r, rotateOrder), translation(*rp), translation(*rpt), translation(*t)])
+
+#Curves++
+def fullKnots(knots):
+    '''
+    Maya stores knots without the two end knots a textbook nurbs curve has
+    '''
+    return [knots[0]] + list(knots) + [knots[-1]]
+
+def defaultKnots(count, degree, periodic=False):
+    '''
+    Knot vector (Maya form, count + degree - 1 long) of a uniform curve
+    '''
+    if degree == 1:
+        return [float(i) for i in range(count)]
+    if periodic:
+        return [float(i) for i in range(-degree + 1, count)]
+    spans = count - degree
+    return [0.0] * degree + [float(i) for i in range(1, spans)] + [float(spans)] * degree
+
+def curveRange(knots, degree, count):
+    return knots[degree - 1], knots[count - 1]
+
+def curvePoint(cvs, knots, degree, param):
+    '''
+    de Boor evaluation of a non rational curve, param is clamped to the curve range
+    '''
+    count = len(cvs)
+    start, end = curveRange(knots, degree, count)
+    param = max(start, min(end, param))
+    full = fullKnots(knots)
+
+    span = degree
+    while span < count - 1 and full[span + 1] <= param:
+        span += 1
+    points = [list(cvs[span - degree + i]) for i in range(degree + 1)]
+    for level in range(1, degree + 1):
+        for i in range(degree, level - 1, -1):
+            left = full[span - degree + i]
+            right = full[span + 1 + i - level]
+            alpha = 0.0
+            if right - left > _EPSILON:
+                alpha = (param - left) / (right - left)
+            points[i] = [(1.0 - alpha) * points[i-1][axisIndex] + alpha * points[i][axisIndex] for axisIndex in range(3)]
+    return points[degree]
+
+def curveLength(cvs, knots, degree, samplesPerSpan=16):
+    if degree == 1:
+        return sum(distance(cvs[i], cvs[i+1]) for i in range(len(cvs) - 1))
+    start, end = curveRange(knots, degree, len(cvs))
+    samples = max(1, (len(cvs) - degree) * samplesPerSpan)
+    total = 0.0
+    previous = curvePoint(cvs, knots, degree, start)
+    for i in range(1, samples + 1):
+        point = curvePoint(cvs, knots, degree, start + (end - start) * i / float(samples))
+        total += distance(previous, point)
+        previous = point
+    return total
+
+#Curves--